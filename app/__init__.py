@@ -1 +1,10 @@
-from .app import app
\ No newline at end of file
+import os
+import sys
+
+# Los módulos de la app se importan con rutas absolutas (config, models, services...):
+# al cargarla como paquete (p. ej. flask --app app desde esta carpeta) esta carpeta tiene que estar en sys.path
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+if _DIRECTORIO not in sys.path:
+    sys.path.insert(0, _DIRECTORIO)
+
+from .app import app
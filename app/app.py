@@ -1,4 +1,4 @@
-from flask import Flask, send_from_directory
+from flask import Flask
 from config.database import db, app
 from controllers.user_controller import UserController
 from controllers.abecedario_controller import AbecedarioController
@@ -6,7 +6,21 @@ from controllers.paseo_controller import paseo_bp
 from controllers.admin_controller import AdminController
 from controllers.memory_game_controller import MemoryGameController
 from controllers.train_game_controller import train_game_bp
+from controllers.job_controller import JobController
 from flask_swagger_ui import get_swaggerui_blueprint
+from middleware.compression import init_compression
+from middleware.metrics import init_metrics
+from middleware.query_profiler import init_query_profiler
+from middleware.static_cache import assets
+from config.openapi import generar_spec
+from config.invalidacion import init_invalidacion
+from cli.mantenimiento import mantenimiento
+from cli.migraciones import migraciones, aplicar_migraciones
+from cli.jobs import jobs
+from cli.particiones import particiones
+from cli.archivo import archivo
+from services.jobs.worker import iniciar_en_hilo
+import os
 
 # Import models to ensure they are registered with SQLAlchemy
 from models.user import User
@@ -14,6 +28,10 @@ from models.abecedario import Abecedario
 from models.paseo import PaseoSession
 from models.memory_game import MemoryGameSession, MemoryGameConfig
 from models.train_game import TrainGameSession, TrainGameConfig
+from models.user_game_stats import UserGameStats
+from models.job import Job
+from models.invalidacion import Invalidacion
+from models.archivo import SesionArchivada
 
 # Create the database tables
 # Create the database tables moved to main block
@@ -38,12 +56,29 @@ app.register_blueprint(paseo_bp, url_prefix='/paseo')
 # Register Train Game blueprint
 app.register_blueprint(train_game_bp, url_prefix='/train-game')
 
-# Ruta para servir el archivo swagger.json
+# Compresión gzip/brotli de respuestas
+init_compression(app)
+
+# Latencia por ruta, consultas SQL por petición y /metrics (Prometheus)
+init_metrics(app, db)
+
+# Perfil de consultas por petición (QUERY_PROFILER=1, solo desarrollo): avisa N+1 y consultas lentas
+init_query_profiler(app, db)
+
+# Invalidación de cachés en memoria entre workers (LISTEN/NOTIFY en PostgreSQL, sondeo en SQLite)
+init_invalidacion(app)
+
+# Comandos de mantenimiento: flask --app app mantenimiento --help
+app.cli.add_command(mantenimiento)
+app.cli.add_command(migraciones)
+app.cli.add_command(jobs)
+app.cli.add_command(particiones)
+app.cli.add_command(archivo)
+
+# Ruta para servir swagger.json (generado al arrancar, ver más abajo)
 @app.route('/swagger.json')
 def swagger_spec():
-    import os
-    directory = os.path.dirname(os.path.abspath(__file__))
-    return send_from_directory(directory, 'swagger.json')
+    return assets.responder('swagger.json')
 
 # User Routes
 app.add_url_rule('/users', 'get_users', UserController.get_all, methods=['GET'])
@@ -55,6 +90,7 @@ app.add_url_rule('/abecedario/session', 'save_abecedario_session', AbecedarioCon
 app.add_url_rule('/abecedario/next-challenge/<int:user_id>', 'get_next_challenge', AbecedarioController.get_next_challenge, methods=['GET'])
 app.add_url_rule('/abecedario/stats/<int:user_id>', 'get_abecedario_stats', AbecedarioController.get_performance_stats, methods=['GET'])
 app.add_url_rule('/abecedario/daily-summary/<int:user_id>', 'get_daily_summary', AbecedarioController.get_daily_summary, methods=['GET'])
+app.add_url_rule('/abecedario/daily-summaries/<int:user_id>', 'get_daily_summaries', AbecedarioController.get_daily_summaries, methods=['GET'])
 app.add_url_rule('/abecedario/history/<int:user_id>', 'get_abecedario_history', AbecedarioController.get_history, methods=['GET'])
 app.add_url_rule('/abecedario/evolution/<int:user_id>', 'get_evolution_report', AbecedarioController.get_evolution_report, methods=['GET'])
 app.add_url_rule('/abecedario/final-stats/<int:user_id>', 'get_final_stats', AbecedarioController.get_final_stats, methods=['GET'])
@@ -66,26 +102,39 @@ app.add_url_rule('/memory-game/stats/<int:user_id>', 'get_memory_stats', MemoryG
 app.add_url_rule('/memory-game/reset/<int:user_id>', 'reset_memory_progress', MemoryGameController.reset_progress, methods=['DELETE'])
 
 # Admin Routes
+app.add_url_rule('/admin/overview', 'admin_overview', AdminController.get_overview, methods=['GET'])
 app.add_url_rule('/admin/memory-sessions', 'admin_memory_sessions', AdminController.get_memory_sessions, methods=['GET'])
 app.add_url_rule('/admin/abecedario-sessions', 'admin_abecedario_sessions', AdminController.get_abecedario_sessions, methods=['GET'])
 app.add_url_rule('/admin/paseo-sessions', 'admin_paseo_sessions', AdminController.get_paseo_sessions, methods=['GET'])
 app.add_url_rule('/admin/memory-configs', 'admin_memory_configs', AdminController.get_memory_configs, methods=['GET'])
 app.add_url_rule('/admin/stats', 'admin_stats', AdminController.get_admin_stats, methods=['GET'])
+app.add_url_rule('/admin/stats/v2', 'admin_stats_v2', AdminController.get_admin_stats_v2, methods=['GET'])
+app.add_url_rule('/admin/metrics', 'admin_metrics', AdminController.get_metrics_summary, methods=['GET'])
 app.add_url_rule('/admin/user-stats/<int:user_id>', 'admin_user_stats', AdminController.get_user_stats_all_games, methods=['GET'])
 app.add_url_rule('/admin/user-memory-sessions/<int:user_id>', 'admin_user_memory_sessions', AdminController.get_user_memory_sessions, methods=['GET'])
 app.add_url_rule('/admin/user-abecedario-sessions/<int:user_id>', 'admin_user_abecedario_sessions', AdminController.get_user_abecedario_sessions, methods=['GET'])
 app.add_url_rule('/admin/user-paseo-sessions/<int:user_id>', 'admin_user_paseo_sessions', AdminController.get_user_paseo_sessions, methods=['GET'])
 app.add_url_rule('/admin/train-sessions', 'admin_train_sessions', AdminController.get_train_sessions, methods=['GET'])
 app.add_url_rule('/admin/user-train-sessions/<int:user_id>', 'admin_user_train_sessions', AdminController.get_user_train_sessions, methods=['GET'])
+app.add_url_rule('/admin/export/<juego>', 'admin_export', AdminController.export_sessions, methods=['GET'])
+
+# Jobs Routes (cola de trabajos en segundo plano)
+app.add_url_rule('/jobs/<int:job_id>', 'get_job', JobController.get_status, methods=['GET'])
 
 # Ruta para servir el dashboard
 @app.route('/admin')
 def admin_dashboard():
-    import os
-    directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
-    return send_from_directory(directory, 'admin_dashboard.html')
+    return assets.responder('admin_dashboard.html')
+
+# Assets estáticos en memoria con URLs con huella, y swagger.json generado desde las rutas
+assets.init_app(app)
+assets.reemplazar_urls('admin_dashboard.html', ['admin_dashboard.css', 'admin_dashboard.js'])
+assets.registrar('swagger.json', app.json.dumps(generar_spec(app)).encode('utf-8'), 'application/json')
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        aplicar_migraciones()
+    # Sin proceso aparte (flask --app app jobs worker): worker en un hilo del servidor
+    if os.environ.get('JOBS_EN_PROCESO') == '1':
+        iniciar_en_hilo(app)
     app.run(debug=True)
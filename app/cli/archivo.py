@@ -0,0 +1,89 @@
+"""
+Archivo en frío de las sesiones viejas (flask archivo ...)
+
+    cd app
+    flask --app app archivo archivar --dry-run
+    flask --app app archivo archivar                      # cron mensual: lo anterior a ARCHIVO_MESES
+    flask --app app archivo archivar --juego abecedario --usuario 19
+    flask --app app archivo estado
+    flask --app app archivo restaurar --usuario 19 --juego paseo
+
+archivar mueve cada sesión anterior al horizonte a un bloque comprimido por
+(juego, usuario, mes) en sesiones_archivadas y la borra de la tabla del
+juego, con un commit por usuario. user_game_stats no cambia. El historial,
+la evolución, los listados del panel y la exportación siguen mostrando las
+sesiones archivadas (las leen del archivo cuando el rango pedido llega hasta ahí).
+
+--meses no puede ser menor que ARCHIVO_MESES: los endpoints solo buscan en
+el archivo antes de ese horizonte. Para archivar más, bajar ARCHIVO_MESES
+en la app y en el cron.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func
+
+from config.database import db
+from models.archivo import SesionArchivada
+from services.archivo.archivo_service import ArchivoService, JUEGOS, MESES_EN_LINEA
+
+archivo = AppGroup('archivo', help='Archivo en frío de las sesiones viejas')
+
+opcion_juego = click.option('--juego', type=click.Choice(['todos', *JUEGOS]), multiple=True, default=['todos'],
+                            show_default=True, help='Juego (repetible)')
+
+
+def _juegos(juego):
+    return list(JUEGOS) if 'todos' in juego else list(dict.fromkeys(juego))
+
+
+@archivo.command('archivar')
+@click.option('--meses', type=int, default=MESES_EN_LINEA, show_default=True,
+              help='Meses que quedan en línea, el actual incluido (ARCHIVO_MESES)')
+@opcion_juego
+@click.option('--usuario', 'usuarios', type=int, multiple=True, help='Solo estos user_id (repetible)')
+@click.option('--dry-run', is_flag=True, help='Solo contar las sesiones a archivar')
+def archivar(meses, juego, usuarios, dry_run):
+    """Mueve al archivo las sesiones anteriores a los últimos --meses"""
+    if meses < MESES_EN_LINEA:
+        raise click.UsageError(f'--meses no puede ser menor que ARCHIVO_MESES ({MESES_EN_LINEA}): '
+                               'los endpoints no buscarían esas sesiones en el archivo')
+    limite = ArchivoService.horizonte(meses)
+
+    for nombre in _juegos(juego):
+        if dry_run:
+            click.echo(f"[dry-run] {nombre}: se archivarían {ArchivoService.contar(nombre, limite)} sesiones "
+                       f"anteriores a {limite}")
+            continue
+        usuarios_archivados, sesiones = 0, 0
+        for _, cantidad in ArchivoService.archivar(nombre, limite, usuarios or None):
+            usuarios_archivados += 1
+            sesiones += cantidad
+        click.echo(f"  ✓ {nombre}: {sesiones} sesiones de {usuarios_archivados} usuarios archivadas "
+                   f"(anteriores a {limite})")
+
+
+@archivo.command('estado')
+def estado():
+    """Bloques, sesiones y tamaño comprimido por juego"""
+    filas = db.session.query(SesionArchivada.juego, func.count(SesionArchivada.id), func.sum(SesionArchivada.cantidad),
+                             func.sum(func.length(SesionArchivada.datos)), func.min(SesionArchivada.mes),
+                             func.max(SesionArchivada.mes)).group_by(SesionArchivada.juego).\
+        order_by(SesionArchivada.juego).all()
+    if not filas:
+        click.echo('Archivo vacío')
+        return
+    for nombre, bloques, sesiones, tamanio, desde, hasta in filas:
+        click.echo(f"  {nombre:<12} {bloques} bloques, {sesiones} sesiones, {tamanio / 1024:.1f} KiB "
+                   f"({desde:%Y-%m} a {hasta:%Y-%m})")
+
+
+@archivo.command('restaurar')
+@click.option('--usuario', 'usuarios', type=int, multiple=True, required=True, help='user_id (repetible)')
+@opcion_juego
+def restaurar(usuarios, juego):
+    """Devuelve las sesiones archivadas a las tablas de los juegos"""
+    for nombre in _juegos(juego):
+        for user_id in usuarios:
+            cantidad = ArchivoService.restaurar(nombre, user_id)
+            if cantidad:
+                click.echo(f"  ✓ {nombre}: {cantidad} sesiones del usuario {user_id} restauradas")
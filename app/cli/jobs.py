@@ -0,0 +1,96 @@
+"""
+Cola de trabajos en segundo plano (flask jobs ...)
+
+    cd app
+    flask --app app jobs worker                          # procesa la cola hasta Ctrl+C / SIGTERM
+    flask --app app jobs worker --tipo memoria.analisis_ia --tipo trenes.analisis_ia
+    flask --app app jobs worker --una-vez                # vacía la cola y termina (cron)
+    flask --app app jobs estado
+    flask --app app jobs reintentar                      # los fallidos vuelven a pendientes
+    flask --app app jobs purgar --dias 30                # borra terminados viejos
+
+Se pueden correr varios workers (procesos o máquinas) contra la misma base
+PostgreSQL: cada uno toma trabajos distintos (FOR UPDATE SKIP LOCKED).
+"""
+import signal
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, update, delete
+
+from config.database import db
+from models.job import Job, PENDIENTE, COMPLETADO, FALLIDO
+from services.jobs.job_service import TAREAS
+from services.jobs.worker import Worker
+from config.invalidacion import escucha_habilitada, iniciar_escucha
+
+jobs = AppGroup('jobs', help='Cola de trabajos en segundo plano (análisis de IA, reportes)')
+
+
+@jobs.command('worker')
+@click.option('--tipo', 'tipos', multiple=True, help='Solo estos tipos de trabajo (repetible)')
+@click.option('--intervalo', type=float, default=1.0, show_default=True,
+              help='Segundos de espera cuando la cola está vacía')
+@click.option('--timeout', type=int, default=600, show_default=True,
+              help='Segundos tras los que un trabajo en curso se considera abandonado')
+@click.option('--una-vez', is_flag=True, help='Procesar lo pendiente y terminar')
+def worker(tipos, intervalo, timeout, una_vez):
+    """Ejecuta trabajos de la cola"""
+    desconocidos = set(tipos) - set(TAREAS)
+    if desconocidos:
+        raise click.BadParameter(f'Tipos sin tarea registrada: {", ".join(sorted(desconocidos))}', param_hint='--tipo')
+
+    app = current_app._get_current_object()
+    proceso = Worker(app, tipos=tipos, intervalo=intervalo, timeout=timeout)
+    if escucha_habilitada() and not una_vez:
+        iniciar_escucha(app)  # las tareas también usan cachés en memoria
+
+    def detener(*_):
+        click.echo('⏹  Terminando el trabajo en curso...')
+        proceso.detener.set()
+
+    signal.signal(signal.SIGTERM, detener)
+    signal.signal(signal.SIGINT, detener)
+
+    click.echo(f"👷 Worker {proceso.nombre}: {', '.join(tipos) or 'todos los tipos'}")
+    procesados = proceso.ejecutar(una_vez=una_vez)
+    click.echo(f'✅ {procesados} trabajos procesados')
+
+
+@jobs.command('estado')
+def estado():
+    """Cantidad de trabajos por tipo y estado"""
+    filas = db.session.query(Job.tipo, Job.estado, func.count(Job.id)).\
+        group_by(Job.tipo, Job.estado).order_by(Job.tipo, Job.estado).all()
+    if not filas:
+        click.echo('Cola vacía')
+        return
+    for tipo, estado_job, cantidad in filas:
+        click.echo(f'  {tipo:<30} {estado_job:<12} {cantidad}')
+
+
+@jobs.command('reintentar')
+@click.option('--tipo', 'tipos', multiple=True, help='Solo estos tipos (repetible)')
+def reintentar(tipos):
+    """Vuelve a encolar los trabajos fallidos (con los intentos en cero)"""
+    condicion = Job.estado == FALLIDO
+    if tipos:
+        condicion = condicion & Job.tipo.in_(tipos)
+    cantidad = db.session.execute(
+        update(Job).where(condicion).values(estado=PENDIENTE, intentos=0, disponible_en=datetime.utcnow(),
+                                            terminado_en=None)).rowcount
+    db.session.commit()
+    click.echo(f'🔁 {cantidad} trabajos reencolados')
+
+
+@jobs.command('purgar')
+@click.option('--dias', type=int, default=30, show_default=True, help='Antigüedad mínima')
+def purgar(dias):
+    """Borra los trabajos completados o fallidos que terminaron hace más de --dias"""
+    limite = datetime.utcnow() - timedelta(days=dias)
+    cantidad = db.session.execute(
+        delete(Job).where(Job.estado.in_((COMPLETADO, FALLIDO)), Job.terminado_en < limite)).rowcount
+    db.session.commit()
+    click.echo(f'🧹 {cantidad} trabajos borrados')
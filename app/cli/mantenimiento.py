@@ -0,0 +1,365 @@
+"""
+Comandos de mantenimiento (flask mantenimiento ...)
+
+Reemplazan a los scripts sueltos que recorrían objetos del ORM uno por uno:
+cada operación es un UPDATE / DELETE por conjunto, aplicado por lotes de
+claves primarias consecutivas (un commit por lote, para no bloquear las
+tablas mucho tiempo) y con barra de progreso. --dry-run solo cuenta las
+filas afectadas.
+
+    cd app
+    flask --app app mantenimiento listar-usuarios
+    flask --app app mantenimiento reset-passwords --password 123 --dry-run
+    flask --app app mantenimiento rehash-passwords --todos --aleatorias --salida credenciales.csv
+    flask --app app mantenimiento reset-progreso --usuario 19 --juego memoria
+    flask --app app mantenimiento reset-progreso --prefijo sintetico --juego todos
+    flask --app app mantenimiento limpiar-trenes
+    flask --app app mantenimiento recalcular-estadisticas --todos
+    flask --app app mantenimiento invalidar-cache abecedario.palabras
+"""
+import os
+import csv
+import time
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+import bcrypt as libbcrypt
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import select, update, delete, func, or_, text
+
+from config.database import db, bcrypt
+from models.user import User
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.memory_game import MemoryGameSession, MemoryGameConfig
+from models.train_game import TrainGameSession, TrainGameConfig
+from models.user_game_stats import UserGameStats
+from models.archivo import SesionArchivada
+from services.user_game_stats_service import UserGameStatsService
+from config import invalidacion
+
+mantenimiento = AppGroup('mantenimiento', help='Operaciones masivas sobre usuarios y sesiones')
+
+# Tablas de cada juego: sesiones y configuración (si tiene)
+TABLAS_JUEGO = {
+    'memoria': (MemoryGameSession, MemoryGameConfig),
+    'trenes': (TrainGameSession, TrainGameConfig),
+    'abecedario': (Abecedario, None),
+    'paseo': (PaseoSession, None),
+}
+
+# Valores por defecto para sesiones de trenes guardadas antes de que existieran las columnas
+DEFAULTS_TRENES = {'train_speed': 3.0, 'color_count': 3, 'spawn_rate': 5.0, 'completion_status': 'completed'}
+
+opcion_lote = click.option('--lote', default=5000, show_default=True, help='Filas por commit')
+opcion_dry_run = click.option('--dry-run', is_flag=True, help='Solo contar las filas afectadas')
+
+
+def _clave_primaria(modelo):
+    return modelo.__table__.primary_key.columns.values()[0]
+
+
+def _contar(modelo, condicion):
+    return db.session.scalar(select(func.count()).select_from(modelo).where(condicion))
+
+
+def aplicar_por_lotes(modelo, condicion, sentencia, lote, etiqueta):
+    """
+    Aplica sentencia (update/delete sobre modelo) a las filas que cumplen
+    condicion, por rangos de clave primaria de hasta `lote` filas.
+    El rango se calcula antes de modificar, así que la condición puede
+    dejar de cumplirse tras el UPDATE sin cortar el recorrido.
+    Devuelve el total de filas afectadas.
+    """
+    pk = _clave_primaria(modelo)
+    total = _contar(modelo, condicion)
+    afectadas = 0
+    ultimo = None
+
+    with click.progressbar(length=total, label=etiqueta, show_pos=True) as barra:
+        while True:
+            filtro = condicion if ultimo is None else (condicion & (pk > ultimo))
+            ids = select(pk).where(filtro).order_by(pk).limit(lote).subquery()
+            hasta = db.session.scalar(select(func.max(ids.c[0])))
+            if hasta is None:
+                break
+            rango = filtro & (pk <= hasta)
+            resultado = db.session.execute(sentencia.where(rango), execution_options={'synchronize_session': False})
+            db.session.commit()
+            afectadas += resultado.rowcount
+            barra.update(resultado.rowcount)
+            ultimo = hasta
+
+    return afectadas
+
+
+def _condicion_usuarios(columna_user_id, usuarios, prefijo, todos):
+    if todos:
+        return columna_user_id.isnot(None)
+    condiciones = []
+    if usuarios:
+        condiciones.append(columna_user_id.in_(usuarios))
+    if prefijo:
+        condiciones.append(columna_user_id.in_(select(User.id).where(User.nombre.like(f'{prefijo}%'))))
+    return or_(*condiciones)
+
+
+def _seleccion_valida(usuarios, prefijo, todos):
+    if not (usuarios or prefijo or todos):
+        raise click.UsageError('Indicar --usuario, --prefijo o --todos')
+
+
+def _opciones_usuarios(f):
+    f = click.option('--todos', is_flag=True, help='Todos los usuarios')(f)
+    f = click.option('--prefijo', help='Usuarios cuyo nombre empieza con este prefijo')(f)
+    f = click.option('--usuario', 'usuarios', type=int, multiple=True, help='ID de usuario (repetible)')(f)
+    return f
+
+
+@mantenimiento.command('listar-usuarios')
+@click.option('--limite', default=100, show_default=True)
+def listar_usuarios(limite):
+    """Lista usuarios con la cantidad de sesiones por juego"""
+    conteos = {}
+    for juego, (sesiones, _) in TABLAS_JUEGO.items():
+        filas = db.session.execute(select(sesiones.user_id, func.count()).group_by(sesiones.user_id))
+        conteos[juego] = dict(filas.all())
+
+    usuarios = db.session.execute(select(User.id, User.nombre, User.edad, User.genero).order_by(User.id).limit(limite))
+    click.echo(f"{'ID':<6} {'Nombre':<30} {'Edad':<5} {'Gén.':<5} " + ' '.join(f'{j:>10}' for j in TABLAS_JUEGO))
+    for user_id, nombre, edad, genero in usuarios:
+        click.echo(f"{user_id:<6} {nombre[:30]:<30} {edad:<5} {genero:<5} " +
+                   ' '.join(f'{conteos[j].get(user_id, 0):>10}' for j in TABLAS_JUEGO))
+    click.echo(f"Total de usuarios: {db.session.scalar(select(func.count()).select_from(User))}")
+
+
+@mantenimiento.command('reset-passwords')
+@_opciones_usuarios
+@click.option('--password', default='123', show_default=True, help='Nueva contraseña')
+@opcion_lote
+@opcion_dry_run
+def reset_passwords(usuarios, prefijo, todos, password, lote, dry_run):
+    """Resetea contraseñas (bcrypt, compatible con /login) con un UPDATE por lote"""
+    _seleccion_valida(usuarios, prefijo, todos)
+    condicion = _condicion_usuarios(User.id, usuarios, prefijo, todos)
+
+    if dry_run:
+        click.echo(f"[dry-run] Se resetearían {_contar(User, condicion)} contraseñas")
+        return
+
+    # Un solo hash para todos: bcrypt es caro a propósito y la contraseña es la misma
+    hash_nuevo = bcrypt.generate_password_hash(password).decode('utf-8')
+    total = aplicar_por_lotes(User, condicion, update(User).values(password=hash_nuevo), lote, 'Contraseñas')
+    click.echo(f"✅ {total} contraseñas reseteadas a: {password}")
+
+
+@mantenimiento.command('reset-progreso')
+@_opciones_usuarios
+@click.option('--juego', type=click.Choice(['todos', *TABLAS_JUEGO]), multiple=True, default=['todos'],
+              show_default=True, help='Juego a resetear (repetible)')
+@opcion_lote
+@opcion_dry_run
+def reset_progreso(usuarios, prefijo, todos, juego, lote, dry_run):
+    """Borra sesiones y configuración de los juegos indicados: el usuario vuelve al tutorial"""
+    _seleccion_valida(usuarios, prefijo, todos)
+    juegos = list(TABLAS_JUEGO) if 'todos' in juego else list(dict.fromkeys(juego))
+
+    for nombre in juegos:
+        for modelo in TABLAS_JUEGO[nombre]:
+            if modelo is None:
+                continue
+            condicion = _condicion_usuarios(modelo.user_id, usuarios, prefijo, todos)
+            tabla = modelo.__tablename__
+            if dry_run:
+                click.echo(f"[dry-run] {tabla}: se borrarían {_contar(modelo, condicion)} filas")
+                continue
+            total = aplicar_por_lotes(modelo, condicion, delete(modelo), lote, f'{tabla:<22}')
+            click.echo(f"  ✓ {tabla}: {total} filas borradas")
+
+    if not dry_run:
+        condicion = _condicion_usuarios(UserGameStats.user_id, usuarios, prefijo, todos)
+        resultado = db.session.execute(delete(UserGameStats).where(condicion & UserGameStats.juego.in_(juegos)))
+        archivadas = db.session.execute(delete(SesionArchivada).where(
+            _condicion_usuarios(SesionArchivada.user_id, usuarios, prefijo, todos) & SesionArchivada.juego.in_(juegos)))
+        # Las configuraciones cacheadas por los workers ya no existen
+        for nombre in juegos:
+            if TABLAS_JUEGO[nombre][1] is not None:
+                invalidacion.publicar(f'{nombre}.config')
+        db.session.commit()
+        click.echo(f"  ✓ user_game_stats: {resultado.rowcount} filas borradas")
+        click.echo(f"  ✓ sesiones_archivadas: {archivadas.rowcount} bloques borrados")
+
+
+@mantenimiento.command('limpiar-trenes')
+@opcion_lote
+@opcion_dry_run
+def limpiar_trenes(lote, dry_run):
+    """Completa con valores por defecto las columnas nulas de train_game_sessions"""
+    columnas = {nombre: getattr(TrainGameSession, nombre) for nombre in DEFAULTS_TRENES}
+    condicion = or_(*[columna.is_(None) for columna in columnas.values()])
+
+    if dry_run:
+        click.echo(f"[dry-run] Se completarían {_contar(TrainGameSession, condicion)} sesiones")
+        return
+
+    sentencia = update(TrainGameSession).values(
+        {nombre: func.coalesce(columna, DEFAULTS_TRENES[nombre]) for nombre, columna in columnas.items()})
+    total = aplicar_por_lotes(TrainGameSession, condicion, sentencia, lote, 'Sesiones de trenes')
+    click.echo(f"✅ {total} sesiones de trenes completadas")
+
+
+@mantenimiento.command('recalcular-estadisticas')
+@_opciones_usuarios
+@click.option('--juego', type=click.Choice(['todos', *TABLAS_JUEGO]), multiple=True, default=['todos'],
+              show_default=True, help='Juego a recalcular (repetible)')
+@opcion_lote
+def recalcular_estadisticas(usuarios, prefijo, todos, juego, lote):
+    """
+    Reconstruye user_game_stats desde las sesiones (después de una carga
+    masiva, de borrar sesiones a mano o al crear la tabla)
+    """
+    _seleccion_valida(usuarios, prefijo, todos)
+    juegos = list(TABLAS_JUEGO) if 'todos' in juego else list(dict.fromkeys(juego))
+
+    def condicion(columna):
+        return _condicion_usuarios(columna, usuarios, prefijo, todos)
+
+    for nombre in juegos:
+        inicio = time.perf_counter()
+        filas = UserGameStatsService.reconstruir(nombre, condicion, lote=lote)
+        click.echo(f"  ✓ {nombre}: {filas} usuarios recalculados en {time.perf_counter() - inicio:.1f} s")
+
+
+@mantenimiento.command('invalidar-cache')
+@click.argument('recurso')
+@click.option('--clave', help='Solo esta clave (p. ej. un user_id); sin ella, todo el recurso')
+def invalidar_cache(recurso, clave):
+    """Vacía una caché en memoria en todos los workers (p. ej. tras editar la base a mano)"""
+    if recurso not in invalidacion.recursos():
+        raise click.BadParameter(f"Recursos: {', '.join(invalidacion.recursos())}", param_hint='RECURSO')
+    invalidacion.publicar(recurso, clave)
+    db.session.commit()
+    click.echo(f"🧹 Invalidado {recurso}{':' + clave if clave else ''}")
+
+
+def _hashear(tarea):
+    """(id, contraseña, rondas, prefijo, sha256_previo) -> (id, hash). Corre en los procesos del pool"""
+    user_id, password, rondas, prefijo, sha256_previo = tarea
+    datos = password.encode('utf-8')
+    if sha256_previo:
+        # Igual que flask_bcrypt con BCRYPT_HANDLE_LONG_PASSWORDS
+        import hashlib
+        datos = hashlib.sha256(datos).hexdigest().encode('utf-8')
+    return user_id, libbcrypt.hashpw(datos, libbcrypt.gensalt(rounds=rondas, prefix=prefijo)).decode('utf-8')
+
+
+def _costo_bcrypt(hash_actual):
+    """Costo (log rounds) de un hash bcrypt '$2b$12$...', o None si no es bcrypt"""
+    partes = (hash_actual or '').split('$')
+    return int(partes[2]) if len(partes) > 3 and partes[2].isdigit() else None
+
+
+def escribir_hashes(pares):
+    """
+    Un solo UPDATE ... FROM (VALUES ...) para todo el lote. Las columnas de
+    VALUES se llaman column1, column2 tanto en Postgres como en SQLite (3.33+).
+    """
+    tabla = db.engine.dialect.identifier_preparer.format_table(User.__table__)
+    valores = ', '.join(f'(:id{i}, :pw{i})' for i in range(len(pares)))
+    parametros = {}
+    for i, (user_id, hash_nuevo) in enumerate(pares):
+        parametros[f'id{i}'] = user_id
+        parametros[f'pw{i}'] = hash_nuevo
+    db.session.execute(text(f'UPDATE {tabla} SET password = v.column2 FROM (VALUES {valores}) AS v '
+                            f'WHERE {tabla}.id = v.column1'), parametros)
+    db.session.commit()
+
+
+@mantenimiento.command('rehash-passwords')
+@_opciones_usuarios
+@click.option('--password', help='Contraseña nueva (cada usuario con su propia sal)')
+@click.option('--aleatorias', is_flag=True, help='Contraseña temporal distinta por usuario (requiere --salida)')
+@click.option('--salida', type=click.Path(dir_okay=False, writable=True), help='CSV nombre,contraseña a generar')
+@click.option('--rondas', type=int, help='Costo bcrypt (por defecto BCRYPT_LOG_ROUNDS, 12)')
+@click.option('--solo-costo-menor', is_flag=True,
+              help='Solo usuarios cuyo hash tiene un costo menor a --rondas. Igual les reemplaza la '
+                   'contraseña por --password / --aleatorias: bcrypt no permite subir el costo sin la original')
+@click.option('--procesos', type=int, default=os.cpu_count() or 1, show_default=True)
+@click.option('--lote', default=1000, show_default=True, help='Usuarios por UPDATE')
+@opcion_dry_run
+def rehash_passwords(usuarios, prefijo, todos, password, aleatorias, salida, rondas, solo_costo_menor,
+                     procesos, lote, dry_run):
+    """
+    Genera un hash bcrypt por usuario repartiendo el trabajo en un pool de
+    procesos y escribe cada lote con un solo UPDATE ... FROM (VALUES ...).
+    Pensado para migrar el costo de bcrypt de toda la base en una ventana de mantenimiento.
+    Siempre cambia la contraseña de los usuarios elegidos (también con
+    --solo-costo-menor): el hash nuevo es de --password o de --aleatorias.
+    """
+    _seleccion_valida(usuarios, prefijo, todos)
+    if bool(password) == aleatorias:
+        raise click.UsageError('Indicar --password o --aleatorias (una de las dos)')
+    if aleatorias and not salida:
+        raise click.UsageError('--aleatorias necesita --salida para entregar las contraseñas')
+
+    rondas = rondas or current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+    prefijo_bcrypt = current_app.config.get('BCRYPT_HASH_PREFIX', '2b').encode('utf-8')
+    sha256_previo = current_app.config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False)
+
+    condicion = _condicion_usuarios(User.id, usuarios, prefijo, todos)
+    filas = db.session.execute(select(User.id, User.nombre, User.password).where(condicion).order_by(User.id)).all()
+    if solo_costo_menor:
+        filas = [f for f in filas if (_costo_bcrypt(f.password) or 0) < rondas]
+
+    # Costo de un hash en este equipo, para estimar la duración
+    inicio = time.perf_counter()
+    _hashear((0, 'estimacion', rondas, prefijo_bcrypt, False))
+    segundos_hash = time.perf_counter() - inicio
+    estimado = segundos_hash * len(filas) / max(procesos, 1)
+
+    if dry_run:
+        click.echo(f"[dry-run] {len(filas)} usuarios a rehashear con costo {rondas} "
+                   f"(~{segundos_hash * 1000:.0f} ms por hash, ~{estimado:.1f} s con {procesos} procesos)")
+        return
+    if not filas:
+        click.echo('No hay usuarios para rehashear')
+        return
+
+    contraseñas = {f.id: (secrets.token_urlsafe(8) if aleatorias else password) for f in filas}
+    if salida:
+        # Antes de tocar la base: si el CSV no se puede escribir nadie queda sin su contraseña
+        try:
+            with open(salida, 'w', newline='', encoding='utf-8') as f:
+                escritor = csv.writer(f)
+                escritor.writerow(['id', 'nombre', 'password'])
+                escritor.writerows((fila.id, fila.nombre, contraseñas[fila.id]) for fila in filas)
+        except OSError as e:
+            raise click.ClickException(f'No se pudo escribir {salida}: {e}. No se cambió ninguna contraseña')
+    tareas = [(f.id, contraseñas[f.id], rondas, prefijo_bcrypt, sha256_previo) for f in filas]
+
+    inicio = time.perf_counter()
+    segundos_escritura = 0.0
+    pendientes = []
+    with ProcessPoolExecutor(max_workers=procesos) as pool, \
+            click.progressbar(length=len(tareas), label=f'bcrypt costo {rondas}', show_pos=True) as barra:
+        for par in pool.map(_hashear, tareas, chunksize=max(1, min(64, len(tareas) // (procesos * 4) or 1))):
+            pendientes.append(par)
+            barra.update(1)
+            if len(pendientes) >= lote:
+                t = time.perf_counter()
+                escribir_hashes(pendientes)
+                segundos_escritura += time.perf_counter() - t
+                pendientes = []
+        if pendientes:
+            t = time.perf_counter()
+            escribir_hashes(pendientes)
+            segundos_escritura += time.perf_counter() - t
+    total = time.perf_counter() - inicio
+
+    click.echo(f"✅ {len(filas)} contraseñas rehasheadas (costo {rondas}) en {total:.1f} s: "
+               f"{len(filas) / total:.1f} hashes/s con {procesos} procesos "
+               f"(serial ~{1 / segundos_hash:.1f}/s), escritura {segundos_escritura * 1000:.0f} ms")
+    if salida:
+        click.echo(f"   Credenciales en {salida}")
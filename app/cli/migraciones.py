@@ -0,0 +1,80 @@
+"""
+Migraciones del esquema (flask migraciones ...), sobre Alembic
+
+    cd app
+    flask --app app migraciones actualizar               # hasta la última versión
+    flask --app app migraciones actualizar --sql         # solo mostrar el SQL
+    flask --app app migraciones revertir --revision -1
+    flask --app app migraciones estado
+    flask --app app migraciones historial
+    flask --app app migraciones nueva -m "tabla de resumen por usuario"
+    flask --app app migraciones marcar --revision head   # base ya al día, sin ejecutar nada
+
+Reemplaza a recreate_db.py (drop_all + create_all): los cambios de esquema
+ya no borran datos. Las migraciones viven en app/migrations/versions; las
+que crean índices o rellenan tablas grandes usan migrations/lotes.py.
+"""
+import os
+
+import click
+from alembic import command
+from alembic.config import Config
+from flask.cli import AppGroup
+
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+migraciones = AppGroup('migraciones', help='Migraciones versionadas del esquema (Alembic)')
+
+
+def configuracion():
+    """Config de Alembic con app/alembic.ini; el logging lo maneja la app"""
+    config = Config(os.path.join(DIRECTORIO_APP, 'alembic.ini'))
+    config.attributes['logging_configurado'] = True
+    return config
+
+
+def aplicar_migraciones(revision='head'):
+    """Lleva la base a `revision` (lo que antes hacía db.create_all al iniciar)"""
+    command.upgrade(configuracion(), revision)
+
+
+@migraciones.command('actualizar')
+@click.option('--revision', default='head', show_default=True)
+@click.option('--sql', is_flag=True, help='Imprimir el SQL en vez de ejecutarlo')
+def actualizar(revision, sql):
+    """Aplica las migraciones pendientes"""
+    command.upgrade(configuracion(), revision, sql=sql)
+
+
+@migraciones.command('revertir')
+@click.option('--revision', required=True, help='Destino: una revisión, -1, o base')
+@click.option('--sql', is_flag=True, help='Imprimir el SQL en vez de ejecutarlo')
+def revertir(revision, sql):
+    """Deshace migraciones hasta la revisión indicada"""
+    command.downgrade(configuracion(), revision, sql=sql)
+
+
+@migraciones.command('estado')
+def estado():
+    """Revisión aplicada en la base"""
+    command.current(configuracion(), verbose=True)
+
+
+@migraciones.command('historial')
+def historial():
+    command.history(configuracion(), indicate_current=True)
+
+
+@migraciones.command('nueva')
+@click.option('-m', '--mensaje', required=True)
+@click.option('--vacia', is_flag=True, help='Sin autogenerar a partir de los modelos')
+def nueva(mensaje, vacia):
+    """Crea una migración comparando los modelos con la base"""
+    command.revision(configuracion(), message=mensaje, autogenerate=not vacia)
+
+
+@migraciones.command('marcar')
+@click.option('--revision', default='head', show_default=True)
+def marcar(revision):
+    """Registra la revisión sin ejecutar las migraciones"""
+    command.stamp(configuracion(), revision)
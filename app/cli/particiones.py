@@ -0,0 +1,151 @@
+"""
+Particiones mensuales de las tablas de sesiones (flask particiones ...)
+
+    cd app
+    flask --app app particiones listar
+    flask --app app particiones crear --meses 3           # cron mensual: los meses siguientes
+    flask --app app particiones retener --dry-run
+    flask --app app particiones retener                   # archiva lo anterior y separa los meses vacíos
+    flask --app app particiones retener --meses 24 --forzar [--borrar]
+
+retener pasa primero las sesiones anteriores a los últimos --meses por el
+archivo en frío (ArchivoService.archivar, lo mismo que `flask archivo
+archivar`): siguen visibles en el historial, los listados y la exportación,
+y recalcular-estadisticas las sigue contando. En PostgreSQL (migración 0008)
+las particiones de esos meses quedan vacías y se separan con DETACH
+PARTITION, un cambio de catálogo instantáneo, y se borran. Por eso --meses
+no puede ser menor que ARCHIVO_MESES.
+
+Con --forzar no se archiva nada: las particiones viejas se mueven al esquema
+`archivo` (o se borran con --borrar; en SQLite, que no tiene particiones,
+--borrar borra por lotes). Esas sesiones dejan de verse en la app y el
+siguiente recalcular-estadisticas las descuenta de user_game_stats.
+"""
+from datetime import date
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+from config.database import db
+from models.particiones import TABLAS, inicio_mes, sumar_meses
+from migrations.particiones import esta_particionada, particiones as particiones_de, crear_particion
+from services.archivo.archivo_service import ArchivoService, JUEGOS, MESES_EN_LINEA
+from cli.mantenimiento import TABLAS_JUEGO, aplicar_por_lotes, _contar, opcion_lote, opcion_dry_run
+
+particiones = AppGroup('particiones', help='Particiones mensuales de las tablas de sesiones (PostgreSQL)')
+
+ESQUEMA_ARCHIVO = 'archivo'
+
+MODELOS = {modelo.__tablename__: modelo for modelo, _ in TABLAS_JUEGO.values()}
+JUEGO_DE_TABLA = {modelo.__tablename__: juego for juego, modelo in JUEGOS.items()}
+
+
+def _particionadas():
+    """Tablas de sesiones particionadas; error claro si la base no las tiene"""
+    conexion = db.session.connection()
+    if conexion.dialect.name != 'postgresql':
+        return []
+    tablas = [tabla for tabla in TABLAS if esta_particionada(conexion, tabla)]
+    if not tablas:
+        raise click.ClickException('Las tablas de sesiones no están particionadas: flask migraciones actualizar')
+    return tablas
+
+
+@particiones.command('listar')
+def listar():
+    """Particiones de cada tabla con su cantidad estimada de filas"""
+    tablas = _particionadas()
+    if not tablas:
+        click.echo('Sin particiones (solo PostgreSQL)')
+        return
+    conexion = db.session.connection()
+    estimadas = text('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:nombre)')
+    for tabla in tablas:
+        click.echo(tabla)
+        for nombre, mes in particiones_de(conexion, tabla) + [(f'{tabla}_default', None)]:
+            filas = conexion.execute(estimadas, {'nombre': nombre}).scalar()
+            filas = f'~{filas}' if filas is not None and filas >= 0 else '? (sin ANALYZE)'
+            click.echo(f"  {nombre:<40} {mes.strftime('%Y-%m') if mes else 'default':<8} {filas} filas")
+
+
+@particiones.command('crear')
+@click.option('--meses', default=3, show_default=True, help='Meses siguientes al actual a dejar creados')
+def crear(meses):
+    """Crea las particiones del mes actual y los siguientes (idempotente)"""
+    conexion = db.session.connection()
+    actual = inicio_mes(date.today())
+    for tabla in _particionadas():
+        for desplazamiento in range(meses + 1):
+            mes = sumar_meses(actual, desplazamiento)
+            if crear_particion(conexion, tabla, mes):
+                click.echo(f"  ✓ {tabla}: {mes:%Y-%m}")
+    db.session.commit()
+
+
+@particiones.command('retener')
+@click.option('--meses', type=click.IntRange(min=1), default=MESES_EN_LINEA, show_default=True,
+              help='Meses que quedan en línea, el actual incluido (no menos que ARCHIVO_MESES sin --forzar)')
+@click.option('--forzar', is_flag=True,
+              help='No pasar las sesiones por el archivo: dejan de verse y de contar en recalcular-estadisticas')
+@click.option('--borrar', is_flag=True, help='Con --forzar: borrar las particiones separadas en vez de moverlas')
+@opcion_lote
+@opcion_dry_run
+def retener(meses, forzar, borrar, lote, dry_run):
+    """Archiva las sesiones anteriores a los últimos --meses y separa sus particiones"""
+    if borrar and not forzar:
+        raise click.UsageError('--borrar descarta las sesiones sin archivarlas: agregar --forzar')
+    if not forzar and meses < MESES_EN_LINEA:
+        raise click.UsageError(f'--meses no puede ser menor que ARCHIVO_MESES ({MESES_EN_LINEA}): '
+                               'los endpoints no buscarían esas sesiones en el archivo (o usar --forzar)')
+    limite = sumar_meses(inicio_mes(date.today()), -(meses - 1))
+    tablas = _particionadas()
+
+    if not forzar:
+        for tabla in TABLAS:
+            juego = JUEGO_DE_TABLA[tabla]
+            if dry_run:
+                click.echo(f"[dry-run] {tabla}: se archivarían {ArchivoService.contar(juego, limite)} sesiones")
+                continue
+            archivadas = sum(cantidad for _, cantidad in ArchivoService.archivar(juego, limite))
+            click.echo(f"  ✓ {tabla}: {archivadas} sesiones anteriores a {limite} archivadas")
+    elif not tablas:
+        # Sin particiones: DELETE por lotes de clave primaria
+        if not borrar:
+            raise click.UsageError('Sin particiones no hay dónde mover las sesiones: usar --borrar')
+        for tabla, (_, columna, _) in TABLAS.items():
+            modelo = MODELOS[tabla]
+            condicion = getattr(modelo, columna) < limite
+            if dry_run:
+                click.echo(f"[dry-run] {tabla}: se borrarían {_contar(modelo, condicion)} filas")
+                continue
+            total = aplicar_por_lotes(modelo, condicion, modelo.__table__.delete(), lote, f'{tabla:<22}')
+            click.echo(f"  ✓ {tabla}: {total} filas anteriores a {limite} borradas")
+        return
+
+    conexion = db.session.connection()
+    # Archivadas, las particiones viejas quedan vacías y se borran; con --forzar se mueven (o se borran)
+    mover = forzar and not borrar
+    if not dry_run and mover:
+        conexion.execute(text(f'CREATE SCHEMA IF NOT EXISTS {ESQUEMA_ARCHIVO}'))
+    for tabla in tablas:
+        viejas = [nombre for nombre, mes in particiones_de(conexion, tabla) if mes < limite]
+        for nombre in viejas:
+            if dry_run:
+                click.echo(f"[dry-run] {tabla}: se {'movería' if mover else 'borraría'} {nombre}")
+                continue
+            if not forzar and conexion.execute(text(f'SELECT EXISTS (SELECT 1 FROM {nombre})')).scalar():
+                # Filas que llegaron después de archivar: quedan para la próxima corrida
+                click.echo(f"  ! {nombre} tiene sesiones sin archivar: no se separa")
+                continue
+            # DETACH toma un bloqueo breve sobre la tabla: no esperar detrás de una consulta larga
+            conexion.execute(text("SET LOCAL lock_timeout = '5s'"))
+            conexion.execute(text(f'ALTER TABLE {tabla} DETACH PARTITION {nombre}'))
+            if mover:
+                conexion.execute(text(f'ALTER TABLE {nombre} SET SCHEMA {ESQUEMA_ARCHIVO}'))
+            else:
+                conexion.execute(text(f'DROP TABLE {nombre}'))
+            db.session.commit()
+            conexion = db.session.connection()
+            click.echo(f"  ✓ {nombre} {f'movida a {ESQUEMA_ARCHIVO}.{nombre}' if mover else 'borrada'}")
+    db.session.commit()
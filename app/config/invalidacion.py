@@ -0,0 +1,261 @@
+"""
+Invalidación de cachés en memoria entre workers y máquinas
+
+Cada proceso (worker de gunicorn, worker de jobs) tiene sus propias cachés:
+CacheLocal, el JSON de palabras del Abecedario, el buffer de Gemini. Los
+caminos de escritura llaman a publicar(recurso, clave) dentro de su
+transacción y el aviso llega a todos los procesos solo si el commit se
+confirma:
+
+- PostgreSQL: pg_notify('invalidacion', ...). Un hilo por proceso mantiene
+  una conexión con LISTEN y aplica los avisos al instante.
+- SQLite (y cualquier otra base): una fila en la tabla invalidaciones que el
+  hilo lee cada INVALIDACION_INTERVALO segundos (2 por defecto). SQLite
+  serializa las escrituras, así que los ids llegan en orden de commit; la
+  purga nunca borra la última fila, para que los ids no vuelvan a empezar.
+
+El proceso que publica aplica la invalidación en after_commit (no antes: otra
+petición podría volver a cachear el valor viejo). clave=None invalida todo el
+recurso. Si la conexión de LISTEN se cae, al reconectar se invalida todo,
+porque los avisos de ese intervalo se pierden.
+
+El hilo arranca con la primera petición de cada proceso (después del fork de
+gunicorn) o con `flask jobs worker`. INVALIDACION_ESCUCHA=0 lo desactiva.
+"""
+import os
+import json
+import time
+import select
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, insert, delete, select as consulta
+
+from config.database import db
+from middleware.metrics import registrar_cache
+from models.invalidacion import Invalidacion
+
+logger = logging.getLogger(__name__)
+
+CANAL = 'invalidacion'
+INTERVALO_SEGUNDOS = float(os.environ.get('INVALIDACION_INTERVALO', 2))
+RETENCION_SEGUNDOS = 600  # filas de invalidaciones más viejas se borran
+
+# recurso -> [función(clave)]
+_suscriptores = {}
+
+_escucha = {'pid': None, 'hilo': None}
+_lock_escucha = threading.Lock()
+
+
+def suscribir(recurso, funcion):
+    """Registra funcion(clave) para las invalidaciones de `recurso` (clave None: todo)"""
+    _suscriptores.setdefault(recurso, []).append(funcion)
+    return funcion
+
+
+def recursos():
+    return sorted(_suscriptores)
+
+
+def aplicar(recurso, clave=None):
+    """Invalida `recurso` / `clave` en este proceso"""
+    for funcion in _suscriptores.get(recurso, ()):
+        try:
+            funcion(clave)
+        except Exception:
+            logger.exception("Error invalidando %s:%s", recurso, clave)
+
+
+def aplicar_todo():
+    for recurso in list(_suscriptores):
+        aplicar(recurso)
+
+
+def publicar(recurso, clave=None):
+    """
+    Invalida `recurso` / `clave` en todos los procesos al confirmarse la
+    transacción actual (sin commit: lo hace quien escribe)
+    """
+    clave = None if clave is None else str(clave)
+    pendientes = db.session.info.setdefault('invalidaciones', set())
+    if (recurso, clave) in pendientes:
+        return
+    pendientes.add((recurso, clave))
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(consulta(func.pg_notify(CANAL, json.dumps([recurso, clave]))))
+    else:
+        db.session.execute(insert(Invalidacion).values(recurso=recurso, clave=clave, creado_en=datetime.utcnow()))
+
+
+def _al_confirmar(session):
+    for recurso, clave in session.info.pop('invalidaciones', ()):
+        aplicar(recurso, clave)
+
+
+def _al_descartar(session):
+    session.info.pop('invalidaciones', None)
+
+
+class CacheLocal:
+    """
+    Caché por clave en memoria del proceso. Se vacía con las invalidaciones de
+    `recurso` y además vence a los `ttl` segundos (por si alguien escribe en la
+    base sin pasar por publicar). None no se guarda.
+    """
+
+    def __init__(self, recurso, ttl=300, maximo=10000):
+        self.recurso = recurso
+        self.ttl = ttl
+        self.maximo = maximo
+        self._datos = {}
+        self._generacion = 0
+        self._lock = threading.Lock()
+        suscribir(recurso, self.invalidar)
+
+    def obtener(self, clave, calcular):
+        clave = str(clave)
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            generacion = self._generacion
+        registrar_cache(self.recurso, entrada is not None and entrada[0] > ahora)
+        if entrada is not None and entrada[0] > ahora:
+            return entrada[1]
+
+        valor = calcular()
+        with self._lock:
+            # Si llegó una invalidación mientras se calculaba, el valor puede ser viejo
+            if valor is not None and generacion == self._generacion:
+                if len(self._datos) >= self.maximo:
+                    self._datos.clear()
+                self._datos[clave] = (ahora + self.ttl, valor)
+        return valor
+
+    def invalidar(self, clave=None):
+        with self._lock:
+            self._generacion += 1
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(str(clave), None)
+
+
+class Escucha:
+    """Hilo que recibe las invalidaciones de los demás procesos"""
+
+    def __init__(self, app, intervalo=INTERVALO_SEGUNDOS):
+        self.app = app
+        self.intervalo = intervalo
+        self.detener = threading.Event()
+        self.ultimo_id = None
+
+    def ejecutar(self):
+        with self.app.app_context():
+            while not self.detener.is_set():
+                try:
+                    if db.engine.dialect.name == 'postgresql':
+                        self._escuchar_postgres()
+                    else:
+                        self._sondear()
+                except Exception:
+                    logger.exception("Error en la escucha de invalidaciones, reintentando")
+                    db.session.rollback()
+                    self.detener.wait(self.intervalo)
+                finally:
+                    db.session.remove()
+
+    def _escuchar_postgres(self):
+        conexion = db.engine.raw_connection()
+        try:
+            dbapi = conexion.driver_connection
+            dbapi.autocommit = True
+            with dbapi.cursor() as cursor:
+                cursor.execute(f'LISTEN {CANAL}')
+            # Lo publicado mientras no había LISTEN se perdió
+            aplicar_todo()
+            logger.info("Escuchando invalidaciones en el canal %s", CANAL)
+
+            while not self.detener.is_set():
+                for payload in self._avisos(dbapi):
+                    recurso, clave = json.loads(payload)
+                    aplicar(recurso, clave)
+        finally:
+            # La conexión quedó en autocommit y con LISTEN: no vuelve al pool
+            conexion.invalidate()
+
+    def _avisos(self, dbapi):
+        """Payloads recibidos en hasta `intervalo` segundos (psycopg2 o psycopg 3)"""
+        if hasattr(dbapi, 'poll'):
+            if select.select([dbapi], [], [], self.intervalo) == ([], [], []):
+                return []
+            dbapi.poll()
+            avisos, dbapi.notifies[:] = list(dbapi.notifies), []
+            return [aviso.payload for aviso in avisos]
+        return [aviso.payload for aviso in dbapi.notifies(timeout=self.intervalo)]
+
+    def _sondear(self):
+        ultima_purga = time.monotonic()
+        while not self.detener.is_set():
+            self.revisar()
+            if time.monotonic() - ultima_purga >= RETENCION_SEGUNDOS / 10:
+                self.purgar()
+                ultima_purga = time.monotonic()
+            self.detener.wait(self.intervalo)
+
+    def purgar(self, retencion=RETENCION_SEGUNDOS):
+        """
+        Borra los avisos viejos menos el último: sin AUTOINCREMENT, SQLite
+        reusaría sus ids y los procesos (que leen id > ultimo_id) no verían
+        los avisos nuevos
+        """
+        limite = datetime.utcnow() - timedelta(seconds=retencion)
+        ultimo = consulta(func.max(Invalidacion.id)).scalar_subquery()
+        db.session.execute(delete(Invalidacion).where(Invalidacion.creado_en < limite, Invalidacion.id < ultimo))
+        db.session.commit()
+
+    def revisar(self):
+        """Una pasada del sondeo: aplica las invalidaciones nuevas y devuelve cuántas"""
+        if self.ultimo_id is None:
+            self.ultimo_id = db.session.execute(consulta(func.coalesce(func.max(Invalidacion.id), 0))).scalar()
+            db.session.commit()
+            return 0
+
+        filas = db.session.execute(
+            consulta(Invalidacion.id, Invalidacion.recurso, Invalidacion.clave).
+            where(Invalidacion.id > self.ultimo_id).order_by(Invalidacion.id)).all()
+        db.session.commit()
+        for id_aviso, recurso, clave in filas:
+            aplicar(recurso, clave)
+            self.ultimo_id = id_aviso
+        return len(filas)
+
+
+def escucha_habilitada():
+    return os.environ.get('INVALIDACION_ESCUCHA', '1') != '0' and os.environ.get('FLASK_ENV') != 'testing'
+
+
+def iniciar_escucha(app):
+    """Arranca el hilo de escucha de este proceso (una sola vez por pid)"""
+    with _lock_escucha:
+        if _escucha['pid'] == os.getpid():
+            return _escucha['hilo']
+        escucha = Escucha(app)
+        threading.Thread(target=escucha.ejecutar, name='invalidacion', daemon=True).start()
+        _escucha.update(pid=os.getpid(), hilo=escucha)
+        return escucha
+
+
+def init_invalidacion(app):
+    event.listen(db.session, 'after_commit', _al_confirmar)
+    event.listen(db.session, 'after_rollback', _al_descartar)
+
+    if not escucha_habilitada():
+        return
+
+    @app.before_request
+    def _iniciar_escucha():
+        if _escucha['pid'] != os.getpid():
+            iniciar_escucha(app)
@@ -0,0 +1,94 @@
+"""
+Proveedor JSON de la app
+
+Usa orjson o msgspec si están instalados y el json de la stdlib si no.
+Las fechas (datetime/date) se serializan en ISO 8601 de forma nativa, por
+lo que los to_dict() de los modelos devuelven los objetos tal cual.
+
+El backend se puede forzar con la variable de entorno JSON_BACKEND
+(orjson | msgspec | stdlib).
+"""
+import os
+import json
+import decimal
+import uuid
+import dataclasses
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _default(valor):
+    """Tipos que ninguno de los backends maneja por sí solo"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (decimal.Decimal, uuid.UUID)):
+        return str(valor)
+    if dataclasses.is_dataclass(valor):
+        return dataclasses.asdict(valor)
+    raise TypeError(f'Object of type {type(valor).__name__} is not JSON serializable')
+
+
+def _elegir_backend():
+    preferido = os.environ.get('JSON_BACKEND')
+    disponibles = {'orjson': orjson is not None, 'msgspec': msgspec is not None, 'stdlib': True}
+    if preferido and disponibles.get(preferido):
+        return preferido
+    for backend in ('orjson', 'msgspec', 'stdlib'):
+        if disponibles[backend]:
+            return backend
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider de Flask con backend rápido y fechas ISO 8601"""
+
+    def __init__(self, app, backend=None):
+        super().__init__(app)
+        self.backend = backend or _elegir_backend()
+        if self.backend == 'msgspec':
+            self._msgspec_encoder = msgspec.json.Encoder(enc_hook=_default)
+            self._msgspec_sorted = msgspec.json.Encoder(enc_hook=_default, order='sorted')
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serializa a bytes UTF-8 (evita el decode/encode intermedio en las respuestas)"""
+        if self.backend == 'orjson':
+            opciones = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                opciones |= orjson.OPT_SORT_KEYS
+            if indent:
+                opciones |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=opciones)
+
+        if self.backend == 'msgspec' and not indent:
+            encoder = self._msgspec_sorted if self.sort_keys else self._msgspec_encoder
+            return encoder.encode(obj)
+
+        return self.dumps(obj, indent=2 if indent else None,
+                          separators=None if indent else (',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if self.backend != 'stdlib' and not kwargs.get('indent'):
+            return self.dumps_bytes(obj).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
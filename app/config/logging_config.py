@@ -0,0 +1,140 @@
+"""
+Logging estructurado de la app
+
+- Los hilos de petición solo encolan el record (QueueHandler); un
+  QueueListener en segundo plano lo formatea y escribe a stdout.
+- Formato: una línea JSON por record (LOG_FORMAT=json, por defecto) o texto
+  legible (LOG_FORMAT=text).
+- Cada petición recibe un request_id (cabecera X-Request-ID o uno nuevo) que
+  se agrega a todos los logs emitidos durante la petición y se devuelve en
+  la respuesta.
+- Log de acceso 'http.access' muestreado: solo LOG_ACCESS_SAMPLE_RATE de las
+  peticiones normales; errores (>= 500) y lentas (>= LOG_SLOW_REQUEST_MS) se
+  registran siempre.
+- Nivel global con LOG_LEVEL (INFO por defecto).
+
+En el código usar formato perezoso: logger.info("x=%s", x), y envolver los
+mensajes caros en logger.isEnabledFor(logging.DEBUG).
+"""
+import os
+import sys
+import copy
+import json
+import time
+import uuid
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+from flask import g, request, has_request_context
+
+access_logger = logging.getLogger('http.access')
+
+# Atributos propios de LogRecord; el resto son campos extra (extra={...})
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Agrega record.request_id (o '-' fuera de una petición)"""
+
+    def filter(self, record):
+        record.request_id = g.get('request_id', '-') if has_request_context() else '-'
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Solo resuelve mensaje y traceback en el hilo que loguea; el formato final va en el listener"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        datos = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage()
+        }
+        for clave, valor in record.__dict__.items():
+            if clave not in _ATRIBUTOS_RECORD:
+                datos[clave] = valor
+        if record.exc_text:
+            datos['exc'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+FORMATO_TEXTO = '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+
+
+def init_logging(app):
+    """Configura el logging raíz con cola + listener y registra el request_id / log de acceso"""
+    global _listener
+
+    app.config.setdefault('LOG_LEVEL', os.environ.get('LOG_LEVEL', 'INFO').upper())
+    app.config.setdefault('LOG_FORMAT', os.environ.get('LOG_FORMAT', 'json'))
+    app.config.setdefault('LOG_ACCESS_SAMPLE_RATE', float(os.environ.get('LOG_ACCESS_SAMPLE_RATE', '0.1')))
+    app.config.setdefault('LOG_SLOW_REQUEST_MS', float(os.environ.get('LOG_SLOW_REQUEST_MS', '1000')))
+
+    if _listener is None:
+        salida = logging.StreamHandler(sys.stdout)
+        if app.config['LOG_FORMAT'] == 'text':
+            salida.setFormatter(logging.Formatter(FORMATO_TEXTO, '%Y-%m-%d %H:%M:%S'))
+        else:
+            salida.setFormatter(JSONFormatter())
+
+        cola = queue.SimpleQueue()
+        manejador = _QueueHandler(cola)
+        manejador.addFilter(RequestIdFilter())
+
+        raiz = logging.getLogger()
+        for anterior in list(raiz.handlers):
+            raiz.removeHandler(anterior)
+        raiz.addHandler(manejador)
+
+        _listener = logging.handlers.QueueListener(cola, salida)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+    logging.getLogger().setLevel(app.config['LOG_LEVEL'])
+
+    @app.before_request
+    def asignar_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+        g.inicio_peticion = time.perf_counter()
+
+    @app.after_request
+    def log_de_acceso(response):
+        request_id = g.get('request_id')
+        if request_id is None:
+            return response
+        response.headers['X-Request-ID'] = request_id
+
+        duracion_ms = (time.perf_counter() - g.inicio_peticion) * 1000
+        if response.status_code >= 500:
+            nivel = logging.ERROR
+        elif duracion_ms >= app.config['LOG_SLOW_REQUEST_MS']:
+            nivel = logging.WARNING
+        elif random.random() < app.config['LOG_ACCESS_SAMPLE_RATE']:
+            nivel = logging.INFO
+        else:
+            return response
+
+        if access_logger.isEnabledFor(nivel):
+            access_logger.log(nivel, '%s %s %s %.1fms', request.method, request.path,
+                              response.status_code, duracion_ms,
+                              extra={'method': request.method, 'path': request.path,
+                                     'status': response.status_code,
+                                     'duration_ms': round(duracion_ms, 1)})
+        return response
@@ -0,0 +1,108 @@
+"""
+Especificación OpenAPI (swagger.json) generada al arrancar
+
+Paths, métodos, parámetros de ruta y tags salen del url_map de la app; el
+resumen y la descripción, del docstring de cada vista. openapi_base.json
+aporta info, servers, components y el detalle (requestBody / responses) de
+las operaciones documentadas a mano, que tiene prioridad sobre lo generado.
+"""
+import os
+import re
+import json
+import inspect
+
+
+TAGS_POR_PREFIJO = {
+    'users': 'Usuarios',
+    'register': 'Usuarios',
+    'login': 'Usuarios',
+    'abecedario': 'Abecedario',
+    'memory-game': 'Memory Game',
+    'paseo': 'Paseo',
+    'train-game': 'Train Game',
+    'admin': 'Admin'
+}
+
+DESCRIPCION_TAGS = {
+    'Memory Game': 'Juego de memoria con dificultad adaptativa',
+    'Paseo': 'Juego de atrapar esferas por color',
+    'Train Game': 'Juego de enrutar trenes por color',
+    'Admin': 'Dashboard de administración y estadísticas'
+}
+
+TIPOS_CONVERSOR = {'int': 'integer', 'float': 'number'}
+
+_PARAMETRO = re.compile(r'<(?:(\w+)(?:\([^)]*\))?:)?(\w+)>')
+_LINEA_RUTA = re.compile(r'^(GET|POST|PUT|DELETE|PATCH)\s+/')
+
+RUTA_BASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'openapi_base.json')
+
+
+def _resumen_y_descripcion(vista):
+    """Primera línea útil del docstring como summary, el resto como description"""
+    lineas = [l for l in (inspect.getdoc(vista) or '').splitlines() if not _LINEA_RUTA.match(l.strip())]
+    lineas = [l.rstrip() for l in lineas]
+    while lineas and not lineas[0].strip():
+        lineas.pop(0)
+    if not lineas:
+        return None, None
+    descripcion = '\n'.join(lineas[1:]).strip()
+    return lineas[0].strip(), descripcion or None
+
+
+def _path_y_parametros(regla):
+    parametros = []
+    for conversor, nombre in _PARAMETRO.findall(regla):
+        parametros.append({
+            'name': nombre,
+            'in': 'path',
+            'required': True,
+            'schema': {'type': TIPOS_CONVERSOR.get(conversor, 'string')}
+        })
+    return _PARAMETRO.sub(r'{\2}', regla), parametros
+
+
+def generar_spec(app, ruta_base=RUTA_BASE):
+    """Arma el documento OpenAPI a partir de las rutas registradas en la app"""
+    with open(ruta_base, encoding='utf-8') as f:
+        base = json.load(f)
+
+    paths = {}
+    for regla in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        prefijo = regla.rule.strip('/').split('/')[0]
+        tag = TAGS_POR_PREFIJO.get(prefijo)
+        if tag is None or regla.endpoint == 'admin_dashboard':
+            continue
+
+        path, parametros = _path_y_parametros(regla.rule)
+        resumen, descripcion = _resumen_y_descripcion(app.view_functions[regla.endpoint])
+
+        for metodo in sorted(regla.methods - {'HEAD', 'OPTIONS'}):
+            operacion = {
+                'tags': [tag],
+                'operationId': regla.endpoint,
+                'summary': resumen or regla.endpoint.replace('_', ' '),
+                'responses': {'200': {'description': 'OK'}}
+            }
+            if descripcion:
+                operacion['description'] = descripcion
+            if parametros:
+                operacion['parameters'] = parametros
+            # Lo documentado a mano en openapi_base.json tiene prioridad
+            operacion.update(base['paths'].get(path, {}).get(metodo.lower(), {}))
+            paths.setdefault(path, {})[metodo.lower()] = operacion
+
+    tags = list(base.get('tags', []))
+    nombres = {t['name'] for t in tags}
+    for tag in dict.fromkeys(TAGS_POR_PREFIJO.values()):
+        if tag not in nombres:
+            tags.append({'name': tag, 'description': DESCRIPCION_TAGS.get(tag, '')})
+
+    return {
+        'openapi': base['openapi'],
+        'info': base['info'],
+        'servers': base.get('servers', []),
+        'tags': tags,
+        'paths': paths,
+        'components': base.get('components', {})
+    }
@@ -1,7 +1,14 @@
 from flask import jsonify, request
 from services.abecedario.abecedario_service import AbecedarioService
+from services.user_game_stats_service import UserGameStatsService
+from services.archivo.archivo_service import ArchivoService
 from services.abecedario.gemini_abecedario_service import GeminiService
-from datetime import datetime, date
+from serializers.negotiation import respuesta
+from config.database import solo_lectura, usar_primario
+from datetime import datetime, date, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
 
 class AbecedarioController:
     
@@ -41,35 +48,35 @@ class AbecedarioController:
         """
         Obtiene el siguiente desafío generado por IA
         GET /abecedario/next-challenge/<user_id>
+        
+        Normalmente ya está calculado (job encolado al guardar la sesión);
+        si no hay uno vigente se calcula en la petición.
         """
-        print(f"\n{'='*50}")
-        print(f"[CONTROLLER] Solicitando desafío para user_id: {user_id}")
-        print(f"{'='*50}")
+        logger.debug("Solicitando desafío para user_id=%s", user_id)
         
         try:
-            challenge, error = AbecedarioController.gemini_service.generate_next_challenge(user_id)
+            challenge, error = AbecedarioService.tomar_desafio_precalculado(user_id), None
+            if challenge is None:
+                challenge, error = AbecedarioController.gemini_service.generate_next_challenge(user_id)
             
             if error:
-                print(f"[CONTROLLER ERROR] {error}")
-                return jsonify({'error': error}), 400
+                logger.warning("No se pudo generar desafío para user_id=%s: %s", user_id, error)
+                return respuesta({'error': error}, 400)
             
-            print(f"[CONTROLLER SUCCESS] Desafío generado exitosamente")
-            print(f"Palabra: {challenge.get('palabra_objetivo', 'N/A')}")
-            print(f"Nivel: {challenge.get('nivel_dificultad', 'N/A')}")
-            print(f"{'='*50}\n")
+            logger.debug("Desafío generado: palabra=%s nivel=%s",
+                         challenge.get('palabra_objetivo', 'N/A'), challenge.get('nivel_dificultad', 'N/A'))
             
-            return jsonify({
+            return respuesta({
                 'challenge': challenge,
                 'timestamp': datetime.now().isoformat()
-            }), 200
+            }, 200)
             
         except Exception as e:
-            print(f"[CONTROLLER EXCEPTION] {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({'error': str(e)}), 500
+            logger.exception("Error generando desafío para user_id=%s", user_id)
+            return respuesta({'error': str(e)}, 500)
     
     @staticmethod
+    @solo_lectura
     def get_performance_stats(user_id):
         """
         Obtiene estadísticas de rendimiento del usuario
@@ -81,8 +88,12 @@ class AbecedarioController:
             if error:
                 return jsonify({'error': error}), 400
             
+            # Últimas 10 palabras (stats) + totales históricos desde user_game_stats
+            acumulado = UserGameStatsService.obtener(user_id, 'abecedario')
+            
             return jsonify({
-                'stats': stats
+                'stats': stats,
+                'acumulado': acumulado.to_dict() if acumulado else None
             }), 200
             
         except Exception as e:
@@ -116,6 +127,41 @@ class AbecedarioController:
             return jsonify({'error': str(e)}), 500
     
     @staticmethod
+    @solo_lectura
+    def get_daily_summaries(user_id):
+        """
+        Resúmenes diarios de un rango de fechas en una sola llamada
+        GET /abecedario/daily-summaries/<user_id>
+        Query params: fecha_inicio, fecha_fin (YYYY-MM-DD, por defecto los últimos 7 días),
+        sesiones=0 para no incluir el detalle de cada sesión
+        """
+        try:
+            try:
+                fecha_fin = datetime.strptime(request.args['fecha_fin'], '%Y-%m-%d').date() \
+                    if request.args.get('fecha_fin') else date.today()
+                fecha_inicio = datetime.strptime(request.args['fecha_inicio'], '%Y-%m-%d').date() \
+                    if request.args.get('fecha_inicio') else fecha_fin - timedelta(days=6)
+            except ValueError:
+                return jsonify({'error': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
+            
+            dias, error = AbecedarioService.get_daily_summaries(
+                user_id, fecha_inicio, fecha_fin, con_sesiones=request.args.get('sesiones') not in ('0', 'false'))
+            
+            if error:
+                return jsonify({'error': error}), 400
+            
+            return respuesta({
+                'fecha_inicio': fecha_inicio.isoformat(),
+                'fecha_fin': fecha_fin.isoformat(),
+                'dias': dias
+            })
+            
+        except Exception as e:
+            logger.exception("Error en get_daily_summaries user_id=%s", user_id)
+            return jsonify({'error': str(e)}), 500
+    
+    @staticmethod
+    @solo_lectura
     def get_history(user_id):
         """
         Obtiene historial de sesiones
@@ -123,6 +169,7 @@ class AbecedarioController:
         Query params: fecha_inicio, fecha_fin (opcional)
         """
         try:
+            from models.abecedario import Abecedario
             fecha_inicio_str = request.args.get('fecha_inicio')
             fecha_fin_str = request.args.get('fecha_fin')
             
@@ -138,10 +185,12 @@ class AbecedarioController:
                     return jsonify({'error': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
             else:
                 # Si no hay rango, obtener últimas 20 sesiones
-                from models.abecedario import Abecedario
                 sesiones = Abecedario.query.filter_by(
                     user_id=user_id
                 ).order_by(Abecedario.created_at.desc()).limit(20).all()
+                if len(sesiones) < 20:
+                    # Menos de 20 en línea: el resto puede estar archivado
+                    sesiones += ArchivoService.ultimas('abecedario', user_id, 20 - len(sesiones))
                 error = None
             
             if error:
@@ -156,12 +205,22 @@ class AbecedarioController:
             return jsonify({'error': str(e)}), 500
     
     @staticmethod
+    @solo_lectura
     def get_evolution_report(user_id):
         """
         Obtiene reporte de evolución agrupado por fecha y nivel
         GET /abecedario/evolution/<user_id>
+        Query params: async=1 lo genera en la cola de trabajos y responde 202
+        con el job (el reporte queda en GET /jobs/<id> al terminar)
         """
         try:
+            if request.args.get('async') in ('1', 'true'):
+                usar_primario()  # encola un job: lectura y escritura en el primario
+                job, error = AbecedarioService.encolar_reporte_evolucion(user_id)
+                if error:
+                    return jsonify({'error': error}), 500
+                return jsonify({'success': True, 'job': job.to_dict(), 'url': f'/jobs/{job.id}'}), 202
+            
             report, error = AbecedarioService.get_evolution_report(user_id)
             
             if error:
@@ -170,8 +229,7 @@ class AbecedarioController:
             return jsonify(report), 200
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error en get_evolution_report user_id=%s", user_id)
             return jsonify({'error': str(e)}), 500
     
     @staticmethod
@@ -199,6 +257,5 @@ class AbecedarioController:
             return jsonify(stats), 200
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error en get_final_stats user_id=%s", user_id)
             return jsonify({'error': str(e)}), 500
@@ -1,41 +1,32 @@
 """
 Controlador para endpoints administrativos
 """
-from flask import jsonify
+from flask import jsonify, request, Response, stream_with_context
 from models.user import User
-from models.memory_game import MemoryGameSession, MemoryGameConfig
-from models.abecedario import Abecedario
-from models.paseo import PaseoSession
-from models.train_game import TrainGameSession
 from datetime import datetime, timedelta
-from sqlalchemy import func
-from config.database import db
+from config.database import db, solo_lectura
+from services.admin.admin_service import AdminService
+from services.user_game_stats_service import UserGameStatsService
+from services.archivo.archivo_service import ArchivoService
+from models.user_game_stats import UserGameStats
+from serializers.session_rows import abecedario_rows, paseo_rows, memory_rows, train_rows
+from serializers import export
+from middleware import metrics
 
 class AdminController:
     # ... existing methods ...
 
     @staticmethod
+    @solo_lectura
     def get_train_sessions():
         """
         GET /admin/train-sessions
         Obtiene todas las sesiones de Train Game (últimas 20)
         """
         try:
-            sessions = db.session.query(TrainGameSession, User.nombre).\
-                join(User, TrainGameSession.user_id == User.id).\
-                order_by(TrainGameSession.finished_at.desc()).\
-                limit(20).\
-                all()
-            
-            result = []
-            for session, user_name in sessions:
-                session_dict = session.to_dict()
-                session_dict['user_name'] = user_name
-                result.append(session_dict)
-            
             return jsonify({
                 'success': True,
-                'sessions': result
+                'sessions': AdminService.listar_sesiones_trenes()
             }), 200
         except Exception as e:
             return jsonify({
@@ -44,19 +35,16 @@ class AdminController:
             }), 500
 
     @staticmethod
+    @solo_lectura
     def get_user_train_sessions(user_id):
         """
         GET /admin/user-train-sessions/<user_id>
         Obtiene todas las sesiones de trenes de un usuario específico
         """
         try:
-            sessions = TrainGameSession.query.filter_by(user_id=user_id).\
-                order_by(TrainGameSession.finished_at.desc()).\
-                all()
-            
             return jsonify({
                 'success': True,
-                'sessions': [s.to_dict() for s in sessions]
+                'sessions': train_rows.listar(user_id=user_id, **ArchivoService.para_listado('trenes', user_id))
             }), 200
         except Exception as e:
             return jsonify({
@@ -65,93 +53,76 @@ class AdminController:
             }), 500
 
     @staticmethod
+    @solo_lectura
     def get_user_stats_all_games(user_id):
         """
         GET /admin/user-stats/<user_id>
         Obtiene estadísticas de todos los juegos para un usuario específico
+        (desde user_game_stats: una fila por juego, sin recorrer sesiones)
         """
         try:
             # Obtener usuario
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return jsonify({
                     'success': False,
                     'error': 'Usuario no encontrado'
                 }), 404
             
-            # Stats de Memoria
-            memory_sessions = MemoryGameSession.query.filter_by(user_id=user_id).all()
-            memory_stats = {
-                'total_sesiones': len(memory_sessions),
-                'promedio_accuracy': sum([s.accuracy_percentage or 0 for s in memory_sessions]) / len(memory_sessions) if memory_sessions else 0,
-                'sesiones_completadas': sum([1 for s in memory_sessions if s.completion_status == 'completed'])
-            }
-            
-            # Stats de Abecedario  
-            abecedario_sessions = Abecedario.query.filter_by(user_id=user_id).all()
-            abecedario_stats = {
-                'total_sesiones': len(abecedario_sessions),
-                'palabras_completadas': sum([1 for s in abecedario_sessions if s.completado]),
-                'tiempo_promedio': sum([s.tiempo_resolucion for s in abecedario_sessions]) / len(abecedario_sessions) if abecedario_sessions else 0
-            }
-            
-            # Stats de Paseo
-            paseo_sessions = PaseoSession.query.filter_by(user_id=user_id).all()
-            paseo_stats = {
-                'total_sesiones': len(paseo_sessions),
-                'victorias': sum([1 for s in paseo_sessions if s.resultado == 'victoria']),
-                'precision_promedio': sum([s.precision or 0 for s in paseo_sessions]) / len(paseo_sessions) if paseo_sessions else 0
-            }
+            stats = UserGameStatsService.obtener_todos(user_id)
+            vacio = UserGameStats(sesiones=0, completadas=0, aciertos=0, errores=0,
+                                  suma_tiempo=0.0, suma_precision=0.0)
+
+            memoria = stats.get('memoria', vacio)
+            abecedario = stats.get('abecedario', vacio)
+            paseo = stats.get('paseo', vacio)
+            trenes = stats.get('trenes', vacio)
+            intentos_tren = trenes.aciertos + trenes.errores
 
-            # Stats de Trenes
-            train_sessions = TrainGameSession.query.filter_by(user_id=user_id).all()
-            train_correct = sum([(s.correct_routing or 0) for s in train_sessions])
-            train_wrong = sum([(s.wrong_routing or 0) for s in train_sessions])
-            train_total_attempts = train_correct + train_wrong
-            
-            train_stats = {
-                'total_sesiones': len(train_sessions),
-                'total_aciertos': train_correct,
-                'precision_promedio': (train_correct / train_total_attempts * 100) if train_total_attempts > 0 else 0
-            }
-            
             return jsonify({
                 'success': True,
                 'user': user.to_dict(),
                 'stats': {
-                    'memoria': memory_stats,
-                    'abecedario': abecedario_stats,
-                    'paseo': paseo_stats,
-                    'trenes': train_stats
-                }
+                    'memoria': {
+                        'total_sesiones': memoria.sesiones,
+                        'promedio_accuracy': memoria.suma_precision / memoria.sesiones if memoria.sesiones else 0,
+                        'sesiones_completadas': memoria.completadas
+                    },
+                    'abecedario': {
+                        'total_sesiones': abecedario.sesiones,
+                        'palabras_completadas': abecedario.completadas,
+                        'tiempo_promedio': abecedario.suma_tiempo / abecedario.sesiones if abecedario.sesiones else 0
+                    },
+                    'paseo': {
+                        'total_sesiones': paseo.sesiones,
+                        'victorias': paseo.completadas,
+                        'precision_promedio': paseo.suma_precision / paseo.sesiones if paseo.sesiones else 0
+                    },
+                    'trenes': {
+                        'total_sesiones': trenes.sesiones,
+                        'total_aciertos': trenes.aciertos,
+                        'precision_promedio': (trenes.aciertos / intentos_tren * 100) if intentos_tren > 0 else 0
+                    }
+                },
+                'acumulado': {juego: fila.to_dict() for juego, fila in stats.items()}
             }), 200
         except Exception as e:
             return jsonify({
                 'success': False,
                 'error': str(e)
             }), 500
+
     @staticmethod
+    @solo_lectura
     def get_abecedario_sessions():
         """
         GET /admin/abecedario-sessions
         Obtiene todas las sesiones de Abecedario (últimas 20)
         """
         try:
-            sessions = db.session.query(Abecedario, User.nombre).\
-                join(User, Abecedario.user_id == User.id).\
-                order_by(Abecedario.created_at.desc()).\
-                limit(20).\
-                all()
-            
-            result = []
-            for session, user_name in sessions:
-                session_dict = session.to_dict()
-                session_dict['user_name'] = user_name
-                result.append(session_dict)
-            
             return jsonify({
                 'success': True,
-                'sessions': result
+                'sessions': AdminService.listar_sesiones_abecedario()
             }), 200
         except Exception as e:
             return jsonify({
@@ -159,27 +130,16 @@ class AdminController:
                 'error': str(e)
             }), 500
     @staticmethod
+    @solo_lectura
     def get_memory_sessions():
         """
         GET /admin/memory-sessions
         Obtiene todas las sesiones de Memory Game (últimas 20)
         """
         try:
-            sessions = db.session.query(MemoryGameSession, User.nombre).\
-                join(User, MemoryGameSession.user_id == User.id).\
-                order_by(MemoryGameSession.finished_at.desc()).\
-                limit(20).\
-                all()
-            
-            result = []
-            for session, user_name in sessions:
-                session_dict = session.to_dict()
-                session_dict['user_name'] = user_name
-                result.append(session_dict)
-            
             return jsonify({
                 'success': True,
-                'sessions': result
+                'sessions': AdminService.listar_sesiones_memoria()
             }), 200
         except Exception as e:
             return jsonify({
@@ -188,18 +148,16 @@ class AdminController:
             }), 500
     
     @staticmethod
+    @solo_lectura
     def get_memory_configs():
         """
         GET /admin/memory-configs
         Obtiene todas las configuraciones actuales de usuarios
         """
         try:
-            configs = MemoryGameConfig.query.all()
-            
             return jsonify({
                 'success': True,
-                'configs': [c.to_dict() | {'user_id': c.user_id, 'last_updated': c.last_updated.isoformat()} 
-                           for c in configs]
+                'configs': AdminService.listar_configs_memoria()
             }), 200
         except Exception as e:
             return jsonify({
@@ -208,81 +166,16 @@ class AdminController:
             }), 500
     
     @staticmethod
+    @solo_lectura
     def get_paseo_sessions():
         """
         GET /admin/paseo-sessions
         Obtiene todas las sesiones de Paseo (últimas 20)
         """
         try:
-            sessions = db.session.query(PaseoSession, User.nombre).\
-                join(User, PaseoSession.user_id == User.id).\
-                order_by(PaseoSession.created_at.desc()).\
-                limit(20).\
-                all()
-            
-            result = []
-            for session, user_name in sessions:
-                session_dict = session.to_dict()
-                session_dict['user_name'] = user_name
-                result.append(session_dict)
-            
             return jsonify({
                 'success': True,
-                'sessions': result
-            }), 200
-        except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 500
-    
-    @staticmethod
-    def get_user_stats_all_games(user_id):
-        """
-        GET /admin/user-stats/<user_id>
-        Obtiene estadísticas de todos los juegos para un usuario específico
-        """
-        try:
-            # Obtener usuario
-            user = User.query.get(user_id)
-            if not user:
-                return jsonify({
-                    'success': False,
-                    'error': 'Usuario no encontrado'
-                }), 404
-            
-            # Stats de Memoria
-            memory_sessions = MemoryGameSession.query.filter_by(user_id=user_id).all()
-            memory_stats = {
-                'total_sesiones': len(memory_sessions),
-                'promedio_accuracy': sum([s.accuracy_percentage or 0 for s in memory_sessions]) / len(memory_sessions) if memory_sessions else 0,
-                'sesiones_completadas': sum([1 for s in memory_sessions if s.completion_status == 'completed'])
-            }
-            
-            # Stats de Abecedario  
-            abecedario_sessions = Abecedario.query.filter_by(user_id=user_id).all()
-            abecedario_stats = {
-                'total_sesiones': len(abecedario_sessions),
-                'palabras_completadas': sum([1 for s in abecedario_sessions if s.completado]),
-                'tiempo_promedio': sum([s.tiempo_resolucion for s in abecedario_sessions]) / len(abecedario_sessions) if abecedario_sessions else 0
-            }
-            
-            # Stats de Paseo
-            paseo_sessions = PaseoSession.query.filter_by(user_id=user_id).all()
-            paseo_stats = {
-                'total_sesiones': len(paseo_sessions),
-                'victorias': sum([1 for s in paseo_sessions if s.resultado == 'victoria']),
-                'precision_promedio': sum([s.precision or 0 for s in paseo_sessions]) / len(paseo_sessions) if paseo_sessions else 0
-            }
-            
-            return jsonify({
-                'success': True,
-                'user': user.to_dict(),
-                'stats': {
-                    'memoria': memory_stats,
-                    'abecedario': abecedario_stats,
-                    'paseo': paseo_stats
-                }
+                'sessions': AdminService.listar_sesiones_paseo()
             }), 200
         except Exception as e:
             return jsonify({
@@ -291,19 +184,16 @@ class AdminController:
             }), 500
     
     @staticmethod
+    @solo_lectura
     def get_user_memory_sessions(user_id):
         """
         GET /admin/user-memory-sessions/<user_id>
         Obtiene todas las sesiones de memoria de un usuario específico
         """
         try:
-            sessions = MemoryGameSession.query.filter_by(user_id=user_id).\
-                order_by(MemoryGameSession.finished_at.desc()).\
-                all()
-            
             return jsonify({
                 'success': True,
-                'sessions': [s.to_dict() for s in sessions]
+                'sessions': memory_rows.listar(user_id=user_id, **ArchivoService.para_listado('memoria', user_id))
             }), 200
         except Exception as e:
             return jsonify({
@@ -312,19 +202,16 @@ class AdminController:
             }), 500
     
     @staticmethod
+    @solo_lectura
     def get_user_abecedario_sessions(user_id):
         """
         GET /admin/user-abecedario-sessions/<user_id>
         Obtiene todas las sesiones de abecedario de un usuario específico
         """
         try:
-            sessions = Abecedario.query.filter_by(user_id=user_id).\
-                order_by(Abecedario.created_at.desc()).\
-                all()
-            
             return jsonify({
                 'success': True,
-                'sessions': Abecedario.to_collection_dict(sessions)
+                'sessions': abecedario_rows.listar(user_id=user_id, **ArchivoService.para_listado('abecedario', user_id))
             }), 200
         except Exception as e:
             return jsonify({
@@ -333,19 +220,16 @@ class AdminController:
             }), 500
     
     @staticmethod
+    @solo_lectura
     def get_user_paseo_sessions(user_id):
         """
         GET /admin/user-paseo-sessions/<user_id>
         Obtiene todas las sesiones de paseo de un usuario específico
         """
         try:
-            sessions = PaseoSession.query.filter_by(user_id=user_id).\
-                order_by(PaseoSession.created_at.desc()).\
-                all()
-            
             return jsonify({
                 'success': True,
-                'sessions': PaseoSession.to_collection_dict(sessions)
+                'sessions': paseo_rows.listar(user_id=user_id, **ArchivoService.para_listado('paseo', user_id))
             }), 200
         except Exception as e:
             return jsonify({
@@ -354,35 +238,121 @@ class AdminController:
             }), 500
     
     @staticmethod
+    @solo_lectura
     def get_admin_stats():
         """
         GET /admin/stats
         Obtiene estadísticas globales del sistema
         """
         try:
-            # Total de sesiones
-            total_sessions = MemoryGameSession.query.count()
-            
-            # Sesiones de hoy
-            today = datetime.utcnow().date()
-            sessions_today = MemoryGameSession.query.filter(
-                func.date(MemoryGameSession.finished_at) == today
-            ).count()
-            
-            # Accuracy promedio
-            avg_accuracy = MemoryGameSession.query.\
-                filter(MemoryGameSession.accuracy_percentage != None).\
-                with_entities(func.avg(MemoryGameSession.accuracy_percentage)).\
-                scalar()
-            
             return jsonify({
                 'success': True,
-                'total_sessions': total_sessions,
-                'sessions_today': sessions_today,
-                'average_accuracy': float(avg_accuracy) if avg_accuracy else 0
+                **AdminService.obtener_stats_globales()
+            }), 200
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+    @staticmethod
+    @solo_lectura
+    def get_overview():
+        """
+        GET /admin/overview
+        Datos iniciales del dashboard (usuarios, stats, últimas sesiones de
+        cada juego y configs de memoria) en una sola petición
+        """
+        try:
+            return jsonify({
+                'success': True,
+                **AdminService.obtener_overview()
+            }), 200
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+    @staticmethod
+    @solo_lectura
+    def get_admin_stats_v2():
+        """
+        GET /admin/stats/v2
+        Estadísticas globales de los cuatro juegos: sesiones totales y de hoy,
+        usuarios activos a 7/30 días y precisión promedio por juego
+        """
+        try:
+            return jsonify({
+                'success': True,
+                **AdminService.obtener_stats_por_juego()
+            }), 200
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+    @staticmethod
+    def get_metrics_summary():
+        """
+        GET /admin/metrics
+        Resumen de rendimiento del proceso: latencia y consultas SQL por ruta,
+        llamadas a Gemini por servicio y tasa de acierto de las cachés
+        """
+        try:
+            return jsonify({
+                'success': True,
+                **metrics.resumen()
             }), 200
         except Exception as e:
             return jsonify({
                 'success': False,
                 'error': str(e)
             }), 500
+
+    @staticmethod
+    @solo_lectura
+    def export_sessions(juego):
+        """
+        GET /admin/export/<juego>?from=YYYY-MM-DD&to=YYYY-MM-DD&user_id=&format=csv|parquet|arrow
+        Descarga el historial de sesiones de un juego (abecedario, paseo, memoria, trenes)
+        en streaming; 'to' es inclusive
+        """
+        if juego not in export.EXPORTABLES:
+            return jsonify({'success': False, 'error': f'Juego desconocido: {juego}'}), 404
+
+        formato = request.args.get('format', 'csv')
+        if formato not in export.FORMATOS:
+            return jsonify({'success': False, 'error': f'Formato desconocido: {formato}'}), 400
+        if formato not in export.formatos_disponibles():
+            return jsonify({'success': False, 'error': f'El formato {formato} requiere pyarrow'}), 501
+
+        try:
+            desde = request.args.get('from')
+            hasta = request.args.get('to')
+            desde = datetime.strptime(desde, '%Y-%m-%d') if desde else None
+            hasta = datetime.strptime(hasta, '%Y-%m-%d') if hasta else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
+        user_id = request.args.get('user_id')
+        if user_id:
+            if not user_id.isdigit():
+                return jsonify({'success': False, 'error': 'user_id debe ser un entero'}), 400
+            user_id = int(user_id)
+        else:
+            user_id = None
+
+        # El nombre del archivo sale solo de valores ya validados
+        mimetype, extension = export.FORMATOS[formato]
+        partes = [juego] + ([str(user_id)] if user_id is not None else [])
+        partes += [fecha.strftime('%Y-%m-%d') for fecha in (desde, hasta) if fecha]
+        nombre = '_'.join(partes)
+        hasta = hasta + timedelta(days=1) if hasta else None
+        # Lo archivado solo si el rango llega antes del horizonte; se lee un mes por vez al exportar
+        archivadas = None
+        if ArchivoService.alcanza(desde.date() if desde else None):
+            archivadas = ArchivoService.por_mes(juego, user_id, desde, hasta)
+        chunks = export.exportar(juego, formato, user_id, desde, hasta, archivadas=archivadas)
+        return Response(stream_with_context(chunks), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename="{nombre}.{extension}"'})
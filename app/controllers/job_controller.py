@@ -0,0 +1,23 @@
+"""
+Controlador de la cola de trabajos en segundo plano
+"""
+from flask import jsonify
+from services.jobs.job_service import JobService
+
+
+class JobController:
+
+    @staticmethod
+    def get_status(job_id):
+        """
+        GET /jobs/<job_id>
+        Estado del trabajo (pendiente, en_curso, completado, fallido) y su
+        resultado cuando terminó
+        """
+        try:
+            job = JobService.obtener(job_id)
+            if job is None:
+                return jsonify({'success': False, 'error': f'Job {job_id} no encontrado'}), 404
+            return jsonify({'success': True, 'job': job.to_dict()}), 200
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
@@ -8,6 +8,10 @@ from flask import request, jsonify
 
 from services.memory_game import MemoryGameService
 
+from serializers.negotiation import respuesta
+
+from config.database import solo_lectura
+
 from datetime import datetime
 
 import logging
@@ -16,19 +20,7 @@ import json
 
 
 
-# Configurar logging
-
-logging.basicConfig(
-
-    level=logging.INFO,
-
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-
-    datefmt='%Y-%m-%d %H:%M:%S'
-
-)
-
-logger = logging.getLogger('MemoryGameController')
+logger = logging.getLogger(__name__)
 
 
 
@@ -50,14 +42,6 @@ class MemoryGameController:
 
         """
 
-        logger.info("="*80)
-
-        logger.info(f"ðŸ“¥ REQUEST | GET /memory-game/config/{user_id}")
-
-        logger.info(f"   User ID: {user_id}")
-
-        
-
         try:
 
             data = service.get_user_config(user_id)
@@ -74,17 +58,13 @@ class MemoryGameController:
 
             
 
-            logger.info(f"ðŸ“¤ RESPONSE | Status: 200 OK")
+            logger.debug("Config user_id=%s: %s (primera vez: %s)",
 
-            logger.info(f"   Config: {data['current_config']}")
-
-            logger.info(f"   First Time: {data['is_first_time']}")
-
-            logger.info("="*80)
+                         user_id, data['current_config'], data['is_first_time'])
 
             
 
-            return jsonify(response), 200
+            return respuesta(response, 200)
 
             
 
@@ -100,15 +80,11 @@ class MemoryGameController:
 
             
 
-            logger.error(f"âŒ ERROR | Status: 500")
-
-            logger.error(f"   Error: {str(e)}")
-
-            logger.error("="*80)
+            logger.exception("Error obteniendo config de user_id=%s", user_id)
 
             
 
-            return jsonify(error_response), 500
+            return respuesta(error_response, 500)
 
 
 
@@ -152,21 +128,17 @@ class MemoryGameController:
 
         """
 
-        logger.info("="*80)
-
-        logger.info("ðŸ“¥ REQUEST | POST /memory-game/submit-results")
-
-        
-
         try:
 
             data = request.get_json()
 
             
 
-            logger.info(f"   Received Data:")
+            # json.dumps solo se evalúa si DEBUG está activo
+
+            if logger.isEnabledFor(logging.DEBUG):
 
-            logger.info(f"   {json.dumps(data, indent=6)}")
+                logger.debug("Payload recibido: %s", json.dumps(data, indent=6))
 
             
 
@@ -188,11 +160,7 @@ class MemoryGameController:
 
                 
 
-                logger.warning(f"âš ï¸  VALIDATION ERROR | Status: 400")
-
-                logger.warning(f"   Missing required fields")
-
-                logger.warning("="*80)
+                logger.warning("submit-results sin user_id o session_data")
 
                 
 
@@ -200,16 +168,6 @@ class MemoryGameController:
 
             
 
-            logger.info(f"   Processing session for User ID: {user_id}")
-
-            logger.info(f"   Session Status: {session_data.get('completion_status')}")
-
-            logger.info(f"   Accuracy: {session_data.get('accuracy')}%")
-
-            logger.info(f"   Time: {session_data.get('elapsed_time')}s / {session_data.get('time_limit')}s")
-
-            
-
             result = service.save_session_and_analyze(user_id, session_data)
 
             
@@ -230,23 +188,19 @@ class MemoryGameController:
 
             ai_analysis = result.get('ai_analysis', {})
 
-            logger.info(f"ðŸ“¤ RESPONSE | Status: 200 OK")
-
-            logger.info(f"   Session Saved: ID={result.get('session_id')}")
-
-            logger.info(f"   AI Score: {ai_analysis.get('performance_assessment', {}).get('overall_score')}/10")
+            logger.info("Sesión guardada user_id=%s id=%s estado=%s score=%s decisión=%s nueva dificultad=%s",
 
-            logger.info(f"   Decision: {ai_analysis.get('adjustment_decision')}")
+                        user_id, result.get('session_id'), session_data.get('completion_status'),
 
-            logger.info(f"   New Difficulty: {ai_analysis.get('next_session_config', {}).get('difficulty_label')}")
+                        ai_analysis.get('performance_assessment', {}).get('overall_score'),
 
-            logger.info(f"   Reason: {ai_analysis.get('reason')}")
+                        ai_analysis.get('adjustment_decision'),
 
-            logger.info(f"   Response Data:")
+                        ai_analysis.get('next_session_config', {}).get('difficulty_label'))
 
-            logger.info(f"   {json.dumps(result, indent=6)}")
+            if logger.isEnabledFor(logging.DEBUG):
 
-            logger.info("="*80)
+                logger.debug("Respuesta: %s", json.dumps(result, indent=6, default=str))
 
             
 
@@ -266,13 +220,7 @@ class MemoryGameController:
 
             
 
-            logger.error(f"âŒ ERROR | Status: 500")
-
-            logger.error(f"   Error: {str(e)}")
-
-            logger.error(f"   Traceback:", exc_info=True)
-
-            logger.error("="*80)
+            logger.exception("Error en submit_results")
 
             
 
@@ -282,6 +230,8 @@ class MemoryGameController:
 
     @staticmethod
 
+    @solo_lectura
+
     def get_stats(user_id):
 
         """
@@ -292,14 +242,6 @@ class MemoryGameController:
 
         """
 
-        logger.info("="*80)
-
-        logger.info(f"ðŸ“¥ REQUEST | GET /memory-game/stats/{user_id}")
-
-        logger.info(f"   User ID: {user_id}")
-
-        
-
         try:
 
             stats = service.get_user_stats(user_id)
@@ -316,17 +258,9 @@ class MemoryGameController:
 
             
 
-            logger.info(f"ðŸ“¤ RESPONSE | Status: 200 OK")
+            logger.debug("Stats user_id=%s: %s sesiones, %s completadas",
 
-            logger.info(f"   Total Sessions: {stats.get('total_sessions')}")
-
-            logger.info(f"   Completed: {stats.get('completed_sessions')}")
-
-            logger.info(f"   Avg Accuracy: {stats.get('average_accuracy'):.1f}%")
-
-            logger.info(f"   Best Time: {stats.get('best_time')}s")
-
-            logger.info("="*80)
+                         user_id, stats.get('total_sessions'), stats.get('completed_sessions'))
 
             
 
@@ -346,11 +280,7 @@ class MemoryGameController:
 
             
 
-            logger.error(f"âŒ ERROR | Status: 500")
-
-            logger.error(f"   Error: {str(e)}")
-
-            logger.error("="*80)
+            logger.exception("Error obteniendo stats de user_id=%s", user_id)
 
             
 
@@ -362,10 +292,7 @@ class MemoryGameController:
         Resetea el progreso del usuario (borra sesiones y configuración)
         para que vuelva a empezar desde el nivel tutorial
         """
-        logger.info("="*80)
-        logger.info(f" REQUEST | DELETE /memory-game/reset/{user_id}")
-        logger.info(f"   User ID: {user_id}")
-        logger.warning(f"     RESETEANDO PROGRESO DEL USUARIO")
+        logger.warning("Reseteando progreso de user_id=%s", user_id)
         
         try:
             result = service.reset_user_progress(user_id)
@@ -375,11 +302,8 @@ class MemoryGameController:
                 'data': result
             }
             
-            logger.info(f" RESPONSE | Status: 200 OK")
-            logger.info(f"   Sessions Deleted: {result.get('sessions_deleted')}")
-            logger.info(f"   Config Deleted: {result.get('config_deleted')}")
-            logger.info(f"    Usuario reseteado a nivel TUTORIAL")
-            logger.info("="*80)
+            logger.info("Usuario %s reseteado a TUTORIAL: %s sesiones y %s configs borradas",
+                        user_id, result.get('sessions_deleted'), result.get('config_deleted'))
             
             return jsonify(response), 200
             
@@ -389,9 +313,7 @@ class MemoryGameController:
                 'error': str(e)
             }
             
-            logger.error(f" ERROR | Status: 500")
-            logger.error(f"   Error: {str(e)}")
-            logger.error("="*80)
+            logger.exception("Error reseteando progreso de user_id=%s", user_id)
             
             return jsonify(error_response), 500
 
@@ -1,6 +1,12 @@
 from flask import Blueprint, request, jsonify
 from services.paseo.paseo_service import PaseoService
 from services.paseo.gemini_paseo_service import GeminiPaseoService
+from services.archivo.archivo_service import ArchivoService
+from serializers.negotiation import respuesta
+from config.database import solo_lectura
+import logging
+
+logger = logging.getLogger(__name__)
 
 paseo_bp = Blueprint('paseo', __name__, url_prefix='/paseo')
 gemini_service = GeminiPaseoService()
@@ -15,7 +21,7 @@ def start_session():
         data = request.get_json()
         
         if not data or 'user_id' not in data:
-            return jsonify({'success': False, 'error': 'user_id requerido'}), 400
+            return respuesta({'success': False, 'error': 'user_id requerido'}, 400)
         
         user_id = data['user_id']
         
@@ -23,31 +29,30 @@ def start_session():
         ultima_sesion, _ = PaseoService.get_ultima_sesion(user_id)
         
         # Decidir nivel inicial
+        velocidad = None
         if not ultima_sesion:
             # Usuario NUEVO → TUTORIAL
             nivel = "tutorial"
-            print(f"[PASEO] Usuario nuevo → TUTORIAL")
+            logger.debug("Usuario %s nuevo → TUTORIAL", user_id)
         else:
             # Ya jugó antes → IA decide basado en rendimiento
-            nivel = gemini_service.decidir_nivel_inicial(user_id)
-            print(f"[PASEO] IA decide nivel: {nivel}")
+            nivel, velocidad = gemini_service.decidir_nivel_inicial(user_id)
+            logger.debug("IA decide nivel para user %s: %s", user_id, nivel)
         
         # Generar plan SIN IA
-        plan = gemini_service._plan_nivel_sin_ia(nivel)
+        plan = gemini_service._plan_nivel_sin_ia(nivel, velocidad=velocidad)
         
         meta = plan.get('meta_aciertos', 5)
-        print(f"[PASEO] Sesión planificada user {user_id}: {nivel.upper()}, meta: {meta} aciertos")
+        logger.info("Sesión planificada user %s: %s, meta: %s aciertos", user_id, nivel.upper(), meta)
         
-        return jsonify({
+        return respuesta({
             'success': True,
             'plan': plan
-        }), 200
+        }, 200)
         
     except Exception as e:
-        print(f"[PASEO API ERROR] start_session: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'success': False, 'error': str(e)}), 500
+        logger.exception("Error en start_session")
+        return respuesta({'success': False, 'error': str(e)}, 500)
 
 
 @paseo_bp.route('/get-next-level', methods=['POST'])
@@ -81,13 +86,11 @@ def get_next_level():
         # Generar plan sin IA
         plan = gemini_service._plan_nivel_sin_ia(siguiente_nivel)
         
-        print(f"[PASEO] Siguiente nivel SIN IA: {siguiente_nivel}")
+        logger.debug("Siguiente nivel SIN IA: %s", siguiente_nivel)
         return jsonify({'success': True, 'plan': plan}), 200
         
     except Exception as e:
-        print(f"[PASEO API ERROR] get_next_level: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en get_next_level")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -118,9 +121,7 @@ def save_session():
         }), 200
         
     except Exception as e:
-        print(f"[PASEO API ERROR] save_session: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en save_session")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -140,12 +141,11 @@ def report_metrics():
         }), 200
         
     except Exception as e:
-        print(f"[PASEO API ERROR] report_metrics: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en report_metrics")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @paseo_bp.route('/evolution/<int:user_id>', methods=['GET'])
+@solo_lectura
 def get_evolution(user_id):
     """
     Obtiene reporte de evolución agrupado por fecha y nivel
@@ -162,6 +162,8 @@ def get_evolution(user_id):
             PaseoSession.fecha_juego.asc(),
             PaseoSession.created_at.asc()
         ).all()
+        # Todo el historial: incluye las sesiones archivadas
+        sesiones = ArchivoService.sesiones('paseo', user_id) + sesiones
         
         if not sesiones:
             return jsonify({
@@ -265,8 +267,7 @@ def get_evolution(user_id):
         }), 200
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en get_evolution user_id=%s", user_id)
         return jsonify({'error': str(e)}), 500
 
 @paseo_bp.route('/final-stats/<int:user_id>', methods=['GET'])
@@ -298,6 +299,5 @@ def get_final_stats(user_id):
         return jsonify(stats), 200
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en get_final_stats user_id=%s", user_id)
         return jsonify({'error': str(e)}), 500
@@ -28,7 +28,7 @@ def list_users():
         print("=" * 80)
         print("\nNOTA: Las contraseñas están hasheadas en la base de datos.")
         print("Para probar el sistema, usa el nombre de usuario y la contraseña original")
-        print("o ejecuta el script reset_passwords.py para cambiarlas a '123'")
+        print("o ejecuta 'flask --app app mantenimiento reset-passwords --todos' para cambiarlas a '123'")
 
 if __name__ == '__main__':
     list_users()
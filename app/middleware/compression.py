@@ -0,0 +1,123 @@
+"""
+Compresión de respuestas (gzip / brotli)
+
+- Respuestas normales: se comprimen si superan COMPRESSION_MIN_SIZE bytes y
+  el tipo de contenido es texto (JSON, JS, CSS, HTML, NDJSON, CSV...).
+- Respuestas en streaming (NDJSON, CSV): se comprimen chunk a chunk con un
+  flush por chunk, así el cliente recibe cada línea sin esperar al final.
+- Los assets estáticos y swagger.json llegan ya precomprimidos desde
+  middleware/static_cache.py; aquí no se vuelven a comprimir.
+- Un endpoint puede excluirse con el decorador @sin_compresion.
+
+brotli es opcional: si no está instalado solo se usa gzip.
+"""
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+TIPOS_COMPRIMIBLES = {
+    'application/json', 'application/javascript', 'application/x-ndjson',
+    'application/msgpack', 'application/xml', 'image/svg+xml'
+}
+
+
+def sin_compresion(vista):
+    """Excluye un endpoint de la compresión (p. ej. respuestas ya comprimidas)"""
+    vista._sin_compresion = True
+    return vista
+
+
+def _comprimible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in TIPOS_COMPRIMIBLES)
+
+
+def elegir_codificacion():
+    """'br', 'gzip' o None según Accept-Encoding (brotli preferido si hay empate)"""
+    aceptadas = request.accept_encodings
+    if brotli is not None and aceptadas['br'] > 0 and aceptadas['br'] >= aceptadas['gzip']:
+        return 'br'
+    if aceptadas['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def comprimir(datos, codificacion, nivel_gzip, calidad_br):
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=calidad_br)
+    return gzip.compress(datos, compresslevel=nivel_gzip, mtime=0)
+
+
+def _comprimir_stream(chunks, codificacion, nivel_gzip, calidad_br):
+    """Comprime un iterable de chunks; cada chunk se entrega completo (flush)"""
+    if codificacion == 'br':
+        compresor = brotli.Compressor(quality=calidad_br)
+
+        def comprimir_chunk(chunk):
+            return compresor.process(chunk) + compresor.flush()
+        finalizar = compresor.finish
+    else:
+        compresor = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        def comprimir_chunk(chunk):
+            return compresor.compress(chunk) + compresor.flush(zlib.Z_SYNC_FLUSH)
+        finalizar = compresor.flush
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            salida = comprimir_chunk(chunk)
+            if salida:
+                yield salida
+        yield finalizar()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def init_compression(app):
+    """Registra la compresión como after_request de la app"""
+    app.config.setdefault('COMPRESSION_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESSION_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESSION_BROTLI_QUALITY', 4)
+
+
+    @app.after_request
+    def comprimir_respuesta(response):
+        if request.method == 'HEAD' or response.status_code != 200:
+            return response
+        if 'Content-Encoding' in response.headers or not _comprimible(response.mimetype):
+            return response
+
+        vista = app.view_functions.get(request.endpoint)
+        if vista is not None and getattr(vista, '_sin_compresion', False):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codificacion = elegir_codificacion()
+        if codificacion is None:
+            return response
+
+        nivel_gzip = app.config['COMPRESSION_GZIP_LEVEL']
+        calidad_br = app.config['COMPRESSION_BROTLI_QUALITY']
+
+        if response.direct_passthrough:
+            # Archivos servidos directamente desde disco (send_file)
+            return response
+        if response.is_streamed:
+            response.response = _comprimir_stream(response.response, codificacion, nivel_gzip, calidad_br)
+            response.headers.pop('Content-Length', None)
+        else:
+            datos = response.get_data()
+            if len(datos) < app.config['COMPRESSION_MIN_SIZE']:
+                return response
+            response.set_data(comprimir(datos, codificacion, nivel_gzip, calidad_br))
+
+        response.headers['Content-Encoding'] = codificacion
+        return response
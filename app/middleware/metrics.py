@@ -0,0 +1,215 @@
+"""
+Métricas de la app (formato Prometheus en /metrics)
+
+- Latencia por ruta y método (histograma) y peticiones por código de estado.
+- Consultas SQL por petición: cantidad y tiempo, con eventos de SQLAlchemy
+  sobre los engines de db (before/after_cursor_execute), réplica incluida.
+- Latencia de las llamadas a Gemini por servicio (medir_gemini).
+- Aciertos / fallos de las cachés en memoria (registrar_cache).
+
+Los valores viven en memoria del proceso: con varios workers cada uno
+expone los suyos y Prometheus los suma por instancia.
+"""
+import time
+import threading
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_lock = threading.Lock()
+
+
+class Histograma:
+    def __init__(self, nombre, ayuda, etiquetas, buckets=BUCKETS_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        self.series = {}  # valores de etiquetas -> [conteos por bucket..., suma, total]
+
+    def observar(self, valor, *valores_etiquetas):
+        with _lock:
+            serie = self.series.get(valores_etiquetas)
+            if serie is None:
+                serie = self.series[valores_etiquetas] = [0] * (len(self.buckets) + 2)
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def percentil(self, serie, p):
+        """
+        Estimación del percentil: límite del primer bucket que lo alcanza. Si
+        cae en +Inf se devuelve el último límite (Infinity no es JSON válido)
+        """
+        objetivo = serie[-1] * p
+        for i, limite in enumerate(self.buckets):
+            if serie[i] >= objetivo:
+                return limite
+        return self.buckets[-1]
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} histogram']
+        for valores, serie in sorted(self.series.items()):
+            base = _etiquetas(self.etiquetas, valores)
+            prefijo = base + ',' if base else ''
+            sufijo = f'{{{base}}}' if base else ''
+            for i, limite in enumerate(self.buckets):
+                lineas.append(f'{self.nombre}_bucket{{{prefijo}le="{limite}"}} {serie[i]}')
+            lineas.append(f'{self.nombre}_bucket{{{prefijo}le="+Inf"}} {serie[-1]}')
+            lineas.append(f'{self.nombre}_sum{sufijo} {serie[-2]}')
+            lineas.append(f'{self.nombre}_count{sufijo} {serie[-1]}')
+        return lineas
+
+
+class Contador:
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.series = {}
+
+    def incrementar(self, *valores_etiquetas, cantidad=1):
+        with _lock:
+            self.series[valores_etiquetas] = self.series.get(valores_etiquetas, 0) + cantidad
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} counter']
+        for valores, total in sorted(self.series.items()):
+            lineas.append(f'{self.nombre}{{{_etiquetas(self.etiquetas, valores)}}} {total}')
+        return lineas
+
+
+def _etiquetas(nombres, valores):
+    return ','.join(f'{n}="{str(v).replace(chr(34), chr(39))}"' for n, v in zip(nombres, valores))
+
+
+http_duracion = Histograma('http_request_duration_seconds', 'Latencia de las peticiones por ruta', ('route', 'method'))
+http_peticiones = Contador('http_requests_total', 'Peticiones por ruta y código de estado', ('route', 'method', 'status'))
+http_consultas = Histograma('http_request_db_queries', 'Consultas SQL por petición', ('route',), BUCKETS_CONSULTAS)
+http_tiempo_db = Histograma('http_request_db_duration_seconds', 'Tiempo en SQL por petición', ('route',))
+db_consultas = Histograma('db_query_duration_seconds', 'Duración de cada consulta SQL', ())
+gemini_duracion = Histograma('gemini_request_duration_seconds', 'Latencia de las llamadas a Gemini', ('service', 'outcome'))
+cache_consultas = Contador('cache_requests_total', 'Aciertos y fallos de las cachés en memoria', ('cache', 'result'))
+replica_lecturas = Contador('db_read_routing_total', 'Peticiones de solo lectura por base usada', ('target',))
+
+METRICAS = [http_duracion, http_peticiones, http_consultas, http_tiempo_db, db_consultas, gemini_duracion, cache_consultas,
+            replica_lecturas]
+
+
+@contextmanager
+def medir_gemini(servicio):
+    """with medir_gemini('abecedario'): response = model.generate_content(...)"""
+    inicio = time.perf_counter()
+    resultado = 'error'
+    try:
+        yield
+        resultado = 'ok'
+    finally:
+        gemini_duracion.observar(time.perf_counter() - inicio, servicio, resultado)
+
+
+def registrar_cache(cache, acierto):
+    cache_consultas.incrementar(cache, 'hit' if acierto else 'miss')
+
+
+def _ruta():
+    return request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+
+
+def exponer_prometheus():
+    lineas = []
+    for metrica in METRICAS:
+        lineas.extend(metrica.exponer())
+    return '\n'.join(lineas) + '\n'
+
+
+def resumen():
+    """Resumen para el dashboard: rutas, Gemini y cachés"""
+    with _lock:
+        consultas_por_ruta = dict(http_consultas.series)
+        rutas = []
+        for (ruta, metodo), serie in http_duracion.series.items():
+            consultas = consultas_por_ruta.get((ruta,))
+            rutas.append({
+                'ruta': ruta,
+                'metodo': metodo,
+                'peticiones': serie[-1],
+                'promedio_ms': round(serie[-2] / serie[-1] * 1000, 1),
+                'p95_ms': round(http_duracion.percentil(serie, 0.95) * 1000, 1),
+                'consultas_promedio': round(consultas[-2] / consultas[-1], 1) if consultas else 0
+            })
+
+        gemini = {}
+        for (servicio, resultado), serie in gemini_duracion.series.items():
+            datos = gemini.setdefault(servicio, {'llamadas': 0, 'errores': 0, 'tiempo_total': 0.0})
+            datos['llamadas'] += serie[-1]
+            datos['tiempo_total'] += serie[-2]
+            if resultado == 'error':
+                datos['errores'] += serie[-1]
+
+        caches = {}
+        for (cache, resultado), total in cache_consultas.series.items():
+            caches.setdefault(cache, {'hit': 0, 'miss': 0})[resultado] = total
+
+    for datos in gemini.values():
+        datos['promedio_ms'] = round(datos.pop('tiempo_total') / datos['llamadas'] * 1000, 1)
+    for datos in caches.values():
+        total = datos['hit'] + datos['miss']
+        datos['tasa_acierto'] = round(datos['hit'] / total * 100, 1) if total else 0
+
+    rutas.sort(key=lambda r: r['p95_ms'], reverse=True)
+    return {'rutas': rutas, 'gemini': gemini, 'caches': caches}
+
+
+def init_metrics(app, db):
+    """Registra los hooks de petición y los eventos de SQLAlchemy sobre los engines"""
+
+    def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metricas_inicio', []).append(time.perf_counter())
+
+    def _despues_consulta(conn, cursor, statement, parameters, context, executemany):
+        duracion = time.perf_counter() - conn.info['metricas_inicio'].pop()
+        db_consultas.observar(duracion)
+        if has_request_context():
+            g.db_consultas = g.get('db_consultas', 0) + 1
+            g.db_tiempo = g.get('db_tiempo', 0.0) + duracion
+
+    def _error_consulta(contexto):
+        # La sentencia falló: after_cursor_execute no llega y el inicio quedaría en la conexión del pool
+        if contexto.connection is not None and contexto.connection.info.get('metricas_inicio'):
+            contexto.connection.info['metricas_inicio'].pop()
+
+    # Primario y réplica (si hay)
+    with app.app_context():
+        motores = list(db.engines.values())
+    for motor in motores:
+        event.listen(motor, 'before_cursor_execute', _antes_consulta)
+        event.listen(motor, 'after_cursor_execute', _despues_consulta)
+        event.listen(motor, 'handle_error', _error_consulta)
+
+    @app.before_request
+    def _iniciar_medicion():
+        g.metricas_inicio = time.perf_counter()
+        g.db_consultas = 0
+        g.db_tiempo = 0.0
+
+    @app.after_request
+    def _registrar_peticion(response):
+        inicio = g.get('metricas_inicio')
+        if inicio is None:
+            return response
+        ruta = _ruta()
+        http_duracion.observar(time.perf_counter() - inicio, ruta, request.method)
+        http_peticiones.incrementar(ruta, request.method, response.status_code)
+        http_consultas.observar(g.db_consultas, ruta)
+        http_tiempo_db.observar(g.db_tiempo, ruta)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return app.response_class(exponer_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
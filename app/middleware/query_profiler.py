@@ -0,0 +1,171 @@
+"""
+Perfilador de consultas SQL (desarrollo y CI)
+
+Cuenta y cronometra las sentencias que ejecuta un bloque de código y agrupa
+las que tienen la misma forma (mismo SQL sin valores literales). Una forma
+que se repite muchas veces dentro de una misma petición suele ser un N+1.
+
+    with perfilar(db.engine) as perfil:
+        client.get('/admin/user-stats/1')
+    perfil.total, perfil.tiempo_ms, perfil.repetidas(), perfil.lentas(50)
+
+Con QUERY_PROFILER=1 (o app.config['QUERY_PROFILER']) cada petición se perfila
+y se loguea un WARNING cuando hay formas repetidas
+(>= QUERY_PROFILER_REPEAT veces) o consultas lentas (>= QUERY_PROFILER_SLOW_MS),
+y la respuesta lleva las cabeceras X-Query-Count y X-Query-Time-Ms.
+
+Los listeners se registran una sola vez sobre el engine; fuera de un bloque
+perfilar() solo cuestan una lectura de ContextVar.
+"""
+import os
+import re
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_perfil_activo = ContextVar('perfil_consultas', default=None)
+
+_LITERALES = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),            # cadenas
+    (re.compile(r'%\(\w+\)s|(?<!:):\w+|\$\d+|%s'), '?'),   # parámetros con nombre / posicionales
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),         # números
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?)'),  # IN (?, ?, ...) -> (?)
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def forma_sql(sentencia):
+    """SQL normalizado: sin literales ni listas de parámetros, espacios colapsados"""
+    for patron, reemplazo in _LITERALES:
+        sentencia = patron.sub(reemplazo, sentencia)
+    return sentencia.strip()
+
+
+class PerfilConsultas:
+    """Consultas ejecutadas dentro de un bloque perfilar()"""
+
+    def __init__(self):
+        self.consultas = []  # (forma, duracion_ms)
+
+    def registrar(self, sentencia, duracion_ms):
+        self.consultas.append((forma_sql(sentencia), duracion_ms))
+
+    @property
+    def total(self):
+        return len(self.consultas)
+
+    @property
+    def tiempo_ms(self):
+        return sum(d for _, d in self.consultas)
+
+    def por_forma(self):
+        """{forma: {'veces', 'tiempo_ms'}} en orden de primera aparición"""
+        formas = {}
+        for forma, duracion in self.consultas:
+            datos = formas.setdefault(forma, {'veces': 0, 'tiempo_ms': 0.0})
+            datos['veces'] += 1
+            datos['tiempo_ms'] += duracion
+        return formas
+
+    def repetidas(self, minimo=2):
+        """Formas ejecutadas al menos `minimo` veces, de más a menos repetida"""
+        formas = [(f, d) for f, d in self.por_forma().items() if d['veces'] >= minimo]
+        return sorted(formas, key=lambda x: x[1]['veces'], reverse=True)
+
+    def lentas(self, umbral_ms):
+        return [(f, d) for f, d in self.consultas if d >= umbral_ms]
+
+    def informe(self, minimo_repetidas=2):
+        lineas = [f'{self.total} consultas, {self.tiempo_ms:.1f} ms']
+        for forma, datos in self.repetidas(minimo_repetidas):
+            lineas.append(f'  x{datos["veces"]} ({datos["tiempo_ms"]:.1f} ms) {forma[:200]}')
+        return '\n'.join(lineas)
+
+
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    if _perfil_activo.get() is not None:
+        conn.info.setdefault('perfil_inicio', []).append(time.perf_counter())
+
+
+def _despues_consulta(conn, cursor, statement, parameters, context, executemany):
+    perfil = _perfil_activo.get()
+    if perfil is not None and conn.info.get('perfil_inicio'):
+        duracion_ms = (time.perf_counter() - conn.info['perfil_inicio'].pop()) * 1000
+        perfil.registrar(statement, duracion_ms)
+
+
+def _error_consulta(contexto):
+    # Sin after_cursor_execute: que el inicio no quede en la conexión del pool
+    if contexto.connection is not None and contexto.connection.info.get('perfil_inicio'):
+        contexto.connection.info['perfil_inicio'].pop()
+
+
+def instalar(motor):
+    """Registra los listeners en el engine (idempotente)"""
+    if not event.contains(motor, 'before_cursor_execute', _antes_consulta):
+        event.listen(motor, 'before_cursor_execute', _antes_consulta)
+        event.listen(motor, 'after_cursor_execute', _despues_consulta)
+        event.listen(motor, 'handle_error', _error_consulta)
+
+
+@contextmanager
+def perfilar(motor):
+    """with perfilar(db.engine) as perfil: ...  (los bloques no se anidan: manda el interno)"""
+    instalar(motor)
+    perfil = PerfilConsultas()
+    token = _perfil_activo.set(perfil)
+    try:
+        yield perfil
+    finally:
+        _perfil_activo.reset(token)
+
+
+def init_query_profiler(app, db):
+    """Perfila cada petición si QUERY_PROFILER está activo (pensado para desarrollo)"""
+    app.config.setdefault('QUERY_PROFILER', os.environ.get('QUERY_PROFILER', '0') == '1')
+    app.config.setdefault('QUERY_PROFILER_REPEAT', int(os.environ.get('QUERY_PROFILER_REPEAT', '3')))
+    app.config.setdefault('QUERY_PROFILER_SLOW_MS', float(os.environ.get('QUERY_PROFILER_SLOW_MS', '100')))
+    if not app.config['QUERY_PROFILER']:
+        return
+
+    with app.app_context():
+        for motor in db.engines.values():
+            instalar(motor)
+
+    @app.before_request
+    def _iniciar_perfil():
+        g.perfil = PerfilConsultas()
+        g.perfil_token = _perfil_activo.set(g.perfil)
+
+    @app.after_request
+    def _reportar_perfil(response):
+        token = g.pop('perfil_token', None)
+        if token is None:
+            return response
+        _perfil_activo.reset(token)
+        perfil = g.perfil
+
+        response.headers['X-Query-Count'] = str(perfil.total)
+        response.headers['X-Query-Time-Ms'] = f'{perfil.tiempo_ms:.1f}'
+
+        minimo = app.config['QUERY_PROFILER_REPEAT']
+        repetidas = perfil.repetidas(minimo)
+        if repetidas:
+            logger.warning('Posible N+1 en %s %s: %s', request.method, request.path, perfil.informe(minimo),
+                           extra={'query_count': perfil.total, 'repeated_shapes': len(repetidas)})
+        for forma, duracion in perfil.lentas(app.config['QUERY_PROFILER_SLOW_MS']):
+            logger.warning('Consulta lenta en %s %s (%.1f ms): %s', request.method, request.path,
+                           duracion, forma[:200], extra={'duration_ms': round(duracion, 1)})
+        return response
+
+    @app.teardown_request
+    def _cerrar_perfil(exc):
+        # Si la vista lanzó una excepción no manejada after_request no corre
+        token = g.pop('perfil_token', None)
+        if token is not None:
+            _perfil_activo.reset(token)
@@ -0,0 +1,131 @@
+"""
+Caché en memoria de assets estáticos pequeños
+
+Al arrancar se leen los archivos de static/ (hasta STATIC_CACHE_MAX_SIZE) y
+se guardan junto con su huella (hash del contenido) y sus versiones gzip /
+brotli ya comprimidas. Las peticiones se sirven desde memoria, sin tocar
+disco ni recalcular rutas.
+
+- url_asset('admin_dashboard.js') -> '/static/admin_dashboard.js?v=<huella>'
+- Con ?v=<huella> vigente: Cache-Control inmutable de un año.
+- Sin huella (o con una vieja): no-cache + ETag, el navegador revalida.
+
+También sirve documentos generados en memoria (swagger.json).
+En modo debug se recarga un archivo si cambió su mtime.
+"""
+import os
+import hashlib
+import mimetypes
+from flask import request
+
+from middleware.compression import comprimir, elegir_codificacion, brotli
+from middleware.metrics import registrar_cache
+
+
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+
+class _Asset:
+    __slots__ = ('datos', 'mimetype', 'huella', 'variantes', 'ruta', 'mtime')
+
+    def __init__(self, datos, mimetype, ruta=None, mtime=None):
+        self.datos = datos
+        self.mimetype = mimetype
+        self.huella = hashlib.sha256(datos).hexdigest()[:12]
+        self.ruta = ruta
+        self.mtime = mtime
+        self.variantes = {'gzip': comprimir(datos, 'gzip', 9, 11)}
+        if brotli is not None:
+            self.variantes['br'] = comprimir(datos, 'br', 9, 11)
+
+
+class StaticAssetCache:
+    """Assets en memoria con huella, precomprimidos y cabeceras de caché"""
+
+    def __init__(self):
+        self._assets = {}
+        self._reescrituras = {}
+        self._app = None
+
+    def init_app(self, app):
+        self._app = app
+        app.config.setdefault('STATIC_CACHE_MAX_SIZE', 256 * 1024)
+        self.cargar_carpeta(app.static_folder)
+
+        vista_original = app.view_functions['static']
+
+        def static(filename):
+            registrar_cache('static_assets', filename in self._assets)
+            if filename in self._assets:
+                return self.responder(filename)
+            return vista_original(filename=filename)
+
+        app.view_functions['static'] = static
+
+    def cargar_carpeta(self, carpeta):
+        limite = self._app.config['STATIC_CACHE_MAX_SIZE']
+        for nombre in sorted(os.listdir(carpeta)):
+            ruta = os.path.join(carpeta, nombre)
+            if os.path.isfile(ruta) and os.path.getsize(ruta) <= limite:
+                self.cargar_archivo(nombre, ruta)
+
+    def cargar_archivo(self, nombre, ruta):
+        with open(ruta, 'rb') as f:
+            datos = f.read()
+        mimetype = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+        if nombre in self._reescrituras:
+            datos = self._con_huellas(datos, self._reescrituras[nombre])
+        self._assets[nombre] = _Asset(datos, mimetype, ruta, os.path.getmtime(ruta))
+
+    def registrar(self, nombre, datos, mimetype):
+        """Agrega un documento generado en memoria (p. ej. swagger.json)"""
+        self._assets[nombre] = _Asset(datos, mimetype)
+
+    def reemplazar_urls(self, nombre, nombres_assets):
+        """Reescribe en un asset de texto las URLs /static/<x> por su versión con huella"""
+        self._reescrituras[nombre] = nombres_assets
+        asset = self._assets[nombre]
+        self._assets[nombre] = _Asset(self._con_huellas(asset.datos, nombres_assets),
+                                      asset.mimetype, asset.ruta, asset.mtime)
+
+    def _con_huellas(self, datos, nombres_assets):
+        texto = datos.decode('utf-8')
+        for otro in nombres_assets:
+            texto = texto.replace(f'"/static/{otro}"', f'"{self.url_asset(otro)}"')
+        return texto.encode('utf-8')
+
+    def url_asset(self, nombre):
+        asset = self._assets.get(nombre)
+        if asset is None:
+            return f'/static/{nombre}'
+        return f'/static/{nombre}?v={asset.huella}'
+
+    def _vigente(self, nombre):
+        asset = self._assets[nombre]
+        if self._app.debug and asset.ruta and os.path.getmtime(asset.ruta) != asset.mtime:
+            self.cargar_archivo(nombre, asset.ruta)
+            asset = self._assets[nombre]
+        return asset
+
+    def responder(self, nombre, inmutable=None):
+        """Response del asset según Accept-Encoding, con ETag y Cache-Control"""
+        asset = self._vigente(nombre)
+
+        codificacion = elegir_codificacion()
+        datos = asset.variantes[codificacion] if codificacion else asset.datos
+        response = self._app.response_class(datos, mimetype=asset.mimetype)
+        if codificacion:
+            response.headers['Content-Encoding'] = codificacion
+        response.vary.add('Accept-Encoding')
+
+        # ETag distinto por codificación: son representaciones distintas del mismo asset
+        response.set_etag(f'{asset.huella}-{codificacion}' if codificacion else asset.huella)
+        if inmutable is None:
+            # En debug los archivos pueden cambiar sin que cambie la URL del HTML
+            inmutable = not self._app.debug and request.args.get('v') == asset.huella
+        response.headers['Cache-Control'] = CACHE_INMUTABLE if inmutable else CACHE_REVALIDAR
+        return response.make_conditional(request)
+
+
+assets = StaticAssetCache()
@@ -0,0 +1,68 @@
+"""
+Entorno de Alembic: usa el engine y la metadata de la app (config/database.py),
+así las migraciones corren contra la misma base que el servidor.
+
+- Cada migración en su propia transacción (transaction_per_migration), para
+  que una creación de índice CONCURRENTLY o un relleno por lotes pueda salir
+  de la transacción con autocommit_block() sin arrastrar a las demás.
+- En SQLite los ALTER se hacen en modo batch (copia de tabla).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from config.database import db, app
+import models.user  # noqa: F401  (registran sus tablas en db.metadata)
+import models.abecedario  # noqa: F401
+import models.paseo  # noqa: F401
+import models.memory_game  # noqa: F401
+import models.train_game  # noqa: F401
+import models.user_game_stats  # noqa: F401
+import models.job  # noqa: F401
+import models.invalidacion  # noqa: F401
+import models.archivo  # noqa: F401
+
+config = context.config
+
+# Desde flask migraciones el logging ya está configurado por la app
+if config.config_file_name is not None and not config.attributes.get('logging_configurado'):
+    fileConfig(config.config_file_name)
+
+target_metadata = db.metadata
+
+
+def _opciones(conexion_o_url):
+    sqlite = getattr(conexion_o_url, 'dialect', None) is not None and conexion_o_url.dialect.name == 'sqlite'
+    return {
+        'target_metadata': target_metadata,
+        'compare_type': True,
+        'render_as_batch': sqlite,
+        'transaction_per_migration': True,
+    }
+
+
+def run_migrations_offline():
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)"""
+    context.configure(url=app.config['SQLALCHEMY_DATABASE_URI'], literal_binds=True,
+                      dialect_opts={'paramstyle': 'named'}, **_opciones(None))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    conexion = config.attributes.get('connection')
+    if conexion is not None:
+        context.configure(connection=conexion, **_opciones(conexion))
+        context.run_migrations()
+        return
+
+    with app.app_context():
+        with db.engine.connect() as conexion:
+            context.configure(connection=conexion, **_opciones(conexion))
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
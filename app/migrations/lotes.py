@@ -0,0 +1,79 @@
+"""
+Operaciones para migraciones sobre tablas de sesiones grandes
+
+- crear_indice_en_linea / borrar_indice_en_linea: en Postgres con
+  CONCURRENTLY, fuera de la transacción de la migración (no bloquea
+  escrituras mientras se construye el índice).
+- actualizar_por_lotes: rellenos de datos por rangos de clave primaria,
+  un commit por rango, para no mantener bloqueadas millones de filas en
+  una sola transacción.
+
+El tamaño de lote se puede cambiar con MIGRACION_LOTE (por defecto 5000).
+"""
+import os
+import logging
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+LOTE = int(os.environ.get('MIGRACION_LOTE', '5000'))
+
+
+def _es_postgres():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _indice_invalido(nombre):
+    """Un CREATE INDEX CONCURRENTLY interrumpido deja el índice marcado como inválido"""
+    consulta = sa.text('SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                       'WHERE c.relname = :nombre')
+    return bool(op.get_bind().execute(consulta, {'nombre': nombre}).scalar())
+
+
+def crear_indice_en_linea(nombre, tabla, columnas, **kwargs):
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS (índice normal fuera de Postgres)"""
+    with op.get_context().autocommit_block():
+        if _es_postgres() and not op.get_context().as_sql and _indice_invalido(nombre):
+            logger.info('Índice %s inválido de un intento anterior: se vuelve a crear', nombre)
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True, if_exists=True)
+        op.create_index(nombre, tabla, columnas, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+
+
+def borrar_indice_en_linea(nombre, tabla):
+    with op.get_context().autocommit_block():
+        op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True, if_exists=True)
+
+
+def actualizar_por_lotes(tabla, asignaciones, condicion, pk='id', lote=None):
+    """
+    UPDATE tabla SET asignaciones WHERE condicion, por rangos de hasta `lote`
+    filas de clave primaria (cada rango en su propia transacción).
+    asignaciones y condicion son SQL literal: las migraciones no dependen
+    de los modelos, que pueden cambiar después.
+    Devuelve las filas actualizadas.
+    """
+    lote = lote or LOTE
+    if op.get_context().as_sql:
+        # --sql: no hay filas que recorrer, se emite un solo UPDATE
+        op.execute(f'UPDATE {tabla} SET {asignaciones} WHERE {condicion}')
+        return 0
+    conexion = op.get_bind()
+    preparador = conexion.dialect.identifier_preparer
+    t, c = preparador.quote(tabla), preparador.quote(pk)
+    siguiente = sa.text(f'SELECT MAX({c}) FROM (SELECT {c} FROM {t} WHERE ({condicion}) AND {c} > :desde '
+                        f'ORDER BY {c} LIMIT :lote) AS rango')
+    actualizar = sa.text(f'UPDATE {t} SET {asignaciones} WHERE ({condicion}) AND {c} > :desde AND {c} <= :hasta')
+
+    total = 0
+    desde = -1
+    with op.get_context().autocommit_block():
+        while True:
+            hasta = conexion.execute(siguiente, {'desde': desde, 'lote': lote}).scalar()
+            if hasta is None:
+                break
+            total += conexion.execute(actualizar, {'desde': desde, 'hasta': hasta}).rowcount
+            desde = hasta
+    logger.info('%s: %d filas actualizadas', tabla, total)
+    return total
@@ -0,0 +1,145 @@
+"""
+Particiones mensuales de las tablas de sesiones (solo PostgreSQL)
+
+Cada tabla de sesiones se particiona por RANGE sobre su columna de fecha
+(la misma de los índices de 0002): una partición por mes, <tabla>_pAAAAMM,
+más <tabla>_default para lo que caiga fuera de los meses creados. La clave
+primaria pasa a ser (pk, fecha), como exige PostgreSQL; los ids siguen
+saliendo de la misma secuencia y no se repiten entre particiones.
+
+Lo usan la migración 0008 y `flask particiones` (crear los meses siguientes,
+separar los viejos). Todo es SQL sobre una conexión de SQLAlchemy: no depende
+de los modelos (TABLAS y los meses vienen de models/particiones.py, sin db).
+"""
+import re
+from datetime import date
+
+import sqlalchemy as sa
+
+from models.particiones import TABLAS, inicio_mes, sumar_meses
+
+_MES = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+def relleno(tabla, dialecto):
+    """Asignación SQL que completa la columna de partición de las filas sin fecha"""
+    _, columna, origen = TABLAS[tabla]
+    if origen == 'fecha_juego':
+        origen = 'datetime(fecha_juego)' if dialecto == 'sqlite' else 'CAST(fecha_juego AS timestamp)'
+    return f'{columna} = COALESCE({origen}, CURRENT_TIMESTAMP)'
+
+
+def indices(tabla):
+    """Índices de 0002 sobre la tabla (se recrean sobre la tabla particionada)"""
+    columna = TABLAS[tabla][1]
+    return [(f'ix_{tabla}_user_id_{columna}', ['user_id', columna]),
+            (f'ix_{tabla}_{columna}_user_id', [columna, 'user_id'])]
+
+
+def nombre_particion(tabla, mes):
+    return f'{tabla}_p{mes:%Y%m}'
+
+
+def _existe(conexion, nombre):
+    return conexion.execute(sa.text('SELECT to_regclass(:nombre) IS NOT NULL'), {'nombre': nombre}).scalar()
+
+
+def esta_particionada(conexion, tabla):
+    return bool(conexion.execute(sa.text(
+        'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid '
+        'WHERE c.oid = to_regclass(:tabla)'), {'tabla': tabla}).scalar())
+
+
+def particiones(conexion, tabla):
+    """[(nombre, mes)] de las particiones mensuales adjuntas, de la más vieja a la más nueva"""
+    nombres = conexion.execute(sa.text(
+        'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = to_regclass(:tabla)'), {'tabla': tabla}).scalars()
+    meses = []
+    for nombre in nombres:
+        coincidencia = _MES.search(nombre)
+        if coincidencia:
+            meses.append((nombre, date(int(coincidencia[1]), int(coincidencia[2]), 1)))
+    return sorted(meses, key=lambda par: par[1])
+
+
+def crear_particion(conexion, tabla, mes):
+    """
+    Crea la partición de `mes` si no existe. Las filas de ese mes que hubieran
+    caído en la partición default se mueven a la nueva. Devuelve True si la creó.
+    """
+    nombre = nombre_particion(tabla, mes)
+    if _existe(conexion, nombre):
+        return False
+    columna = TABLAS[tabla][1]
+    default = f'{tabla}_default'
+    rango = {'desde': mes, 'hasta': sumar_meses(mes, 1)}
+    en_rango = f'{columna} >= :desde AND {columna} < :hasta'
+
+    conexion.execute(sa.text(f'CREATE TABLE {nombre} (LIKE {tabla} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    if _existe(conexion, default):
+        conexion.execute(sa.text(f'INSERT INTO {nombre} SELECT * FROM {default} WHERE {en_rango}'), rango)
+        conexion.execute(sa.text(f'DELETE FROM {default} WHERE {en_rango}'), rango)
+    conexion.execute(sa.text(
+        f"ALTER TABLE {tabla} ATTACH PARTITION {nombre} FOR VALUES FROM ('{rango['desde']}') TO ('{rango['hasta']}')"))
+    return True
+
+
+def particionar(conexion, tabla, meses_siguientes=3):
+    """Convierte la tabla en particionada por mes, copiando las filas (una transacción)"""
+    pk, columna, _ = TABLAS[tabla]
+    anterior = f'{tabla}_sin_particionar'
+    secuencia = conexion.execute(sa.text('SELECT pg_get_serial_sequence(:tabla, :pk)'),
+                                 {'tabla': tabla, 'pk': pk}).scalar()
+
+    conexion.execute(sa.text(f'UPDATE {tabla} SET {relleno(tabla, "postgresql")} WHERE {columna} IS NULL'))
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} RENAME TO {anterior}'))
+    conexion.execute(sa.text(f'ALTER TABLE {anterior} RENAME CONSTRAINT {tabla}_pkey TO {anterior}_pkey'))
+    for nombre, _ in indices(tabla):
+        conexion.execute(sa.text(f'DROP INDEX IF EXISTS {nombre}'))
+
+    conexion.execute(sa.text(f'CREATE TABLE {tabla} (LIKE {anterior} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                             f'PARTITION BY RANGE ({columna})'))
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} ALTER COLUMN {columna} SET NOT NULL'))
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} ADD CONSTRAINT {tabla}_pkey PRIMARY KEY ({pk}, {columna})'))
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} ADD CONSTRAINT {tabla}_user_id_fkey '
+                             f'FOREIGN KEY (user_id) REFERENCES "user" (id)'))
+    for nombre, columnas in indices(tabla):
+        conexion.execute(sa.text(f'CREATE INDEX {nombre} ON {tabla} ({", ".join(columnas)})'))
+
+    primera = conexion.execute(sa.text(f'SELECT MIN({columna}) FROM {anterior}')).scalar()
+    mes, ultimo = inicio_mes(primera or date.today()), sumar_meses(inicio_mes(date.today()), meses_siguientes)
+    while mes <= ultimo:
+        crear_particion(conexion, tabla, mes)
+        mes = sumar_meses(mes, 1)
+    conexion.execute(sa.text(f'CREATE TABLE {tabla}_default PARTITION OF {tabla} DEFAULT'))
+
+    conexion.execute(sa.text(f'INSERT INTO {tabla} SELECT * FROM {anterior}'))
+    if secuencia:
+        conexion.execute(sa.text(f'ALTER SEQUENCE {secuencia} OWNED BY {tabla}.{pk}'))
+    conexion.execute(sa.text(f'DROP TABLE {anterior}'))
+
+
+def desparticionar(conexion, tabla):
+    """Vuelve a una tabla normal con las filas de las particiones adjuntas"""
+    pk, columna, _ = TABLAS[tabla]
+    anterior = f'{tabla}_particionada'
+    secuencia = conexion.execute(sa.text('SELECT pg_get_serial_sequence(:tabla, :pk)'),
+                                 {'tabla': tabla, 'pk': pk}).scalar()
+
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} RENAME TO {anterior}'))
+    conexion.execute(sa.text(f'ALTER TABLE {anterior} RENAME CONSTRAINT {tabla}_pkey TO {anterior}_pkey'))
+    for nombre, _ in indices(tabla):
+        conexion.execute(sa.text(f'DROP INDEX IF EXISTS {nombre}'))
+
+    conexion.execute(sa.text(f'CREATE TABLE {tabla} (LIKE {anterior} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} ALTER COLUMN {columna} DROP NOT NULL'))
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} ADD CONSTRAINT {tabla}_pkey PRIMARY KEY ({pk})'))
+    conexion.execute(sa.text(f'ALTER TABLE {tabla} ADD CONSTRAINT {tabla}_user_id_fkey '
+                             f'FOREIGN KEY (user_id) REFERENCES "user" (id)'))
+    conexion.execute(sa.text(f'INSERT INTO {tabla} SELECT * FROM {anterior}'))
+    if secuencia:
+        conexion.execute(sa.text(f'ALTER SEQUENCE {secuencia} OWNED BY {tabla}.{pk}'))
+    conexion.execute(sa.text(f'DROP TABLE {anterior}'))
+    for nombre, columnas in indices(tabla):
+        conexion.execute(sa.text(f'CREATE INDEX {nombre} ON {tabla} ({", ".join(columnas)})'))
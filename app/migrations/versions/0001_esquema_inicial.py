@@ -0,0 +1,139 @@
+"""esquema inicial: usuarios y sesiones de los cuatro juegos
+
+Las bases creadas antes con db.create_all() / recreate_db.py ya tienen
+estas tablas: se crean solo las que faltan, así la primera migración
+sirve tanto para una base nueva como para adoptar una existente.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _tablas():
+    return [
+        ('user', [
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('nombre', sa.String(100), nullable=False, unique=True),
+            sa.Column('password', sa.String(100), nullable=False),
+            sa.Column('edad', sa.Integer(), nullable=False),
+            sa.Column('genero', sa.String(10), nullable=False),
+        ]),
+        ('abecedario_session', [
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+            sa.Column('palabra_objetivo', sa.String(50), nullable=False),
+            sa.Column('longitud_palabra', sa.Integer(), nullable=False),
+            sa.Column('tiempo_resolucion', sa.Float(), nullable=False),
+            sa.Column('cantidad_errores', sa.Integer()),
+            sa.Column('pistas_usadas', sa.Integer()),
+            sa.Column('completado', sa.Boolean()),
+            sa.Column('nivel_jugado', sa.String(20)),
+            sa.Column('cambio_nivel', sa.Boolean()),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('fecha_juego', sa.Date(), nullable=False),
+        ]),
+        ('paseo_session', [
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('fecha_juego', sa.Date()),
+            sa.Column('velocidad_esferas', sa.Float(), nullable=False),
+            sa.Column('intervalo_spawn', sa.Float(), nullable=False),
+            sa.Column('colores_activos', sa.String(50)),
+            sa.Column('color_correcto', sa.String(20)),
+            sa.Column('duracion_segmento', sa.Float(), nullable=False),
+            sa.Column('tiempo_total_sesion', sa.Float()),
+            sa.Column('esferas_rojas_atrapadas', sa.Integer()),
+            sa.Column('esferas_azules_atrapadas', sa.Integer()),
+            sa.Column('esferas_perdidas', sa.Integer()),
+            sa.Column('precision', sa.Float()),
+            sa.Column('tiempo_reaccion_promedio', sa.Float()),
+            sa.Column('fase', sa.String(20)),
+            sa.Column('nivel_dificultad', sa.String(20)),
+            sa.Column('sesion_completa', sa.Boolean()),
+            sa.Column('ajustado_por_ia', sa.Boolean()),
+            sa.Column('recomendacion_siguiente', sa.String(500)),
+            sa.Column('resultado', sa.String(20)),
+            sa.Column('meta_aciertos', sa.Integer()),
+            sa.Column('razon_derrota', sa.String(50)),
+            sa.Column('cambio_nivel', sa.Boolean()),
+        ]),
+        ('memory_game_sessions', [
+            sa.Column('session_id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+            sa.Column('game_type', sa.String(50)),
+            sa.Column('difficulty_level', sa.String(20)),
+            sa.Column('total_pairs', sa.Integer(), nullable=False),
+            sa.Column('grid_size', sa.String(10)),
+            sa.Column('total_flips', sa.Integer()),
+            sa.Column('pairs_found', sa.Integer()),
+            sa.Column('elapsed_time_seconds', sa.Float()),
+            sa.Column('completion_status', sa.String(20)),
+            sa.Column('accuracy_percentage', sa.Float()),
+            sa.Column('memory_score', sa.Float()),
+            sa.Column('ai_adjustment_decision', sa.String(20)),
+            sa.Column('ai_reason', sa.String(500)),
+            sa.Column('ai_memory_assessment', sa.String(20)),
+            sa.Column('ai_speed_assessment', sa.String(20)),
+            sa.Column('ai_accuracy_assessment', sa.String(20)),
+            sa.Column('ai_overall_score', sa.Float()),
+            sa.Column('started_at', sa.DateTime()),
+            sa.Column('finished_at', sa.DateTime()),
+        ]),
+        ('memory_game_configs', [
+            sa.Column('config_id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False, unique=True),
+            sa.Column('total_pairs', sa.Integer()),
+            sa.Column('grid_size', sa.String(10)),
+            sa.Column('time_limit', sa.Integer()),
+            sa.Column('memorization_time', sa.Integer()),
+            sa.Column('difficulty_label', sa.String(20)),
+            sa.Column('last_updated', sa.DateTime()),
+        ]),
+        ('train_game_sessions', [
+            sa.Column('session_id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+            sa.Column('game_type', sa.String(50)),
+            sa.Column('train_speed', sa.Float()),
+            sa.Column('color_count', sa.Integer()),
+            sa.Column('spawn_rate', sa.Float()),
+            sa.Column('total_spawned', sa.Integer()),
+            sa.Column('correct_routing', sa.Integer()),
+            sa.Column('wrong_routing', sa.Integer()),
+            sa.Column('crash_count', sa.Integer()),
+            sa.Column('completion_status', sa.String(20)),
+            sa.Column('started_at', sa.DateTime()),
+            sa.Column('finished_at', sa.DateTime()),
+        ]),
+        ('train_game_configs', [
+            sa.Column('config_id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False, unique=True),
+            sa.Column('train_speed', sa.Float()),
+            sa.Column('spawn_rate', sa.Float()),
+            sa.Column('total_trains', sa.Integer()),
+            sa.Column('color_count', sa.Integer()),
+            sa.Column('time_limit', sa.Integer()),
+            sa.Column('difficulty_label', sa.String(20)),
+            sa.Column('last_updated', sa.DateTime()),
+        ]),
+    ]
+
+
+def upgrade():
+    existentes = set() if op.get_context().as_sql else set(sa.inspect(op.get_bind()).get_table_names())
+    for nombre, columnas in _tablas():
+        if nombre not in existentes:
+            op.create_table(nombre, *columnas)
+
+
+def downgrade():
+    for nombre, _ in reversed(_tablas()):
+        op.drop_table(nombre)
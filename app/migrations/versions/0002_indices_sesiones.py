@@ -0,0 +1,39 @@
+"""índices (user_id, fecha) y (fecha, user_id) en las tablas de sesiones
+
+Se crean con CREATE INDEX CONCURRENTLY en Postgres: la tabla sigue
+aceptando sesiones nuevas mientras se construye cada índice.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from migrations.lotes import crear_indice_en_linea, borrar_indice_en_linea
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# tabla -> columna de fecha por la que se consultan las sesiones
+FECHAS = {
+    'abecedario_session': 'created_at',
+    'paseo_session': 'created_at',
+    'memory_game_sessions': 'finished_at',
+    'train_game_sessions': 'finished_at',
+}
+
+
+def _indices():
+    for tabla, fecha in FECHAS.items():
+        yield f'ix_{tabla}_user_id_{fecha}', tabla, ['user_id', fecha]
+        yield f'ix_{tabla}_{fecha}_user_id', tabla, [fecha, 'user_id']
+
+
+def upgrade():
+    for nombre, tabla, columnas in _indices():
+        crear_indice_en_linea(nombre, tabla, columnas)
+
+
+def downgrade():
+    for nombre, tabla, _ in _indices():
+        borrar_indice_en_linea(nombre, tabla)
@@ -0,0 +1,47 @@
+"""rellenar columnas nulas de sesiones guardadas antes de que existieran
+
+Sesiones antiguas tienen NULL en columnas que el código actual asume con
+valor (config de trenes, flags booleanos). Se completan con el mismo
+valor por defecto del modelo, por lotes de clave primaria.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from migrations.lotes import actualizar_por_lotes
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# tabla -> (clave primaria, {columna: valor SQL por defecto})
+DEFAULTS = {
+    'train_game_sessions': ('session_id', {
+        'train_speed': '3.0', 'color_count': '3', 'spawn_rate': '5.0', 'completion_status': "'completed'",
+        'total_spawned': '0', 'correct_routing': '0', 'wrong_routing': '0', 'crash_count': '0',
+    }),
+    'memory_game_sessions': ('session_id', {
+        'game_type': "'memory_cards'", 'total_flips': '0', 'pairs_found': '0',
+    }),
+    'abecedario_session': ('id', {
+        'cantidad_errores': '0', 'pistas_usadas': '0', 'completado': 'false', 'nivel_jugado': "'facil'",
+        'cambio_nivel': 'false',
+    }),
+    'paseo_session': ('id', {
+        'esferas_rojas_atrapadas': '0', 'esferas_azules_atrapadas': '0', 'esferas_perdidas': '0',
+        'sesion_completa': 'false', 'ajustado_por_ia': 'false', 'cambio_nivel': 'false',
+    }),
+}
+
+
+def upgrade():
+    for tabla, (pk, valores) in DEFAULTS.items():
+        asignaciones = ', '.join(f'{col} = COALESCE({col}, {valor})' for col, valor in valores.items())
+        condicion = ' OR '.join(f'{col} IS NULL' for col in valores)
+        actualizar_por_lotes(tabla, asignaciones, condicion, pk=pk)
+
+
+def downgrade():
+    # Los valores rellenados coinciden con los defaults del modelo: no hay nada que deshacer
+    pass
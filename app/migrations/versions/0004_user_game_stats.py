@@ -0,0 +1,204 @@
+"""tabla user_game_stats: estadísticas acumuladas por usuario y juego
+
+La tabla se llena con cada sesión nueva; las sesiones ya guardadas se suman
+acá, con un GROUP BY (user_id, día) por juego y las rachas calculadas al
+recorrer los días de cada usuario en orden. Son las mismas reglas de
+services/user_game_stats_service.py al crear la tabla, copiadas en SQL para
+que la migración no dependa del código que cambie después. Para recalcular
+más adelante:
+
+    flask --app app mantenimiento recalcular-estadisticas --todos
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.lotes import LOTE
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+# juego -> tabla y expresiones SQL de cada sesión: momento, día, completada,
+# tiempo, precisión, aciertos, errores (mismas reglas que los _delta_* del servicio)
+JUEGOS = {
+    'abecedario': ('abecedario_session', {
+        'momento': 'COALESCE(created_at, {fecha_juego}, CURRENT_TIMESTAMP)',
+        'dia': 'COALESCE(fecha_juego, {dia_momento})',
+        'completada': 'completado',
+        'tiempo': 'tiempo_resolucion',
+        'precision': 'CASE WHEN completado THEN 100.0 ELSE 0.0 END',
+        'aciertos': 'CASE WHEN completado THEN 1 ELSE 0 END',
+        'errores': 'cantidad_errores',
+    }),
+    'paseo': ('paseo_session', {
+        'momento': 'COALESCE(created_at, {fecha_juego}, CURRENT_TIMESTAMP)',
+        'dia': 'COALESCE(fecha_juego, {dia_momento})',
+        'completada': "resultado = 'victoria'",
+        'tiempo': 'duracion_segmento',
+        'precision': '"precision"',
+        'aciertos': 'esferas_rojas_atrapadas',
+        'errores': 'COALESCE(esferas_azules_atrapadas, 0) + COALESCE(esferas_perdidas, 0)',
+    }),
+    'memoria': ('memory_game_sessions', {
+        'momento': 'COALESCE(finished_at, started_at, CURRENT_TIMESTAMP)',
+        'dia': '{dia_momento}',
+        'completada': "completion_status = 'completed'",
+        'tiempo': 'elapsed_time_seconds',
+        'precision': 'accuracy_percentage',
+        'aciertos': 'pairs_found',
+        # Cada par de cartas dadas vuelta sin coincidir es un error
+        'errores': 'CASE WHEN COALESCE(total_flips, 0) / 2 > COALESCE(pairs_found, 0) '
+                   'THEN COALESCE(total_flips, 0) / 2 - COALESCE(pairs_found, 0) ELSE 0 END',
+    }),
+    'trenes': ('train_game_sessions', {
+        'momento': 'COALESCE(finished_at, started_at, CURRENT_TIMESTAMP)',
+        'dia': '{dia_momento}',
+        'completada': "completion_status = 'completed'",
+        'tiempo': 'CAST(NULL AS FLOAT)',
+        'precision': 'CASE WHEN COALESCE(correct_routing, 0) + COALESCE(wrong_routing, 0) > 0 '
+                     'THEN COALESCE(correct_routing, 0) * 100.0 / (COALESCE(correct_routing, 0) + '
+                     'COALESCE(wrong_routing, 0)) ELSE 0.0 END',
+        'aciertos': 'correct_routing',
+        'errores': 'wrong_routing',
+    }),
+}
+
+SUMAS = ('sesiones', 'completadas', 'aciertos', 'errores', 'sesiones_con_tiempo', 'suma_tiempo',
+         'suma_tiempo_cuadrado', 'suma_precision', 'suma_precision_cuadrado', 'suma_precision_completadas')
+
+
+def _consulta_por_dia(tabla, expresiones, dialecto):
+    """Totales por (user_id, día) de las sesiones de una tabla, en orden"""
+    if dialecto == 'sqlite':
+        como_fecha, como_momento = 'date({})', 'datetime({})'
+    else:
+        como_fecha, como_momento = 'CAST({} AS DATE)', 'CAST({} AS TIMESTAMP)'
+    momento = expresiones['momento'].format(fecha_juego=como_momento.format('fecha_juego'))
+    columnas = {clave: sql.format(dia_momento=como_fecha.format(momento)) if clave == 'dia' else sql
+                for clave, sql in expresiones.items()}
+    columnas['momento'] = momento
+    return sa.text(f"""
+        SELECT user_id, dia,
+               COUNT(*) AS sesiones,
+               SUM(completada) AS completadas,
+               SUM(COALESCE(aciertos, 0)) AS aciertos,
+               SUM(COALESCE(errores, 0)) AS errores,
+               COUNT(tiempo) AS sesiones_con_tiempo,
+               COALESCE(SUM(tiempo), 0) AS suma_tiempo,
+               COALESCE(SUM(tiempo * tiempo), 0) AS suma_tiempo_cuadrado,
+               MIN(CASE WHEN completada = 1 THEN tiempo END) AS mejor_tiempo,
+               SUM(precision_sesion) AS suma_precision,
+               SUM(precision_sesion * precision_sesion) AS suma_precision_cuadrado,
+               SUM(CASE WHEN completada = 1 THEN precision_sesion ELSE 0 END) AS suma_precision_completadas,
+               MIN(momento) AS primera_partida,
+               MAX(momento) AS ultima_partida
+        FROM (SELECT user_id,
+                     {columnas['dia']} AS dia,
+                     {columnas['momento']} AS momento,
+                     CASE WHEN {columnas['completada']} THEN 1 ELSE 0 END AS completada,
+                     {columnas['tiempo']} AS tiempo,
+                     COALESCE({columnas['precision']}, 0.0) AS precision_sesion,
+                     {columnas['aciertos']} AS aciertos,
+                     {columnas['errores']} AS errores
+              FROM {tabla}) AS sesiones
+        GROUP BY user_id, dia
+        ORDER BY user_id, dia""").columns(dia=sa.Date, primera_partida=sa.DateTime, ultima_partida=sa.DateTime)
+
+
+def _acumular(actual, dia):
+    """Suma los totales de un día (en orden cronológico) a la fila del usuario"""
+    if actual is None:
+        return {**{col: dia[col] for col in SUMAS}, 'mejor_tiempo': dia['mejor_tiempo'],
+                'primera_partida': dia['primera_partida'], 'ultima_partida': dia['ultima_partida'],
+                'ultimo_dia': dia['dia'], 'racha_dias': 1, 'racha_maxima': 1, 'sesiones_dia': dia['sesiones'],
+                'aciertos_dia': dia['aciertos'], 'errores_dia': dia['errores']}
+    fila = {col: actual[col] + dia[col] for col in SUMAS}
+    mejor = [t for t in (actual['mejor_tiempo'], dia['mejor_tiempo']) if t is not None]
+    racha = actual['racha_dias'] + 1 if actual['ultimo_dia'] == dia['dia'] - timedelta(days=1) else 1
+    fila.update({
+        'mejor_tiempo': min(mejor) if mejor else None,
+        'primera_partida': min(actual['primera_partida'], dia['primera_partida']),
+        'ultima_partida': max(actual['ultima_partida'], dia['ultima_partida']),
+        'ultimo_dia': dia['dia'],
+        'racha_dias': racha,
+        'racha_maxima': max(actual['racha_maxima'], racha),
+        'sesiones_dia': dia['sesiones'],
+        'aciertos_dia': dia['aciertos'],
+        'errores_dia': dia['errores'],
+    })
+    return fila
+
+
+def rellenar():
+    """Una fila por usuario y juego con las sesiones ya guardadas, insertadas de a LOTE"""
+    conexion = op.get_bind()
+    if conexion.execute(sa.text('SELECT COUNT(*) FROM user_game_stats')).scalar():
+        return
+    destino = sa.table('user_game_stats', *[sa.column(c) for c in (
+        'user_id', 'juego', *SUMAS, 'mejor_tiempo', 'primera_partida', 'ultima_partida', 'ultimo_dia',
+        'racha_dias', 'racha_maxima', 'sesiones_dia', 'aciertos_dia', 'errores_dia')])
+
+    for juego, (tabla, expresiones) in JUEGOS.items():
+        filas, actual, user_id = [], None, None
+        for dia in conexion.execute(_consulta_por_dia(tabla, expresiones, conexion.dialect.name)).mappings():
+            if dia['user_id'] != user_id:
+                if actual is not None:
+                    filas.append({'user_id': user_id, 'juego': juego, **actual})
+                actual, user_id = None, dia['user_id']
+            actual = _acumular(actual, dia)
+            if len(filas) >= LOTE:
+                conexion.execute(destino.insert(), filas)
+                filas = []
+        if actual is not None:
+            filas.append({'user_id': user_id, 'juego': juego, **actual})
+        if filas:
+            conexion.execute(destino.insert(), filas)
+
+
+def upgrade():
+    # Una base creada con db.create_all() ya puede tenerla (vacía: se rellena igual)
+    if op.get_context().as_sql:
+        _crear_tabla()
+        return
+    if not sa.inspect(op.get_bind()).has_table('user_game_stats'):
+        _crear_tabla()
+    rellenar()
+
+
+def _crear_tabla():
+    op.create_table(
+        'user_game_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('juego', sa.String(20), primary_key=True),
+        sa.Column('sesiones', sa.Integer(), nullable=False),
+        sa.Column('completadas', sa.Integer(), nullable=False),
+        sa.Column('aciertos', sa.Integer(), nullable=False),
+        sa.Column('errores', sa.Integer(), nullable=False),
+        sa.Column('sesiones_con_tiempo', sa.Integer(), nullable=False),
+        sa.Column('suma_tiempo', sa.Float(), nullable=False),
+        sa.Column('suma_tiempo_cuadrado', sa.Float(), nullable=False),
+        sa.Column('mejor_tiempo', sa.Float()),
+        sa.Column('suma_precision', sa.Float(), nullable=False),
+        sa.Column('suma_precision_cuadrado', sa.Float(), nullable=False),
+        sa.Column('suma_precision_completadas', sa.Float(), nullable=False),
+        sa.Column('primera_partida', sa.DateTime()),
+        sa.Column('ultima_partida', sa.DateTime()),
+        sa.Column('ultimo_dia', sa.Date()),
+        sa.Column('racha_dias', sa.Integer(), nullable=False),
+        sa.Column('racha_maxima', sa.Integer(), nullable=False),
+        sa.Column('sesiones_dia', sa.Integer(), nullable=False),
+        sa.Column('aciertos_dia', sa.Integer(), nullable=False),
+        sa.Column('errores_dia', sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('user_game_stats')
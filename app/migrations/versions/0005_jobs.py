@@ -0,0 +1,44 @@
+"""tabla jobs: cola de trabajos en segundo plano
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Una base creada con db.create_all() ya puede tenerla
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('jobs'):
+        return
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('tipo', sa.String(50), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id')),
+        sa.Column('clave', sa.String(100)),
+        sa.Column('parametros', sa.Text(), nullable=False),
+        sa.Column('estado', sa.String(20), nullable=False),
+        sa.Column('prioridad', sa.Integer(), nullable=False),
+        sa.Column('intentos', sa.Integer(), nullable=False),
+        sa.Column('max_intentos', sa.Integer(), nullable=False),
+        sa.Column('disponible_en', sa.DateTime(), nullable=False),
+        sa.Column('resultado', sa.Text()),
+        sa.Column('error', sa.Text()),
+        sa.Column('worker', sa.String(100)),
+        sa.Column('creado_en', sa.DateTime(), nullable=False),
+        sa.Column('iniciado_en', sa.DateTime()),
+        sa.Column('terminado_en', sa.DateTime()),
+    )
+    op.create_index('ix_jobs_estado_prioridad_disponible_en', 'jobs', ['estado', 'prioridad', 'disponible_en'])
+    op.create_index('ix_jobs_clave', 'jobs', ['clave'])
+
+
+def downgrade():
+    op.drop_table('jobs')
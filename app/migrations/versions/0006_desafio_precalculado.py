@@ -0,0 +1,31 @@
+"""tabla abecedario_desafio_precalculado: próximo desafío calculado por un job
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Una base creada con db.create_all() ya puede tenerla
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('abecedario_desafio_precalculado'):
+        return
+    op.create_table(
+        'abecedario_desafio_precalculado',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('sesion_id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('desafio', sa.Text(), nullable=False),
+        sa.Column('creado_en', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('abecedario_desafio_precalculado')
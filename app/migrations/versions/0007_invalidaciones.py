@@ -0,0 +1,31 @@
+"""tabla invalidaciones: avisos de invalidación de caché (sondeo en SQLite)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Una base creada con db.create_all() ya puede tenerla
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('invalidaciones'):
+        return
+    op.create_table(
+        'invalidaciones',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('recurso', sa.String(50), nullable=False),
+        sa.Column('clave', sa.String(100)),
+        sa.Column('creado_en', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_invalidaciones_creado_en', 'invalidaciones', ['creado_en'])
+
+
+def downgrade():
+    op.drop_table('invalidaciones')
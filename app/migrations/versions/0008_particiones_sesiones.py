@@ -0,0 +1,52 @@
+"""particiones mensuales de las tablas de sesiones (PostgreSQL)
+
+abecedario_session y paseo_session por created_at, memory_game_sessions y
+train_game_sessions por finished_at: una partición por mes desde la sesión
+más vieja hasta tres meses adelante, más una default. Copia todas las filas
+en una sola transacción: correrla en una ventana de mantenimiento. Los meses
+siguientes se crean con `flask particiones crear` (ver migrations/particiones.py).
+
+Antes, en cualquier base, completa la columna de fecha de las sesiones que
+la tienen en NULL (desde fecha_juego o started_at): las consultas por día
+ahora también filtran por ella (models/particiones.py). En SQLite no hay
+particiones declarativas y no se hace nada más.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from migrations.lotes import actualizar_por_lotes
+from migrations.particiones import TABLAS, relleno, esta_particionada, particionar, desparticionar
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialecto = op.get_context().dialect.name
+    for tabla, (pk, columna, _) in TABLAS.items():
+        actualizar_por_lotes(tabla, relleno(tabla, dialecto), f'{columna} IS NULL', pk=pk)
+
+    if dialecto != 'postgresql':
+        return
+    if op.get_context().as_sql:
+        # Los meses a crear dependen de las fechas guardadas
+        op.execute('-- 0008: el particionado necesita conexión a la base (sin --sql)')
+        return
+    conexion = op.get_bind()
+    for tabla in TABLAS:
+        if not esta_particionada(conexion, tabla):
+            particionar(conexion, tabla)
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'postgresql' or op.get_context().as_sql:
+        return
+    conexion = op.get_bind()
+    for tabla in TABLAS:
+        if esta_particionada(conexion, tabla):
+            desparticionar(conexion, tabla)
@@ -0,0 +1,34 @@
+"""tabla sesiones_archivadas: archivo en frío de sesiones viejas
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Una base creada con db.create_all() ya puede tenerla
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('sesiones_archivadas'):
+        return
+    op.create_table(
+        'sesiones_archivadas',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('juego', sa.String(20), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+        sa.Column('mes', sa.Date(), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('datos', sa.LargeBinary(), nullable=False),
+        sa.Column('archivado_en', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('juego', 'user_id', 'mes', name='uq_sesiones_archivadas_juego_user_id_mes'),
+    )
+
+
+def downgrade():
+    op.drop_table('sesiones_archivadas')
@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Abecedario(db.Model):
     __tablename__ = 'abecedario_session'
+    __table_args__ = (
+        db.Index('ix_abecedario_session_created_at_user_id', 'created_at', 'user_id'),
+        db.Index('ix_abecedario_session_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -37,10 +41,26 @@ class Abecedario(db.Model):
             'cantidad_errores': self.cantidad_errores,
             'pistas_usadas': self.pistas_usadas,
             'completado': self.completado,
-            'created_at': self.created_at.isoformat(),
-            'fecha_juego': self.fecha_juego.isoformat()
+            'created_at': self.created_at,
+            'fecha_juego': self.fecha_juego
         }
     
     @staticmethod
     def to_collection_dict(items):
         return [item.to_dict() for item in items]
+
+
+class DesafioPrecalculado(db.Model):
+    """
+    Próximo desafío de cada usuario, calculado por un job después de guardar
+    la sesión (services/abecedario/gemini_abecedario_service.py). Vale solo
+    mientras sesion_id siga siendo su última sesión y fecha sea hoy (el nivel
+    se reinicia cada día); si no, /next-challenge lo calcula en la petición.
+    """
+    __tablename__ = 'abecedario_desafio_precalculado'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    sesion_id = db.Column(db.Integer, nullable=False)  # última sesión al momento de calcularlo
+    fecha = db.Column(db.Date, nullable=False)
+    desafio = db.Column(db.Text, nullable=False)  # JSON, igual al 'challenge' de /next-challenge
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,27 @@
+"""
+Sesiones archivadas (almacenamiento en frío)
+
+Las sesiones anteriores al horizonte en línea (ARCHIVO_MESES) se mueven de
+las tablas de cada juego a esta tabla con `flask archivo archivar`: una fila
+por (juego, usuario, mes) con las sesiones de ese mes serializadas en JSON y
+comprimidas con zlib (services/archivo/archivo_service.py). Las estadísticas
+acumuladas de user_game_stats no cambian al archivar.
+"""
+from datetime import datetime
+from config.database import db
+
+
+class SesionArchivada(db.Model):
+    __tablename__ = 'sesiones_archivadas'
+    __table_args__ = (
+        db.UniqueConstraint('juego', 'user_id', 'mes', name='uq_sesiones_archivadas_juego_user_id_mes'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    juego = db.Column(db.String(20), nullable=False)  # abecedario, paseo, memoria, trenes
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    mes = db.Column(db.Date, nullable=False)  # primer día del mes de las sesiones
+
+    cantidad = db.Column(db.Integer, nullable=False)  # sesiones en el bloque
+    datos = db.Column(db.LargeBinary, nullable=False)  # zlib(JSON {'columnas': [...], 'filas': [[...]]})
+    archivado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,19 @@
+"""
+Avisos de invalidación de caché para bases sin LISTEN/NOTIFY (SQLite)
+
+Cada fila es una invalidación publicada por un camino de escritura
+(config/invalidacion.py); los procesos leen las filas nuevas cada pocos
+segundos y las borran pasado un rato. En PostgreSQL no se usa: el aviso
+viaja por pg_notify.
+"""
+from datetime import datetime
+from config.database import db
+
+
+class Invalidacion(db.Model):
+    __tablename__ = 'invalidaciones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recurso = db.Column(db.String(50), nullable=False)
+    clave = db.Column(db.String(100))  # None: todo el recurso
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,68 @@
+"""
+Cola de trabajos en segundo plano (tabla jobs)
+
+Cada fila es un trabajo: tipo registrado en services/jobs, parámetros en
+JSON, estado, prioridad, reintentos y resultado. Lo ejecuta el worker
+(flask --app app jobs worker); las peticiones solo encolan y consultan.
+"""
+from datetime import datetime
+from flask import current_app
+from config.database import db
+
+PENDIENTE = 'pendiente'
+EN_CURSO = 'en_curso'
+COMPLETADO = 'completado'
+FALLIDO = 'fallido'
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Orden en que el worker toma los pendientes
+        db.Index('ix_jobs_estado_prioridad_disponible_en', 'estado', 'prioridad', 'disponible_en'),
+        db.Index('ix_jobs_clave', 'clave'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    clave = db.Column(db.String(100))  # para no encolar dos veces lo mismo y encontrar el resultado
+    parametros = db.Column(db.Text, nullable=False, default='{}')
+
+    estado = db.Column(db.String(20), nullable=False, default=PENDIENTE)
+    prioridad = db.Column(db.Integer, nullable=False, default=0)  # mayor = antes
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    max_intentos = db.Column(db.Integer, nullable=False, default=3)
+    disponible_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # backoff entre reintentos
+
+    resultado = db.Column(db.Text)
+    error = db.Column(db.Text)
+    worker = db.Column(db.String(100))
+
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    iniciado_en = db.Column(db.DateTime)
+    terminado_en = db.Column(db.DateTime)
+
+    @property
+    def datos(self):
+        return current_app.json.loads(self.parametros or '{}')
+
+    @property
+    def valor(self):
+        return current_app.json.loads(self.resultado) if self.resultado else None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'user_id': self.user_id,
+            'estado': self.estado,
+            'prioridad': self.prioridad,
+            'intentos': self.intentos,
+            'max_intentos': self.max_intentos,
+            'resultado': self.valor,
+            'error': self.error,
+            'creado_en': self.creado_en,
+            'iniciado_en': self.iniciado_en,
+            'terminado_en': self.terminado_en
+        }
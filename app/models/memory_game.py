@@ -6,6 +6,10 @@ from config.database import db
 
 class MemoryGameSession(db.Model):
     __tablename__ = 'memory_game_sessions'
+    __table_args__ = (
+        db.Index('ix_memory_game_sessions_finished_at_user_id', 'finished_at', 'user_id'),
+        db.Index('ix_memory_game_sessions_user_id_finished_at', 'user_id', 'finished_at'),
+    )
     
     session_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -60,8 +64,8 @@ class MemoryGameSession(db.Model):
                 'accuracy': self.ai_accuracy_assessment,
                 'overall_score': self.ai_overall_score
             },
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
         }
 
 
@@ -0,0 +1,37 @@
+"""
+Particiones mensuales de las tablas de sesiones (migración 0008)
+
+TABLAS, inicio_mes() y sumar_meses() los comparten la migración,
+`flask particiones` y el archivo en frío (services/archivo).
+
+Las consultas por día filtran fecha_juego, pero las tablas están
+particionadas por created_at. Agregar el rango equivalente sobre created_at
+(por_dias) no cambia el resultado y deja leer solo los meses que tocan.
+fecha_juego es la fecha local y created_at la hora UTC: se deja un día de
+margen a cada lado.
+"""
+from datetime import date, datetime, time, timedelta
+
+# tabla -> (clave primaria, columna de partición, columna de donde sale la fecha si es NULL)
+TABLAS = {
+    'abecedario_session': ('id', 'created_at', 'fecha_juego'),
+    'paseo_session': ('id', 'created_at', 'fecha_juego'),
+    'memory_game_sessions': ('session_id', 'finished_at', 'started_at'),
+    'train_game_sessions': ('session_id', 'finished_at', 'started_at'),
+}
+
+
+def inicio_mes(dia):
+    return date(dia.year, dia.month, 1)
+
+
+def sumar_meses(mes, cantidad):
+    anio, indice = divmod(mes.month - 1 + cantidad, 12)
+    return date(mes.year + anio, indice + 1, 1)
+
+
+def por_dias(columna, desde, hasta=None):
+    """columna dentro de los días [desde, hasta] (hasta=None: solo desde), con margen"""
+    hasta = hasta or desde
+    return (columna >= datetime.combine(desde - timedelta(days=1), time.min)) & \
+        (columna < datetime.combine(hasta + timedelta(days=2), time.min))
@@ -7,6 +7,10 @@ class PaseoSession(db.Model):
     Almacena métricas de cada sesión completa (3 minutos)
     """
     __tablename__ = 'paseo_session'
+    __table_args__ = (
+        db.Index('ix_paseo_session_created_at_user_id', 'created_at', 'user_id'),
+        db.Index('ix_paseo_session_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -54,8 +58,8 @@ class PaseoSession(db.Model):
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'created_at': self.created_at.isoformat(),
-            'fecha_juego': self.fecha_juego.isoformat(),
+            'created_at': self.created_at,
+            'fecha_juego': self.fecha_juego,
             'velocidad_esferas': self.velocidad_esferas,
             'intervalo_spawn': self.intervalo_spawn,
             'colores_activos': self.colores_activos,
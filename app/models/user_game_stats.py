@@ -0,0 +1,78 @@
+"""
+Estadísticas acumuladas por usuario y juego (tabla de resumen)
+
+Una fila por (user_id, juego) que se actualiza en la misma transacción que
+cada sesión guardada (services/user_game_stats_service.py). Guarda sumas y
+sumas de cuadrados, así promedio y desviación salen sin recorrer sesiones.
+Los contadores *_dia corresponden a ultimo_dia.
+"""
+import math
+from datetime import date, timedelta
+from config.database import db
+
+
+class UserGameStats(db.Model):
+    __tablename__ = 'user_game_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    juego = db.Column(db.String(20), primary_key=True)  # abecedario, paseo, memoria, trenes
+
+    sesiones = db.Column(db.Integer, nullable=False, default=0)
+    completadas = db.Column(db.Integer, nullable=False, default=0)
+    aciertos = db.Column(db.Integer, nullable=False, default=0)
+    errores = db.Column(db.Integer, nullable=False, default=0)
+
+    # Duración de la sesión (solo las sesiones que la informan)
+    sesiones_con_tiempo = db.Column(db.Integer, nullable=False, default=0)
+    suma_tiempo = db.Column(db.Float, nullable=False, default=0.0)
+    suma_tiempo_cuadrado = db.Column(db.Float, nullable=False, default=0.0)
+    mejor_tiempo = db.Column(db.Float)  # menor tiempo entre las completadas
+
+    # Precisión 0-100 (None cuenta como 0, igual que los promedios del admin)
+    suma_precision = db.Column(db.Float, nullable=False, default=0.0)
+    suma_precision_cuadrado = db.Column(db.Float, nullable=False, default=0.0)
+    suma_precision_completadas = db.Column(db.Float, nullable=False, default=0.0)
+
+    primera_partida = db.Column(db.DateTime)
+    ultima_partida = db.Column(db.DateTime)
+
+    # Días consecutivos con al menos una sesión, terminando en ultimo_dia
+    ultimo_dia = db.Column(db.Date)
+    racha_dias = db.Column(db.Integer, nullable=False, default=0)
+    racha_maxima = db.Column(db.Integer, nullable=False, default=0)
+    sesiones_dia = db.Column(db.Integer, nullable=False, default=0)
+    aciertos_dia = db.Column(db.Integer, nullable=False, default=0)
+    errores_dia = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def _desviacion(n, suma, suma_cuadrado):
+        if not n:
+            return 0
+        media = suma / n
+        return math.sqrt(max(suma_cuadrado / n - media * media, 0.0))
+
+    def racha_vigente(self, hoy=None):
+        """La racha sigue viva si jugó hoy o ayer; si no, es 0"""
+        hoy = hoy or date.today()
+        return self.racha_dias if self.ultimo_dia is not None and self.ultimo_dia >= hoy - timedelta(days=1) else 0
+
+    def to_dict(self):
+        n = self.sesiones or 0
+        return {
+            'user_id': self.user_id,
+            'juego': self.juego,
+            'sesiones': n,
+            'completadas': self.completadas,
+            'aciertos': self.aciertos,
+            'errores': self.errores,
+            'tiempo_promedio': round(self.suma_tiempo / self.sesiones_con_tiempo, 2) if self.sesiones_con_tiempo else 0,
+            'tiempo_desviacion': round(self._desviacion(self.sesiones_con_tiempo, self.suma_tiempo, self.suma_tiempo_cuadrado), 2),
+            'mejor_tiempo': self.mejor_tiempo,
+            'precision_promedio': round(self.suma_precision / n, 2) if n else 0,
+            'precision_desviacion': round(self._desviacion(n, self.suma_precision, self.suma_precision_cuadrado), 2),
+            'primera_partida': self.primera_partida,
+            'ultima_partida': self.ultima_partida,
+            'ultimo_dia': self.ultimo_dia,
+            'racha_dias': self.racha_vigente(),
+            'racha_maxima': self.racha_maxima
+        }
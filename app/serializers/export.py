@@ -0,0 +1,176 @@
+"""
+Exportación del historial de sesiones (GET /admin/export/<juego>)
+
+Las filas salen de un cursor del lado del servidor (yield_per: en PostgreSQL
+un cursor con nombre, en SQLite la lectura paso a paso) en lotes de
+EXPORT_LOTE filas, y cada lote se escribe y se entrega al cliente antes de
+leer el siguiente: la memoria usada no depende de cuántas sesiones haya.
+Las sesiones archivadas salen antes: el controlador pasa los meses del
+archivo (ArchivoService.por_mes()), que se leen uno por vez.
+
+- csv: texto UTF-8 con BOM (Excel reconoce los acentos), un chunk por lote.
+- parquet: un row group por lote (ParquetWriter).
+- arrow: formato IPC de streaming de Arrow, un record batch por lote.
+
+pyarrow es opcional: sin él solo está disponible csv.
+"""
+import io
+import csv
+import os
+from itertools import islice
+
+from sqlalchemy import Integer, Float, Boolean, DateTime, Date
+
+from config.database import db
+from serializers.session_rows import abecedario_rows, paseo_rows, memory_rows, train_rows
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+EXPORT_LOTE = int(os.getenv('EXPORT_LOTE', '5000'))
+
+EXPORTABLES = {
+    'abecedario': abecedario_rows,
+    'paseo': paseo_rows,
+    'memoria': memory_rows,
+    'trenes': train_rows,
+}
+
+FORMATOS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+def formatos_disponibles():
+    return [f for f in FORMATOS if f == 'csv' or pyarrow is not None]
+
+
+def _lotes(serializador, user_id, desde, hasta, lote, archivadas):
+    """Listas de tuplas de a `lote` filas, leídas con cursor del lado del servidor"""
+    # Primero lo archivado: es anterior al horizonte, lo que sigue en línea es posterior
+    if archivadas is not None:
+        filas_archivadas = serializador.filas_archivadas(archivadas)
+        while filas := list(islice(filas_archivadas, lote)):
+            yield filas
+
+    consulta = serializador.consulta_exportacion(user_id, desde, hasta).statement
+    resultado = db.session.execute(consulta.execution_options(yield_per=lote))
+    try:
+        for filas in resultado.partitions():
+            yield filas
+    finally:
+        resultado.close()
+
+
+def _nombres(serializador):
+    return [nombre for nombre, _ in serializador.columnas] + ['user_name']
+
+
+def exportar_csv(serializador, user_id=None, desde=None, hasta=None, lote=None, archivadas=None):
+    """Chunks de bytes: cabecera y luego un chunk por lote de filas"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(_nombres(serializador))
+    yield '\ufeff'.encode('utf-8') + buffer.getvalue().encode('utf-8')
+
+    for filas in _lotes(serializador, user_id, desde, hasta, lote or EXPORT_LOTE, archivadas):
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(filas)
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _Salida:
+    """
+    Archivo de solo escritura para pyarrow que guarda lo escrito hasta que se
+    retira con vaciar(). Lleva la posición absoluta (tell) que Parquet necesita
+    para los offsets del footer aunque los bytes ya se hayan enviado.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+        self.closed = False
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _tipo_arrow(columna):
+    tipo = columna.type
+    if isinstance(tipo, Boolean):
+        return pyarrow.bool_()
+    if isinstance(tipo, Integer):
+        return pyarrow.int64()
+    if isinstance(tipo, Float):
+        return pyarrow.float64()
+    if isinstance(tipo, DateTime):
+        return pyarrow.timestamp('us')
+    if isinstance(tipo, Date):
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+def _esquema(serializador):
+    campos = [pyarrow.field(nombre, _tipo_arrow(columna)) for nombre, columna in serializador.columnas]
+    return pyarrow.schema(campos + [pyarrow.field('user_name', pyarrow.string())])
+
+
+def exportar_columnar(serializador, formato, user_id=None, desde=None, hasta=None, lote=None, archivadas=None):
+    """Chunks de bytes de un archivo Parquet (un row group por lote) o de un stream Arrow IPC"""
+    esquema = _esquema(serializador)
+    salida = _Salida()
+    archivo = pyarrow.PythonFile(salida, mode='w')
+    if formato == 'parquet':
+        escritor = pyarrow.parquet.ParquetWriter(archivo, esquema, compression='zstd')
+    else:
+        escritor = pyarrow.ipc.new_stream(archivo, esquema)
+
+    try:
+        for filas in _lotes(serializador, user_id, desde, hasta, lote or EXPORT_LOTE, archivadas):
+            columnas = zip(*filas)
+            escritor.write_batch(pyarrow.record_batch(
+                [pyarrow.array(valores, type=campo.type) for valores, campo in zip(columnas, esquema)],
+                schema=esquema))
+            yield salida.vaciar()
+    finally:
+        escritor.close()
+    yield salida.vaciar()
+
+
+def exportar(juego, formato='csv', user_id=None, desde=None, hasta=None, lote=None, archivadas=None):
+    """
+    Generador de chunks de bytes para el juego y formato pedidos.
+    archivadas: meses [(user_id, sesión)] del archivo en orden cronológico, o None.
+    """
+    serializador = EXPORTABLES[juego]
+    if formato == 'csv':
+        return exportar_csv(serializador, user_id, desde, hasta, lote, archivadas)
+    return exportar_columnar(serializador, formato, user_id, desde, hasta, lote, archivadas)
@@ -0,0 +1,51 @@
+"""
+Negociación de formato para los endpoints que consume Unity
+
+Con `Accept: application/msgpack` la respuesta se codifica en MessagePack
+(más compacta y barata de parsear en tablets); en cualquier otro caso se
+responde JSON como siempre. Las claves de los objetos se emiten ordenadas,
+igual que el JSON de Flask (sort_keys), para que el esquema sea estable
+entre versiones y el cliente pueda mapear campos por posición si quiere.
+"""
+from flask import request, jsonify, current_app
+
+from config.json_provider import _default
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+_MSGPACK_ALIAS = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+
+def _ordenar(valor):
+    """Copia del payload con las claves de cada dict ordenadas"""
+    if isinstance(valor, dict):
+        return {str(k): _ordenar(valor[k]) for k in sorted(valor, key=str)}
+    if isinstance(valor, (list, tuple)):
+        return [_ordenar(v) for v in valor]
+    return valor
+
+
+def prefiere_msgpack():
+    """True si el cliente pide MessagePack por encima de JSON"""
+    if msgpack is None:
+        return False
+    # JSON va primero: con Accept ausente o */* gana JSON
+    elegido = request.accept_mimetypes.best_match(('application/json',) + _MSGPACK_ALIAS)
+    return elegido in _MSGPACK_ALIAS
+
+
+def respuesta(payload, status=200):
+    """jsonify o MessagePack según la cabecera Accept (JSON por defecto)"""
+    if prefiere_msgpack():
+        cuerpo = msgpack.packb(_ordenar(payload), default=_default, use_bin_type=True)
+        resp = current_app.response_class(cuerpo, status=status, mimetype=MSGPACK_MIMETYPE)
+    else:
+        resp = jsonify(payload)
+        resp.status_code = status
+    resp.vary.add('Accept')
+    return resp
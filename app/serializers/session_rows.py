@@ -0,0 +1,230 @@
+"""
+Serialización de listados de sesiones de solo lectura (endpoints /admin/*-sessions)
+
+En lugar de hidratar objetos ORM, llamar a to_dict() y luego mutar el dict
+con user_name, se seleccionan solo las columnas necesarias como tuplas
+(with_entities) y se arma cada fila con las mismas claves que to_dict().
+Las fechas quedan como datetime/date: las serializa el proveedor JSON de la app.
+
+Las sesiones archivadas llegan ya leídas (ArchivoService.por_mes(), lo pasa
+el servicio o el controlador) y se agregan a los listados y a la exportación
+con las mismas tuplas, ordenadas junto con las que siguen en línea.
+"""
+import heapq
+from datetime import datetime, time
+from itertools import islice
+
+from sqlalchemy import select
+
+from config.database import db
+from models.user import User
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.memory_game import MemoryGameSession
+from models.train_game import TrainGameSession
+
+
+class SessionRowSerializer:
+    """
+    Listado de sesiones de un juego a partir de tuplas de columnas.
+    `campos` es una lista de (clave, columna) o (clave, [(subclave, columna), ...])
+    para objetos anidados, en el mismo orden que el to_dict() del modelo.
+    """
+
+    def __init__(self, modelo, campos, columna_orden):
+        self.modelo = modelo
+        self.columna_orden = columna_orden
+        self._estructura = []
+        self._columnas = []
+
+        for clave, valor in campos:
+            if isinstance(valor, list):
+                self._estructura.append((clave, tuple(subclave for subclave, _ in valor)))
+                self._columnas.extend(columna for _, columna in valor)
+            else:
+                self._estructura.append((clave, None))
+                self._columnas.append(valor)
+
+        self._plano = all(subclaves is None for _, subclaves in self._estructura)
+        self._claves = tuple(clave for clave, _ in self._estructura)
+        self._orden = next(i for i, columna in enumerate(self._columnas) if columna is columna_orden)
+
+    def _fila_a_dict(self, fila):
+        if self._plano:
+            return dict(zip(self._claves, fila))
+
+        resultado = {}
+        i = 0
+        for clave, subclaves in self._estructura:
+            if subclaves is None:
+                resultado[clave] = fila[i]
+                i += 1
+            else:
+                resultado[clave] = dict(zip(subclaves, fila[i:i + len(subclaves)]))
+                i += len(subclaves)
+        return resultado
+
+    def listar(self, user_id=None, limit=None, con_usuario=False, archivadas=None, horizonte=None):
+        """
+        Sesiones ordenadas de más reciente a más antigua.
+        con_usuario=True agrega 'user_name' (join con User, solo la columna nombre).
+        archivadas: meses [(user_id, sesión)] de lo archivado, del más nuevo al
+        más viejo; solo se recorren si las filas en línea no completan `limit`
+        o la última es anterior a `horizonte` (date).
+        """
+        columnas = list(self._columnas)
+        if con_usuario:
+            columnas.append(User.nombre)
+
+        query = db.session.query(self.modelo).with_entities(*columnas)
+        if con_usuario:
+            query = query.join(User, self.modelo.user_id == User.id)
+        if user_id is not None:
+            query = query.filter(self.modelo.user_id == user_id)
+        query = query.order_by(self.columna_orden.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        filas = [tuple(fila) for fila in query]
+
+        if archivadas is not None and self._llega_al_archivo(filas, limit, horizonte):
+            filas_archivadas = self.filas_archivadas(archivadas, con_usuario=con_usuario)
+            filas = list(islice(heapq.merge(filas, filas_archivadas, key=self._clave_orden, reverse=True), limit))
+            filas_archivadas.close()
+
+        if not con_usuario:
+            return [self._fila_a_dict(fila) for fila in filas]
+
+        resultado = []
+        for fila in filas:
+            sesion = self._fila_a_dict(fila[:-1])
+            sesion['user_name'] = fila[-1]
+            resultado.append(sesion)
+        return resultado
+
+    def _clave_orden(self, fila):
+        return fila[self._orden] or datetime.min
+
+    def _llega_al_archivo(self, filas, limit, horizonte):
+        """False si las `limit` filas en línea ya son todas posteriores a lo archivado"""
+        if limit is None or len(filas) < limit or horizonte is None:
+            return True
+        return self._clave_orden(filas[-1]) < datetime.combine(horizonte, time.min)
+
+    def filas_archivadas(self, meses, con_usuario=True):
+        """
+        Tuplas (columnas [+ user_name]) de las sesiones archivadas, en el
+        orden en que llegan los meses [(user_id, sesión)].
+        Los nombres se buscan con una consulta por mes.
+        """
+        nombres = {}
+        for del_mes in meses:
+            faltan = {id_usuario for id_usuario, _ in del_mes} - nombres.keys()
+            if con_usuario and faltan:
+                nombres.update(db.session.execute(select(User.id, User.nombre).where(User.id.in_(faltan))).all())
+            for id_usuario, sesion in del_mes:
+                fila = tuple(getattr(sesion, columna.key) for columna in self._columnas)
+                yield fila + (nombres.get(id_usuario),) if con_usuario else fila
+
+    @property
+    def columnas(self):
+        """[(nombre, columna)] en orden de to_dict(); los anidados como 'clave_subclave'"""
+        nombres = []
+        for clave, subclaves in self._estructura:
+            nombres.extend([clave] if subclaves is None else [f'{clave}_{sub}' for sub in subclaves])
+        return list(zip(nombres, self._columnas))
+
+    def consulta_exportacion(self, user_id=None, desde=None, hasta=None):
+        """
+        SELECT de las columnas planas + user_name, de más antigua a más nueva,
+        filtrado por usuario y por rango [desde, hasta) sobre la columna de orden.
+        """
+        query = db.session.query(self.modelo).with_entities(*self._columnas, User.nombre).\
+            join(User, self.modelo.user_id == User.id)
+        if user_id is not None:
+            query = query.filter(self.modelo.user_id == user_id)
+        if desde is not None:
+            query = query.filter(self.columna_orden >= desde)
+        if hasta is not None:
+            query = query.filter(self.columna_orden < hasta)
+        return query.order_by(self.columna_orden.asc(), self._columnas[0].asc())
+
+
+# Mismas claves (y orden) que los to_dict() de cada modelo
+abecedario_rows = SessionRowSerializer(Abecedario, [
+    ('id', Abecedario.id),
+    ('user_id', Abecedario.user_id),
+    ('palabra_objetivo', Abecedario.palabra_objetivo),
+    ('longitud_palabra', Abecedario.longitud_palabra),
+    ('tiempo_resolucion', Abecedario.tiempo_resolucion),
+    ('cantidad_errores', Abecedario.cantidad_errores),
+    ('pistas_usadas', Abecedario.pistas_usadas),
+    ('completado', Abecedario.completado),
+    ('created_at', Abecedario.created_at),
+    ('fecha_juego', Abecedario.fecha_juego)
+], Abecedario.created_at)
+
+paseo_rows = SessionRowSerializer(PaseoSession, [
+    ('id', PaseoSession.id),
+    ('user_id', PaseoSession.user_id),
+    ('created_at', PaseoSession.created_at),
+    ('fecha_juego', PaseoSession.fecha_juego),
+    ('velocidad_esferas', PaseoSession.velocidad_esferas),
+    ('intervalo_spawn', PaseoSession.intervalo_spawn),
+    ('colores_activos', PaseoSession.colores_activos),
+    ('color_correcto', PaseoSession.color_correcto),
+    ('duracion_segmento', PaseoSession.duracion_segmento),
+    ('tiempo_total_sesion', PaseoSession.tiempo_total_sesion),
+    ('esferas_rojas_atrapadas', PaseoSession.esferas_rojas_atrapadas),
+    ('esferas_azules_atrapadas', PaseoSession.esferas_azules_atrapadas),
+    ('esferas_perdidas', PaseoSession.esferas_perdidas),
+    ('precision', PaseoSession.precision),
+    ('tiempo_reaccion_promedio', PaseoSession.tiempo_reaccion_promedio),
+    ('fase', PaseoSession.fase),
+    ('nivel_dificultad', PaseoSession.nivel_dificultad),
+    ('sesion_completa', PaseoSession.sesion_completa),
+    ('ajustado_por_ia', PaseoSession.ajustado_por_ia),
+    ('recomendacion_siguiente', PaseoSession.recomendacion_siguiente),
+    ('resultado', PaseoSession.resultado),
+    ('meta_aciertos', PaseoSession.meta_aciertos),
+    ('razon_derrota', PaseoSession.razon_derrota),
+    ('cambio_nivel', PaseoSession.cambio_nivel)
+], PaseoSession.created_at)
+
+memory_rows = SessionRowSerializer(MemoryGameSession, [
+    ('session_id', MemoryGameSession.session_id),
+    ('user_id', MemoryGameSession.user_id),
+    ('difficulty_level', MemoryGameSession.difficulty_level),
+    ('total_pairs', MemoryGameSession.total_pairs),
+    ('grid_size', MemoryGameSession.grid_size),
+    ('total_flips', MemoryGameSession.total_flips),
+    ('pairs_found', MemoryGameSession.pairs_found),
+    ('elapsed_time', MemoryGameSession.elapsed_time_seconds),
+    ('completion_status', MemoryGameSession.completion_status),
+    ('accuracy', MemoryGameSession.accuracy_percentage),
+    ('memory_score', MemoryGameSession.memory_score),
+    ('ai_metrics', [
+        ('adjustment_decision', MemoryGameSession.ai_adjustment_decision),
+        ('reason', MemoryGameSession.ai_reason),
+        ('memory', MemoryGameSession.ai_memory_assessment),
+        ('speed', MemoryGameSession.ai_speed_assessment),
+        ('accuracy', MemoryGameSession.ai_accuracy_assessment),
+        ('overall_score', MemoryGameSession.ai_overall_score)
+    ]),
+    ('started_at', MemoryGameSession.started_at),
+    ('finished_at', MemoryGameSession.finished_at)
+], MemoryGameSession.finished_at)
+
+train_rows = SessionRowSerializer(TrainGameSession, [
+    ('session_id', TrainGameSession.session_id),
+    ('user_id', TrainGameSession.user_id),
+    ('train_speed', TrainGameSession.train_speed),
+    ('color_count', TrainGameSession.color_count),
+    ('spawn_rate', TrainGameSession.spawn_rate),
+    ('total_spawned', TrainGameSession.total_spawned),
+    ('correct_routing', TrainGameSession.correct_routing),
+    ('wrong_routing', TrainGameSession.wrong_routing),
+    ('crash_count', TrainGameSession.crash_count),
+    ('completion_status', TrainGameSession.completion_status),
+    ('started_at', TrainGameSession.started_at),
+    ('finished_at', TrainGameSession.finished_at)
+], TrainGameSession.finished_at)
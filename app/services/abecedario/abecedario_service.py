@@ -1,10 +1,32 @@
 from config.database import db
-from models.abecedario import Abecedario
+from models.abecedario import Abecedario, DesafioPrecalculado
+from models.particiones import por_dias
 from datetime import datetime, date
-from sqlalchemy import func
+from sqlalchemy import select, delete
 import json
 import os
 import random
+import logging
+from middleware.metrics import registrar_cache
+from config.invalidacion import suscribir
+from services.user_game_stats_service import UserGameStatsService
+from services.jobs.job_service import JobService, tarea
+from services.archivo.archivo_service import ArchivoService
+from services.resumen_diario_service import ResumenDiarioService
+
+logger = logging.getLogger(__name__)
+
+MAX_DIAS_RESUMEN = 366  # /daily-summaries
+
+
+@tarea('abecedario.reporte_evolucion')
+def generar_reporte_evolucion(parametros):
+    """Job: reporte de evolución completo (GET /abecedario/evolution/<id>?async=1)"""
+    report, error = AbecedarioService.get_evolution_report(parametros['user_id'])
+    if error:
+        raise RuntimeError(error)
+    return report
+
 
 class AbecedarioService:
     
@@ -14,6 +36,7 @@ class AbecedarioService:
     @staticmethod
     def _cargar_palabras_predefinidas():
         """Carga el JSON de palabras una sola vez (singleton)"""
+        registrar_cache('abecedario_palabras_predefinidas', AbecedarioService._palabras_cache is not None)
         if AbecedarioService._palabras_cache is None:
             data_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'palabras_predefinidas.json')
             with open(data_path, 'r', encoding='utf-8') as f:
@@ -61,16 +84,16 @@ class AbecedarioService:
             if not ultima_sesion:
                 # Primera sesión del usuario
                 cambio_nivel = True
-                print(f"[SERVICE] PRIMERA SESIÓN - Nivel inicial: {nivel_jugado}")
+                logger.debug("PRIMERA SESIÓN - Nivel inicial: %s", nivel_jugado)
             elif ultima_sesion.fecha_juego < fecha_hoy:
                 # 🆕 NUEVO DÍA: Resetear COMPLETAMENTE (regresa a FÁCIL y 0/5)
                 cambio_nivel = True
-                print(f"[SERVICE] NUEVO DÍA DETECTADO: {ultima_sesion.fecha_juego} -> {fecha_hoy}")
-                print(f"[SERVICE] Reseteando a FÁCIL con progreso 0/5")
+                logger.debug("NUEVO DÍA DETECTADO: %s -> %s", ultima_sesion.fecha_juego, fecha_hoy)
+                logger.debug("Reseteando a FÁCIL con progreso 0/5")
             elif ultima_sesion.nivel_jugado and ultima_sesion.nivel_jugado != nivel_jugado:
                 # Cambio de nivel (subió o bajó)
                 cambio_nivel = True
-                print(f"[SERVICE] CAMBIO DE NIVEL DETECTADO: {ultima_sesion.nivel_jugado} -> {nivel_jugado}")
+                logger.debug("CAMBIO DE NIVEL DETECTADO: %s -> %s", ultima_sesion.nivel_jugado, nivel_jugado)
             
             nueva_sesion = Abecedario(
                 user_id=user_id,
@@ -86,18 +109,56 @@ class AbecedarioService:
             )
             
             db.session.add(nueva_sesion)
+            UserGameStatsService.registrar('abecedario', nueva_sesion)
+            # El próximo desafío se calcula fuera de la petición (lo toma /next-challenge)
+            JobService.encolar('abecedario.siguiente_desafio', {'user_id': user_id}, user_id=user_id,
+                               clave=f'abecedario.siguiente_desafio:{user_id}')
             db.session.commit()
             
-            print(f"[SERVICE] Sesión guardada - Nivel: {nivel_jugado}, Completado: {session_data['completado']}, Cambio: {cambio_nivel}")
+            logger.info("Sesión guardada user_id=%s - Nivel: %s, Completado: %s, Cambio: %s",
+                        user_id, nivel_jugado, session_data['completado'], cambio_nivel)
             
             return nueva_sesion, None
             
         except Exception as e:
             db.session.rollback()
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error en save_session user_id=%s", user_id)
             return None, str(e)
     
+    @staticmethod
+    def ultima_sesion_id(user_id):
+        """Id de la última sesión del usuario (None si no jugó)"""
+        return db.session.execute(AbecedarioService._ultima_sesion_id(user_id)).scalar()
+    
+    @staticmethod
+    def _ultima_sesion_id(user_id):
+        return select(Abecedario.id).where(Abecedario.user_id == user_id).\
+            order_by(Abecedario.created_at.desc(), Abecedario.id.desc()).limit(1)
+    
+    @staticmethod
+    def tomar_desafio_precalculado(user_id):
+        """
+        Consume el desafío precalculado si sigue vigente (calculado tras la última
+        sesión y hoy). Una sola sentencia: DELETE ... RETURNING. None si no hay.
+        """
+        desafio = db.session.execute(
+            delete(DesafioPrecalculado).where(
+                DesafioPrecalculado.user_id == user_id,
+                DesafioPrecalculado.sesion_id == AbecedarioService._ultima_sesion_id(user_id).scalar_subquery(),
+                DesafioPrecalculado.fecha == date.today()
+            ).returning(DesafioPrecalculado.desafio)
+        ).scalar()
+        db.session.commit()
+        registrar_cache('abecedario_desafio_precalculado', desafio is not None)
+        return json.loads(desafio) if desafio is not None else None
+    
+    @staticmethod
+    def guardar_desafio_precalculado(user_id, sesion_id, challenge):
+        """Reemplaza el desafío precalculado del usuario (sin commit)"""
+        db.session.merge(DesafioPrecalculado(user_id=user_id, sesion_id=sesion_id, fecha=date.today(),
+                                             desafio=json.dumps(challenge, ensure_ascii=False),
+                                             creado_en=datetime.utcnow()))
+    
     @staticmethod
     def get_recent_performance(user_id, limit=10):
         """
@@ -138,14 +199,14 @@ class AbecedarioService:
             debe_bajar = fallidas >= 4
             
             if debe_bajar:
-                print(f"[ANÁLISIS] FRUSTRACIÓN DETECTADA: {fallidas}/5 palabras falladas → BAJAR NIVEL")
+                logger.info("FRUSTRACIÓN DETECTADA: %s/5 palabras falladas → BAJAR NIVEL", fallidas)
             else:
-                print(f"[ANÁLISIS] Rendimiento aceptable: {fallidas}/5 falladas")
+                logger.debug("Rendimiento aceptable: %s/5 falladas", fallidas)
             
             return debe_bajar
             
         except Exception as e:
-            print(f"[ANÁLISIS ERROR] {str(e)}")
+            logger.warning("Error analizando rendimiento de user_id=%s: %s", user_id, e)
             return False
     
     @staticmethod
@@ -171,12 +232,12 @@ class AbecedarioService:
             
             # Usuario nuevo
             if not ultima_sesion:
-                print("[NIVEL] Usuario nuevo → FACIL")
+                logger.debug("Usuario nuevo → FACIL")
                 return 'facil'
             
             # 🆕 NUEVO DÍA: Resetear a FACIL para comparar evolución
             if ultima_sesion.fecha_juego < fecha_hoy:
-                print(f"[NIVEL] Nuevo día ({ultima_sesion.fecha_juego} -> {fecha_hoy}) → Resetear a FACIL")
+                logger.debug("Nuevo día (%s -> %s) → Resetear a FACIL", ultima_sesion.fecha_juego, fecha_hoy)
                 return 'facil'
             
             nivel_actual = ultima_sesion.nivel_jugado or 'facil'
@@ -186,13 +247,13 @@ class AbecedarioService:
             
             if debe_bajar:
                 if nivel_actual == 'dificil':
-                    print(f"[NIVEL] Frustración detectada → BAJA de DIFICIL a INTERMEDIO")
+                    logger.info("Frustración detectada → BAJA de DIFICIL a INTERMEDIO")
                     return 'intermedio'
                 elif nivel_actual == 'intermedio':
-                    print(f"[NIVEL] Frustración detectada → BAJA de INTERMEDIO a FACIL")
+                    logger.info("Frustración detectada → BAJA de INTERMEDIO a FACIL")
                     return 'facil'
                 else:
-                    print(f"[NIVEL] Frustración detectada pero ya en FACIL → MANTIENE FACIL")
+                    logger.debug("Frustración detectada pero ya en FACIL → MANTIENE FACIL")
                     return 'facil'
             
             # REGLA 2: Contar palabras completadas en nivel actual desde último cambio
@@ -212,28 +273,26 @@ class AbecedarioService:
             
             completadas_en_nivel = min(query.count(), 5)
             
-            print(f"[NIVEL] Nivel actual: {nivel_actual.upper()}, Completadas: {completadas_en_nivel}/5")
+            logger.debug("Nivel actual: %s, Completadas: %s/5", nivel_actual.upper(), completadas_en_nivel)
             
             # REGLA 3: Si completó 5, sube de nivel
             if completadas_en_nivel >= 5:
                 if nivel_actual == 'facil':
-                    print(f"[NIVEL] 5/5 completadas → SUBE de FACIL a INTERMEDIO")
+                    logger.info("5/5 completadas → SUBE de FACIL a INTERMEDIO")
                     return 'intermedio'
                 elif nivel_actual == 'intermedio':
-                    print(f"[NIVEL] 5/5 completadas → SUBE de INTERMEDIO a DIFICIL")
+                    logger.info("5/5 completadas → SUBE de INTERMEDIO a DIFICIL")
                     return 'dificil'
                 else:
-                    print(f"[NIVEL] Permanece en DIFICIL (nivel máximo)")
+                    logger.debug("Permanece en DIFICIL (nivel máximo)")
                     return 'dificil'
             
             # REGLA 4: Mantener nivel
-            print(f"[NIVEL] Mantiene nivel {nivel_actual.upper()}")
+            logger.debug("Mantiene nivel %s", nivel_actual.upper())
             return nivel_actual
             
-        except Exception as e:
-            print(f"[NIVEL ERROR] {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error determinando nivel óptimo user_id=%s", user_id)
             return 'facil'  # Fallback seguro
     
     @staticmethod
@@ -242,19 +301,19 @@ class AbecedarioService:
         Calcula estadísticas de rendimiento (simplificado)
         Ya no se usa para determinar nivel (eso lo hace determinar_nivel_optimo)
         """
-        print(f"[SERVICE] Obteniendo stats para user_id: {user_id}, limit: {limit}")
+        logger.debug("Obteniendo stats para user_id: %s, limit: %s", user_id, limit)
         
         try:
             sesiones, error = AbecedarioService.get_recent_performance(user_id, limit)
             
-            print(f"[SERVICE] Sesiones encontradas: {len(sesiones) if sesiones else 0}")
+            logger.debug("Sesiones encontradas: %s", len(sesiones) if sesiones else 0)
             
             if error:
-                print(f"[SERVICE ERROR] {error}")
+                logger.warning("Error obteniendo sesiones recientes de user_id=%s: %s", user_id, error)
                 return None, error
             
             if not sesiones:
-                print("[SERVICE] Usuario nuevo - sin sesiones previas")
+                logger.debug("Usuario nuevo - sin sesiones previas")
                 stats = {
                     'promedio_tiempo': 0,
                     'promedio_errores': 0,
@@ -266,7 +325,7 @@ class AbecedarioService:
                     'sesion_reciente_dificil': False,
                     'ultimas_3_errores': 0
                 }
-                print(f"[SERVICE] Stats calculadas: {stats}")
+                logger.debug("Stats calculadas: %s", stats)
                 return stats, None
             
             total_sesiones = len(sesiones)
@@ -311,14 +370,12 @@ class AbecedarioService:
                 ]
             }
             
-            print(f"[SERVICE] Stats calculadas: total_sesiones={stats['total_sesiones']}, tasa_exito={stats['tasa_exito']}%")
+            logger.debug("Stats calculadas: total_sesiones=%s, tasa_exito=%s%%", stats['total_sesiones'], stats['tasa_exito'])
             
             return stats, None
             
         except Exception as e:
-            print(f"[SERVICE EXCEPTION] {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error calculando stats de user_id=%s", user_id)
             return None, str(e)
     
     @staticmethod
@@ -330,9 +387,14 @@ class AbecedarioService:
             sesiones = Abecedario.query.filter(
                 Abecedario.user_id == user_id,
                 Abecedario.fecha_juego >= fecha_inicio,
-                Abecedario.fecha_juego <= fecha_fin
+                Abecedario.fecha_juego <= fecha_fin,
+                por_dias(Abecedario.created_at, fecha_inicio, fecha_fin)
             ).order_by(Abecedario.created_at.asc()).all()
             
+            # Si el rango llega a lo archivado, esas sesiones van primero (son más viejas)
+            if ArchivoService.alcanza(fecha_inicio):
+                sesiones = ArchivoService.sesiones('abecedario', user_id, fecha_inicio, fecha_fin) + sesiones
+            
             return sesiones, None
             
         except Exception as e:
@@ -347,33 +409,44 @@ class AbecedarioService:
             if fecha is None:
                 fecha = date.today()
             
-            sesiones = Abecedario.query.filter_by(
-                user_id=user_id,
-                fecha_juego=fecha
-            ).all()
+            dia, = ResumenDiarioService.abecedario(user_id, fecha, con_sesiones=True)
+            return dia.resumen(), None
             
-            if not sesiones:
-                return {
-                    'fecha': fecha.isoformat(),
-                    'total_palabras': 0,
-                    'palabras_completadas': 0,
-                    'tiempo_total': 0,
-                    'errores_totales': 0
-                }, None
+        except Exception as e:
+            return None, str(e)
+    
+    @staticmethod
+    def get_daily_summaries(user_id, fecha_inicio, fecha_fin, con_sesiones=True):
+        """
+        Resúmenes de cada día del rango (los días sin sesiones en cero), en una
+        sola consulta en lugar de una petición por día
+        """
+        try:
+            if fecha_fin < fecha_inicio:
+                return None, 'fecha_fin es anterior a fecha_inicio'
+            if (fecha_fin - fecha_inicio).days >= MAX_DIAS_RESUMEN:
+                return None, f'El rango no puede superar {MAX_DIAS_RESUMEN} días'
             
-            return {
-                'fecha': fecha.isoformat(),
-                'total_palabras': len(sesiones),
-                'palabras_completadas': sum(1 for s in sesiones if s.completado),
-                'tiempo_total': sum(s.tiempo_resolucion for s in sesiones),
-                'errores_totales': sum(s.cantidad_errores for s in sesiones),
-                'promedio_tiempo': sum(s.tiempo_resolucion for s in sesiones) / len(sesiones),
-                'sesiones': Abecedario.to_collection_dict(sesiones)
-            }, None
+            dias = ResumenDiarioService.abecedario(user_id, fecha_inicio, fecha_fin, con_sesiones=con_sesiones)
+            return [dia.resumen() for dia in dias], None
             
         except Exception as e:
+            logger.exception("Error en get_daily_summaries user_id=%s", user_id)
             return None, str(e)
     
+    @staticmethod
+    def encolar_reporte_evolucion(user_id):
+        """Encola el reporte de evolución; si ya hay uno pendiente para el usuario devuelve ese"""
+        try:
+            job = JobService.encolar('abecedario.reporte_evolucion', {'user_id': user_id}, user_id=user_id,
+                                     clave=f'abecedario.reporte_evolucion:{user_id}')
+            db.session.commit()
+            return job, None
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Error encolando reporte de evolución user_id=%s", user_id)
+            return None, str(e)
+
     @staticmethod
     def get_evolution_report(user_id):
         """
@@ -385,6 +458,8 @@ class AbecedarioService:
                 Abecedario.fecha_juego.asc(), 
                 Abecedario.created_at.asc()
             ).all()
+            # Todo el historial: incluye las sesiones archivadas
+            sesiones = ArchivoService.sesiones('abecedario', user_id) + sesiones
             
             if not sesiones:
                 return {'mensaje': 'Sin datos', 'evolucion_por_fecha': []}, None
@@ -520,15 +595,14 @@ class AbecedarioService:
             }, None
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error en get_evolution_report user_id=%s", user_id)
             return None, str(e)
     
     @staticmethod
     def get_final_game_stats(user_id, fecha=None):
         """
         Calcula estadísticas finales del juego usando SOLO campos existentes.
-        Incluye cálculo de puntos basado en desempeño.
+        Incluye cálculo de puntos basado en desempeño (services/resumen_diario_service.py).
         
         Returns:
             dict: Estadísticas completas con puntos calculados
@@ -537,134 +611,13 @@ class AbecedarioService:
             if fecha is None:
                 fecha = date.today()
             
-            # Obtener todas las sesiones del día
-            sesiones = Abecedario.query.filter_by(
-                user_id=user_id,
-                fecha_juego=fecha
-            ).order_by(Abecedario.created_at.asc()).all()
-            
-            if not sesiones:
-                return {
-                    'fecha': fecha.isoformat(),
-                    'puntos_totales': 0,
-                    'palabras_completadas': 0,
-                    'palabras_totales': 0,
-                    'por_nivel': {},
-                    'metricas_globales': {
-                        'tiempo_promedio': 0,
-                        'mejor_tiempo': 0,
-                        'precision': 0,
-                        'total_errores': 0,
-                        'total_pistas': 0
-                    }
-                }, None
-            
-            # Inicializar contadores
-            puntos_totales = 0
-            palabras_completadas = 0
-            palabras_totales = len(sesiones)
-            
-            # Métricas por nivel
-            por_nivel = {
-                'facil': {'palabras': 0, 'completadas': 0, 'puntos': 0},
-                'intermedio': {'palabras': 0, 'completadas': 0, 'puntos': 0},
-                'dificil': {'palabras': 0, 'completadas': 0, 'puntos': 0}
-            }
-            
-            # Métricas globales
-            tiempos = []
-            total_errores = 0
-            total_pistas = 0
-            
-            # Puntos base por nivel
-            puntos_base = {
-                'facil': 10,
-                'intermedio': 25,
-                'dificil': 50
-            }
-            
-            # Procesar cada sesión
-            for sesion in sesiones:
-                nivel = sesion.nivel_jugado or 'facil'
-                
-                # Contar palabras por nivel
-                por_nivel[nivel]['palabras'] += 1
-                
-                if sesion.completado:
-                    palabras_completadas += 1
-                    por_nivel[nivel]['completadas'] += 1
-                    
-                    # CALCULAR PUNTOS SOLO SI COMPLETÓ LA PALABRA
-                    base = puntos_base[nivel]
-                    multiplicador = 1.0
-                    
-                    # Bonificación: Sin errores (+50%)
-                    if sesion.cantidad_errores == 0:
-                        multiplicador += 0.5
-                    
-                    # Bonificación: Sin pistas en nivel difícil (+25%)
-                    if sesion.pistas_usadas == 0 and nivel == 'dificil':
-                        multiplicador += 0.25
-                    
-                    # Bonificación: Tiempo rápido < 15s (+20%)
-                    if sesion.tiempo_resolucion < 15:
-                        multiplicador += 0.2
-                    
-                    # Penalización: Errores (-5 puntos cada uno)
-                    penalizacion = sesion.cantidad_errores * 5
-                    
-                    # Calcular puntos finales (mínimo 0)
-                    puntos_palabra = max(0, int((base * multiplicador) - penalizacion))
-                    
-                    puntos_totales += puntos_palabra
-                    por_nivel[nivel]['puntos'] += puntos_palabra
-                
-                # Acumular métricas
-                if sesion.completado:
-                    tiempos.append(sesion.tiempo_resolucion)
-                total_errores += sesion.cantidad_errores
-                total_pistas += sesion.pistas_usadas
-            
-            # Calcular métricas globales
-            tiempo_promedio = sum(tiempos) / len(tiempos) if tiempos else 0
-            mejor_tiempo = min(tiempos) if tiempos else 0
-            precision = (palabras_completadas / palabras_totales * 100) if palabras_totales > 0 else 0
-            
-            # Construir respuesta
-            resultado = {
-                'fecha': fecha.isoformat(),
-                'puntos_totales': puntos_totales,
-                'palabras_completadas': palabras_completadas,
-                'palabras_totales': palabras_totales,
-                'por_nivel': {
-                    'facil': {
-                        'total': por_nivel['facil']['palabras'],
-                        'completadas': por_nivel['facil']['completadas'],
-                        'puntos': por_nivel['facil']['puntos']
-                    },
-                    'intermedio': {
-                        'total': por_nivel['intermedio']['palabras'],
-                        'completadas': por_nivel['intermedio']['completadas'],
-                        'puntos': por_nivel['intermedio']['puntos']
-                    },
-                    'dificil': {
-                        'total': por_nivel['dificil']['palabras'],
-                        'completadas': por_nivel['dificil']['completadas'],
-                        'puntos': por_nivel['dificil']['puntos']
-                    }
-                },
-                'metricas_globales': {
-                    'tiempo_promedio': round(tiempo_promedio, 2),
-                    'mejor_tiempo': round(mejor_tiempo, 2),
-                    'precision': round(precision, 2),
-                    'total_errores': total_errores,
-                    'total_pistas': total_pistas
-                }
-            }
-            
-            return resultado, None
+            dia, = ResumenDiarioService.abecedario(user_id, fecha)
+            return dia.estadisticas_finales(), None
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error en get_final_game_stats user_id=%s", user_id)
             return None, str(e)
+
+
+# flask mantenimiento invalidar-cache abecedario.palabras: releer el JSON en todos los workers
+suscribir('abecedario.palabras', lambda clave: setattr(AbecedarioService, '_palabras_cache', None))
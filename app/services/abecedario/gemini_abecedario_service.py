@@ -1,7 +1,51 @@
 import os
 import json
+import logging
+from datetime import date
 import google.generativeai as genai
+from config.database import db
+from models.abecedario import DesafioPrecalculado
 from services.abecedario.abecedario_service import AbecedarioService
+from services.jobs.job_service import tarea
+from config.invalidacion import suscribir
+from middleware.metrics import medir_gemini, registrar_cache
+
+logger = logging.getLogger(__name__)
+
+_servicio_jobs = None
+
+
+def _gemini_service():
+    """Instancia compartida por los jobs (conserva el buffer de palabras de DIFICIL)"""
+    global _servicio_jobs
+    if _servicio_jobs is None:
+        _servicio_jobs = GeminiService()
+    return _servicio_jobs
+
+
+@tarea('abecedario.siguiente_desafio', prioridad=5)
+def precalcular_siguiente_desafio(parametros):
+    """
+    Job encolado por save_session: deja listo el desafío que pedirá /next-challenge.
+    Si mientras se calculaba llegó otra sesión, lo recalcula (hasta 3 veces); de
+    todas formas tomar_desafio_precalculado descarta los de una sesión vieja.
+    """
+    user_id = parametros['user_id']
+    for _ in range(3):
+        sesion_id = AbecedarioService.ultima_sesion_id(user_id)
+        vigente = db.session.get(DesafioPrecalculado, user_id)
+        if vigente is not None and vigente.sesion_id == sesion_id and vigente.fecha == date.today():
+            return {'sesion_id': sesion_id, 'recalculado': False}
+        
+        challenge, error = _gemini_service().generate_next_challenge(user_id)
+        if error:
+            raise RuntimeError(error)
+        AbecedarioService.guardar_desafio_precalculado(user_id, sesion_id, challenge)
+        if AbecedarioService.ultima_sesion_id(user_id) == sesion_id:
+            break
+    
+    return {'sesion_id': sesion_id, 'recalculado': True,
+            'palabra_objetivo': challenge['palabra_objetivo'], 'nivel_dificultad': challenge['nivel_dificultad']}
 
 class GeminiService:
     """
@@ -49,12 +93,12 @@ class GeminiService:
     
     def generate_next_challenge(self, user_id):
         """Genera desafío adaptativo usando sistema híbrido local + IA"""
-        print(f"\n[GEMINI] ==== Generando desafío para user_id: {user_id} ====\n")
+        logger.debug("Generando desafío para user_id=%s", user_id)
         
         try:
             # PASO 1: Determinar nivel óptimo (lógica en Python, NO en Gemini)
             nivel_actual = AbecedarioService.determinar_nivel_optimo(user_id)
-            print(f"[GEMINI] Nivel determinado: {nivel_actual.upper()}")
+            logger.debug("Nivel determinado: %s", nivel_actual.upper())
             
             # PASO 2: Verificar si hay cambio de nivel
             from models.abecedario import Abecedario
@@ -76,7 +120,7 @@ class GeminiService:
             # PASO 5: Generar desafío según nivel (HÍBRIDO + BATCH)
             if nivel_actual in ['facil', 'intermedio']:
                 # 💾 Modo Local (JSON) - Gratis e instantáneo
-                print(f"[GEMINI] Modo AHORRO: Usando palabra local para nivel {nivel_actual.upper()}")
+                logger.debug("Modo AHORRO: Usando palabra local para nivel %s", nivel_actual.upper())
                 challenge = AbecedarioService.get_palabra_local(nivel_actual, palabras_usadas)
                 
                 if not challenge:
@@ -84,19 +128,21 @@ class GeminiService:
                     
             else:
                 # 🤖 Modo IA BATCH (Gemini) - Solo para nivel DIFICIL
-                print(f"[GEMINI] Modo TESIS + BATCH: Nivel {nivel_actual.upper()}")
+                logger.debug("Modo TESIS + BATCH: Nivel %s", nivel_actual.upper())
                 
                 # Verificar si hay palabras en el buffer
+                registrar_cache('abecedario_palabra_buffer', bool(self._palabra_buffer))
                 if not self._palabra_buffer:
-                    print(f"[GEMINI BATCH] Buffer vacío, generando {self._buffer_size} palabras...")
-                    self._palabra_buffer = self._generar_lote_palabras(stats, nivel_actual, palabras_usadas)
+                    logger.debug("Buffer vacío, generando %s palabras...", self._buffer_size)
+                    # En la clase: compartido por todas las instancias y vaciable por invalidación
+                    GeminiService._palabra_buffer = self._generar_lote_palabras(stats, nivel_actual, palabras_usadas)
                     
                     if not self._palabra_buffer:
                         return None, "Error al generar lote de palabras"
                 
                 # Obtener la primera palabra del buffer
                 challenge = self._palabra_buffer.pop(0)
-                print(f"[GEMINI BATCH] Palabra del buffer. Quedan {len(self._palabra_buffer)} en cache.")
+                logger.debug("Palabra del buffer. Quedan %s en cache.", len(self._palabra_buffer))
             
             # PASO 6: Agregar metadata del desafío
             challenge['nivel_dificultad'] = nivel_actual
@@ -108,17 +154,15 @@ class GeminiService:
                 'porcentaje': round((completadas_nivel / 5) * 100, 1)
             }
             
-            print(f"[GEMINI] ✅ Desafío generado: '{challenge['palabra_objetivo']}' - Nivel: {nivel_actual.upper()} ({completadas_nivel}/5)")
+            logger.info("Desafío generado user_id=%s: '%s' - Nivel: %s (%s/5)",
+                        user_id, challenge['palabra_objetivo'], nivel_actual.upper(), completadas_nivel)
             if cambio_nivel:
-                print(f"[GEMINI] 🔄 CAMBIO DE NIVEL: {nivel_anterior or 'N/A'} → {nivel_actual.upper()}")
-            print(f"{'='*70}\n")
+                logger.info("Cambio de nivel: %s → %s", nivel_anterior or 'N/A', nivel_actual.upper())
             
             return challenge, None
             
         except Exception as e:
-            print(f"[GEMINI ERROR] {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error generando desafío para user_id=%s", user_id)
             return None, str(e)
     
     def _contar_completadas_en_nivel(self, user_id, nivel):
@@ -202,11 +246,12 @@ IMPORTANTE: Todas las "palabra_objetivo" deben estar COMPLETAMENTE en MAYÚSCULA
         🆕 Genera un lote de 20 palabras de una sola vez (optimización batch)
         Reduce llamadas API de 20 a 1 (95% ahorro)
         """
-        print(f"[GEMINI BATCH] Generando lote de {self._buffer_size} palabras para nivel {nivel.upper()}...")
+        logger.info("Generando lote de %s palabras para nivel %s...", self._buffer_size, nivel.upper())
         
         try:
             prompt = self._build_prompt(stats, nivel, palabras_usadas)
-            response = self.model.generate_content(prompt)
+            with medir_gemini('abecedario'):
+                response = self.model.generate_content(prompt)
             
             # Parsear respuesta JSON
             text = response.text
@@ -230,13 +275,11 @@ IMPORTANTE: Todas las "palabra_objetivo" deben estar COMPLETAMENTE en MAYÚSCULA
                     item['letras_distractoras'] = [letra.upper() for letra in item['letras_distractoras']]
                     palabras_validas.append(item)
             
-            print(f"[GEMINI BATCH] ✅ Generadas {len(palabras_validas)} palabras válidas")
+            logger.info("Lote generado: %s palabras válidas", len(palabras_validas))
             return palabras_validas
             
-        except Exception as e:
-            print(f"[GEMINI BATCH ERROR] {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error generando lote de palabras")
             return []
     
     def _parse_response(self, text):
@@ -266,9 +309,13 @@ IMPORTANTE: Todas las "palabra_objetivo" deben estar COMPLETAMENTE en MAYÚSCULA
                     letra.upper() for letra in challenge['letras_distractoras']
                 ]
             
-            print(f"[PARSE] Palabra: {palabra_original} → {palabra_mayuscula}")
+            logger.debug("Palabra: %s → %s", palabra_original, palabra_mayuscula)
             
             return challenge
             
         except Exception as e:
             raise ValueError(f"Error parseando respuesta de IA: {str(e)}")
+
+
+# Las palabras pregeneradas también se descartan al invalidar abecedario.palabras
+suscribir('abecedario.palabras', lambda clave: GeminiService._palabra_buffer.clear())
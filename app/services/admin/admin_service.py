@@ -0,0 +1,208 @@
+"""
+Servicio de consultas para el panel de administración
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app, g
+from sqlalchemy import func, select, union_all, literal, case, and_, distinct, null
+from config.database import db
+from models.user import User
+from models.memory_game import MemoryGameSession, MemoryGameConfig
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.train_game import TrainGameSession
+from serializers.session_rows import abecedario_rows, paseo_rows, memory_rows, train_rows
+from services.archivo.archivo_service import ArchivoService
+
+# Pool compartido para el overview: cada tarea abre su propio app context,
+# por lo que usa su propia sesión (y conexión) del pool de SQLAlchemy
+_overview_executor = ThreadPoolExecutor(max_workers=7, thread_name_prefix='admin-overview')
+
+
+def _en_paralelo():
+    """El overview en paralelo solo con un pool real (no en SQLite)"""
+    return db.engine.dialect.name != 'sqlite'
+
+
+class AdminService:
+
+    @staticmethod
+    def listar_usuarios():
+        return User.to_collection_dict(User.query.all())
+
+    @staticmethod
+    def listar_sesiones_memoria(limit=20):
+        return memory_rows.listar(limit=limit, con_usuario=True, **ArchivoService.para_listado('memoria'))
+
+    @staticmethod
+    def listar_sesiones_abecedario(limit=20):
+        return abecedario_rows.listar(limit=limit, con_usuario=True, **ArchivoService.para_listado('abecedario'))
+
+    @staticmethod
+    def listar_sesiones_paseo(limit=20):
+        return paseo_rows.listar(limit=limit, con_usuario=True, **ArchivoService.para_listado('paseo'))
+
+    @staticmethod
+    def listar_sesiones_trenes(limit=20):
+        return train_rows.listar(limit=limit, con_usuario=True, **ArchivoService.para_listado('trenes'))
+
+    @staticmethod
+    def listar_configs_memoria():
+        configs = MemoryGameConfig.query.all()
+        return [c.to_dict() | {'user_id': c.user_id, 'last_updated': c.last_updated}
+                for c in configs]
+
+    @staticmethod
+    def obtener_stats_globales():
+        """Estadísticas globales del juego de memoria (formato de /admin/stats)"""
+        total_sessions = MemoryGameSession.query.count()
+
+        # Rango [hoy, mañana) en lugar de func.date(): así se puede usar el índice de finished_at
+        inicio_hoy = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        sessions_today = MemoryGameSession.query.filter(
+            MemoryGameSession.finished_at >= inicio_hoy,
+            MemoryGameSession.finished_at < inicio_hoy + timedelta(days=1)
+        ).count()
+
+        avg_accuracy = MemoryGameSession.query.\
+            filter(MemoryGameSession.accuracy_percentage != None).\
+            with_entities(func.avg(MemoryGameSession.accuracy_percentage)).\
+            scalar()
+
+        return {
+            'total_sessions': total_sessions,
+            'sessions_today': sessions_today,
+            'average_accuracy': float(avg_accuracy) if avg_accuracy else 0
+        }
+
+    @staticmethod
+    def _proyecciones_por_juego():
+        """
+        (juego, modelo, columna de fecha, expresión de precisión 0-100) de cada juego.
+        Abecedario no tiene precisión: se usa el % de palabras completadas.
+        """
+        intentos_tren = func.coalesce(TrainGameSession.correct_routing, 0) + func.coalesce(TrainGameSession.wrong_routing, 0)
+        return [
+            ('memoria', MemoryGameSession, MemoryGameSession.finished_at, MemoryGameSession.accuracy_percentage),
+            ('abecedario', Abecedario, Abecedario.created_at, case((Abecedario.completado, 100.0), else_=0.0)),
+            ('paseo', PaseoSession, PaseoSession.created_at, PaseoSession.precision),
+            ('trenes', TrainGameSession, TrainGameSession.finished_at,
+             case((intentos_tren > 0, TrainGameSession.correct_routing * 100.0 / intentos_tren), else_=None))
+        ]
+
+    @staticmethod
+    def obtener_stats_por_juego():
+        """
+        Estadísticas globales de los cuatro juegos en una sola consulta:
+        totales y precisión promedio por juego, más la actividad reciente
+        (sesiones de hoy, usuarios activos 7/30 días) agrupada con GROUP BY.
+
+        La parte de actividad solo lee filas con fecha >= hace 30 días mediante
+        predicados de rango sobre la columna (sin funciones), que resuelven los
+        índices (fecha, user_id) de cada tabla.
+        """
+        ahora = datetime.utcnow()
+        inicio_hoy = datetime.combine(ahora.date(), datetime.min.time())
+        fin_hoy = inicio_hoy + timedelta(days=1)
+        hace_7 = ahora - timedelta(days=7)
+        hace_30 = ahora - timedelta(days=30)
+
+        proyecciones = AdminService._proyecciones_por_juego()
+
+        totales = union_all(*[
+            select(
+                literal(juego).label('juego'),
+                func.count().label('total'),
+                func.avg(precision).label('precision')
+            ).select_from(modelo)
+            for juego, modelo, fecha, precision in proyecciones
+        ]).subquery('totales')
+
+        recientes = union_all(*[
+            select(
+                literal(juego).label('juego'),
+                modelo.user_id.label('user_id'),
+                fecha.label('fecha')
+            ).where(fecha >= hace_30)
+            for juego, modelo, fecha, precision in proyecciones
+        ]).subquery('recientes')
+
+        def columnas_actividad():
+            return [
+                func.sum(case((and_(recientes.c.fecha >= inicio_hoy, recientes.c.fecha < fin_hoy), 1), else_=0)).label('hoy'),
+                func.count(distinct(case((recientes.c.fecha >= hace_7, recientes.c.user_id)))).label('activos_7d'),
+                func.count(distinct(recientes.c.user_id)).label('activos_30d')
+            ]
+
+        actividad = select(recientes.c.juego, *columnas_actividad()).\
+            group_by(recientes.c.juego).\
+            subquery('actividad')
+
+        # Una fila por juego + una fila 'todos' con los usuarios distintos entre juegos
+        consulta = union_all(
+            select(
+                totales.c.juego, totales.c.total, totales.c.precision,
+                actividad.c.hoy, actividad.c.activos_7d, actividad.c.activos_30d
+            ).select_from(totales.outerjoin(actividad, actividad.c.juego == totales.c.juego)),
+            select(
+                literal('todos').label('juego'), null().label('total'), null().label('precision'),
+                *columnas_actividad()
+            )
+        )
+
+        filas = {fila.juego: fila for fila in db.session.execute(consulta)}
+
+        juegos = {}
+        for juego, _, _, _ in proyecciones:
+            fila = filas[juego]
+            juegos[juego] = {
+                'total_sesiones': fila.total or 0,
+                'sesiones_hoy': int(fila.hoy or 0),
+                'usuarios_activos_7d': fila.activos_7d or 0,
+                'usuarios_activos_30d': fila.activos_30d or 0,
+                'precision_promedio': round(float(fila.precision), 2) if fila.precision is not None else 0
+            }
+
+        todos = filas['todos']
+        return {
+            'juegos': juegos,
+            'global': {
+                'total_sesiones': sum(j['total_sesiones'] for j in juegos.values()),
+                'sesiones_hoy': sum(j['sesiones_hoy'] for j in juegos.values()),
+                'usuarios_activos_7d': todos.activos_7d or 0,
+                'usuarios_activos_30d': todos.activos_30d or 0
+            },
+            'generado_en': ahora.isoformat()
+        }
+
+    @staticmethod
+    def obtener_overview():
+        """
+        Todo lo que el dashboard necesita al cargar, en una sola respuesta.
+        En motores con pool real (Postgres) las consultas corren en paralelo,
+        cada una en su propia conexión; en SQLite se ejecutan en serie.
+        """
+        tareas = {
+            'users': AdminService.listar_usuarios,
+            'stats': AdminService.obtener_stats_globales,
+            'memory_sessions': AdminService.listar_sesiones_memoria,
+            'memory_configs': AdminService.listar_configs_memoria,
+            'abecedario_sessions': AdminService.listar_sesiones_abecedario,
+            'paseo_sessions': AdminService.listar_sesiones_paseo,
+            'train_sessions': AdminService.listar_sesiones_trenes
+        }
+
+        if not _en_paralelo():
+            return {clave: tarea() for clave, tarea in tareas.items()}
+
+        app = current_app._get_current_object()
+        usar_replica = g.get('usar_replica', False)
+
+        def ejecutar(tarea):
+            with app.app_context():
+                # Cada hilo tiene su propio g: lee de la misma base que eligió la petición
+                g.usar_replica = usar_replica
+                return tarea()
+
+        futuros = {clave: _overview_executor.submit(ejecutar, tarea) for clave, tarea in tareas.items()}
+        return {clave: futuro.result() for clave, futuro in futuros.items()}
@@ -0,0 +1,281 @@
+"""
+Archivo en frío de las sesiones viejas (tabla sesiones_archivadas)
+
+archivar() mueve las sesiones anteriores al horizonte (quedan en línea los
+últimos ARCHIVO_MESES meses, el actual incluido) a un bloque comprimido por
+(juego, usuario, mes) y las borra de la tabla del juego, un usuario por
+transacción. user_game_stats no se toca: las estadísticas acumuladas siguen
+contando las sesiones archivadas, y reconstruir() las vuelve a leer de acá.
+
+Los endpoints de historial y evolución llaman a sesiones() solo cuando el
+rango pedido empieza antes del horizonte (alcanza()); para los listados y
+la exportación del panel, los servicios y controladores leen por_mes() y se
+lo pasan a los serializadores. Devuelve objetos del modelo del juego sin agregarlos a la sesión de SQLAlchemy, así el código que
+arma los reportes no distingue las archivadas de las que siguen en línea.
+"""
+import os
+import json
+import zlib
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import select, delete, func
+
+from config.database import db
+from models.archivo import SesionArchivada
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.memory_game import MemoryGameSession
+from models.train_game import TrainGameSession
+from models.particiones import TABLAS, inicio_mes, sumar_meses
+
+MESES_EN_LINEA = int(os.environ.get('ARCHIVO_MESES', 24))
+LOTE_BORRADO = 1000  # claves por DELETE ... WHERE pk IN (...)
+
+JUEGOS = {
+    'abecedario': Abecedario,
+    'paseo': PaseoSession,
+    'memoria': MemoryGameSession,
+    'trenes': TrainGameSession,
+}
+
+
+def _columna_fecha(modelo):
+    """Columna por la que se archiva: la de partición (created_at o finished_at), nunca NULL desde 0008"""
+    return modelo.__table__.c[TABLAS[modelo.__tablename__][1]]
+
+
+def _clave(modelo):
+    return modelo.__table__.primary_key.columns.values()[0]
+
+
+def _dia(sesion):
+    """Día de juego: fecha_juego si el juego la tiene, si no el día de la columna de archivo"""
+    dia = getattr(sesion, 'fecha_juego', None)
+    if dia is None:
+        momento = getattr(sesion, _columna_fecha(type(sesion)).name)
+        dia = momento.date() if momento else None
+    return dia
+
+
+def _a_json(valor):
+    return valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+
+
+def _comprimir(modelo, filas):
+    """filas ({columna: valor}) -> bytes"""
+    columnas = [columna.name for columna in modelo.__table__.columns]
+    datos = {'columnas': columnas, 'filas': [[_a_json(fila.get(c)) for c in columnas] for fila in filas]}
+    return zlib.compress(json.dumps(datos, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def _descomprimir(modelo, datos):
+    """bytes -> [{columna: valor}] con las fechas como date / datetime; ignora columnas que ya no existen"""
+    bloque = json.loads(zlib.decompress(datos))
+    tabla = modelo.__table__.c
+    conversores = {}
+    for columna in bloque['columnas']:
+        if columna in tabla:
+            tipo = tabla[columna].type
+            conversores[columna] = (datetime.fromisoformat if isinstance(tipo, db.DateTime) else
+                                    date.fromisoformat if isinstance(tipo, db.Date) else None)
+    filas = []
+    for valores in bloque['filas']:
+        fila = {}
+        for columna, valor in zip(bloque['columnas'], valores):
+            if columna in conversores:
+                convertir = conversores[columna]
+                fila[columna] = convertir(valor) if convertir and valor is not None else valor
+        filas.append(fila)
+    return filas
+
+
+def _instancias(modelo, filas):
+    """Objetos del modelo (transitorios: no se agregan a db.session)"""
+    atributos = {propiedad.columns[0].name: propiedad.key for propiedad in modelo.__mapper__.column_attrs}
+    return [modelo(**{atributos[c]: v for c, v in fila.items()}) for fila in filas]
+
+
+class ArchivoService:
+
+    @staticmethod
+    def horizonte(meses=None):
+        """Primer día en línea: lo anterior puede estar archivado"""
+        return sumar_meses(inicio_mes(date.today()), -((meses or MESES_EN_LINEA) - 1))
+
+    @staticmethod
+    def alcanza(desde):
+        """True si un rango que empieza en `desde` (None: todo el historial) llega a lo archivado"""
+        # fecha_juego es la fecha local: una sesión archivada puede caer el mismo día del horizonte
+        return desde is None or desde <= ArchivoService.horizonte()
+
+    @staticmethod
+    def contar(juego, limite):
+        """Sesiones de `juego` anteriores a `limite` (date) que archivar() movería"""
+        modelo = JUEGOS[juego]
+        columna = _columna_fecha(modelo)
+        return db.session.scalar(select(func.count()).select_from(modelo.__table__).
+                                 where(columna < datetime.combine(limite, time.min)))
+
+    @staticmethod
+    def archivar(juego, limite, usuarios=None):
+        """
+        Mueve al archivo las sesiones de `juego` anteriores a `limite` (date).
+        Un commit por usuario; si el mes ya tenía bloque (sesiones cargadas
+        tarde), se combinan. Generador de (user_id, sesiones archivadas).
+        """
+        modelo = JUEGOS[juego]
+        columna, pk = _columna_fecha(modelo), _clave(modelo)
+        condicion = columna < datetime.combine(limite, time.min)
+        consulta = select(modelo.__table__.c.user_id).where(condicion).distinct().order_by(modelo.__table__.c.user_id)
+        if usuarios is not None:
+            consulta = consulta.where(modelo.__table__.c.user_id.in_(usuarios))
+
+        for user_id in db.session.scalars(consulta).all():
+            filas = db.session.execute(
+                select(modelo.__table__).where(condicion, modelo.__table__.c.user_id == user_id).
+                order_by(columna, pk)).mappings().all()
+            por_mes = {}
+            for fila in filas:
+                por_mes.setdefault(inicio_mes(fila[columna.name]), []).append(dict(fila))
+
+            existentes = {bloque.mes: bloque for bloque in db.session.scalars(
+                select(SesionArchivada).where(SesionArchivada.juego == juego, SesionArchivada.user_id == user_id,
+                                              SesionArchivada.mes.in_(list(por_mes))))}
+            for mes, del_mes in por_mes.items():
+                bloque = existentes.get(mes)
+                if bloque is None:
+                    db.session.add(SesionArchivada(juego=juego, user_id=user_id, mes=mes, cantidad=len(del_mes),
+                                                   datos=_comprimir(modelo, del_mes)))
+                    continue
+                del_mes = sorted(_descomprimir(modelo, bloque.datos) + del_mes,
+                                 key=lambda fila: (fila[columna.name], fila[pk.name]))
+                bloque.datos, bloque.cantidad = _comprimir(modelo, del_mes), len(del_mes)
+                bloque.archivado_en = datetime.utcnow()
+
+            ids = [fila[pk.name] for fila in filas]
+            for i in range(0, len(ids), LOTE_BORRADO):
+                # La condición de fecha deja que PostgreSQL descarte particiones
+                db.session.execute(delete(modelo.__table__).where(pk.in_(ids[i:i + LOTE_BORRADO]), condicion))
+            db.session.commit()
+            yield user_id, len(filas)
+
+    @staticmethod
+    def sesiones(juego, user_id, desde=None, hasta=None):
+        """
+        Sesiones archivadas del usuario con día de juego en [desde, hasta]
+        (None: sin límite), en orden cronológico. Una consulta.
+        """
+        modelo = JUEGOS[juego]
+        consulta = select(SesionArchivada.datos).where(
+            SesionArchivada.juego == juego, SesionArchivada.user_id == user_id).order_by(SesionArchivada.mes)
+        # El bloque es el mes de created_at (UTC): un día de margen como en models/particiones.py
+        if desde is not None:
+            consulta = consulta.where(SesionArchivada.mes >= inicio_mes(desde - timedelta(days=1)))
+        if hasta is not None:
+            consulta = consulta.where(SesionArchivada.mes <= hasta + timedelta(days=1))
+
+        sesiones = []
+        for datos in db.session.scalars(consulta):
+            sesiones.extend(_instancias(modelo, _descomprimir(modelo, datos)))
+        if desde is not None or hasta is not None:
+            sesiones = [s for s in sesiones
+                        if (desde is None or _dia(s) >= desde) and (hasta is None or _dia(s) <= hasta)]
+        return sesiones
+
+    @staticmethod
+    def ultimas(juego, user_id, cantidad):
+        """Las `cantidad` sesiones archivadas más recientes, de la más nueva a la más vieja"""
+        modelo = JUEGOS[juego]
+        consulta = select(SesionArchivada.datos).where(
+            SesionArchivada.juego == juego, SesionArchivada.user_id == user_id).order_by(SesionArchivada.mes.desc())
+        sesiones = []
+        for datos in db.session.scalars(consulta):
+            sesiones.extend(reversed(_instancias(modelo, _descomprimir(modelo, datos))))
+            if len(sesiones) >= cantidad:
+                break
+        return sesiones[:cantidad]
+
+    @staticmethod
+    def recorrer(juego, condicion_usuarios=None, lote=500):
+        """(user_id, sesión) de todo el archivo de `juego`, por usuario y en orden cronológico"""
+        modelo = JUEGOS[juego]
+        consulta = select(SesionArchivada.user_id, SesionArchivada.datos).where(SesionArchivada.juego == juego).\
+            order_by(SesionArchivada.user_id, SesionArchivada.mes)
+        if condicion_usuarios is not None:
+            consulta = consulta.where(condicion_usuarios(SesionArchivada.user_id))
+        for user_id, datos in db.session.execute(consulta.execution_options(yield_per=lote)):
+            for sesion in _instancias(modelo, _descomprimir(modelo, datos)):
+                yield user_id, sesion
+
+    @staticmethod
+    def por_mes(juego, user_id=None, desde=None, hasta=None, descendente=False, lote=50):
+        """
+        Listas [(user_id, sesión)] de un mes (todos los usuarios o solo
+        `user_id`) con la columna de archivo en [desde, hasta) (datetime,
+        None: sin límite), en orden cronológico (o inverso) por esa columna y
+        la clave primaria. Para los listados y la exportación del panel.
+        """
+        modelo = JUEGOS[juego]
+        columna, pk = _columna_fecha(modelo).name, _clave(modelo).name
+        orden = SesionArchivada.mes.desc() if descendente else SesionArchivada.mes
+        consulta = select(SesionArchivada.mes, SesionArchivada.user_id, SesionArchivada.datos).where(
+            SesionArchivada.juego == juego).order_by(orden, SesionArchivada.user_id)
+        if user_id is not None:
+            consulta = consulta.where(SesionArchivada.user_id == user_id)
+        if desde is not None:
+            consulta = consulta.where(SesionArchivada.mes >= inicio_mes(desde.date()))
+        if hasta is not None:
+            consulta = consulta.where(SesionArchivada.mes <= hasta.date())
+
+        def ordenado(del_mes):
+            del_mes = [(id_usuario, sesion) for id_usuario, sesion in del_mes
+                       if (desde is None or getattr(sesion, columna) >= desde) and
+                       (hasta is None or getattr(sesion, columna) < hasta)]
+            del_mes.sort(key=lambda par: (getattr(par[1], columna), getattr(par[1], pk)), reverse=descendente)
+            return del_mes
+
+        resultado = db.session.execute(consulta.execution_options(yield_per=lote))
+        try:
+            mes_actual, del_mes = None, []
+            for mes, id_usuario, datos in resultado:
+                if mes != mes_actual and del_mes:
+                    yield ordenado(del_mes)
+                    del_mes = []
+                mes_actual = mes
+                del_mes.extend((id_usuario, sesion) for sesion in _instancias(modelo, _descomprimir(modelo, datos)))
+            if del_mes:
+                yield ordenado(del_mes)
+        finally:
+            resultado.close()
+
+    @staticmethod
+    def para_listado(juego, user_id=None):
+        """
+        Argumentos de SessionRowSerializer.listar() para sumar lo archivado:
+        los meses de por_mes() del más nuevo al más viejo (no se leen hasta
+        que el listado los recorre) y el horizonte.
+        """
+        return {'archivadas': ArchivoService.por_mes(juego, user_id, descendente=True),
+                'horizonte': ArchivoService.horizonte()}
+
+    @staticmethod
+    def restaurar(juego, user_id):
+        """Devuelve a la tabla del juego las sesiones archivadas del usuario (mismo id). Hace commit"""
+        modelo = JUEGOS[juego]
+        bloques = db.session.scalars(select(SesionArchivada).where(
+            SesionArchivada.juego == juego, SesionArchivada.user_id == user_id)).all()
+        filas = [fila for bloque in bloques for fila in _descomprimir(modelo, bloque.datos)]
+        if filas:
+            db.session.execute(modelo.__table__.insert(), filas)
+        for bloque in bloques:
+            db.session.delete(bloque)
+        db.session.commit()
+        return len(filas)
+
+    @staticmethod
+    def borrar(user_id, juegos=None):
+        """Elimina lo archivado del usuario (al resetear el progreso), sin commit"""
+        condicion = SesionArchivada.user_id == user_id
+        if juegos:
+            condicion = condicion & SesionArchivada.juego.in_(juegos)
+        db.session.execute(delete(SesionArchivada).where(condicion))
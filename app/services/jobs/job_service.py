@@ -0,0 +1,142 @@
+"""
+Cola de trabajos sobre la tabla jobs (sin broker externo)
+
+Los services registran sus tareas con @tarea('tipo') y las encolan con
+JobService.encolar() dentro de su propia transacción: el trabajo existe solo
+si el commit de la petición se confirma. El worker (services/jobs/worker.py)
+toma los pendientes por prioridad con un UPDATE ... RETURNING sobre una
+subconsulta FOR UPDATE SKIP LOCKED (en PostgreSQL varios workers no se pisan;
+SQLite serializa las escrituras), ejecuta la función registrada y guarda el
+resultado. Si la tarea lanza una excepción se reintenta con backoff
+exponencial hasta max_intentos; después queda 'fallido' con el error.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from config.database import db
+from models.job import Job, PENDIENTE, EN_CURSO, COMPLETADO, FALLIDO
+
+logger = logging.getLogger(__name__)
+
+# tipo -> (función(parametros) -> resultado, prioridad, max_intentos)
+TAREAS = {}
+
+BACKOFF_SEGUNDOS = 15
+
+
+def tarea(tipo, prioridad=0, max_intentos=3):
+    """Registra la función que ejecuta los trabajos de `tipo`"""
+    def registrar(funcion):
+        TAREAS[tipo] = (funcion, prioridad, max_intentos)
+        return funcion
+    return registrar
+
+
+class JobService:
+
+    @staticmethod
+    def encolar(tipo, parametros=None, user_id=None, clave=None, prioridad=None):
+        """
+        Agrega un trabajo pendiente, sin commit (lo confirma el commit de quien
+        encola). Si ya hay uno pendiente o en curso con la misma clave, devuelve ese.
+        """
+        _, prioridad_tarea, max_intentos = TAREAS[tipo]
+        if clave is not None:
+            existente = Job.query.filter(Job.clave == clave, Job.estado.in_((PENDIENTE, EN_CURSO))).first()
+            if existente is not None:
+                return existente
+
+        job = Job(tipo=tipo, user_id=user_id, clave=clave,
+                  parametros=current_app.json.dumps(parametros or {}),
+                  prioridad=prioridad_tarea if prioridad is None else prioridad,
+                  max_intentos=max_intentos)
+        db.session.add(job)
+        db.session.flush()
+        logger.debug("Job %s encolado: %s (clave=%s)", job.id, tipo, clave)
+        return job
+
+    @staticmethod
+    def obtener(job_id):
+        return db.session.get(Job, job_id)
+
+    @staticmethod
+    def resultado(clave):
+        """Resultado del último trabajo completado con esa clave, o None"""
+        job = Job.query.filter_by(clave=clave, estado=COMPLETADO).order_by(Job.id.desc()).first()
+        return job.valor if job is not None else None
+
+    @staticmethod
+    def tomar(worker, tipos=None):
+        """Marca como en curso el pendiente de mayor prioridad y lo devuelve (o None)"""
+        ahora = datetime.utcnow()
+        siguiente = select(Job.id).where(Job.estado == PENDIENTE, Job.disponible_en <= ahora)
+        if tipos:
+            siguiente = siguiente.where(Job.tipo.in_(tipos))
+        siguiente = siguiente.order_by(Job.prioridad.desc(), Job.id).limit(1).with_for_update(skip_locked=True)
+
+        job_id = db.session.execute(
+            update(Job).where(Job.id == siguiente.scalar_subquery(), Job.estado == PENDIENTE).
+            values(estado=EN_CURSO, intentos=Job.intentos + 1, iniciado_en=ahora, worker=worker).
+            returning(Job.id)
+        ).scalar()
+        db.session.commit()
+        return db.session.get(Job, job_id) if job_id is not None else None
+
+    @staticmethod
+    def ejecutar(job):
+        """Corre la tarea del trabajo y registra el resultado o el error (con commit)"""
+        registrada = TAREAS.get(job.tipo)
+        try:
+            if registrada is None:
+                raise LookupError(f'Tarea no registrada: {job.tipo}')
+            resultado = registrada[0](job.datos)
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job.id)
+            job.error = f'{type(e).__name__}: {e}'
+            if registrada is not None and job.intentos < job.max_intentos:
+                job.estado = PENDIENTE
+                job.disponible_en = datetime.utcnow() + timedelta(seconds=BACKOFF_SEGUNDOS * 2 ** (job.intentos - 1))
+                logger.warning("Job %s (%s) falló, intento %s/%s: %s", job.id, job.tipo, job.intentos, job.max_intentos, e)
+            else:
+                job.estado = FALLIDO
+                job.terminado_en = datetime.utcnow()
+                logger.exception("Job %s (%s) fallido tras %s intentos", job.id, job.tipo, job.intentos)
+            db.session.commit()
+            return job
+
+        job.estado = COMPLETADO
+        job.resultado = current_app.json.dumps(resultado)
+        job.error = None
+        job.terminado_en = datetime.utcnow()
+        db.session.commit()
+        logger.info("Job %s (%s) completado en %s intento(s)", job.id, job.tipo, job.intentos)
+        return job
+
+    @staticmethod
+    def recuperar_vencidos(segundos):
+        """Vuelve a pendientes los trabajos en curso hace más de `segundos` (worker caído)"""
+        limite = datetime.utcnow() - timedelta(seconds=segundos)
+        vencidos = (Job.estado == EN_CURSO) & (Job.iniciado_en < limite)
+        reintentables = db.session.execute(
+            update(Job).where(vencidos, Job.intentos < Job.max_intentos).values(estado=PENDIENTE)).rowcount
+        agotados = db.session.execute(
+            update(Job).where(vencidos).values(estado=FALLIDO, error='Tiempo de ejecución agotado',
+                                                terminado_en=datetime.utcnow())).rowcount
+        db.session.commit()
+        return reintentables + agotados
+
+    @staticmethod
+    def procesar_pendientes(worker='inline', tipos=None, limite=None):
+        """Ejecuta los trabajos disponibles hasta vaciar la cola (o `limite`); devuelve cuántos"""
+        procesados = 0
+        while limite is None or procesados < limite:
+            job = JobService.tomar(worker, tipos)
+            if job is None:
+                break
+            JobService.ejecutar(job)
+            procesados += 1
+        return procesados
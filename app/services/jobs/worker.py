@@ -0,0 +1,71 @@
+"""
+Worker de la cola de trabajos
+
+    flask --app app jobs worker                 # proceso dedicado (producción)
+    JOBS_EN_PROCESO=1 python app.py             # hilo dentro del servidor de desarrollo
+
+Toma un trabajo a la vez; cuando la cola está vacía espera `intervalo`
+segundos antes de volver a consultar. Cada timeout/10 segundos devuelve a
+pendientes los trabajos que quedaron en curso más de `timeout` (worker caído).
+"""
+import os
+import time
+import socket
+import logging
+import threading
+
+from config.database import db
+from services.jobs.job_service import JobService
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+
+    def __init__(self, app, tipos=None, intervalo=1.0, timeout=600, nombre=None):
+        self.app = app
+        self.tipos = list(tipos or [])
+        self.intervalo = intervalo
+        self.timeout = timeout
+        self.nombre = nombre or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        self.detener = threading.Event()
+
+    def ejecutar(self, una_vez=False):
+        """Procesa trabajos hasta que se llame a detener.set() (o hasta vaciar la cola si una_vez)"""
+        logger.info("Worker %s iniciado (tipos: %s)", self.nombre, self.tipos or 'todos')
+        procesados = 0
+        ultima_revision = None
+        with self.app.app_context():
+            while not self.detener.is_set():
+                try:
+                    ahora = time.monotonic()
+                    if ultima_revision is None or ahora - ultima_revision >= max(self.timeout / 10, self.intervalo):
+                        recuperados = JobService.recuperar_vencidos(self.timeout)
+                        if recuperados:
+                            logger.warning("%s trabajos vencidos recuperados", recuperados)
+                        ultima_revision = ahora
+
+                    job = JobService.tomar(self.nombre, self.tipos)
+                    if job is not None:
+                        JobService.ejecutar(job)
+                        procesados += 1
+                        continue
+                except Exception:
+                    logger.exception("Error en el worker %s", self.nombre)
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+                if una_vez:
+                    break
+                self.detener.wait(self.intervalo)
+
+        logger.info("Worker %s detenido (%s trabajos)", self.nombre, procesados)
+        return procesados
+
+
+def iniciar_en_hilo(app, **opciones):
+    """Worker en un hilo daemon del mismo proceso (desarrollo, sin proceso aparte)"""
+    worker = Worker(app, **opciones)
+    threading.Thread(target=worker.ejecutar, name='jobs-worker', daemon=True).start()
+    return worker
@@ -5,6 +5,7 @@ import google.generativeai as genai
 import os
 import json
 import logging
+from middleware.metrics import medir_gemini
 
 logger = logging.getLogger(__name__)
 
@@ -33,35 +34,39 @@ class AIAdapterService:
             logger.warning("⚠️ GEMINI_API_KEY no encontrada. Usando modo fallback.")
             self.model = None
 
-    def analyze_and_recommend(self, user_id, current_config, session_data):
+    def _datos_rendimiento(self, current_config, session_data):
+        return {
+            "current_difficulty": current_config.difficulty_label,
+            "total_pairs": session_data.total_pairs,
+            "pairs_found": session_data.pairs_found,
+            "total_flips": session_data.total_flips,
+            "elapsed_time": session_data.elapsed_time_seconds,
+            "time_limit": current_config.time_limit,
+            "completed": session_data.completion_status == "completed",
+            "accuracy": session_data.accuracy_percentage or 0
+        }
+
+    def analyze_and_recommend(self, user_id, current_config, session_data, usar_ia=True):
         """
         Analiza el desempeño y recomienda la nueva configuración.
+        Con usar_ia=False solo se usa la lógica determinista (sin llamar a Gemini).
         """
         try:
             # 1. Preparar datos para el prompt
-            performance_data = {
-                "current_difficulty": current_config.difficulty_label,
-                "total_pairs": session_data.total_pairs,
-                "pairs_found": session_data.pairs_found,
-                "total_flips": session_data.total_flips,
-                "elapsed_time": session_data.elapsed_time_seconds,
-                "time_limit": current_config.time_limit,
-                "completed": session_data.completion_status == "completed",
-                "accuracy": session_data.accuracy_percentage or 0
-            }
+            performance_data = self._datos_rendimiento(current_config, session_data)
 
             # 2. Intentar usar IA
-            if self.model:
+            if self.model and usar_ia:
                 try:
                     return self._analyze_with_ai(performance_data, current_config)
                 except Exception as e:
-                    logger.error(f"❌ Error en Gemini: {str(e)}. Usando fallback.")
+                    logger.warning("Error en Gemini: %s. Usando fallback.", e)
                     return self._analyze_fallback(performance_data, current_config)
             else:
                 return self._analyze_fallback(performance_data, current_config)
 
-        except Exception as e:
-            logger.error(f"❌ Error crítico en analyze_and_recommend: {str(e)}")
+        except Exception:
+            logger.exception("Error crítico en analyze_and_recommend user_id=%s", user_id)
             # Retornar configuración actual en caso de pánico total
             return {
                 "ai_analysis": {
@@ -82,6 +87,15 @@ class AIAdapterService:
                 }
             }
 
+    def analizar_con_ia(self, current_config, session_data):
+        """
+        Solo Gemini, sin fallback: los errores se propagan para que el job
+        que lo llama se reintente
+        """
+        if not self.model:
+            raise RuntimeError("GEMINI_API_KEY no configurada")
+        return self._analyze_with_ai(self._datos_rendimiento(current_config, session_data), current_config)
+
     def _analyze_with_ai(self, data, current_config):
         prompt = f"""
         Actúa como un sistema experto de ajuste de dificultad para un juego de memoria terapéutico para adultos mayores.
@@ -131,7 +145,8 @@ class AIAdapterService:
         }}
         """
 
-        response = self.model.generate_content(prompt)
+        with medir_gemini('memory_game'):
+            response = self.model.generate_content(prompt)
         result = json.loads(response.text.strip().replace('```json', '').replace('```', ''))
         
         # Validar y asegurar grid_size
@@ -6,14 +6,82 @@ Servicio de lógica de negocio para el juego de memoria
 
 from datetime import datetime
 
+from sqlalchemy import func
+
 from config.database import db
 
 from models.memory_game import MemoryGameSession, MemoryGameConfig
 
+from serializers.session_rows import memory_rows
+
+from services.user_game_stats_service import UserGameStatsService
+
+from services.archivo.archivo_service import ArchivoService
+
+from services.jobs.job_service import JobService, tarea
+
+from config.invalidacion import CacheLocal, publicar
+
 from .ai_adapter_service import AIAdapterService
 
 
 
+def aplicar_analisis(session, config, ai_analysis):
+    """
+    Guarda las métricas del análisis en la sesión (seguimiento del terapeuta)
+    y, si se pasa config, la actualiza con next_session_config
+    """
+    assessment = ai_analysis.get('performance_assessment', {})
+    session.ai_adjustment_decision = ai_analysis.get('adjustment_decision')
+    session.ai_reason = ai_analysis.get('reason')
+    session.ai_memory_assessment = assessment.get('memory_retention')
+    session.ai_speed_assessment = assessment.get('speed')
+    session.ai_accuracy_assessment = assessment.get('accuracy')
+    session.ai_overall_score = assessment.get('overall_score')
+
+    if config is None:
+        return
+    new_config_data = ai_analysis['next_session_config']
+    config.difficulty_label = new_config_data.get('difficulty_label', config.difficulty_label)
+    config.total_pairs = new_config_data.get('total_pairs', config.total_pairs)
+    config.grid_size = new_config_data.get('grid_size', '2x3')
+    config.time_limit = new_config_data.get('time_limit', 60)
+    config.memorization_time = new_config_data.get('memorization_time', 5)
+
+
+@tarea('memoria.analisis_ia', prioridad=10)
+def analizar_sesion_con_ia(parametros):
+    """
+    Job: análisis de Gemini de una sesión ya guardada. Reemplaza el ajuste
+    determinista solo si la sesión sigue siendo la última del usuario (si ya
+    jugó otra, la configuración vigente sale de esa).
+    """
+    session = db.session.get(MemoryGameSession, parametros['session_id'])
+    if session is None:
+        return {'aplicado': False, 'motivo': 'sesión eliminada'}
+
+    anterior = MemoryGameConfig(user_id=session.user_id, **parametros['config_anterior'])
+    ai_analysis = AIAdapterService().analizar_con_ia(anterior, session)['ai_analysis']
+
+    ultima = db.session.query(func.max(MemoryGameSession.session_id)).\
+        filter(MemoryGameSession.user_id == session.user_id).scalar()
+    config = MemoryGameConfig.query.filter_by(user_id=session.user_id).first() \
+        if ultima == session.session_id else None
+    aplicar_analisis(session, config, ai_analysis)
+    if config is not None:
+        publicar('memoria.config', session.user_id)
+    return {'aplicado': config is not None, 'ai_analysis': ai_analysis}
+
+
+# Configuración vigente por usuario (GET /memory-game/config/<id>), invalidada al cambiar
+_configs = CacheLocal('memoria.config')
+
+
+def _config_guardada(user_id):
+    config = MemoryGameConfig.query.filter_by(user_id=user_id).first()
+    return {'current_config': config.to_dict(), 'last_updated': config.last_updated} if config else None
+
+
 class MemoryGameService:
 
     def __init__(self):
@@ -32,11 +100,11 @@ class MemoryGameService:
 
         """
 
-        config = MemoryGameConfig.query.filter_by(user_id=user_id).first()
+        guardada = _configs.obtener(user_id, lambda: _config_guardada(user_id))
 
         
 
-        if not config:
+        if guardada is None:
 
             # Crear configuración por defecto
 
@@ -46,6 +114,8 @@ class MemoryGameService:
 
             db.session.commit()
 
+            guardada = {'current_config': config.to_dict(), 'last_updated': config.last_updated}
+
             is_first_time = True
 
         else:
@@ -58,11 +128,11 @@ class MemoryGameService:
 
             'user_id': user_id,
 
-            'current_config': config.to_dict(),
+            'current_config': guardada['current_config'],
 
             'is_first_time': is_first_time,
 
-            'last_updated': config.last_updated.isoformat()
+            'last_updated': guardada['last_updated']
 
         }
 
@@ -126,11 +196,15 @@ class MemoryGameService:
 
         db.session.add(session)
 
+        UserGameStatsService.registrar('memoria', session)
+
         db.session.commit()
 
         
 
-        # 3. Analizar con IA y obtener nueva configuración
+        # 3. Ajuste inmediato con la lógica determinista (la respuesta no espera a Gemini)
+
+        config_anterior = current_config.to_dict()
 
         ai_result = self.ai_adapter.analyze_and_recommend(
 
@@ -138,51 +212,37 @@ class MemoryGameService:
 
             current_config,
 
-            session
-
-        )
+            session,
 
-        
+            usar_ia=False
 
-        # 4. Guardar métricas de IA en la sesión (para seguimiento del terapeuta)
+        )
 
         ai_analysis = ai_result['ai_analysis']
 
-        assessment = ai_analysis.get('performance_assessment', {})
-
         
 
-        session.ai_adjustment_decision = ai_analysis.get('adjustment_decision')
-
-        session.ai_reason = ai_analysis.get('reason')
-
-        session.ai_memory_assessment = assessment.get('memory_retention')
-
-        session.ai_speed_assessment = assessment.get('speed')
+        # 4. Guardar métricas en la sesión y actualizar la configuración del usuario
 
-        session.ai_accuracy_assessment = assessment.get('accuracy')
+        aplicar_analisis(session, current_config, ai_analysis)
 
-        session.ai_overall_score = assessment.get('overall_score')
+        publicar('memoria.config', user_id)
 
         
 
-        # 5. Actualizar configuración del usuario
+        # 5. El análisis con Gemini corre en la cola de trabajos y reemplaza este ajuste al terminar
 
-        new_config_data = ai_analysis['next_session_config']
+        session_id, job_id = session.session_id, None
 
-        
-
-        # ✅ CORRECCIÓN: Usar .get() o acceso directo seguro
+        if self.ai_adapter.model:
 
-        current_config.difficulty_label = new_config_data.get('difficulty_label', current_config.difficulty_label)
+            job_id = JobService.encolar('memoria.analisis_ia', {
 
-        current_config.total_pairs = new_config_data.get('total_pairs', current_config.total_pairs)
+                'session_id': session_id,
 
-        current_config.grid_size = new_config_data.get('grid_size', '2x3')
+                'config_anterior': config_anterior
 
-        current_config.time_limit = new_config_data.get('time_limit', 60)
-
-        current_config.memorization_time = new_config_data.get('memorization_time', 5)
+            }, user_id=user_id).id
 
         
 
@@ -194,9 +254,11 @@ class MemoryGameService:
 
             'session_saved': True,
 
-            'session_id': session.session_id,
+            'session_id': session_id,
+
+            'ai_analysis': ai_analysis,
 
-            'ai_analysis': ai_analysis
+            'job_id': job_id
 
         }
 
@@ -223,51 +285,32 @@ class MemoryGameService:
     
 
     def get_user_stats(self, user_id: int) -> dict:
-
         """
-
-        Obtiene estadísticas del usuario
-
+        Obtiene estadísticas del usuario: totales desde user_game_stats (clave
+        primaria) y las 5 sesiones más recientes con ORDER BY finished_at DESC LIMIT 5.
         """
+        stats = UserGameStatsService.obtener(user_id, 'memoria')
 
-        sessions = MemoryGameSession.query.filter_by(user_id=user_id).all()
-
-        
-
-        if not sessions:
-
+        if stats is None or not stats.sesiones:
             return {
-
                 'total_sessions': 0,
-
                 'completed_sessions': 0,
-
                 'average_accuracy': 0,
-
                 'best_time': None
-
             }
 
-        
-
-        completed = [s for s in sessions if s.completion_status == 'completed']
-
-        
+        # Más reciente primero en la consulta; se devuelven de la más antigua a la más nueva
+        recientes = memory_rows.listar(user_id=user_id, limit=5, **ArchivoService.para_listado('memoria', user_id))
+        recientes.reverse()
 
         return {
-
-            'total_sessions': len(sessions),
-
-            'completed_sessions': len(completed),
-
-            'average_accuracy': sum(s.accuracy_percentage or 0 for s in completed) / len(completed) if completed else 0,
-
-            'best_time': min(s.elapsed_time_seconds for s in completed) if completed else None,
-
-            'recent_sessions': [s.to_dict() for s in sessions[-5:]]
-
+            'total_sessions': stats.sesiones,
+            'completed_sessions': stats.completadas,
+            'average_accuracy': stats.suma_precision_completadas / stats.completadas if stats.completadas else 0,
+            'best_time': stats.mejor_tiempo,
+            'recent_sessions': recientes
         }
-        
+
     def reset_user_progress(self, user_id: int) -> dict:
         """
         Resetea el progreso del usuario eliminando sesiones y configuración
@@ -277,6 +320,9 @@ class MemoryGameService:
         
         # Borrar configuración
         config_deleted = MemoryGameConfig.query.filter_by(user_id=user_id).delete()
+        UserGameStatsService.borrar(user_id, ['memoria'])
+        ArchivoService.borrar(user_id, ['memoria'])
+        publicar('memoria.config', user_id)
         
         # Commit
         db.session.commit()
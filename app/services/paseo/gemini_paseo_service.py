@@ -1,9 +1,22 @@
 ﻿import random
 from datetime import date
-from services.paseo.paseo_service import PaseoService
+from services.paseo.paseo_service import PaseoService, clave_analisis_derrota
 import os
 import json
+import logging
 import google.generativeai as genai
+from middleware.metrics import medir_gemini
+from services.jobs.job_service import JobService, tarea
+
+logger = logging.getLogger(__name__)
+
+
+@tarea('paseo.analisis_derrota', prioridad=10)
+def analizar_derrota(parametros):
+    """Job encolado por PaseoService.save_session al perder en DIFICIL"""
+    return GeminiPaseoService().analizar_derrota_dificil(
+        parametros['user_id'], parametros['aciertos'], parametros['meta'])
+
 
 class GeminiPaseoService:
     """Servicio con IA para Paseo - Usa Gemini SOLO para nivel DIFICIL"""
@@ -15,18 +28,19 @@ class GeminiPaseoService:
             self.model = genai.GenerativeModel('gemini-2.5-flash')
             self.gemini_activo = True
         else:
-            print("[PASEO IA] GEMINI_API_KEY no configurada - Modo degradado")
+            logger.warning("GEMINI_API_KEY no configurada - Modo degradado")
             self.gemini_activo = False
     
     def decidir_nivel_inicial(self, user_id):
         """
-        Decide nivel inicial - Usa Gemini SOLO si perdió en DIFICIL
+        Decide nivel inicial - Usa Gemini SOLO si perdió en DIFICIL.
+        Devuelve (nivel, velocidad ajustada por Gemini o None)
         """
         ultima_sesion, _ = PaseoService.get_ultima_sesion(user_id)
         
         if not ultima_sesion:
-            print("[PASEO IA] Primera vez → FACIL")
-            return "facil"
+            logger.debug("Primera vez → FACIL")
+            return "facil", None
         
         nivel_anterior = ultima_sesion['nivel']
         resultado = ultima_sesion['resultado']
@@ -35,57 +49,73 @@ class GeminiPaseoService:
         
         # Tutorial → FACIL
         if nivel_anterior == 'tutorial':
-            print("[PASEO IA] Después de tutorial → FACIL")
-            return "facil"
+            logger.debug("Después de tutorial → FACIL")
+            return "facil", None
         
         # Victoria → Subir
         if resultado == 'victoria':
             if nivel_anterior == 'facil':
-                print("[PASEO IA] Victoria FACIL → INTERMEDIO")
-                return "intermedio"
+                logger.debug("Victoria FACIL → INTERMEDIO")
+                return "intermedio", None
             elif nivel_anterior == 'intermedio':
-                print("[PASEO IA] Victoria INTERMEDIO → DIFICIL")
-                return "dificil"
+                logger.debug("Victoria INTERMEDIO → DIFICIL")
+                return "dificil", None
             else:
-                print("[PASEO IA] Victoria DIFICIL → Mantiene DIFICIL")
-                return "dificil"
+                logger.debug("Victoria DIFICIL → Mantiene DIFICIL")
+                return "dificil", None
         
         # Derrota en INTERMEDIO → Baja a FACIL
         if nivel_anterior == 'intermedio':
-            print(f"[PASEO IA] Derrota INTERMEDIO ({aciertos}/{meta}) → FACIL")
-            return "facil"
+            logger.debug("Derrota INTERMEDIO (%s/%s) → FACIL", aciertos, meta)
+            return "facil", None
         
-        # Derrota en DIFICIL → Usar Gemini para análisis profundo
+        # Derrota en DIFICIL → análisis de Gemini, hecho por el job que encoló save_session
         if nivel_anterior == 'dificil' and self.gemini_activo:
-            print(f"[PASEO IA] Derrota DIFICIL ({aciertos}/{meta}) - Consultando Gemini...")
-            return self._analizar_derrota_dificil(user_id, aciertos, meta)
+            analisis = JobService.resultado(clave_analisis_derrota(ultima_sesion['id']))
+            if analisis:
+                logger.info("Gemini DIFICIL → %s | Velocidad: %s | %s",
+                            analisis['nivel'].upper(), analisis['velocidad'], analisis['razon'])
+                return analisis['nivel'], analisis['velocidad']
+            # El job todavía no terminó (o falló): misma regla que si Gemini no responde
+            logger.info("Derrota DIFICIL (%s/%s) sin análisis de Gemini todavía - Lógica simple", aciertos, meta)
+            return self._nivel_por_porcentaje(aciertos, meta), None
         
         # Derrota en FACIL o fallback
-        print(f"[PASEO IA] Derrota {nivel_anterior.upper()} → Mantiene {nivel_anterior.upper()}")
-        return nivel_anterior
+        logger.debug("Derrota %s → Mantiene %s", nivel_anterior.upper(), nivel_anterior.upper())
+        return nivel_anterior, None
     
-    def _analizar_derrota_dificil(self, user_id, aciertos, meta):
+    def _nivel_por_porcentaje(self, aciertos, meta):
+        """Nivel tras perder en DIFICIL según qué tan cerca estuvo de la meta"""
+        porcentaje = (aciertos / meta * 100) if meta > 0 else 0
+        if porcentaje < 30:
+            return "facil"
+        elif porcentaje < 60:
+            return "intermedio"
+        else:
+            return "dificil"
+    
+    def analizar_derrota_dificil(self, user_id, aciertos, meta):
         """
-        Usa Gemini para analizar derrota en DIFICIL y decidir nivel + velocidad
+        Usa Gemini para analizar derrota en DIFICIL y decidir nivel + velocidad.
+        Sin fallback: los errores se propagan para que el job se reintente.
         """
-        try:
-            # Obtener historial reciente
-            from models.paseo import PaseoSession
-            from datetime import date, timedelta
-            
-            sesiones_recientes = PaseoSession.query.filter_by(
-                user_id=user_id,
-                nivel_dificultad='dificil'
-            ).order_by(PaseoSession.created_at.desc()).limit(3).all()
-            
-            # Calcular métricas
-            total_intentos = len(sesiones_recientes)
-            total_aciertos_historico = sum(s.esferas_rojas_atrapadas for s in sesiones_recientes)
-            total_errores = sum(s.esferas_azules_atrapadas + s.esferas_perdidas for s in sesiones_recientes)
-            precision_promedio = sum(s.precision for s in sesiones_recientes) / total_intentos if total_intentos > 0 else 0
-            
-            # Prompt conciso para Gemini
-            prompt = f"""Eres un terapeuta cognitivo. Analiza el rendimiento de un adulto mayor en nivel DIFICIL:
+        # Obtener historial reciente
+        from models.paseo import PaseoSession
+        from datetime import date, timedelta
+        
+        sesiones_recientes = PaseoSession.query.filter_by(
+            user_id=user_id,
+            nivel_dificultad='dificil'
+        ).order_by(PaseoSession.created_at.desc()).limit(3).all()
+        
+        # Calcular métricas
+        total_intentos = len(sesiones_recientes)
+        total_aciertos_historico = sum(s.esferas_rojas_atrapadas for s in sesiones_recientes)
+        total_errores = sum(s.esferas_azules_atrapadas + s.esferas_perdidas for s in sesiones_recientes)
+        precision_promedio = sum(s.precision for s in sesiones_recientes) / total_intentos if total_intentos > 0 else 0
+        
+        # Prompt conciso para Gemini
+        prompt = f"""Eres un terapeuta cognitivo. Analiza el rendimiento de un adulto mayor en nivel DIFICIL:
 
 ÚLTIMA SESIÓN DIFICIL:
 - Aciertos: {aciertos}/{meta}
@@ -119,38 +149,25 @@ GUÍA:
 - Si >60% aciertos → DIFICIL, velocidad 4.5-5.0 (estuvo cerca)
 - Reducir velocidad si precisión <50% o muchos errores"""
 
+        with medir_gemini('paseo'):
             response = self.model.generate_content(prompt)
-            text = response.text
+        text = response.text
+        
+        # Parse JSON
+        start = text.find('{')
+        end = text.rfind('}') + 1
+        if start != -1 and end > start:
+            data = json.loads(text[start:end])
+            nivel = data.get('nivel_recomendado', 'intermedio')
+            razon = data.get('razonamiento_breve', '')
+            velocidad = data.get('velocidad_ajustada', 4.5)
             
-            # Parse JSON
-            start = text.find('{')
-            end = text.rfind('}') + 1
-            if start != -1 and end > start:
-                data = json.loads(text[start:end])
-                nivel = data.get('nivel_recomendado', 'intermedio')
-                razon = data.get('razonamiento_breve', '')
-                velocidad = data.get('velocidad_ajustada', 4.5)
-                
-                print(f"[GEMINI DIFICIL] → {nivel.upper()} | Velocidad: {velocidad} | {razon}")
-                
-                # Guardar velocidad para aplicarla después
-                self._velocidad_ajustada = velocidad
-                
-                return nivel
-            else:
-                raise ValueError("No JSON en respuesta")
-                
-        except Exception as e:
-            print(f"[GEMINI ERROR] {e} - Fallback a lógica simple")
-            # Fallback: análisis simple sin IA
-            porcentaje = (aciertos / meta * 100) if meta > 0 else 0
-            if porcentaje < 30:
-                return "facil"
-            elif porcentaje < 60:
-                return "intermedio"
-            else:
-                return "dificil"
-    
+            logger.info("Gemini DIFICIL → %s | Velocidad: %s | %s", nivel.upper(), velocidad, razon)
+            
+            return {'nivel': nivel, 'velocidad': velocidad, 'razon': razon}
+        else:
+            raise ValueError("No JSON en respuesta")
+
     def _plan_nivel_sin_ia(self, nivel, razonamiento=None):
         """
         IA decide nivel inicial basado en ÚLTIMO resultado y errores
@@ -159,7 +176,7 @@ GUÍA:
         ultima_sesion, _ = PaseoService.get_ultima_sesion(user_id)
         
         if not ultima_sesion:
-            print("[PASEO IA] Primera vez → FACIL")
+            logger.debug("Primera vez → FACIL")
             return "facil"
         
         nivel_anterior = ultima_sesion['nivel']
@@ -169,19 +186,19 @@ GUÍA:
         
         # Después del tutorial → FACIL
         if nivel_anterior == 'tutorial':
-            print("[PASEO IA] Después de tutorial → FACIL")
+            logger.debug("Después de tutorial → FACIL")
             return "facil"
         
         # Si ganó, subir de nivel
         if resultado == 'victoria':
             if nivel_anterior == 'facil':
-                print("[PASEO IA] Victoria en FACIL → INTERMEDIO")
+                logger.debug("Victoria en FACIL → INTERMEDIO")
                 return "intermedio"
             elif nivel_anterior == 'intermedio':
-                print("[PASEO IA] Victoria en INTERMEDIO → DIFICIL")
+                logger.debug("Victoria en INTERMEDIO → DIFICIL")
                 return "dificil"
             else:  # Ya está en DIFICIL
-                print("[PASEO IA] Victoria en DIFICIL → Mantiene DIFICIL")
+                logger.debug("Victoria en DIFICIL → Mantiene DIFICIL")
                 return "dificil"
         
         # Si perdió, analizar qué tan mal le fue
@@ -191,27 +208,27 @@ GUÍA:
             
             # INTERMEDIO perdido → Baja a FACIL (siempre)
             if nivel_anterior == 'intermedio':
-                print(f"[PASEO IA] Derrota en INTERMEDIO ({aciertos}/{meta}) → FACIL")
+                logger.debug("Derrota en INTERMEDIO (%s/%s) → FACIL", aciertos, meta)
                 return "facil"
             
             # DIFICIL perdido → Analizar qué tan mal
             elif nivel_anterior == 'dificil':
                 if porcentaje_aciertos < 30:  # Muy mal (menos del 30%)
-                    print(f"[PASEO IA] Derrota severa en DIFICIL ({aciertos}/{meta}, {porcentaje_aciertos:.0f}%) → FACIL")
+                    logger.debug("Derrota severa en DIFICIL (%s/%s, %.0f%%) → FACIL", aciertos, meta, porcentaje_aciertos)
                     return "facil"
                 elif porcentaje_aciertos < 60:  # Regular (30-60%)
-                    print(f"[PASEO IA] Derrota en DIFICIL ({aciertos}/{meta}, {porcentaje_aciertos:.0f}%) → INTERMEDIO")
+                    logger.debug("Derrota en DIFICIL (%s/%s, %.0f%%) → INTERMEDIO", aciertos, meta, porcentaje_aciertos)
                     return "intermedio"
                 else:  # Estuvo cerca (60%+)
-                    print(f"[PASEO IA] Derrota cercana en DIFICIL ({aciertos}/{meta}, {porcentaje_aciertos:.0f}%) → Mantiene DIFICIL")
+                    logger.debug("Derrota cercana en DIFICIL (%s/%s, %.0f%%) → Mantiene DIFICIL", aciertos, meta, porcentaje_aciertos)
                     return "dificil"
             
             # FACIL perdido → Mantiene FACIL
             else:
-                print(f"[PASEO IA] Derrota en FACIL ({aciertos}/{meta}) → Mantiene FACIL")
+                logger.debug("Derrota en FACIL (%s/%s) → Mantiene FACIL", aciertos, meta)
                 return "facil"
     
-    def _plan_nivel_sin_ia(self, nivel, razonamiento=None):
+    def _plan_nivel_sin_ia(self, nivel, razonamiento=None, velocidad=None):
         """
         Genera plan de sesión - Usa velocidad ajustada si Gemini la decidió
         """
@@ -249,10 +266,9 @@ GUÍA:
         config = configs.get(nivel, configs['facil'])
         
         # ✅ Si Gemini ajustó la velocidad, usarla (para cualquier nivel que decidió)
-        if hasattr(self, '_velocidad_ajustada'):
-            velocidad_final = self._velocidad_ajustada
-            print(f"[PLAN] Gemini ajustó velocidad para {nivel.upper()}: {velocidad_final}")
-            delattr(self, '_velocidad_ajustada')
+        if velocidad is not None:
+            velocidad_final = velocidad
+            logger.debug("Gemini ajustó velocidad para %s: %s", nivel.upper(), velocidad_final)
         else:
             velocidad_final = config['velocidad']
         
@@ -1,6 +1,19 @@
 from models.paseo import PaseoSession
 from config.database import db
+from services.user_game_stats_service import UserGameStatsService
+from services.resumen_diario_service import ResumenDiarioService
+from services.jobs.job_service import JobService
 from datetime import date
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def clave_analisis_derrota(sesion_id):
+    """Clave del job de Gemini que analiza una derrota en DIFICIL"""
+    return f'paseo.analisis_derrota:{sesion_id}'
+
 
 class PaseoService:
     """Servicio SIMPLIFICADO para Paseo - Patrón de Abecedario"""
@@ -35,15 +48,15 @@ class PaseoService:
             if not ultima_sesion:
                 # Primera sesión del usuario
                 cambio_nivel = True
-                print(f"[PASEO] PRIMERA SESIÓN - Nivel: {nivel_jugado}")
+                logger.debug("PRIMERA SESIÓN - Nivel: %s", nivel_jugado)
             elif ultima_sesion.fecha_juego < fecha_hoy:
                 # NUEVO DÍA: Resetear (regresa a nivel que IA decida)
                 cambio_nivel = True
-                print(f"[PASEO] NUEVO DÍA: {ultima_sesion.fecha_juego} -> {fecha_hoy}")
+                logger.debug("NUEVO DÍA: %s -> %s", ultima_sesion.fecha_juego, fecha_hoy)
             elif ultima_sesion.nivel_dificultad and ultima_sesion.nivel_dificultad != nivel_jugado:
                 # Cambio de nivel (FACIL→INTERMEDIO→DIFICIL)
                 cambio_nivel = True
-                print(f"[PASEO] CAMBIO DE NIVEL: {ultima_sesion.nivel_dificultad} -> {nivel_jugado}")
+                logger.debug("CAMBIO DE NIVEL: %s -> %s", ultima_sesion.nivel_dificultad, nivel_jugado)
             
             # Calcular precisión
             aciertos = session_data['total_aciertos']
@@ -82,18 +95,33 @@ class PaseoService:
             )
             
             db.session.add(nueva_sesion)
+            UserGameStatsService.registrar('paseo', nueva_sesion)
+            
+            # Derrota en DIFICIL: Gemini decide el próximo nivel en la cola de trabajos
+            # (lo lee start_session; mientras no termine se usa la lógica simple)
+            if resultado == 'derrota' and nivel_jugado == 'dificil' and PaseoService._gemini_activo():
+                db.session.flush()
+                JobService.encolar('paseo.analisis_derrota', {
+                    'user_id': user_id, 'aciertos': aciertos, 'meta': meta
+                }, user_id=user_id, clave=clave_analisis_derrota(nueva_sesion.id))
+            
             db.session.commit()
             
-            print(f"[PASEO] ✅ Sesión guardada - Nivel: {nivel_jugado}, Resultado: {resultado}, Cambio: {cambio_nivel}")
+            logger.info("Sesión guardada user_id=%s - Nivel: %s, Resultado: %s, Cambio: %s",
+                        user_id, nivel_jugado, resultado, cambio_nivel)
             
             return nueva_sesion, None
             
         except Exception as e:
             db.session.rollback()
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error en save_session user_id=%s", user_id)
             return None, str(e)
     
+    @staticmethod
+    def _gemini_activo():
+        """Sin GEMINI_API_KEY el job fallaría siempre: no se encola (misma condición que GeminiPaseoService)"""
+        return bool(os.getenv('GEMINI_API_KEY'))
+
     @staticmethod
     def get_ultima_sesion(user_id):
         """Obtiene la última sesión jugada (cualquier día)"""
@@ -106,6 +134,7 @@ class PaseoService:
                 return None, None
             
             return {
+                'id': ultima.id,
                 'nivel': ultima.nivel_dificultad,
                 'resultado': ultima.resultado,
                 'fecha': ultima.fecha_juego,
@@ -114,7 +143,7 @@ class PaseoService:
             }, None
             
         except Exception as e:
-            print(f"[PASEO ERROR] get_ultima_sesion: {str(e)}")
+            logger.error("Error en get_ultima_sesion user_id=%s: %s", user_id, e)
             return None, str(e)
     
     @staticmethod
@@ -127,44 +156,26 @@ class PaseoService:
             if fecha is None:
                 fecha = date.today()
             
-            # Obtener todas las sesiones del día
-            sesiones = PaseoSession.query.filter_by(
-                user_id=user_id,
-                fecha_juego=fecha
-            ).order_by(PaseoSession.created_at.asc()).all()
-            
-            if not sesiones:
+            # El día más reciente del usuario (el caso normal: hoy) sale de user_game_stats
+            stats = UserGameStatsService.obtener(user_id, 'paseo')
+            if stats is None or stats.ultimo_dia is None or fecha >= stats.ultimo_dia:
+                mismo_dia = stats is not None and stats.ultimo_dia == fecha
+                total_aciertos = stats.aciertos_dia if mismo_dia else 0
+                total_errores = stats.errores_dia if mismo_dia else 0
+                total_esferas = total_aciertos + total_errores
+                precision = (total_aciertos / total_esferas * 100) if total_esferas > 0 else 0
                 return {
                     'fecha': fecha.isoformat(),
-                    'precision': 0.0,
-                    'total_errores': 0,
-                    'total_aciertos': 0,
-                    'total_sesiones': 0
+                    'precision': round(precision, 1),
+                    'total_errores': total_errores,
+                    'total_aciertos': total_aciertos,
+                    'total_sesiones': stats.sesiones_dia if mismo_dia else 0
                 }, None
             
-            # Calcular totales
-            total_aciertos = 0
-            total_errores = 0
-            
-            for sesion in sesiones:
-                total_aciertos += sesion.esferas_rojas_atrapadas or 0
-                total_errores += (sesion.esferas_azules_atrapadas or 0) + (sesion.esferas_perdidas or 0)
-            
-            # Calcular precisión
-            total_esferas = total_aciertos + total_errores
-            precision = (total_aciertos / total_esferas * 100) if total_esferas > 0 else 0
-            
-            resultado = {
-                'fecha': fecha.isoformat(),
-                'precision': round(precision, 1),
-                'total_errores': total_errores,
-                'total_aciertos': total_aciertos,
-                'total_sesiones': len(sesiones)
-            }
-            
-            return resultado, None
+            # Días anteriores: una pasada por las sesiones del día
+            dia, = ResumenDiarioService.paseo(user_id, fecha)
+            return dia.estadisticas_finales(), None
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error en get_final_stats user_id=%s", user_id)
             return None, str(e)
@@ -0,0 +1,223 @@
+"""
+Métricas diarias en una sola pasada (Abecedario y Paseo)
+
+final-stats, daily-summary y daily-summaries (un rango de días) comparten
+este agregador: una consulta con solo las columnas que usan, ordenada por
+(fecha_juego, created_at) y leída como tuplas en lotes (yield_per); cada
+fila se suma a los acumuladores de su día en un único recorrido, sin
+hidratar objetos ni volver a recorrer las sesiones por cada métrica.
+
+Si el rango llega a lo archivado (services/archivo) esas sesiones pasan por
+los mismos acumuladores antes que las de la consulta.
+"""
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from config.database import db
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.particiones import por_dias
+from serializers.session_rows import abecedario_rows
+from services.archivo.archivo_service import ArchivoService
+
+LOTE = 500  # filas por fetch del cursor
+
+# Puntos base por nivel (final-stats de Abecedario)
+PUNTOS_BASE = {'facil': 10, 'intermedio': 25, 'dificil': 50}
+
+# Claves de Abecedario.to_dict(): las sesiones del daily-summary
+CAMPOS_SESION = [nombre for nombre, _ in abecedario_rows.columnas]
+COLUMNAS_ABECEDARIO = [columna for _, columna in abecedario_rows.columnas] + [Abecedario.nivel_jugado]
+COLUMNAS_PASEO = [PaseoSession.fecha_juego, PaseoSession.esferas_rojas_atrapadas,
+                  PaseoSession.esferas_azules_atrapadas, PaseoSession.esferas_perdidas]
+
+
+def puntos_palabra(nivel, sesion):
+    """Puntos de una palabra completada"""
+    multiplicador = 1.0
+
+    # Bonificación: Sin errores (+50%)
+    if sesion.cantidad_errores == 0:
+        multiplicador += 0.5
+
+    # Bonificación: Sin pistas en nivel difícil (+25%)
+    if sesion.pistas_usadas == 0 and nivel == 'dificil':
+        multiplicador += 0.25
+
+    # Bonificación: Tiempo rápido < 15s (+20%)
+    if sesion.tiempo_resolucion < 15:
+        multiplicador += 0.2
+
+    # Penalización: Errores (-5 puntos cada uno), mínimo 0
+    return max(0, int((PUNTOS_BASE[nivel] * multiplicador) - sesion.cantidad_errores * 5))
+
+
+def dias_del_rango(desde, hasta):
+    return [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+
+
+class DiaAbecedario:
+    """Acumuladores de un día de Abecedario"""
+
+    __slots__ = ('fecha', 'total', 'completadas', 'tiempo_total', 'tiempo_completadas', 'mejor_tiempo',
+                 'errores', 'pistas', 'puntos', 'por_nivel', 'sesiones')
+
+    def __init__(self, fecha, con_sesiones=False):
+        self.fecha = fecha
+        self.total = 0
+        self.completadas = 0
+        self.tiempo_total = 0
+        self.tiempo_completadas = 0
+        self.mejor_tiempo = None
+        self.errores = 0
+        self.pistas = 0
+        self.puntos = 0
+        self.por_nivel = {nivel: {'total': 0, 'completadas': 0, 'puntos': 0} for nivel in PUNTOS_BASE}
+        self.sesiones = [] if con_sesiones else None
+
+    def agregar(self, sesion):
+        nivel = sesion.nivel_jugado or 'facil'
+        del_nivel = self.por_nivel[nivel]
+        self.total += 1
+        del_nivel['total'] += 1
+        self.tiempo_total += sesion.tiempo_resolucion
+        self.errores += sesion.cantidad_errores
+        self.pistas += sesion.pistas_usadas
+
+        # Puntos y tiempos solo de las palabras completadas
+        if sesion.completado:
+            puntos = puntos_palabra(nivel, sesion)
+            self.completadas += 1
+            self.puntos += puntos
+            del_nivel['completadas'] += 1
+            del_nivel['puntos'] += puntos
+            self.tiempo_completadas += sesion.tiempo_resolucion
+            if self.mejor_tiempo is None or sesion.tiempo_resolucion < self.mejor_tiempo:
+                self.mejor_tiempo = sesion.tiempo_resolucion
+
+        if self.sesiones is not None:
+            self.sesiones.append({campo: getattr(sesion, campo) for campo in CAMPOS_SESION})
+
+    def resumen(self):
+        """GET /abecedario/daily-summary"""
+        if not self.total:
+            return {
+                'fecha': self.fecha.isoformat(),
+                'total_palabras': 0,
+                'palabras_completadas': 0,
+                'tiempo_total': 0,
+                'errores_totales': 0
+            }
+        resumen = {
+            'fecha': self.fecha.isoformat(),
+            'total_palabras': self.total,
+            'palabras_completadas': self.completadas,
+            'tiempo_total': self.tiempo_total,
+            'errores_totales': self.errores,
+            'promedio_tiempo': self.tiempo_total / self.total
+        }
+        if self.sesiones is not None:
+            resumen['sesiones'] = self.sesiones
+        return resumen
+
+    def estadisticas_finales(self):
+        """GET /abecedario/final-stats"""
+        if not self.total:
+            return {
+                'fecha': self.fecha.isoformat(),
+                'puntos_totales': 0,
+                'palabras_completadas': 0,
+                'palabras_totales': 0,
+                'por_nivel': {},
+                'metricas_globales': {
+                    'tiempo_promedio': 0,
+                    'mejor_tiempo': 0,
+                    'precision': 0,
+                    'total_errores': 0,
+                    'total_pistas': 0
+                }
+            }
+        tiempo_promedio = self.tiempo_completadas / self.completadas if self.completadas else 0
+        return {
+            'fecha': self.fecha.isoformat(),
+            'puntos_totales': self.puntos,
+            'palabras_completadas': self.completadas,
+            'palabras_totales': self.total,
+            'por_nivel': {nivel: dict(datos) for nivel, datos in self.por_nivel.items()},
+            'metricas_globales': {
+                'tiempo_promedio': round(tiempo_promedio, 2),
+                'mejor_tiempo': round(self.mejor_tiempo or 0, 2),
+                'precision': round(self.completadas / self.total * 100, 2),
+                'total_errores': self.errores,
+                'total_pistas': self.pistas
+            }
+        }
+
+
+class DiaPaseo:
+    """Acumuladores de un día de Paseo"""
+
+    __slots__ = ('fecha', 'total', 'aciertos', 'errores')
+
+    def __init__(self, fecha):
+        self.fecha = fecha
+        self.total = 0
+        self.aciertos = 0
+        self.errores = 0
+
+    def agregar(self, sesion):
+        self.total += 1
+        self.aciertos += sesion.esferas_rojas_atrapadas or 0
+        self.errores += (sesion.esferas_azules_atrapadas or 0) + (sesion.esferas_perdidas or 0)
+
+    def estadisticas_finales(self):
+        """GET /paseo/final-stats"""
+        total_esferas = self.aciertos + self.errores
+        precision = (self.aciertos / total_esferas * 100) if total_esferas > 0 else 0
+        return {
+            'fecha': self.fecha.isoformat(),
+            'precision': round(precision, 1),
+            'total_errores': self.errores,
+            'total_aciertos': self.aciertos,
+            'total_sesiones': self.total
+        }
+
+
+def _agregar(juego, modelo, columnas, user_id, desde, hasta, crear):
+    """{fecha_juego: acumulador} de los días con sesiones en [desde, hasta]"""
+    # Lo archivado primero: el cursor de la consulta queda abierto mientras se recorre
+    archivadas = ArchivoService.sesiones(juego, user_id, desde, hasta) if ArchivoService.alcanza(desde) else []
+    consulta = select(*columnas).where(
+        modelo.user_id == user_id,
+        modelo.fecha_juego >= desde,
+        modelo.fecha_juego <= hasta,
+        por_dias(modelo.created_at, desde, hasta)
+    ).order_by(modelo.fecha_juego, modelo.created_at)
+
+    dias = {}
+    for filas in (archivadas, db.session.execute(consulta.execution_options(yield_per=LOTE))):
+        for fila in filas:
+            dia = dias.get(fila.fecha_juego)
+            if dia is None:
+                dia = dias[fila.fecha_juego] = crear(fila.fecha_juego)
+            dia.agregar(fila)
+    return dias
+
+
+class ResumenDiarioService:
+
+    @staticmethod
+    def abecedario(user_id, desde, hasta=None, con_sesiones=False):
+        """[DiaAbecedario] de cada día de [desde, hasta] (hasta=None: solo desde), también los vacíos"""
+        hasta = hasta or desde
+        dias = _agregar('abecedario', Abecedario, COLUMNAS_ABECEDARIO, user_id, desde, hasta,
+                        lambda fecha: DiaAbecedario(fecha, con_sesiones))
+        return [dias.get(fecha) or DiaAbecedario(fecha, con_sesiones) for fecha in dias_del_rango(desde, hasta)]
+
+    @staticmethod
+    def paseo(user_id, desde, hasta=None):
+        """[DiaPaseo] de cada día de [desde, hasta] (hasta=None: solo desde), también los vacíos"""
+        hasta = hasta or desde
+        dias = _agregar('paseo', PaseoSession, COLUMNAS_PASEO, user_id, desde, hasta, DiaPaseo)
+        return [dias.get(fecha) or DiaPaseo(fecha) for fecha in dias_del_rango(desde, hasta)]
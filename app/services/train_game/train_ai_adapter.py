@@ -4,7 +4,11 @@ Implementa parámetros ADAPTATIVOS y FIJOS según BACKEND_CAMBIOS_PENDIENTES.md
 """
 import os
 import json
+import logging
 import google.generativeai as genai
+from middleware.metrics import medir_gemini
+
+logger = logging.getLogger(__name__)
 
 # ============================================================
 # VALORES FIJOS por nivel de dificultad
@@ -69,22 +73,35 @@ class TrainAIAdapter:
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
             self.use_ai = True
-            print("[TRAIN IA] Gemini 1.5 Flash configurado")
+            logger.info("Gemini 1.5 Flash configurado")
         else:
-            print("[TRAIN IA] Sin API key. Usando lógica clásica.")
+            logger.warning("Sin API key. Usando lógica clásica.")
             self.use_ai = False
 
-    def analyze_performance(self, session_data: dict, current_config: dict) -> dict:
-        """
-        Analiza el desempeño y retorna la nueva configuración.
-        Solo usa IA para casos ambiguos (50-85% precisión).
-        """
+    def _precision(self, session_data: dict) -> float:
         correct = session_data.get('correct_routing', 0) or 0
         wrong = session_data.get('wrong_routing', 0) or 0
         total = session_data.get('total_spawned', correct + wrong)
+        return (correct / total * 100) if total > 0 else 0
+
+    def requiere_ia(self, session_data: dict) -> bool:
+        """True si la sesión cae en la zona gris (50-85%, sin timeout) y hay Gemini"""
+        if not self.use_ai or session_data.get('completion_status', 'completed') == 'timeout':
+            return False
+        return ACCURACY_LOW <= self._precision(session_data) < ACCURACY_HIGH
+
+    def analizar_con_ia(self, session_data: dict, current_config: dict) -> dict:
+        """Solo Gemini, sin fallback: los errores se propagan para que el job se reintente"""
+        return self._analyze_with_gemini(session_data, current_config, self._precision(session_data))
+
+    def analyze_performance(self, session_data: dict, current_config: dict, usar_ia: bool = True) -> dict:
+        """
+        Analiza el desempeño y retorna la nueva configuración.
+        Solo usa IA para casos ambiguos (50-85% precisión); con usar_ia=False
+        siempre la lógica clásica.
+        """
         completion_status = session_data.get('completion_status', 'completed')
-        
-        accuracy = (correct / total * 100) if total > 0 else 0
+        accuracy = self._precision(session_data)
         
         # Casos obvios: usar lógica clásica
         if completion_status == 'timeout':
@@ -95,11 +112,11 @@ class TrainAIAdapter:
             return self._analyze_classic(session_data, current_config)
         
         # Zona gris (50-85%): usar IA si está disponible
-        if self.use_ai:
+        if self.use_ai and usar_ia:
             try:
                 return self._analyze_with_gemini(session_data, current_config, accuracy)
             except Exception as e:
-                print(f"[TRAIN IA] Error Gemini: {e}. Usando fallback.")
+                logger.warning("Error Gemini: %s. Usando fallback.", e)
                 return self._analyze_classic(session_data, current_config)
         else:
             return self._analyze_classic(session_data, current_config)
@@ -113,7 +130,8 @@ class TrainAIAdapter:
 Decide: si mejora tendencia→subir, si errores frecuentes→mantener/bajar.
 JSON:{{"d":"up"|"down"|"keep","r":"razón corta"}}"""
         
-        response = self.model.generate_content(prompt)
+        with medir_gemini('train_game'):
+            response = self.model.generate_content(prompt)
         response_text = response.text.strip()
         
         if '```' in response_text:
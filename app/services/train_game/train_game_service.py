@@ -1,7 +1,54 @@
 from models.train_game import TrainGameSession, TrainGameConfig
 from .train_ai_adapter import TrainAIAdapter
 from config.database import db
+from serializers.session_rows import train_rows
+from services.user_game_stats_service import UserGameStatsService
+from services.archivo.archivo_service import ArchivoService
+from services.jobs.job_service import JobService, tarea
+from config.invalidacion import CacheLocal, publicar
 from datetime import datetime
+from sqlalchemy import func
+
+def aplicar_config(config, next_config):
+    config.train_speed = next_config['train_speed']
+    config.spawn_rate = next_config['spawn_rate']
+    config.total_trains = next_config['total_trains']
+    config.color_count = next_config['color_count']
+    config.time_limit = next_config['time_limit']
+    config.difficulty_label = next_config['difficulty_label']
+    config.last_updated = datetime.utcnow()
+
+
+@tarea('trenes.analisis_ia', prioridad=10)
+def analizar_sesion_con_ia(parametros):
+    """
+    Job: decisión de Gemini para una sesión en la zona gris. Corrige la
+    configuración solo si la sesión sigue siendo la última del usuario.
+    """
+    session = db.session.get(TrainGameSession, parametros['session_id'])
+    if session is None:
+        return {'aplicado': False, 'motivo': 'sesión eliminada'}
+
+    analysis = TrainAIAdapter().analizar_con_ia(parametros['session_data'], parametros['config_anterior'])
+
+    ultima = db.session.query(func.max(TrainGameSession.session_id)).\
+        filter(TrainGameSession.user_id == session.user_id).scalar()
+    config = TrainGameConfig.query.filter_by(user_id=session.user_id).first() \
+        if ultima == session.session_id else None
+    if config is not None:
+        aplicar_config(config, analysis['next_config'])
+        publicar('trenes.config', session.user_id)
+    return {'aplicado': config is not None, 'ai_analysis': analysis}
+
+
+# Configuración vigente por usuario (GET /train-game/config/<id>), invalidada al cambiar
+_configs = CacheLocal('trenes.config')
+
+
+def _config_guardada(user_id):
+    config = TrainGameConfig.query.filter_by(user_id=user_id).first()
+    return config.to_dict() if config else None
+
 
 class TrainGameService:
     def __init__(self):
@@ -9,9 +56,9 @@ class TrainGameService:
         
     def get_config(self, user_id):
         """Obtiene o crea la configuración para un usuario"""
-        config = TrainGameConfig.query.filter_by(user_id=user_id).first()
+        current_config = _configs.obtener(user_id, lambda: _config_guardada(user_id))
         
-        if not config:
+        if current_config is None:
             # Configuración inicial (Nivel Fácil)
             initial = self.ai_adapter.get_initial_config()
             config = TrainGameConfig(
@@ -25,12 +72,13 @@ class TrainGameService:
             )
             db.session.add(config)
             db.session.commit()
+            current_config = config.to_dict()
             
         return {
             "success": True,
             "data": {
                 "user_id": user_id,
-                "current_config": config.to_dict()
+                "current_config": current_config
             }
         }
         
@@ -68,45 +116,53 @@ class TrainGameService:
         )
         
         db.session.add(new_session)
+        UserGameStatsService.registrar('trenes', new_session)
         
         current_config_dict = current_config_db.to_dict()
         
-        # 3. Análisis de IA
-        analysis = self.ai_adapter.analyze_performance(session_data, current_config_dict)
+        # 3. Análisis con lógica clásica (inmediato)
+        analysis = self.ai_adapter.analyze_performance(session_data, current_config_dict, usar_ia=False)
         
         # 4. Actualizar Configuración en BD
-        next_config = analysis['next_config']
-        current_config_db.train_speed = next_config['train_speed']
-        current_config_db.spawn_rate = next_config['spawn_rate']
-        current_config_db.total_trains = next_config['total_trains']
-        current_config_db.color_count = next_config['color_count']
-        current_config_db.time_limit = next_config['time_limit']
-        current_config_db.difficulty_label = next_config['difficulty_label']
-        current_config_db.last_updated = datetime.utcnow()
+        aplicar_config(current_config_db, analysis['next_config'])
+        publicar('trenes.config', user_id)
+        
+        # 5. Zona gris: Gemini decide en la cola de trabajos y corrige la config al terminar
+        db.session.flush()
+        session_id, job_id = new_session.session_id, None
+        if self.ai_adapter.requiere_ia(session_data):
+            job_id = JobService.encolar('trenes.analisis_ia', {
+                'session_id': session_id,
+                'session_data': session_data,
+                'config_anterior': current_config_dict
+            }, user_id=user_id).id
         
         db.session.commit()
         
         return {
             "success": True,
             "data": {
-                "session_id": new_session.session_id,
-                "ai_analysis": analysis
+                "session_id": session_id,
+                "ai_analysis": analysis,
+                "job_id": job_id
             }
         }
         
     def get_stats(self, user_id):
-        """Obtiene estadísticas acumuladas"""
-        sessions = TrainGameSession.query.filter_by(user_id=user_id).all()
-        
-        total_sessions = len(sessions)
-        if total_sessions == 0:
+        """
+        Obtiene estadísticas acumuladas: totales desde user_game_stats (clave
+        primaria) y ORDER BY finished_at DESC LIMIT 5 para las recientes
+        """
+        stats = UserGameStatsService.obtener(user_id, 'trenes')
+
+        if stats is None or not stats.sesiones:
             return {"success": True, "data": {"total_sessions": 0}}
-            
-        total_correct = sum(s.correct_routing for s in sessions)
-        total_wrong = sum(s.wrong_routing for s in sessions)
+
+        total_sessions, total_correct, total_wrong = stats.sesiones, stats.aciertos, stats.errores
         total_attempts = total_correct + total_wrong
         
         avg_accuracy = (total_correct / total_attempts * 100) if total_attempts > 0 else 0
+        recientes = train_rows.listar(user_id=user_id, limit=5, **ArchivoService.para_listado('trenes', user_id))
         
         return {
             "success": True,
@@ -114,6 +170,6 @@ class TrainGameService:
                 "total_sessions": total_sessions,
                 "total_trains_routed": total_correct,
                 "average_accuracy": round(avg_accuracy, 1),
-                "recent_sessions": [s.to_dict() for s in sessions[-5:]] # Últimas 5
+                "recent_sessions": recientes[::-1] # Últimas 5, de la más antigua a la más nueva
             }
         }
@@ -0,0 +1,257 @@
+"""
+Estadísticas acumuladas por usuario y juego (tabla user_game_stats)
+
+Cada save de sesión llama a registrar() antes de su commit: un único
+INSERT ... ON CONFLICT DO UPDATE suma la sesión a la fila del usuario en la
+misma transacción (O(1), sin leer el historial). Las lecturas de stats son
+una búsqueda por clave primaria.
+
+reconstruir() recalcula las filas desde las sesiones (después de cargas
+masivas o de borrar sesiones): recorre las sesiones en orden cronológico y
+las combina con la misma regla que el upsert (combinar()). Las sesiones
+archivadas (services/archivo) también cuentan.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, case, and_, or_, bindparam
+
+from config.database import db
+from models.user_game_stats import UserGameStats
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.memory_game import MemoryGameSession
+from models.train_game import TrainGameSession
+from services.archivo.archivo_service import ArchivoService
+
+# Columnas que se suman al combinar una sesión
+SUMAS = ('sesiones', 'completadas', 'aciertos', 'errores', 'sesiones_con_tiempo', 'suma_tiempo',
+         'suma_tiempo_cuadrado', 'suma_precision', 'suma_precision_cuadrado', 'suma_precision_completadas')
+POR_DIA = ('sesiones_dia', 'aciertos_dia', 'errores_dia')
+
+
+def _delta(momento, dia, completada, tiempo, precision, aciertos, errores):
+    """Fila de user_game_stats que representa una sola sesión"""
+    precision = float(precision or 0)
+    return {
+        'sesiones': 1,
+        'completadas': int(bool(completada)),
+        'aciertos': aciertos or 0,
+        'errores': errores or 0,
+        'sesiones_con_tiempo': int(tiempo is not None),
+        'suma_tiempo': float(tiempo or 0),
+        'suma_tiempo_cuadrado': float(tiempo or 0) ** 2,
+        'mejor_tiempo': tiempo if completada and tiempo is not None else None,
+        'suma_precision': precision,
+        'suma_precision_cuadrado': precision ** 2,
+        'suma_precision_completadas': precision if completada else 0.0,
+        'primera_partida': momento,
+        'ultima_partida': momento,
+        'ultimo_dia': dia,
+        'racha_dias': 1,
+        'racha_maxima': 1,
+        'sesiones_dia': 1,
+        'aciertos_dia': aciertos or 0,
+        'errores_dia': errores or 0
+    }
+
+
+def _delta_abecedario(s):
+    momento = s.created_at or datetime.utcnow()
+    return _delta(momento, s.fecha_juego or momento.date(), s.completado, s.tiempo_resolucion,
+                  100.0 if s.completado else 0.0, int(bool(s.completado)), s.cantidad_errores)
+
+
+def _delta_paseo(s):
+    momento = s.created_at or datetime.utcnow()
+    return _delta(momento, s.fecha_juego or momento.date(), s.resultado == 'victoria', s.duracion_segmento,
+                  s.precision, s.esferas_rojas_atrapadas, (s.esferas_azules_atrapadas or 0) + (s.esferas_perdidas or 0))
+
+
+def _delta_memoria(s):
+    momento = s.finished_at or datetime.utcnow()
+    # Cada par de cartas dadas vuelta sin coincidir es un error
+    errores = max((s.total_flips or 0) // 2 - (s.pairs_found or 0), 0)
+    return _delta(momento, momento.date(), s.completion_status == 'completed', s.elapsed_time_seconds,
+                  s.accuracy_percentage, s.pairs_found, errores)
+
+
+def _delta_trenes(s):
+    momento = s.finished_at or datetime.utcnow()
+    correctos, incorrectos = s.correct_routing or 0, s.wrong_routing or 0
+    precision = correctos * 100.0 / (correctos + incorrectos) if correctos + incorrectos else 0.0
+    return _delta(momento, momento.date(), s.completion_status == 'completed', None,
+                  precision, correctos, incorrectos)
+
+
+# juego -> (modelo, columna de orden cronológico, delta de una sesión, columnas que usa el delta)
+JUEGOS = {
+    'abecedario': (Abecedario, Abecedario.created_at, _delta_abecedario,
+                   ('fecha_juego', 'completado', 'tiempo_resolucion', 'cantidad_errores')),
+    'paseo': (PaseoSession, PaseoSession.created_at, _delta_paseo,
+              ('fecha_juego', 'resultado', 'duracion_segmento', 'precision', 'esferas_rojas_atrapadas',
+               'esferas_azules_atrapadas', 'esferas_perdidas')),
+    'memoria': (MemoryGameSession, MemoryGameSession.finished_at, _delta_memoria,
+                ('total_flips', 'pairs_found', 'completion_status', 'elapsed_time_seconds', 'accuracy_percentage')),
+    'trenes': (TrainGameSession, TrainGameSession.finished_at, _delta_trenes,
+               ('correct_routing', 'wrong_routing', 'completion_status')),
+}
+
+
+def combinar(actual, delta):
+    """
+    Suma una sesión (delta) a una fila acumulada. Misma regla que el upsert SQL:
+    una sesión de un día anterior a ultimo_dia no mueve la racha ni los contadores del día.
+    """
+    if actual is None:
+        return dict(delta)
+
+    nueva = {col: actual[col] + delta[col] for col in SUMAS}
+
+    mejor, candidato = actual['mejor_tiempo'], delta['mejor_tiempo']
+    nueva['mejor_tiempo'] = candidato if candidato is not None and (mejor is None or candidato < mejor) else mejor
+    nueva['primera_partida'] = min(actual['primera_partida'], delta['primera_partida'])
+    nueva['ultima_partida'] = max(actual['ultima_partida'], delta['ultima_partida'])
+
+    dia, ultimo = delta['ultimo_dia'], actual['ultimo_dia']
+    if ultimo == dia:
+        racha = actual['racha_dias']
+        nueva.update({col: actual[col] + delta[col] for col in POR_DIA})
+    elif ultimo is not None and ultimo > dia:
+        racha = actual['racha_dias']
+        dia = ultimo
+        nueva.update({col: actual[col] for col in POR_DIA})
+    else:
+        racha = actual['racha_dias'] + 1 if ultimo == dia - timedelta(days=1) else 1
+        nueva.update({col: delta[col] for col in POR_DIA})
+
+    nueva['ultimo_dia'] = dia
+    nueva['racha_dias'] = racha
+    nueva['racha_maxima'] = max(actual['racha_maxima'], racha)
+    return nueva
+
+
+def _upsert(dialecto):
+    """INSERT ... ON CONFLICT (user_id, juego) DO UPDATE con la regla de combinar()"""
+    if dialecto == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialecto == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+
+    t = UserGameStats.__table__.c
+    sentencia = insert(UserGameStats)
+    nueva = sentencia.excluded
+    ayer = bindparam('ayer', type_=db.Date)
+
+    mismo_dia = t.ultimo_dia == nueva.ultimo_dia
+    dia_anterior = t.ultimo_dia > nueva.ultimo_dia
+    racha = case((mismo_dia, t.racha_dias), (dia_anterior, t.racha_dias),
+                 (t.ultimo_dia == ayer, t.racha_dias + 1), else_=1)
+
+    valores = {col: t[col] + nueva[col] for col in SUMAS}
+    valores.update({col: case((mismo_dia, t[col] + nueva[col]), (dia_anterior, t[col]), else_=nueva[col])
+                    for col in POR_DIA})
+    valores.update({
+        'mejor_tiempo': case((and_(nueva.mejor_tiempo.isnot(None),
+                                   or_(t.mejor_tiempo.is_(None), nueva.mejor_tiempo < t.mejor_tiempo)),
+                              nueva.mejor_tiempo), else_=t.mejor_tiempo),
+        'primera_partida': case((nueva.primera_partida < t.primera_partida, nueva.primera_partida),
+                                else_=t.primera_partida),
+        'ultima_partida': case((nueva.ultima_partida > t.ultima_partida, nueva.ultima_partida),
+                               else_=t.ultima_partida),
+        'ultimo_dia': case((dia_anterior, t.ultimo_dia), else_=nueva.ultimo_dia),
+        'racha_dias': racha,
+        'racha_maxima': case((racha > t.racha_maxima, racha), else_=t.racha_maxima),
+    })
+    return sentencia.on_conflict_do_update(index_elements=[t.user_id, t.juego], set_=valores)
+
+
+class UserGameStatsService:
+
+    @staticmethod
+    def registrar(juego, sesion):
+        """
+        Suma la sesión a las estadísticas del usuario, sin commit: el commit
+        del save de la sesión confirma ambas cosas juntas.
+        """
+        delta = JUEGOS[juego][2](sesion)
+        sentencia = _upsert(db.session.get_bind().dialect.name)
+        if sentencia is not None:
+            db.session.execute(sentencia, {'user_id': sesion.user_id, 'juego': juego, **delta,
+                                           'ayer': delta['ultimo_dia'] - timedelta(days=1)})
+            return
+
+        # Otros motores: lectura con bloqueo de fila y la misma combinación en Python
+        fila = db.session.get(UserGameStats, (sesion.user_id, juego), with_for_update=True)
+        if fila is None:
+            db.session.add(UserGameStats(user_id=sesion.user_id, juego=juego, **delta))
+        else:
+            actual = {col: getattr(fila, col) for col in delta}
+            for col, valor in combinar(actual, delta).items():
+                setattr(fila, col, valor)
+
+    @staticmethod
+    def obtener(user_id, juego):
+        """Fila de estadísticas (o None si el usuario no jugó): búsqueda por clave primaria"""
+        return db.session.get(UserGameStats, (user_id, juego))
+
+    @staticmethod
+    def obtener_todos(user_id):
+        """{juego: UserGameStats} de los juegos que el usuario jugó, en una consulta"""
+        filas = db.session.execute(select(UserGameStats).where(UserGameStats.user_id == user_id)).scalars()
+        return {fila.juego: fila for fila in filas}
+
+    @staticmethod
+    def borrar(user_id, juegos=None):
+        """Elimina las estadísticas (al resetear el progreso), sin commit"""
+        condicion = UserGameStats.user_id == user_id
+        if juegos:
+            condicion = condicion & UserGameStats.juego.in_(juegos)
+        db.session.execute(delete(UserGameStats).where(condicion))
+
+    @staticmethod
+    def reconstruir(juego, condicion_usuarios=None, lote=5000):
+        """
+        Recalcula desde las sesiones las filas de `juego` de los usuarios que
+        cumplen condicion_usuarios (expresión sobre user_id; None = todos).
+        Una sola pasada por las sesiones en orden (user_id, fecha). Devuelve
+        la cantidad de filas escritas.
+        """
+        modelo, fecha, extraer, columnas = JUEGOS[juego]
+        condicion = UserGameStats.juego == juego
+        # Solo las columnas que usa el delta: las filas se leen como tuplas, sin hidratar objetos
+        consulta = select(modelo.user_id, fecha, *[getattr(modelo, c) for c in columnas]).\
+            order_by(modelo.user_id, fecha, _clave(modelo))
+        if condicion_usuarios is not None:
+            condicion = condicion & condicion_usuarios(UserGameStats.user_id)
+            consulta = consulta.where(condicion_usuarios(modelo.user_id))
+
+        db.session.execute(delete(UserGameStats).where(condicion))
+
+        # Las sesiones archivadas siguen contando; son las más viejas, se combinan primero
+        archivadas = {}
+        for user_id, sesion in ArchivoService.recorrer(juego, condicion_usuarios):
+            archivadas[user_id] = combinar(archivadas.get(user_id), extraer(sesion))
+
+        filas = []
+        actual, user_id = None, None
+        for sesion in db.session.execute(consulta.execution_options(yield_per=lote)):
+            if sesion.user_id != user_id:
+                if actual is not None:
+                    filas.append({'user_id': user_id, 'juego': juego, **actual})
+                actual, user_id = archivadas.pop(sesion.user_id, None), sesion.user_id
+            actual = combinar(actual, extraer(sesion))
+        if actual is not None:
+            filas.append({'user_id': user_id, 'juego': juego, **actual})
+        # Usuarios con todo su historial archivado
+        filas.extend({'user_id': user_id, 'juego': juego, **actual} for user_id, actual in archivadas.items())
+
+        for i in range(0, len(filas), lote):
+            db.session.execute(UserGameStats.__table__.insert(), filas[i:i + lote])
+        db.session.commit()
+        return len(filas)
+
+
+def _clave(modelo):
+    return modelo.__table__.primary_key.columns.values()[0]
@@ -43,22 +43,49 @@ async function fetchAPI(endpoint) {
 }
 
 // ========== LOAD ALL DATA ==========
+// Una sola petición a /admin/overview en lugar de una por tabla
 async function loadAllData() {
-    await Promise.all([
-        loadGeneralStats(),
-        loadMemoryData(),
-        loadAbecedarioData(),
-        loadPaseoData(),
-        loadTrainData(),
-        loadUsersDropdown()
-    ]);
+    const overview = await fetchAPI('/admin/overview');
+    if (overview && overview.success) {
+        loadGeneralStats(overview);
+        loadMemoryData(overview);
+        loadAbecedarioData(overview);
+        loadPaseoData(overview);
+        loadTrainData(overview);
+        loadUsersDropdown(overview);
+    }
+    loadPerformanceSummary();
     initCharts();
 }
 
+// ========== RENDIMIENTO (/admin/metrics) ==========
+async function loadPerformanceSummary() {
+    const data = await fetchAPI('/admin/metrics');
+    if (!data || !data.success) return;
+
+    const tbody = document.querySelector('#performanceTable tbody');
+    tbody.innerHTML = data.rutas.slice(0, 10).map(r => `
+        <tr>
+            <td>${r.metodo} ${r.ruta}</td>
+            <td>${r.peticiones}</td>
+            <td>${r.promedio_ms} ms</td>
+            <td>${r.p95_ms} ms</td>
+            <td>${r.consultas_promedio}</td>
+        </tr>
+    `).join('') || '<tr><td colspan="5">Sin datos todavía</td></tr>';
+
+    const gemini = Object.entries(data.gemini)
+        .map(([servicio, g]) => `${servicio}: ${g.llamadas} llamadas, ${g.promedio_ms} ms, ${g.errores} errores`);
+    const caches = Object.entries(data.caches)
+        .map(([cache, c]) => `${cache}: ${c.tasa_acierto}% aciertos`);
+    document.getElementById('performanceExtra').textContent =
+        [`🤖 Gemini — ${gemini.join(' · ') || 'sin llamadas'}`, `🗄️ Cachés — ${caches.join(' · ') || 'sin datos'}`].join('   |   ');
+}
+
 // ========== GENERAL STATS ==========
-async function loadGeneralStats() {
-    const usersData = await fetchAPI('/users');
-    if (usersData && usersData.users) {
+function loadGeneralStats(overview) {
+    const usersData = { users: overview.users };
+    if (usersData.users) {
         document.getElementById('totalUsers').textContent = usersData.users.length;
         const tbody = document.querySelector('#usersTable tbody');
         tbody.innerHTML = usersData.users.slice(0, 5).map(u => `
@@ -71,7 +98,7 @@ async function loadGeneralStats() {
         `).join('');
     }
 
-    const statsData = await fetchAPI('/admin/stats');
+    const statsData = overview.stats;
     if (statsData) {
         document.getElementById('totalGames').textContent = statsData.total_sessions || 0;
         document.getElementById('gamesToday').textContent = statsData.sessions_today || 0;
@@ -81,9 +108,9 @@ async function loadGeneralStats() {
 }
 
 // ========== MEMORY DATA ==========
-async function loadMemoryData() {
-    const sessionsData = await fetchAPI('/admin/memory-sessions');
-    if (sessionsData && sessionsData.sessions) {
+function loadMemoryData(overview) {
+    const sessionsData = { sessions: overview.memory_sessions };
+    if (sessionsData.sessions) {
         const tbody = document.querySelector('#memoryTable tbody');
         if (tbody) {
             tbody.innerHTML = sessionsData.sessions.map(s => `
@@ -100,8 +127,8 @@ async function loadMemoryData() {
         }
     }
 
-    const configsData = await fetchAPI('/admin/memory-configs');
-    if (configsData && configsData.configs) {
+    const configsData = { configs: overview.memory_configs };
+    if (configsData.configs) {
         const tbody = document.querySelector('#configTable tbody');
         if (tbody) {
             tbody.innerHTML = configsData.configs.map(c => `
@@ -117,9 +144,9 @@ async function loadMemoryData() {
 }
 
 // ========== ABECEDARIO DATA ==========
-async function loadAbecedarioData() {
-    const data = await fetchAPI('/admin/abecedario-sessions');
-    if (data && data.sessions) {
+function loadAbecedarioData(overview) {
+    const data = { sessions: overview.abecedario_sessions };
+    if (data.sessions) {
         const el = document.getElementById('abcCompleted');
         if (el) el.textContent = data.sessions.length;
 
@@ -141,9 +168,9 @@ async function loadAbecedarioData() {
 }
 
 // ========== PASEO DATA ==========
-async function loadPaseoData() {
-    const data = await fetchAPI('/admin/paseo-sessions');
-    if (data && data.sessions) {
+function loadPaseoData(overview) {
+    const data = { sessions: overview.paseo_sessions };
+    if (data.sessions) {
         const victorias = data.sessions.filter(s => s.resultado === 'victoria').length;
         const precisionPromedio = data.sessions.length > 0
             ? data.sessions.reduce((sum, s) => sum + (s.precision || 0), 0) / data.sessions.length
@@ -175,9 +202,9 @@ async function loadPaseoData() {
 }
 
 // ========== TRAIN DATA ==========
-async function loadTrainData() {
-    const data = await fetchAPI('/admin/train-sessions');
-    if (data && data.sessions) {
+function loadTrainData(overview) {
+    const data = { sessions: overview.train_sessions };
+    if (data.sessions) {
         const totalCorrect = data.sessions.reduce((sum, s) => sum + (s.correct_routing || 0), 0);
         const totalWrong = data.sessions.reduce((sum, s) => sum + (s.wrong_routing || 0), 0);
         const totalAttempts = totalCorrect + totalWrong;
@@ -207,9 +234,9 @@ async function loadTrainData() {
 }
 
 // ========== USER DROPDOWN ==========
-async function loadUsersDropdown() {
-    const usersData = await fetchAPI('/users');
-    if (usersData && usersData.users) {
+function loadUsersDropdown(overview) {
+    const usersData = { users: overview.users };
+    if (usersData.users) {
         const select = document.getElementById('userSelect');
         if (select) {
             select.innerHTML = '<option value="">-- Seleccione un usuario --</option>';
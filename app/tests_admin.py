@@ -0,0 +1,233 @@
+import unittest
+import json
+import gzip
+import os
+from datetime import datetime, date
+
+# Set testing environment BEFORE importing app
+os.environ['FLASK_ENV'] = 'testing'
+
+from app import app, db
+from models.user import User
+from models.abecedario import Abecedario
+from models.memory_game import MemoryGameSession, MemoryGameConfig
+from models.paseo import PaseoSession
+from models.train_game import TrainGameSession
+from serializers.session_rows import abecedario_rows, paseo_rows, memory_rows, train_rows
+from middleware import metrics
+
+class TestAdmin(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.app = app.test_client()
+
+        with app.app_context():
+            db.create_all()
+            user = User(nombre="AdminTestUser", password="password", edad=72, genero="F")
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+            db.session.add_all([
+                MemoryGameSession(user_id=user.id, total_pairs=3, pairs_found=3, accuracy_percentage=80.0,
+                                  completion_status='completed', finished_at=datetime.utcnow()),
+                MemoryGameConfig(user_id=user.id),
+                Abecedario(user_id=user.id, palabra_objetivo='CASA', longitud_palabra=4, tiempo_resolucion=12.5,
+                           cantidad_errores=0, pistas_usadas=0, completado=True, fecha_juego=date.today()),
+                PaseoSession(user_id=user.id, velocidad_esferas=3.0, intervalo_spawn=2.0, duracion_segmento=60,
+                             esferas_rojas_atrapadas=5, precision=100.0, resultado='victoria',
+                             fecha_juego=date.today()),
+                TrainGameSession(user_id=user.id, correct_routing=8, wrong_routing=2,
+                                 completion_status='completed', finished_at=datetime.utcnow())
+            ])
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_overview_matches_individual_endpoints(self):
+        """El overview devuelve lo mismo que los endpoints individuales"""
+        response = self.app.get('/admin/overview')
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(data['success'])
+
+        pares = {
+            'memory_sessions': ('/admin/memory-sessions', 'sessions'),
+            'memory_configs': ('/admin/memory-configs', 'configs'),
+            'abecedario_sessions': ('/admin/abecedario-sessions', 'sessions'),
+            'paseo_sessions': ('/admin/paseo-sessions', 'sessions'),
+            'train_sessions': ('/admin/train-sessions', 'sessions'),
+            'users': ('/users', 'users')
+        }
+        for clave, (url, campo) in pares.items():
+            individual = json.loads(self.app.get(url).data)
+            self.assertEqual(data[clave], individual[campo], clave)
+            self.assertEqual(len(data[clave]), 1, clave)
+
+        self.assertEqual(data['stats']['total_sessions'], 1)
+        self.assertEqual(data['memory_sessions'][0]['user_name'], 'AdminTestUser')
+
+    def test_stats_v2_all_games(self):
+        """Stats v2 reporta los cuatro juegos y la actividad global"""
+        response = self.app.get('/admin/stats/v2')
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(data['juegos']), {'memoria', 'abecedario', 'paseo', 'trenes'})
+        for juego in data['juegos'].values():
+            self.assertEqual(juego['total_sesiones'], 1)
+            self.assertEqual(juego['sesiones_hoy'], 1)
+            self.assertEqual(juego['usuarios_activos_7d'], 1)
+
+        self.assertEqual(data['juegos']['memoria']['precision_promedio'], 80.0)
+        self.assertEqual(data['juegos']['abecedario']['precision_promedio'], 100.0)
+        self.assertEqual(data['juegos']['trenes']['precision_promedio'], 80.0)
+        self.assertEqual(data['global']['total_sesiones'], 4)
+        self.assertEqual(data['global']['usuarios_activos_30d'], 1)
+
+    def test_row_serializers_match_to_dict(self):
+        """Los listados por columnas generan lo mismo que to_dict()"""
+        serializadores = [
+            (abecedario_rows, Abecedario), (paseo_rows, PaseoSession),
+            (memory_rows, MemoryGameSession), (train_rows, TrainGameSession)
+        ]
+        with app.app_context():
+            for serializador, modelo in serializadores:
+                esperado = [s.to_dict() for s in modelo.query.filter_by(user_id=self.user_id).all()]
+                self.assertEqual(serializador.listar(user_id=self.user_id), esperado, modelo.__name__)
+
+            con_usuario = memory_rows.listar(con_usuario=True)
+            self.assertEqual(con_usuario[0]['user_name'], 'AdminTestUser')
+
+    def test_compression(self):
+        """Respuestas grandes y assets se comprimen; las pequeñas no"""
+        with app.app_context():
+            db.session.add_all([
+                PaseoSession(user_id=self.user_id, velocidad_esferas=3.0, intervalo_spawn=2.0,
+                             duracion_segmento=60, fecha_juego=date.today())
+                for _ in range(50)
+            ])
+            db.session.commit()
+
+        url = f'/admin/user-paseo-sessions/{self.user_id}'
+        plano = self.app.get(url)
+        comprimido = self.app.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(comprimido.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', comprimido.headers['Vary'])
+        self.assertEqual(gzip.decompress(comprimido.data), plano.data)
+        self.assertNotIn('Content-Encoding', plano.headers)
+
+        pequeno = self.app.get('/admin/stats', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', pequeno.headers)
+
+        js = self.app.get('/static/admin_dashboard.js', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(js.headers['Content-Encoding'], 'gzip')
+        with open(os.path.join(app.static_folder, 'admin_dashboard.js'), 'rb') as f:
+            self.assertEqual(gzip.decompress(js.data), f.read())
+        js.close()
+
+    def test_static_assets_and_swagger(self):
+        """Dashboard con URLs con huella, assets inmutables y swagger generado de las rutas"""
+        html = self.app.get('/admin')
+        self.assertEqual(html.headers['Cache-Control'], 'no-cache')
+        url_js = next(l.split('"')[1] for l in html.data.decode('utf-8').splitlines()
+                      if 'admin_dashboard.js' in l)
+        self.assertIn('?v=', url_js)
+
+        js = self.app.get(url_js)
+        self.assertIn('immutable', js.headers['Cache-Control'])
+        revalidado = self.app.get(url_js, headers={'If-None-Match': js.headers['ETag']})
+        self.assertEqual(revalidado.status_code, 304)
+
+        spec = json.loads(self.app.get('/swagger.json').data)
+        self.assertIn('/admin/stats/v2', spec['paths'])
+        self.assertIn('post', spec['paths']['/paseo/start-session'])
+        parametro = spec['paths']['/memory-game/config/{user_id}']['get']['parameters'][0]
+        self.assertEqual(parametro['schema']['type'], 'integer')
+        # El detalle escrito a mano se conserva
+        self.assertIn('requestBody', spec['paths']['/register']['post'])
+
+    def test_metrics(self):
+        """/metrics expone latencia y consultas por ruta; /admin/metrics las resume"""
+        self.app.get('/admin/stats/v2')
+        texto = self.app.get('/metrics').data.decode('utf-8')
+        self.assertIn('http_request_duration_seconds_count{route="/admin/stats/v2",method="GET"}', texto)
+        self.assertIn('http_request_db_queries_bucket{route="/admin/stats/v2",le="1"}', texto)
+        self.assertIn('# TYPE db_query_duration_seconds histogram', texto)
+
+        resumen = json.loads(self.app.get('/admin/metrics').data)
+        ruta = next(r for r in resumen['rutas'] if r['ruta'] == '/admin/stats/v2')
+        self.assertGreaterEqual(ruta['consultas_promedio'], 1)
+
+        # Una petición más lenta que el último bucket no rompe el JSON
+        metrics.http_duracion.observar(60.0, '/lenta', 'GET')
+        respuesta = self.app.get('/admin/metrics').get_data(as_text=True)
+        self.assertNotIn('Infinity', respuesta)
+        lenta = next(r for r in json.loads(respuesta)['rutas'] if r['ruta'] == '/lenta')
+        self.assertEqual(lenta['p95_ms'], 10000.0)
+
+        # Una sentencia que falla no deja su inicio en la conexión
+        with app.app_context():
+            with db.engine.connect() as conexion:
+                with self.assertRaises(Exception):
+                    conexion.exec_driver_sql('SELECT * FROM tabla_inexistente')
+                self.assertEqual(conexion.info.get('metricas_inicio'), [])
+
+    def test_cli_mantenimiento(self):
+        """reset-progreso y reset-passwords: dry-run solo cuenta, el resto borra / actualiza por lotes"""
+        runner = app.test_cli_runner()
+        usuario = ['--usuario', str(self.user_id)]
+
+        resultado = runner.invoke(args=['mantenimiento', 'reset-progreso', *usuario, '--juego', 'memoria', '--dry-run'])
+        self.assertIn('memory_game_sessions: se borrarían 1 filas', resultado.output)
+        with app.app_context():
+            self.assertEqual(MemoryGameSession.query.count(), 1)
+
+        resultado = runner.invoke(args=['mantenimiento', 'reset-progreso', *usuario, '--lote', '1'])
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        with app.app_context():
+            for modelo in (MemoryGameSession, MemoryGameConfig, Abecedario, PaseoSession, TrainGameSession):
+                self.assertEqual(modelo.query.count(), 0, modelo.__tablename__)
+
+        resultado = runner.invoke(args=['mantenimiento', 'reset-passwords', *usuario, '--password', 'nueva'])
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        response = self.app.post('/login', json={'nombre': 'AdminTestUser', 'password': 'nueva'})
+        self.assertEqual(response.status_code, 200)
+
+        resultado = runner.invoke(args=['mantenimiento', 'reset-passwords'])
+        self.assertNotEqual(resultado.exit_code, 0)
+
+    def test_cli_rehash_passwords(self):
+        """rehash-passwords: hash propio por usuario con el costo pedido, compatible con /login"""
+        runner = app.test_cli_runner()
+        resultado = runner.invoke(args=['mantenimiento', 'rehash-passwords', '--usuario', str(self.user_id),
+                                        '--password', 'rehash', '--rondas', '4', '--procesos', '1'])
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        self.assertIn('hashes/s', resultado.output)
+        with app.app_context():
+            self.assertTrue(db.session.get(User, self.user_id).password.startswith('$2b$04$'))
+        response = self.app.post('/login', json={'nombre': 'AdminTestUser', 'password': 'rehash'})
+        self.assertEqual(response.status_code, 200)
+
+        # Ya tiene costo 4: nada que rehashear
+        resultado = runner.invoke(args=['mantenimiento', 'rehash-passwords', '--usuario', str(self.user_id),
+                                        '--password', 'x', '--rondas', '4', '--solo-costo-menor', '--dry-run'])
+        self.assertIn('0 usuarios', resultado.output)
+
+        # Sin dónde escribir las credenciales no se cambia ninguna contraseña
+        with app.app_context():
+            hash_actual = db.session.get(User, self.user_id).password
+        resultado = runner.invoke(args=['mantenimiento', 'rehash-passwords', '--usuario', str(self.user_id),
+                                        '--aleatorias', '--salida', '/directorio/inexistente/credenciales.csv',
+                                        '--rondas', '4', '--procesos', '1'])
+        self.assertNotEqual(resultado.exit_code, 0)
+        self.assertIn('No se cambió ninguna contraseña', resultado.output)
+        with app.app_context():
+            self.assertEqual(db.session.get(User, self.user_id).password, hash_actual)
+
+if __name__ == '__main__':
+    unittest.main()
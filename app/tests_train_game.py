@@ -9,6 +9,11 @@ from app import app, db
 from models.user import User
 from models.train_game import TrainGameConfig, TrainGameSession
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 class TestTrainGame(unittest.TestCase):
     def setUp(self):
         app.config['TESTING'] = True
@@ -109,5 +114,25 @@ class TestTrainGame(unittest.TestCase):
         self.assertEqual(next_config['color_count'], 3)
         print(f"\n✅ Test 3 Passed: Level Down triggered. Colors reduced to: {next_config['color_count']}")
 
+    @unittest.skipIf(msgpack is None, "msgpack no instalado")
+    def test_config_msgpack(self):
+        """Test 4: Accept: application/msgpack returns the same config as JSON"""
+        url = f'/train-game/config/{self.user_id}'
+        as_json = json.loads(self.app.get(url).data)
+        response = self.app.get(url, headers={'Accept': 'application/msgpack'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/msgpack')
+        self.assertIn('Accept', response.headers['Vary'])
+
+        data = msgpack.unpackb(response.data)
+        self.assertEqual(data, as_json)
+        self.assertEqual(list(data['data']['current_config']), sorted(data['data']['current_config']))
+        self.assertLess(len(response.data), len(json.dumps(as_json, separators=(',', ':'))))
+
+        # Without Accept (or */*) the default stays JSON
+        self.assertEqual(self.app.get(url, headers={'Accept': '*/*'}).mimetype, 'application/json')
+        print("\n✅ Test 4 Passed: msgpack negotiation")
+
 if __name__ == '__main__':
     unittest.main()
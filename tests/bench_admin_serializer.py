@@ -0,0 +1,85 @@
+"""
+MICRO-BENCHMARK - SERIALIZACIÓN DE LISTADOS ADMIN
+==================================================
+Compara filas/segundo de dos caminos para armar el JSON de /admin/*-sessions:
+
+- to_dict: query ORM (hidrata objetos) + join User + to_dict() + user_name + jsonify
+- tuplas:  with_entities (solo columnas) + dict por fila + jsonify
+
+Ambos serializan con el proveedor JSON de la app (orjson/msgspec si están instalados).
+
+Uso:
+    python tests/bench_admin_serializer.py
+    python tests/bench_admin_serializer.py --sesiones 100000 --repeticiones 3
+"""
+
+import os
+import json
+import argparse
+
+from bench_common import preparar_entorno, sembrar_usuarios, sembrar_sesiones, medir
+
+
+def main():
+    parser = argparse.ArgumentParser(description='to_dict() vs serializador por tuplas')
+    parser.add_argument('--db', default='sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_admin_serializer.db'))
+    parser.add_argument('--sesiones', type=int, default=50000, help='Sesiones por juego')
+    parser.add_argument('--usuarios', type=int, default=50)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    app, db = preparar_entorno(args.db)
+
+    from flask import jsonify
+    from models.user import User
+    from models.abecedario import Abecedario
+    from models.paseo import PaseoSession
+    from models.memory_game import MemoryGameSession
+    from models.train_game import TrainGameSession
+    from serializers.session_rows import abecedario_rows, paseo_rows, memory_rows, train_rows
+
+    casos = [
+        ('abecedario', Abecedario, Abecedario.created_at, abecedario_rows),
+        ('paseo', PaseoSession, PaseoSession.created_at, paseo_rows),
+        ('memoria', MemoryGameSession, MemoryGameSession.finished_at, memory_rows),
+        ('trenes', TrainGameSession, TrainGameSession.finished_at, train_rows)
+    ]
+
+    resultados = {}
+    with app.app_context(), app.test_request_context():
+        if Abecedario.query.count() == 0:
+            print(f"🌱 Sembrando {args.sesiones:,} sesiones por juego...")
+            sembrar_sesiones(db, sembrar_usuarios(db, args.usuarios), args.sesiones)
+
+        for juego, modelo, orden, serializador in casos:
+            filas = modelo.query.count()
+
+            def camino_to_dict():
+                sesiones = db.session.query(modelo, User.nombre).\
+                    join(User, modelo.user_id == User.id).\
+                    order_by(orden.desc()).all()
+                result = []
+                for sesion, user_name in sesiones:
+                    sesion_dict = sesion.to_dict()
+                    sesion_dict['user_name'] = user_name
+                    result.append(sesion_dict)
+                jsonify({'success': True, 'sessions': result}).get_data()
+                db.session.expunge_all()
+
+            def camino_tuplas():
+                jsonify({'success': True, 'sessions': serializador.listar(con_usuario=True)}).get_data()
+
+            mejor_dict, _ = medir(camino_to_dict, args.repeticiones)
+            mejor_tuplas, _ = medir(camino_tuplas, args.repeticiones)
+            resultados[juego] = {
+                'filas': filas,
+                'to_dict_filas_por_seg': round(filas / (mejor_dict / 1000)),
+                'tuplas_filas_por_seg': round(filas / (mejor_tuplas / 1000)),
+                'mejora': f"{mejor_dict / mejor_tuplas:.2f}x"
+            }
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
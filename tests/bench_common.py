@@ -0,0 +1,194 @@
+"""
+Utilidades compartidas por los benchmarks
+==========================================
+Prepara la app contra una base de datos propia (DATABASE_URL) y siembra
+sesiones de los cuatro juegos con inserts masivos (executemany por lotes).
+También define una petición de ejemplo por endpoint (PETICIONES /
+peticion_para) y el cálculo de percentiles.
+
+Uso típico dentro de un benchmark:
+
+    from bench_common import preparar_entorno
+    app, db = preparar_entorno('sqlite:///bench.db')
+"""
+
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+
+def preparar_entorno(db_url):
+    """Configura variables de entorno e importa la app apuntando a db_url"""
+    os.environ['DATABASE_URL'] = db_url
+    os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+
+    from app import app, db
+    with app.app_context():
+        db.create_all()
+    return app, db
+
+
+# Peticiones de ejemplo para los endpoints que no son GET /ruta/<user_id>.
+# '{user_id}' se reemplaza por el id del usuario; '{n}' por un contador (nombres únicos).
+PETICIONES = {
+    'static': ('GET', '/static/admin_dashboard.css', None),
+    'swagger_ui.static': ('GET', '/api/docs/dist/swagger-ui.css', None),
+    'swagger_ui.show': ('GET', '/api/docs/', None),
+    'register': ('POST', '/register', {'nombre': 'NuevoUsuario{n}', 'password': 'clave', 'edad': 70, 'genero': 'F'}),
+    'login': ('POST', '/login', {'nombre': 'UsuarioPrueba', 'password': 'clave'}),
+    'save_abecedario_session': ('POST', '/abecedario/session', {
+        'user_id': '{user_id}', 'palabra_objetivo': 'CASA', 'tiempo_resolucion': 10.0, 'cantidad_errores': 1,
+        'pistas_usadas': 0, 'completado': True, 'nivel_dificultad': 'facil'}),
+    'submit_memory_results': ('POST', '/memory-game/submit-results', {
+        'user_id': '{user_id}', 'session_data': {
+            'completion_status': 'completed', 'total_flips': 12, 'pairs_found': 3, 'total_pairs': 3,
+            'elapsed_time': 45.5, 'time_limit': 60, 'accuracy': 75.0}}),
+    'paseo.start_session': ('POST', '/paseo/start-session', {'user_id': '{user_id}'}),
+    'paseo.get_next_level': ('POST', '/paseo/get-next-level', {'user_id': '{user_id}'}),
+    'paseo.save_session': ('POST', '/paseo/save-session', {
+        'user_id': '{user_id}', 'nivel_dificultad': 'facil', 'meta_aciertos': 5, 'total_aciertos': 5,
+        'total_errores_incorrecto': 1, 'total_errores_perdidas': 0, 'duracion_total': 60.0, 'completado': True}),
+    'paseo.report_metrics': ('POST', '/paseo/report-metrics', {'user_id': '{user_id}'}),
+    'train_game.submit_results': ('POST', '/train-game/submit-results', {
+        'user_id': '{user_id}', 'session_data': {
+            'train_speed': 3.0, 'color_count': 3, 'spawn_rate': 5.0, 'total_spawned': 10,
+            'correct_routing': 8, 'wrong_routing': 2, 'completion_status': 'completed'}}),
+    'admin_export': ('GET', '/admin/export/memoria', None),
+    'get_job': ('GET', '/jobs/1', None),
+}
+
+
+def endpoints_registrados(app):
+    return sorted({regla.endpoint for regla in app.url_map.iter_rules()})
+
+
+def peticion_para(app, endpoint, user_id, n=0):
+    """(metodo, url, cuerpo_json) de ejemplo para un endpoint de la app"""
+    if endpoint in PETICIONES:
+        metodo, url, cuerpo = PETICIONES[endpoint]
+        if cuerpo is not None:
+            cuerpo = {k: (user_id if v == '{user_id}' else v.format(n=n) if isinstance(v, str) else v)
+                      for k, v in cuerpo.items()}
+        return metodo, url, cuerpo
+
+    regla = next(r for r in app.url_map.iter_rules() if r.endpoint == endpoint)
+    metodo = sorted(regla.methods - {'HEAD', 'OPTIONS'})[0]
+    return metodo, regla.rule.replace('<int:user_id>', str(user_id)), None
+
+
+def percentiles(muestras_ms, ps=(50, 95, 99)):
+    """{'p50_ms': ..., ...} por rango más cercano sobre las muestras en milisegundos"""
+    ordenadas = sorted(muestras_ms)
+    if not ordenadas:
+        return {f'p{p}_ms': None for p in ps}
+    return {f'p{p}_ms': round(ordenadas[max(0, -(-len(ordenadas) * p // 100) - 1)], 2) for p in ps}
+
+
+def medir(funcion, repeticiones=5):
+    """Ejecuta funcion N veces y devuelve (mejor, promedio) en milisegundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tiempos), sum(tiempos) / len(tiempos)
+
+
+def sembrar_usuarios(db, n_usuarios, prefijo='bench'):
+    """Crea usuarios de prueba y devuelve sus ids"""
+    from sqlalchemy import insert
+    from models.user import User
+
+    filas = [{
+        'nombre': f'{prefijo}_{i}_{int(time.time())}',
+        'password': 'x',
+        'edad': 65 + (i % 25),
+        'genero': 'M' if i % 2 == 0 else 'F'
+    } for i in range(n_usuarios)]
+    db.session.execute(insert(User), filas)
+    db.session.commit()
+    return [u.id for u in User.query.filter(User.nombre.like(f'{prefijo}_%')).all()]
+
+
+def _insertar_por_lotes(db, modelo, generador, total, lote):
+    from sqlalchemy import insert
+
+    insertadas = 0
+    while insertadas < total:
+        n = min(lote, total - insertadas)
+        db.session.execute(insert(modelo), [generador() for _ in range(n)])
+        db.session.commit()
+        insertadas += n
+
+
+def sembrar_sesiones(db, user_ids, sesiones_por_juego, dias=365, lote=10000, semilla=42):
+    """
+    Inserta sesiones_por_juego filas en cada tabla de sesiones, repartidas al
+    azar entre user_ids y en los últimos `dias` días. Devuelve filas/segundo.
+    """
+    from models.abecedario import Abecedario
+    from models.paseo import PaseoSession
+    from models.memory_game import MemoryGameSession
+    from models.train_game import TrainGameSession
+
+    rnd = random.Random(semilla)
+    ahora = datetime.utcnow()
+
+    def fecha():
+        return ahora - timedelta(seconds=rnd.randint(0, dias * 86400))
+
+    def abecedario():
+        creada = fecha()
+        return {
+            'user_id': rnd.choice(user_ids), 'palabra_objetivo': 'CASA', 'longitud_palabra': 4,
+            'tiempo_resolucion': rnd.uniform(5, 60), 'cantidad_errores': rnd.randint(0, 4),
+            'pistas_usadas': rnd.randint(0, 2), 'completado': rnd.random() < 0.7,
+            'nivel_jugado': rnd.choice(['facil', 'intermedio', 'dificil']), 'cambio_nivel': False,
+            'created_at': creada, 'fecha_juego': creada.date()
+        }
+
+    def paseo():
+        creada = fecha()
+        aciertos = rnd.randint(0, 10)
+        errores = rnd.randint(0, 6)
+        return {
+            'user_id': rnd.choice(user_ids), 'created_at': creada, 'fecha_juego': creada.date(),
+            'velocidad_esferas': 3.0, 'intervalo_spawn': 2.0, 'duracion_segmento': 60.0,
+            'esferas_rojas_atrapadas': aciertos, 'esferas_azules_atrapadas': errores, 'esferas_perdidas': 0,
+            'precision': aciertos / (aciertos + errores) * 100 if aciertos + errores else 0,
+            'nivel_dificultad': rnd.choice(['facil', 'intermedio', 'dificil']),
+            'resultado': rnd.choice(['victoria', 'derrota']), 'meta_aciertos': 5, 'sesion_completa': True
+        }
+
+    def memoria():
+        terminada = fecha()
+        return {
+            'user_id': rnd.choice(user_ids), 'difficulty_level': 'easy', 'total_pairs': 4, 'grid_size': '2x4',
+            'total_flips': rnd.randint(8, 30), 'pairs_found': rnd.randint(0, 4),
+            'elapsed_time_seconds': rnd.uniform(20, 90), 'accuracy_percentage': rnd.uniform(20, 100),
+            'completion_status': rnd.choice(['completed', 'timeout']),
+            'started_at': terminada - timedelta(seconds=90), 'finished_at': terminada
+        }
+
+    def trenes():
+        terminada = fecha()
+        return {
+            'user_id': rnd.choice(user_ids), 'train_speed': 3.0, 'color_count': 3, 'spawn_rate': 10.0,
+            'total_spawned': 10, 'correct_routing': rnd.randint(0, 10), 'wrong_routing': rnd.randint(0, 5),
+            'crash_count': 0, 'completion_status': 'completed',
+            'started_at': terminada - timedelta(seconds=90), 'finished_at': terminada
+        }
+
+    inicio = time.perf_counter()
+    for modelo, generador in [(Abecedario, abecedario), (PaseoSession, paseo),
+                              (MemoryGameSession, memoria), (TrainGameSession, trenes)]:
+        _insertar_por_lotes(db, modelo, generador, sesiones_por_juego, lote)
+    segundos = time.perf_counter() - inicio
+
+    return (sesiones_por_juego * 4) / segundos if segundos else 0
@@ -0,0 +1,69 @@
+"""
+BENCHMARK - PROVEEDOR JSON
+===========================
+Mide /admin/user-paseo-sessions/<user_id> con 10.000 sesiones de un usuario
+usando cada backend JSON disponible (stdlib, orjson, msgspec) a través del
+test client de Flask.
+
+Uso:
+    python tests/bench_json_provider.py
+    python tests/bench_json_provider.py --sesiones 20000 --repeticiones 10
+"""
+
+import os
+import json
+import argparse
+
+from bench_common import preparar_entorno, sembrar_usuarios, medir
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backends JSON sobre /admin/user-paseo-sessions')
+    parser.add_argument('--db', default='sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_json_provider.db'))
+    parser.add_argument('--sesiones', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    app, db = preparar_entorno(args.db)
+
+    from bench_common import sembrar_sesiones
+    from models.paseo import PaseoSession
+    from config import json_provider
+    from config.json_provider import FastJSONProvider
+
+    with app.app_context():
+        if PaseoSession.query.count() == 0:
+            print(f"🌱 Sembrando {args.sesiones:,} sesiones de paseo para un usuario...")
+            sembrar_sesiones(db, sembrar_usuarios(db, 1, prefijo='bench_json'), args.sesiones)
+        user_id = PaseoSession.query.first().user_id
+        filas = PaseoSession.query.filter_by(user_id=user_id).count()
+
+    backends = ['stdlib']
+    if json_provider.orjson is not None:
+        backends.append('orjson')
+    if json_provider.msgspec is not None:
+        backends.append('msgspec')
+
+    client = app.test_client()
+    url = f'/admin/user-paseo-sessions/{user_id}'
+    proveedor_original = app.json
+    resultados = {'sesiones': filas}
+
+    for backend in backends:
+        app.json = FastJSONProvider(app, backend=backend)
+        respuesta = client.get(url)
+        assert respuesta.status_code == 200, respuesta.data[:200]
+
+        mejor, promedio = medir(lambda: client.get(url).get_data(), args.repeticiones)
+        resultados[backend] = {
+            'mejor_ms': round(mejor, 1),
+            'promedio_ms': round(promedio, 1),
+            'bytes': len(respuesta.data)
+        }
+
+    app.json = proveedor_original
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+BENCHMARK - COSTO DEL LOGGING POR PETICIÓN
+===========================================
+Mide la latencia media de GET /memory-game/config/<id> y GET /train-game/config/<id>
+(test client de Flask) en tres escenarios:
+
+- sin_logs:  logging deshabilitado (referencia)
+- antes:     el esquema anterior: StreamHandler síncrono + el bloque de ~6 líneas
+             INFO con banners que emitían los controladores en cada petición
+- despues:   QueueHandler + listener en segundo plano, request_id, log de
+             acceso muestreado y logs de detalle en DEBUG
+
+La salida de los logs va a /dev/null para medir solo el costo en la petición.
+
+Uso:
+    python tests/bench_logging.py
+    python tests/bench_logging.py --peticiones 5000
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+
+from bench_common import preparar_entorno, sembrar_usuarios
+
+
+def _bloque_anterior(logger, ruta, user_id, config):
+    """Reproduce el logging por petición que tenían los controladores antes del cambio"""
+    logger.info("=" * 80)
+    logger.info(f"📥 REQUEST | GET {ruta}")
+    logger.info(f"   User ID: {user_id}")
+    logger.info("📤 RESPONSE | Status: 200 OK")
+    logger.info(f"   Config: {config}")
+    logger.info("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Overhead del logging por petición')
+    parser.add_argument('--db', default='sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_logging.db'))
+    parser.add_argument('--peticiones', type=int, default=2000)
+    args = parser.parse_args()
+
+    app, db = preparar_entorno(args.db)
+
+    from flask import request
+    from config import logging_config
+
+    with app.app_context():
+        user_id = sembrar_usuarios(db, 1, prefijo='bench_log')[0]
+
+    modo = {'antes': False}
+
+    @app.after_request
+    def emular_anterior(response):
+        if modo['antes']:
+            _bloque_anterior(logger_antes, request.path, user_id, response.get_json(silent=True))
+        return response
+
+    client = app.test_client()
+    urls = [f'/memory-game/config/{user_id}', f'/train-game/config/{user_id}']
+    for url in urls:
+        assert client.get(url).status_code == 200
+
+    devnull = open(os.devnull, 'w')
+    raiz = logging.getLogger()
+    manejador_cola = raiz.handlers[0]
+    logging_config._listener.handlers[0].setStream(devnull)
+    logger_antes = logging.getLogger('bench.antes')
+
+    def correr():
+        """Mejor de 3 rondas, en microsegundos por petición"""
+        rondas = []
+        for _ in range(3):
+            inicio = time.perf_counter()
+            for i in range(args.peticiones):
+                client.get(urls[i % len(urls)])
+            rondas.append((time.perf_counter() - inicio) * 1_000_000 / args.peticiones)
+        return min(rondas)
+
+    resultados = {'peticiones': args.peticiones}
+
+    logging.disable(logging.CRITICAL)
+    resultados['sin_logs_us'] = round(correr(), 1)
+    logging.disable(logging.NOTSET)
+
+    sincrono = logging.StreamHandler(devnull)
+    sincrono.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    raiz.removeHandler(manejador_cola)
+    raiz.addHandler(sincrono)
+    app.config['LOG_ACCESS_SAMPLE_RATE'] = 0.0
+    modo['antes'] = True
+    resultados['antes_us'] = round(correr(), 1)
+    modo['antes'] = False
+    raiz.removeHandler(sincrono)
+    raiz.addHandler(manejador_cola)
+
+    app.config['LOG_ACCESS_SAMPLE_RATE'] = 0.1
+    resultados['despues_us'] = round(correr(), 1)
+
+    resultados['overhead_antes_us'] = round(resultados['antes_us'] - resultados['sin_logs_us'], 1)
+    resultados['overhead_despues_us'] = round(resultados['despues_us'] - resultados['sin_logs_us'], 1)
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
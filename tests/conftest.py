@@ -0,0 +1,66 @@
+"""
+Fixtures de pytest compartidas
+
+    def test_algo(cliente, presupuesto_consultas):
+        with presupuesto_consultas(3, 'GET /users'):
+            cliente.get('/users')
+
+presupuesto_consultas falla el test si el bloque ejecuta más consultas SQL que
+las declaradas, mostrando las formas repetidas (posibles N+1).
+"""
+import os
+import sys
+from contextlib import contextmanager
+
+# Set testing environment BEFORE importing app
+os.environ['FLASK_ENV'] = 'testing'
+os.environ.setdefault('GEMINI_API_KEY', 'testing')
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import pytest
+import google.generativeai as genai
+from unittest import mock
+
+from app import app, db
+from middleware.query_profiler import perfilar
+from config import invalidacion
+
+
+@pytest.fixture
+def cliente():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+    yield app.test_client()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    # Las cachés en memoria no deben pasar de un test al siguiente (los ids se repiten)
+    invalidacion.aplicar_todo()
+
+
+@pytest.fixture
+def sin_gemini():
+    """Las llamadas a Gemini fallan al instante: los servicios usan su lógica local"""
+    with mock.patch.object(genai.GenerativeModel, 'generate_content',
+                           side_effect=RuntimeError('Gemini deshabilitado en tests')):
+        yield
+
+
+@pytest.fixture
+def presupuesto_consultas():
+    with app.app_context():
+        motor = db.engine
+
+    @contextmanager
+    def verificar(maximo, etiqueta=''):
+        with perfilar(motor) as perfil:
+            yield perfil
+        if perfil.total > maximo:
+            pytest.fail(f'{etiqueta}: {perfil.total} consultas, presupuesto {maximo}\n{perfil.informe()}',
+                        pytrace=False)
+
+    return verificar
@@ -0,0 +1,116 @@
+"""
+Archivo en frío (flask archivo archivar): las sesiones viejas salen de las
+tablas de los juegos pero el historial, la evolución y user_game_stats
+siguen contándolas.
+
+    python -m pytest tests/tests_archivo.py
+"""
+from datetime import datetime, timedelta
+
+from app import app, db
+from models.user import User
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.memory_game import MemoryGameSession
+from models.archivo import SesionArchivada
+from services.user_game_stats_service import UserGameStatsService
+
+VIEJA = datetime.utcnow() - timedelta(days=900)
+RECIENTE = datetime.utcnow() - timedelta(hours=1)
+
+
+def _usuario_con_historial():
+    with app.app_context():
+        user = User(nombre='Archivo', password='x', edad=75, genero='F')
+        db.session.add(user)
+        db.session.flush()
+        for creada, completado in [(VIEJA, True), (VIEJA + timedelta(days=40), False), (RECIENTE, True)]:
+            db.session.add(Abecedario(user_id=user.id, palabra_objetivo='SOL', longitud_palabra=3,
+                                      tiempo_resolucion=8.0, completado=completado, nivel_jugado='facil',
+                                      created_at=creada, fecha_juego=creada.date()))
+            db.session.add(PaseoSession(user_id=user.id, created_at=creada, fecha_juego=creada.date(),
+                                        velocidad_esferas=3.0, intervalo_spawn=2.0, duracion_segmento=30.0,
+                                        esferas_rojas_atrapadas=5, resultado='victoria', nivel_dificultad='facil'))
+            db.session.add(MemoryGameSession(user_id=user.id, total_pairs=4, pairs_found=4, completion_status='completed',
+                                             started_at=creada, finished_at=creada))
+        db.session.commit()
+        UserGameStatsService.reconstruir('abecedario')
+        return user.id
+
+
+def _archivar():
+    resultado = app.test_cli_runner().invoke(args=['archivo', 'archivar'])
+    assert resultado.exit_code == 0, resultado.output
+    return resultado.output
+
+
+def test_archivar_y_leer_de_forma_transparente(cliente):
+    user_id = _usuario_con_historial()
+    evolucion = cliente.get(f'/abecedario/evolution/{user_id}').get_json()
+    paseo = cliente.get(f'/paseo/evolution/{user_id}').get_json()
+    with app.app_context():
+        stats = UserGameStatsService.obtener(user_id, 'abecedario').to_dict()
+
+    assert 'abecedario: 2 sesiones de 1 usuarios archivadas' in _archivar()
+    with app.app_context():
+        assert Abecedario.query.count() == 1 and PaseoSession.query.count() == 1
+        # Un bloque por mes
+        assert SesionArchivada.query.filter_by(juego='abecedario').count() == 2
+
+    assert cliente.get(f'/abecedario/evolution/{user_id}').get_json() == evolucion
+    assert cliente.get(f'/paseo/evolution/{user_id}').get_json() == paseo
+
+    historial = cliente.get(f'/abecedario/history/{user_id}').get_json()
+    assert historial['total'] == 3
+    rango = cliente.get(f'/abecedario/history/{user_id}?fecha_inicio={VIEJA.date()}'
+                        f'&fecha_fin={VIEJA.date() + timedelta(days=10)}').get_json()
+    assert rango['total'] == 1 and rango['sesiones'][0]['completado'] is True
+
+    # Las estadísticas no cambian, ni al recalcularlas desde las sesiones
+    with app.app_context():
+        UserGameStatsService.reconstruir('abecedario')
+        assert UserGameStatsService.obtener(user_id, 'abecedario').to_dict() == stats
+
+
+def test_panel_y_exportacion_incluyen_lo_archivado(cliente):
+    user_id = _usuario_con_historial()
+    rutas = [f'/admin/user-memory-sessions/{user_id}', f'/admin/user-abecedario-sessions/{user_id}',
+             '/admin/memory-sessions', '/admin/train-sessions']
+    antes = [cliente.get(ruta).get_json() for ruta in rutas]
+    exportado = cliente.get('/admin/export/memoria').get_data(as_text=True)
+
+    assert 'memoria: 2 sesiones de 1 usuarios archivadas' in _archivar()
+    with app.app_context():
+        assert MemoryGameSession.query.count() == 1
+
+    assert [cliente.get(ruta).get_json() for ruta in rutas] == antes
+    assert antes[0]['sessions'][-1]['finished_at'][:10] == str(VIEJA.date())
+    assert cliente.get('/admin/export/memoria').get_data(as_text=True) == exportado
+    # Rango solo de lo archivado
+    solo_viejas = cliente.get(f'/admin/export/memoria?to={VIEJA.date() + timedelta(days=10)}').get_data(as_text=True)
+    assert len(solo_viejas.splitlines()) == 2
+
+
+def test_archivar_de_nuevo_combina_y_restaurar(cliente):
+    user_id = _usuario_con_historial()
+    _archivar()
+    with app.app_context():
+        # Una sesión vieja cargada tarde cae en un bloque que ya existe
+        db.session.add(Abecedario(user_id=user_id, palabra_objetivo='MAR', longitud_palabra=3, tiempo_resolucion=4.0,
+                                  completado=True, created_at=VIEJA + timedelta(hours=2), fecha_juego=VIEJA.date()))
+        db.session.commit()
+    _archivar()
+    with app.app_context():
+        bloque = SesionArchivada.query.filter_by(juego='abecedario', user_id=user_id).order_by(SesionArchivada.mes).first()
+        assert bloque.cantidad == 2
+
+    resultado = app.test_cli_runner().invoke(args=['archivo', 'restaurar', '--usuario', str(user_id)])
+    assert 'abecedario: 3 sesiones' in resultado.output
+    with app.app_context():
+        assert Abecedario.query.filter_by(user_id=user_id).count() == 4
+        assert SesionArchivada.query.count() == 0
+
+
+def test_meses_menor_al_horizonte_de_lectura(cliente):
+    resultado = app.test_cli_runner().invoke(args=['archivo', 'archivar', '--meses', '1'])
+    assert resultado.exit_code != 0 and 'ARCHIVO_MESES' in resultado.output
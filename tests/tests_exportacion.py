@@ -0,0 +1,100 @@
+"""
+Exportación en streaming de sesiones (GET /admin/export/<juego>)
+
+    python -m pytest tests/tests_exportacion.py
+"""
+import io
+import csv
+from datetime import datetime
+
+import pytest
+
+from app import app, db
+from models.user import User
+from models.memory_game import MemoryGameSession
+from serializers import export
+
+
+@pytest.fixture
+def usuarios(cliente):
+    """Dos usuarios con 10 sesiones de memoria cada uno, del 1 al 10 de marzo"""
+    with app.app_context():
+        ids = []
+        for nombre in ('Ana', 'José'):
+            user = User(nombre=nombre, password='x', edad=75, genero='F')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all([
+                MemoryGameSession(user_id=user.id, total_pairs=4, pairs_found=dia % 5, total_flips=10,
+                                  completion_status='completed', elapsed_time_seconds=dia * 1.5,
+                                  ai_reason=f'día {dia}', finished_at=datetime(2026, 3, dia, 12))
+                for dia in range(1, 11)])
+            ids.append(user.id)
+        db.session.commit()
+        return ids
+
+
+def _csv(response):
+    assert response.status_code == 200
+    texto = response.get_data(as_text=True)
+    assert texto.startswith('\ufeff')
+    return list(csv.DictReader(io.StringIO(texto[1:])))
+
+
+def test_csv_completo_en_lotes(cliente, usuarios, monkeypatch):
+    monkeypatch.setattr(export, 'EXPORT_LOTE', 3)
+    response = cliente.get('/admin/export/memoria')
+
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'memoria.csv' in response.headers['Content-Disposition']
+    filas = _csv(response)
+    assert len(filas) == 20
+    # De la más antigua a la más nueva; las columnas anidadas quedan planas
+    assert [f['finished_at'][:10] for f in filas[:2]] == ['2026-03-01', '2026-03-01']
+    assert filas[-1]['ai_metrics_reason'] == 'día 10'
+    assert {f['user_name'] for f in filas} == {'Ana', 'José'}
+
+
+def test_filtros(cliente, usuarios):
+    response = cliente.get(f'/admin/export/memoria?user_id={usuarios[1]}&from=2026-03-03&to=2026-03-05')
+    assert f'memoria_{usuarios[1]}_2026-03-03_2026-03-05.csv' in response.headers['Content-Disposition']
+    filas = _csv(response)
+    assert [(f['user_name'], f['finished_at'][:10]) for f in filas] == \
+        [('José', '2026-03-03'), ('José', '2026-03-04'), ('José', '2026-03-05')]
+
+    assert _csv(cliente.get('/admin/export/paseo')) == []
+
+
+def test_errores(cliente, monkeypatch):
+    assert cliente.get('/admin/export/ajedrez').status_code == 404
+    assert cliente.get('/admin/export/memoria?format=xlsx').status_code == 400
+    assert cliente.get('/admin/export/memoria?from=03-01-2026').status_code == 400
+    assert cliente.get('/admin/export/memoria?user_id=abc').status_code == 400
+    assert cliente.get('/admin/export/memoria?user_id=1"').status_code == 400
+
+    monkeypatch.setattr(export, 'pyarrow', None)
+    assert cliente.get('/admin/export/memoria?format=parquet').status_code == 501
+
+
+def test_parquet_un_row_group_por_lote(cliente, usuarios, monkeypatch):
+    pq = pytest.importorskip('pyarrow.parquet')
+    monkeypatch.setattr(export, 'EXPORT_LOTE', 6)
+
+    response = cliente.get('/admin/export/memoria?format=parquet')
+    assert response.status_code == 200
+    archivo = pq.ParquetFile(io.BytesIO(response.data))
+    assert archivo.metadata.num_rows == 20
+    assert archivo.metadata.num_row_groups == 4
+
+    tabla = archivo.read()
+    assert str(tabla.schema.field('finished_at').type) == 'timestamp[us]'
+    assert tabla.column('pairs_found').to_pylist()[:3] == [1, 1, 2]
+
+
+def test_arrow_stream(cliente, usuarios):
+    ipc = pytest.importorskip('pyarrow.ipc')
+    response = cliente.get(f'/admin/export/memoria?format=arrow&user_id={usuarios[0]}')
+    tabla = ipc.open_stream(response.data).read_all()
+    assert tabla.num_rows == 10
+    assert set(tabla.column('user_name').to_pylist()) == {'Ana'}
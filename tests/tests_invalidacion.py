@@ -0,0 +1,108 @@
+"""
+Invalidación de cachés en memoria entre workers (config/invalidacion.py)
+
+En SQLite el aviso viaja por la tabla invalidaciones; el sondeo de otro
+worker se simula con Escucha.revisar().
+
+    python -m pytest tests/tests_invalidacion.py
+"""
+from app import app, db
+from config import invalidacion
+from config.invalidacion import CacheLocal, Escucha, publicar
+from models.invalidacion import Invalidacion
+from models.user import User
+from models.train_game import TrainGameConfig
+
+cache = CacheLocal('prueba.cache')
+
+
+def _cachear(clave, valor):
+    return cache.obtener(clave, lambda: valor)
+
+
+def test_se_aplica_al_confirmar_y_no_con_rollback(cliente):
+    with app.app_context():
+        _cachear(1, 'viejo')
+        publicar('prueba.cache', 1)
+        db.session.rollback()
+        assert _cachear(1, 'nuevo') == 'viejo'
+        assert Invalidacion.query.count() == 0
+
+        publicar('prueba.cache', 1)
+        publicar('prueba.cache', 1)  # repetida en la misma transacción: un solo aviso
+        assert _cachear(1, 'nuevo') == 'viejo'  # todavía sin commit
+        db.session.commit()
+        assert _cachear(1, 'nuevo') == 'nuevo'
+        assert Invalidacion.query.count() == 1
+
+
+def test_otro_worker_recibe_el_aviso(cliente):
+    escucha = Escucha(app)
+    with app.app_context():
+        escucha.revisar()  # toma el último id como punto de partida
+        _cachear(1, 'viejo')
+        _cachear(2, 'viejo')
+
+        # Aviso de otro proceso: solo llega la fila, no el after_commit local
+        db.session.add(Invalidacion(recurso='prueba.cache', clave='1'))
+        db.session.commit()
+        assert _cachear(1, 'nuevo') == 'viejo'
+        assert escucha.revisar() == 1
+        assert (_cachear(1, 'nuevo'), _cachear(2, 'nuevo')) == ('nuevo', 'viejo')
+
+        db.session.add(Invalidacion(recurso='prueba.cache', clave=None))
+        db.session.commit()
+        escucha.revisar()
+        assert _cachear(2, 'nuevo') == 'nuevo'
+
+
+def test_aviso_despues_de_la_purga(cliente):
+    escucha = Escucha(app)
+    with app.app_context():
+        for clave in range(5):
+            db.session.add(Invalidacion(recurso='prueba.cache', clave=str(clave)))
+        db.session.commit()
+        escucha.revisar()
+        _cachear(1, 'viejo')
+
+        # Con todo vencido queda la última fila: el próximo id no se reusa
+        escucha.purgar(retencion=-1)
+        assert Invalidacion.query.count() == 1
+        db.session.add(Invalidacion(recurso='prueba.cache', clave='1'))
+        db.session.commit()
+        assert escucha.revisar() == 1
+        assert _cachear(1, 'nuevo') == 'nuevo'
+
+
+def test_config_de_trenes_cacheada_e_invalidada(cliente, presupuesto_consultas):
+    with app.app_context():
+        user = User(nombre='Cache', password='x', edad=70, genero='M')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    inicial = cliente.get(f'/train-game/config/{user_id}').get_json()['data']['current_config']
+    cliente.get(f'/train-game/config/{user_id}')
+    with presupuesto_consultas(0, 'GET /train-game/config (cacheada)'):
+        assert cliente.get(f'/train-game/config/{user_id}').get_json()['data']['current_config'] == inicial
+
+    datos = {'correct_routing': 10, 'wrong_routing': 0, 'total_spawned': 10, 'completion_status': 'completed'}
+    cliente.post('/train-game/submit-results', json={'user_id': user_id, 'session_data': datos})
+    actual = cliente.get(f'/train-game/config/{user_id}').get_json()['data']['current_config']
+    with app.app_context():
+        assert actual['train_speed'] == TrainGameConfig.query.filter_by(user_id=user_id).one().train_speed
+    assert actual['train_speed'] > inicial['train_speed']
+
+
+def test_comando_invalidar_cache(cliente):
+    runner = app.test_cli_runner()
+    with app.app_context():
+        _cachear(1, 'viejo')
+    resultado = runner.invoke(args=['mantenimiento', 'invalidar-cache', 'prueba.cache', '--clave', '1'])
+    assert resultado.exit_code == 0, resultado.output
+    with app.app_context():
+        assert _cachear(1, 'nuevo') == 'nuevo'
+
+    resultado = runner.invoke(args=['mantenimiento', 'invalidar-cache', 'no.existe'])
+    assert resultado.exit_code != 0
+    assert 'abecedario.palabras' in resultado.output and 'memoria.config' in invalidacion.recursos()
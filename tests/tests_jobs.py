@@ -0,0 +1,225 @@
+"""
+Cola de trabajos (tabla jobs): prioridades, reintentos con backoff y los
+análisis de Gemini que corren fuera de la petición.
+
+    python -m pytest tests/tests_jobs.py
+"""
+import json
+from unittest import mock
+
+import pytest
+import google.generativeai as genai
+
+from app import app, db
+from models.user import User
+from models.job import Job
+from models.memory_game import MemoryGameConfig, MemoryGameSession
+from models.abecedario import DesafioPrecalculado
+from services.jobs import job_service
+from services.jobs.job_service import JobService, tarea
+
+ejecutados = []
+
+
+@tarea('prueba.eco')
+def _eco(parametros):
+    ejecutados.append(parametros['n'])
+    return {'n': parametros['n']}
+
+
+@tarea('prueba.falla', max_intentos=3)
+def _falla(parametros):
+    raise RuntimeError('sin conexión')
+
+
+@pytest.fixture
+def user_id(cliente):
+    with app.app_context():
+        user = User(nombre='Cola', password='x', edad=70, genero='F')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _procesar():
+    with app.app_context():
+        return JobService.procesar_pendientes()
+
+
+def _gemini(respuesta):
+    """generate_content devuelve `respuesta` como texto JSON"""
+    return mock.patch.object(genai.GenerativeModel, 'generate_content',
+                             return_value=mock.Mock(text=json.dumps(respuesta)))
+
+
+def test_prioridad_y_resultado(cliente):
+    ejecutados.clear()
+    with app.app_context():
+        ids = [JobService.encolar('prueba.eco', {'n': n}, prioridad=p).id for n, p in [(1, 0), (2, 5), (3, 0)]]
+        db.session.commit()
+
+    assert _procesar() == 3
+    assert ejecutados == [2, 1, 3]
+
+    respuesta = cliente.get(f'/jobs/{ids[0]}').get_json()
+    assert respuesta['job']['estado'] == 'completado'
+    assert respuesta['job']['resultado'] == {'n': 1}
+    assert cliente.get('/jobs/999').status_code == 404
+
+
+def test_clave_no_duplica_pendientes(cliente):
+    with app.app_context():
+        primero = JobService.encolar('prueba.eco', {'n': 1}, clave='reporte:1')
+        assert JobService.encolar('prueba.eco', {'n': 1}, clave='reporte:1').id == primero.id
+        db.session.commit()
+        JobService.procesar_pendientes()
+        assert JobService.resultado('reporte:1') == {'n': 1}
+        # Terminado el anterior, la misma clave vuelve a encolarse
+        assert JobService.encolar('prueba.eco', {'n': 1}, clave='reporte:1').id != primero.id
+
+
+def test_reintentos_con_backoff(cliente, monkeypatch):
+    with app.app_context():
+        job_id = JobService.encolar('prueba.falla').id
+        db.session.commit()
+
+        # Con backoff el reintento no está disponible todavía
+        assert JobService.procesar_pendientes() == 1
+        job = db.session.get(Job, job_id)
+        assert (job.estado, job.intentos) == ('pendiente', 1)
+        assert 'sin conexión' in job.error
+        assert job.disponible_en > job.iniciado_en
+
+        monkeypatch.setattr(job_service, 'BACKOFF_SEGUNDOS', 0)
+        job.disponible_en = job.iniciado_en
+        db.session.commit()
+        assert JobService.procesar_pendientes() == 2
+        db.session.expire_all()
+        job = db.session.get(Job, job_id)
+        assert (job.estado, job.intentos) == ('fallido', 3)
+
+
+def test_memoria_responde_sin_esperar_a_gemini(cliente, user_id):
+    datos = {'completion_status': 'completed', 'total_flips': 6, 'pairs_found': 3, 'total_pairs': 3,
+             'elapsed_time': 20, 'time_limit': 60, 'accuracy': 100}
+    with mock.patch.object(genai.GenerativeModel, 'generate_content') as gemini:
+        respuesta = cliente.post('/memory-game/submit-results',
+                                 json={'user_id': user_id, 'session_data': datos}).get_json()['data']
+        gemini.assert_not_called()
+
+    # Ajuste determinista inmediato: victoria rápida y precisa → sube de nivel
+    assert respuesta['ai_analysis']['next_session_config']['difficulty_label'] == 'easy'
+    job_id = respuesta['job_id']
+    assert cliente.get(f'/jobs/{job_id}').get_json()['job']['estado'] == 'pendiente'
+
+    with _gemini({'analysis': {'decision': 'increase', 'reason': 'Muy rápido', 'score': 9,
+                               'metrics': {'memory': 'high', 'speed': 'fast', 'accuracy': 'high'}},
+                  'new_config': {'difficulty_label': 'medium', 'total_pairs': 6, 'grid_size': '3x4',
+                                 'time_limit': 120, 'memorization_time': 4}}):
+        _procesar()
+
+    job = cliente.get(f'/jobs/{job_id}').get_json()['job']
+    assert job['estado'] == 'completado' and job['resultado']['aplicado']
+    with app.app_context():
+        config = MemoryGameConfig.query.filter_by(user_id=user_id).one()
+        sesion = db.session.get(MemoryGameSession, respuesta['session_id'])
+        assert (config.difficulty_label, config.total_pairs) == ('medium', 6)
+        assert sesion.ai_reason == 'Muy rápido'
+
+
+def test_memoria_analisis_viejo_no_pisa_la_config(cliente, user_id, sin_gemini):
+    datos = {'completion_status': 'timeout', 'total_flips': 10, 'pairs_found': 1, 'total_pairs': 3,
+             'elapsed_time': 60, 'time_limit': 60, 'accuracy': 20}
+    ids = [cliente.post('/memory-game/submit-results', json={'user_id': user_id, 'session_data': datos}
+                        ).get_json()['data']['job_id'] for _ in range(2)]
+
+    with _gemini({'analysis': {'decision': 'increase', 'reason': 'x', 'score': 5,
+                               'metrics': {'memory': 'low', 'speed': 'slow', 'accuracy': 'low'}},
+                  'new_config': {'difficulty_label': 'master', 'total_pairs': 12, 'grid_size': '3x8',
+                                 'time_limit': 200, 'memorization_time': 2}}):
+        _procesar()
+
+    resultados = [cliente.get(f'/jobs/{i}').get_json()['job']['resultado']['aplicado'] for i in ids]
+    assert resultados == [False, True]
+
+
+def test_trenes_zona_gris(cliente, user_id):
+    datos = {'correct_routing': 7, 'wrong_routing': 3, 'total_spawned': 10, 'completion_status': 'completed'}
+    respuesta = cliente.post('/train-game/submit-results', json={'user_id': user_id, 'session_data': datos}).get_json()
+    assert respuesta['data']['ai_analysis']['used_ai'] is False
+    assert respuesta['data']['job_id'] is not None
+
+    with _gemini({'d': 'down', 'r': 'Errores frecuentes'}):
+        _procesar()
+    config = cliente.get(f'/train-game/config/{user_id}').get_json()['data']['current_config']
+    assert config['train_speed'] == 3.0
+
+    # Fuera de la zona gris no se encola nada
+    datos['correct_routing'], datos['wrong_routing'] = 10, 0
+    assert cliente.post('/train-game/submit-results',
+                        json={'user_id': user_id, 'session_data': datos}).get_json()['data']['job_id'] is None
+
+
+def test_paseo_derrota_en_dificil(cliente, user_id):
+    derrota = {'user_id': user_id, 'nivel_dificultad': 'dificil', 'meta_aciertos': 7, 'total_aciertos': 2,
+               'total_errores_incorrecto': 3, 'total_errores_perdidas': 4, 'duracion_total': 120.0, 'completado': True}
+    cliente.post('/paseo/save-session', json=derrota)
+
+    # Sin el análisis todavía: regla por porcentaje (2/7 < 30% → facil)
+    plan = cliente.post('/paseo/start-session', json={'user_id': user_id}).get_json()['plan']
+    assert (plan['nivel_dificultad'], plan['velocidad_esferas']) == ('facil', 3.0)
+
+    with _gemini({'nivel_recomendado': 'intermedio', 'razonamiento_breve': 'Cerca', 'velocidad_ajustada': 3.5}):
+        _procesar()
+    plan = cliente.post('/paseo/start-session', json={'user_id': user_id}).get_json()['plan']
+    assert (plan['nivel_dificultad'], plan['velocidad_esferas']) == ('intermedio', 3.5)
+
+
+def test_paseo_derrota_sin_gemini_no_encola(cliente, user_id, monkeypatch):
+    monkeypatch.delenv('GEMINI_API_KEY')
+    cliente.post('/paseo/save-session', json={
+        'user_id': user_id, 'nivel_dificultad': 'dificil', 'meta_aciertos': 7, 'total_aciertos': 2,
+        'total_errores_incorrecto': 3, 'total_errores_perdidas': 4, 'duracion_total': 120.0, 'completado': True})
+    with app.app_context():
+        assert Job.query.filter_by(tipo='paseo.analisis_derrota').count() == 0
+
+
+def test_reporte_de_evolucion_en_segundo_plano(cliente, user_id):
+    cliente.post('/abecedario/session', json={
+        'user_id': user_id, 'palabra_objetivo': 'SOL', 'tiempo_resolucion': 9.0, 'cantidad_errores': 0,
+        'pistas_usadas': 0, 'completado': True, 'nivel_dificultad': 'facil'})
+
+    respuesta = cliente.get(f'/abecedario/evolution/{user_id}?async=1')
+    assert respuesta.status_code == 202
+    job_id = respuesta.get_json()['job']['id']
+
+    _procesar()
+    job = cliente.get(f'/jobs/{job_id}').get_json()['job']
+    assert job['estado'] == 'completado'
+    assert job['resultado'] == cliente.get(f'/abecedario/evolution/{user_id}').get_json()
+
+
+def test_siguiente_desafio_precalculado(cliente, user_id):
+    sesion = {'user_id': user_id, 'palabra_objetivo': 'SOL', 'tiempo_resolucion': 9.0, 'cantidad_errores': 0,
+              'pistas_usadas': 0, 'completado': True, 'nivel_dificultad': 'facil'}
+    cliente.post('/abecedario/session', json=sesion)
+    _procesar()
+    with app.app_context():
+        precalculado = db.session.get(DesafioPrecalculado, user_id)
+        palabra = json.loads(precalculado.desafio)['palabra_objetivo']
+
+    # Se entrega el precalculado y se consume
+    challenge = cliente.get(f'/abecedario/next-challenge/{user_id}').get_json()['challenge']
+    assert challenge['palabra_objetivo'] == palabra
+    assert challenge['progreso_nivel']['palabras_completadas'] == 1
+    with app.app_context():
+        assert db.session.get(DesafioPrecalculado, user_id) is None
+
+    # Sin worker: otra sesión deja el anterior viejo y se calcula en la petición
+    cliente.post('/abecedario/session', json=sesion)
+    _procesar()
+    cliente.post('/abecedario/session', json=sesion)
+    challenge = cliente.get(f'/abecedario/next-challenge/{user_id}').get_json()['challenge']
+    assert challenge['progreso_nivel']['palabras_completadas'] == 3
+    with app.app_context():
+        assert db.session.get(DesafioPrecalculado, user_id) is not None
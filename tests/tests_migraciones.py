@@ -0,0 +1,128 @@
+"""
+Migraciones (app/migrations) contra una base SQLite en un archivo temporal
+
+- Desde cero hasta head el esquema queda igual al de los modelos
+  (autogenerate no encuentra diferencias) y se puede revertir hasta base.
+- Una base creada con db.create_all() se adopta sin perder datos y el
+  relleno por lotes completa las columnas nulas (también la columna de
+  fecha por la que se particiona en PostgreSQL).
+- user_game_stats se llena con las sesiones que ya estaban guardadas, con
+  las mismas reglas que el acumulado en línea.
+
+    python -m pytest tests/tests_migraciones.py
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('alembic')
+
+import sqlalchemy as sa
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+from app import db
+from cli.migraciones import configuracion
+from migrations import lotes
+from services.user_game_stats_service import JUEGOS, combinar
+
+
+@pytest.fixture
+def motor(tmp_path):
+    motor = sa.create_engine(f'sqlite:///{tmp_path / "migraciones.db"}')
+    yield motor
+    motor.dispose()
+
+
+def _ejecutar(motor, accion, revision):
+    config = configuracion()
+    with motor.connect() as conexion:
+        config.attributes['connection'] = conexion
+        accion(config, revision)
+        conexion.commit()
+
+
+def _diferencias(motor):
+    with motor.connect() as conexion:
+        return compare_metadata(MigrationContext.configure(conexion), db.metadata)
+
+
+def test_desde_cero_igual_a_los_modelos(motor):
+    _ejecutar(motor, command.upgrade, 'head')
+    assert _diferencias(motor) == []
+
+    _ejecutar(motor, command.downgrade, 'base')
+    assert sa.inspect(motor).get_table_names() == ['alembic_version']
+
+
+def test_adopta_base_existente_y_rellena_por_lotes(motor, monkeypatch):
+    db.metadata.create_all(motor)
+    with motor.begin() as conexion:
+        conexion.execute(sa.text("INSERT INTO \"user\" (id, nombre, password, edad, genero) VALUES (1, 'a', 'x', 70, 'F')"))
+        for i in range(1, 8):
+            conexion.execute(sa.text('INSERT INTO train_game_sessions (session_id, user_id, train_speed) '
+                                     'VALUES (:i, 1, :v)'), {'i': i, 'v': None if i % 2 else 4.5})
+        conexion.execute(sa.text("INSERT INTO abecedario_session (user_id, palabra_objetivo, longitud_palabra, "
+                                 "tiempo_resolucion, fecha_juego) VALUES (1, 'SOL', 3, 5.0, '2025-03-04')"))
+
+    monkeypatch.setattr(lotes, 'LOTE', 2)
+    _ejecutar(motor, command.upgrade, 'head')
+
+    with motor.connect() as conexion:
+        filas = conexion.execute(sa.text('SELECT train_speed, color_count, completion_status '
+                                         'FROM train_game_sessions ORDER BY session_id')).all()
+    assert len(filas) == 7
+    assert [f.train_speed for f in filas] == [3.0, 4.5, 3.0, 4.5, 3.0, 4.5, 3.0]
+    assert all(f.color_count == 3 and f.completion_status == 'completed' for f in filas)
+    with motor.connect() as conexion:
+        assert conexion.execute(sa.text('SELECT COUNT(*) FROM train_game_sessions WHERE finished_at IS NULL')).scalar() == 0
+        assert conexion.execute(sa.text('SELECT created_at FROM abecedario_session')).scalar() == '2025-03-04 00:00:00'
+    assert _diferencias(motor) == []
+
+
+def test_rellena_user_game_stats_con_las_sesiones_existentes(motor, monkeypatch):
+    _ejecutar(motor, command.upgrade, '0003')
+    trenes = [(datetime(2025, 3, d, 10 + i), c, w) for d, i, c, w in
+              ((3, 0, 5, 1), (4, 0, 2, 2), (4, 1, 7, 0), (5, 0, 0, 0), (9, 0, 3, 3))]
+    abecedario = [(datetime(2025, 3, 1, 9), date(2025, 3, 1), 4.0, 1, True),
+                  (None, date(2025, 3, 2), 6.5, 3, False),
+                  (datetime(2025, 3, 2, 18), date(2025, 3, 2), 3.0, 0, True)]
+    with motor.begin() as conexion:
+        for i in (1, 2):
+            conexion.execute(sa.text("INSERT INTO \"user\" (id, nombre, password, edad, genero) "
+                                     "VALUES (:i, :n, 'x', 70, 'F')"), {'i': i, 'n': f'u{i}'})
+        for momento, correctos, incorrectos in trenes:
+            conexion.execute(sa.text("INSERT INTO train_game_sessions (user_id, correct_routing, wrong_routing, "
+                                     "completion_status, started_at, finished_at) "
+                                     "VALUES (1, :c, :w, 'completed', :m, :m)"),
+                             {'c': correctos, 'w': incorrectos, 'm': momento})
+        for momento, dia, tiempo, errores, completado in abecedario:
+            conexion.execute(sa.text("INSERT INTO abecedario_session (user_id, palabra_objetivo, longitud_palabra, "
+                                     "tiempo_resolucion, cantidad_errores, completado, created_at, fecha_juego) "
+                                     "VALUES (2, 'SOL', 3, :t, :e, :c, :m, :d)"),
+                             {'t': tiempo, 'e': errores, 'c': completado, 'm': momento, 'd': dia})
+
+    monkeypatch.setattr(lotes, 'LOTE', 1)
+    _ejecutar(motor, command.upgrade, 'head')
+
+    esperado = {}
+    for momento, correctos, incorrectos in trenes:
+        sesion = SimpleNamespace(finished_at=momento, correct_routing=correctos, wrong_routing=incorrectos,
+                                 completion_status='completed')
+        esperado[1, 'trenes'] = combinar(esperado.get((1, 'trenes')), JUEGOS['trenes'][2](sesion))
+    for momento, dia, tiempo, errores, completado in abecedario:
+        # 0008 completa created_at desde fecha_juego
+        sesion = SimpleNamespace(created_at=momento or datetime.combine(dia, datetime.min.time()), fecha_juego=dia,
+                                 tiempo_resolucion=tiempo, cantidad_errores=errores, completado=completado)
+        esperado[2, 'abecedario'] = combinar(esperado.get((2, 'abecedario')), JUEGOS['abecedario'][2](sesion))
+
+    with motor.connect() as conexion:
+        filas = conexion.execute(sa.select(db.metadata.tables['user_game_stats'])).mappings().all()
+    assert {(f['user_id'], f['juego']) for f in filas} == set(esperado)
+    for fila in filas:
+        acumulado = esperado[fila['user_id'], fila['juego']]
+        for col, valor in acumulado.items():
+            assert fila[col] == (pytest.approx(valor) if isinstance(valor, float) else valor), col
+    assert esperado[1, 'trenes']['racha_maxima'] == 3 and esperado[1, 'trenes']['racha_dias'] == 1
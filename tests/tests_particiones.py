@@ -0,0 +1,102 @@
+"""
+Consultas por día con el filtro de partición y `flask particiones retener`
+en SQLite (sin particiones declarativas): por defecto pasa las sesiones
+viejas por el archivo en frío, con --forzar --borrar las borra por lotes.
+El particionado en sí es solo de PostgreSQL (migración 0008).
+
+    python -m pytest tests/tests_particiones.py
+"""
+from datetime import date, datetime, timedelta
+
+from app import app, db
+from models.user import User
+from models.abecedario import Abecedario
+from models.paseo import PaseoSession
+from models.archivo import SesionArchivada
+from services.user_game_stats_service import UserGameStatsService
+
+
+def _sesion(user_id, creada, fecha_juego):
+    return Abecedario(user_id=user_id, palabra_objetivo='SOL', longitud_palabra=3, tiempo_resolucion=5.0,
+                      completado=True, fecha_juego=fecha_juego, nivel_jugado='facil', created_at=creada)
+
+
+def test_dia_local_distinto_del_dia_utc(cliente):
+    dia = date(2026, 3, 10)
+    with app.app_context():
+        user = User(nombre='Particion', password='x', edad=70, genero='F')
+        db.session.add(user)
+        db.session.flush()
+        # Jugada el 10 a la noche (hora local) = 11 de madrugada en UTC
+        db.session.add(_sesion(user.id, datetime(2026, 3, 11, 2, 30), dia))
+        db.session.add(_sesion(user.id, datetime(2026, 3, 10, 15, 0), dia))
+        db.session.add(_sesion(user.id, datetime(2026, 3, 12, 15, 0), date(2026, 3, 12)))
+        db.session.commit()
+        user_id = user.id
+
+    respuesta = cliente.get(f'/abecedario/final-stats/{user_id}?fecha={dia.isoformat()}').get_json()
+    assert respuesta['palabras_totales'] == 2
+    resumen = cliente.get(f'/abecedario/daily-summary/{user_id}?fecha={dia.isoformat()}').get_json()
+    assert resumen['total_palabras'] == 2
+
+
+def test_retener_borra_por_lotes_sin_particiones(cliente):
+    viejo = datetime.utcnow() - timedelta(days=400)
+    with app.app_context():
+        user = User(nombre='Retencion', password='x', edad=70, genero='M')
+        db.session.add(user)
+        db.session.flush()
+        for creada in (viejo, viejo, datetime.utcnow()):
+            db.session.add(_sesion(user.id, creada, creada.date()))
+            db.session.add(PaseoSession(user_id=user.id, created_at=creada, fecha_juego=creada.date(),
+                                        velocidad_esferas=3.0, intervalo_spawn=2.0, duracion_segmento=30.0))
+        db.session.commit()
+
+    runner = app.test_cli_runner()
+    resultado = runner.invoke(args=['particiones', 'retener', '--meses', '12', '--forzar'])
+    assert resultado.exit_code != 0 and '--borrar' in resultado.output
+
+    resultado = runner.invoke(args=['particiones', 'retener', '--meses', '12', '--forzar', '--borrar', '--dry-run'])
+    assert 'abecedario_session: se borrarían 2 filas' in resultado.output
+
+    resultado = runner.invoke(args=['particiones', 'retener', '--meses', '12', '--forzar', '--borrar', '--lote', '1'])
+    assert resultado.exit_code == 0, resultado.output
+    with app.app_context():
+        assert (Abecedario.query.count(), PaseoSession.query.count()) == (1, 1)
+
+
+def test_retener_pasa_por_el_archivo(cliente):
+    viejo = (datetime.utcnow() - timedelta(days=900)).replace(day=10)
+    with app.app_context():
+        user = User(nombre='RetencionArchivo', password='x', edad=70, genero='F')
+        db.session.add(user)
+        db.session.flush()
+        for creada in (viejo, viejo + timedelta(days=1), datetime.utcnow()):
+            db.session.add(_sesion(user.id, creada, creada.date()))
+        db.session.commit()
+        user_id = user.id
+        UserGameStatsService.reconstruir('abecedario')
+        stats = UserGameStatsService.obtener(user_id, 'abecedario').to_dict()
+    historial = cliente.get(f'/abecedario/evolution/{user_id}').get_json()
+
+    runner = app.test_cli_runner()
+    # Sin --forzar no se retiene menos que ARCHIVO_MESES ni se borra sin archivar
+    resultado = runner.invoke(args=['particiones', 'retener', '--meses', '12'])
+    assert resultado.exit_code != 0 and 'ARCHIVO_MESES' in resultado.output
+    resultado = runner.invoke(args=['particiones', 'retener', '--borrar'])
+    assert resultado.exit_code != 0 and '--forzar' in resultado.output
+
+    resultado = runner.invoke(args=['particiones', 'retener', '--dry-run'])
+    assert 'abecedario_session: se archivarían 2 sesiones' in resultado.output
+
+    resultado = runner.invoke(args=['particiones', 'retener'])
+    assert resultado.exit_code == 0, resultado.output
+    assert 'abecedario_session: 2 sesiones' in resultado.output
+    with app.app_context():
+        assert Abecedario.query.filter_by(user_id=user_id).count() == 1
+        assert SesionArchivada.query.filter_by(juego='abecedario', user_id=user_id).count() == 1
+
+        # Lo retenido sigue en las lecturas y en el recálculo de user_game_stats
+        UserGameStatsService.reconstruir('abecedario')
+        assert UserGameStatsService.obtener(user_id, 'abecedario').to_dict() == stats
+    assert cliente.get(f'/abecedario/evolution/{user_id}').get_json() == historial
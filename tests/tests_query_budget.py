@@ -0,0 +1,145 @@
+"""
+Presupuesto de consultas SQL por endpoint
+
+Cada ruta registrada en app.py declara cuántas consultas puede ejecutar con
+un usuario que ya jugó una sesión de cada juego. Si un cambio agrega
+consultas (p. ej. un N+1 en un loop) el test falla y muestra las formas
+repetidas. Una ruta nueva sin presupuesto declarado también hace fallar el
+test: hay que agregarla a PRESUPUESTOS.
+
+    python -m pytest tests/tests_query_budget.py
+"""
+from datetime import datetime, date
+
+import pytest
+
+from app import app, db
+from middleware.query_profiler import forma_sql, perfilar
+from bench_common import endpoints_registrados, peticion_para
+from models.user import User
+from models.abecedario import Abecedario
+from models.memory_game import MemoryGameSession, MemoryGameConfig
+from models.paseo import PaseoSession
+from models.train_game import TrainGameSession, TrainGameConfig
+from services.user_game_stats_service import UserGameStatsService, JUEGOS
+
+# endpoint -> máximo de consultas
+PRESUPUESTOS = {
+    'static': 0,
+    'swagger_ui.static': 0,
+    'swagger_ui.show': 0,
+    'swagger_spec': 0,
+    'metrics': 0,
+    'admin_dashboard': 0,
+
+    'get_users': 1,
+    'register': 3,
+    'login': 1,
+
+    'save_abecedario_session': 6,
+    'get_next_challenge': 9,
+    'get_abecedario_stats': 2,
+    'get_daily_summary': 1,
+    'get_daily_summaries': 1,
+    'get_abecedario_history': 2,
+    'get_evolution_report': 2,
+    'get_final_stats': 1,
+
+    'get_memory_config': 1,
+    'submit_memory_results': 8,
+    'get_memory_stats': 3,
+    'reset_memory_progress': 5,
+
+    'paseo.start_session': 2,
+    'paseo.get_next_level': 1,
+    'paseo.save_session': 4,
+    'paseo.report_metrics': 0,
+    'paseo.get_evolution': 2,
+    'paseo.get_final_stats': 1,
+
+    'train_game.get_config': 1,
+    'train_game.submit_results': 6,
+    'train_game.get_stats': 3,
+
+    'admin_overview': 13,
+    'admin_memory_sessions': 2,
+    'admin_abecedario_sessions': 2,
+    'admin_paseo_sessions': 2,
+    'admin_memory_configs': 1,
+    'admin_stats': 3,
+    'admin_stats_v2': 1,
+    'admin_metrics': 0,
+    'admin_user_stats': 4,
+    'admin_user_memory_sessions': 2,
+    'admin_user_abecedario_sessions': 2,
+    'admin_user_paseo_sessions': 2,
+    'admin_train_sessions': 2,
+    'admin_user_train_sessions': 2,
+    'admin_export': 1,
+    'get_job': 1,
+}
+
+@pytest.fixture
+def user_id(cliente):
+    """Usuario con una sesión de cada juego y configs de memoria / trenes ya creadas"""
+    from config.database import bcrypt
+
+    with app.app_context():
+        user = User(nombre='UsuarioPrueba', password=bcrypt.generate_password_hash('clave').decode('utf-8'),
+                    edad=72, genero='F')
+        db.session.add(user)
+        db.session.commit()
+
+        db.session.add_all([
+            MemoryGameSession(user_id=user.id, total_pairs=3, pairs_found=3, accuracy_percentage=80.0,
+                              completion_status='completed', finished_at=datetime.utcnow()),
+            MemoryGameConfig(user_id=user.id),
+            TrainGameConfig(user_id=user.id),
+            Abecedario(user_id=user.id, palabra_objetivo='CASA', longitud_palabra=4, tiempo_resolucion=12.5,
+                       cantidad_errores=0, pistas_usadas=0, completado=True, fecha_juego=date.today()),
+            PaseoSession(user_id=user.id, velocidad_esferas=3.0, intervalo_spawn=2.0, duracion_segmento=60,
+                         esferas_rojas_atrapadas=5, precision=100.0, resultado='victoria',
+                         nivel_dificultad='facil', fecha_juego=date.today()),
+            TrainGameSession(user_id=user.id, correct_routing=8, wrong_routing=2,
+                             completion_status='completed', finished_at=datetime.utcnow())
+        ])
+        db.session.commit()
+        for juego in JUEGOS:
+            UserGameStatsService.reconstruir(juego)
+        return user.id
+
+
+def test_todas_las_rutas_tienen_presupuesto():
+    faltantes = set(endpoints_registrados(app)) - set(PRESUPUESTOS)
+    sobrantes = set(PRESUPUESTOS) - set(endpoints_registrados(app))
+    assert not faltantes, f'Rutas sin presupuesto de consultas: {sorted(faltantes)}'
+    assert not sobrantes, f'Presupuestos de rutas que ya no existen: {sorted(sobrantes)}'
+
+
+@pytest.mark.parametrize('endpoint', endpoints_registrados(app))
+def test_presupuesto_de_consultas(endpoint, cliente, user_id, sin_gemini, presupuesto_consultas):
+    metodo, url, cuerpo = peticion_para(app, endpoint, user_id)
+
+    with presupuesto_consultas(PRESUPUESTOS.get(endpoint, 0), f'{metodo} {url}'):
+        response = cliente.open(url, method=metodo, json=cuerpo)
+
+    assert response.status_code < 500, f'{metodo} {url} -> {response.status_code}'
+
+
+def test_perfil_agrupa_formas_repetidas(cliente, user_id):
+    """Consultas iguales con distintos valores cuentan como la misma forma"""
+    assert forma_sql("SELECT * FROM users WHERE id = 5 AND nombre = 'Ana'") == \
+        forma_sql("SELECT *  FROM users\nWHERE id = 7 AND nombre = 'Luis'")
+    assert forma_sql('SELECT x FROM t WHERE id IN (?, ?, ?)') == forma_sql('SELECT x FROM t WHERE id IN (?)')
+
+    with app.app_context():
+        with perfilar(db.engine) as perfil:
+            for _ in range(3):
+                db.session.get(User, user_id)
+                db.session.expire_all()
+            User.query.count()
+
+    assert perfil.total == 4
+    (forma, datos), = perfil.repetidas()
+    assert datos['veces'] == 3
+    assert 'FROM user WHERE' in forma
@@ -0,0 +1,102 @@
+"""
+Ruteo de lecturas a la réplica (config/database.py): las rutas
+@solo_lectura leen de la réplica si está al día, el resto y cualquier
+escritura van al primario. La "réplica" es otro SQLite con datos distintos,
+así se ve de dónde salió cada respuesta.
+
+    python -m pytest tests/tests_replica.py
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import app, db
+from config import database
+from config.database import REPLICA, EstadoReplica
+from models.user import User
+from models.paseo import PaseoSession
+from models.job import Job
+from services.admin import admin_service
+
+
+@pytest.fixture
+def replica(cliente, tmp_path, monkeypatch):
+    motor = create_engine(f'sqlite:///{tmp_path / "replica.db"}')
+    db.metadata.create_all(motor)
+    monkeypatch.setattr(database, 'estado_replica', EstadoReplica())
+    with app.app_context():
+        db.engines[REPLICA] = motor
+    yield motor
+    with app.app_context():
+        del db.engines[REPLICA]
+    motor.dispose()
+
+
+@pytest.fixture
+def user_id(cliente):
+    with app.app_context():
+        user = User(nombre='Replica', password='x', edad=80, genero='M')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _sesion_en(motor, user_id, cantidad=1):
+    with Session(motor) as sesion:
+        sesion.add(User(id=user_id, nombre='Replica', password='x', edad=80, genero='M'))
+        for _ in range(cantidad):
+            sesion.add(PaseoSession(user_id=user_id, velocidad_esferas=3.0, intervalo_spawn=2.0,
+                                    duracion_segmento=30.0, resultado='victoria', nivel_dificultad='facil',
+                                    fecha_juego=date.today()))
+        sesion.commit()
+
+
+def _evolucion(user_id):
+    return app.test_client().get(f'/paseo/evolution/{user_id}').get_json()
+
+
+def test_rutas_de_lectura_usan_la_replica(replica, user_id):
+    _sesion_en(replica, user_id, cantidad=2)
+    cliente = app.test_client()
+    cliente.post('/paseo/save-session', json={
+        'user_id': user_id, 'nivel_dificultad': 'facil', 'meta_aciertos': 5, 'total_aciertos': 5,
+        'total_errores_incorrecto': 0, 'total_errores_perdidas': 0, 'duracion_total': 60.0, 'completado': True})
+
+    # final-stats se muestra justo después de guardar: lee del primario
+    assert cliente.get(f'/paseo/final-stats/{user_id}').get_json()['total_sesiones'] == 1
+    assert cliente.get(f'/paseo/evolution/{user_id}').get_json()['total_sesiones'] == 2
+    assert database.replica_lecturas.series[('replica',)] >= 1
+
+
+def test_replica_atrasada_o_caida_vuelve_al_primario(replica, user_id, monkeypatch):
+    _sesion_en(replica, user_id)
+    monkeypatch.setattr(EstadoReplica, 'retraso', lambda self, motor: 60.0)
+    assert 'total_sesiones' not in _evolucion(user_id)
+
+    def caida(self, motor):
+        raise ConnectionError('sin réplica')
+    monkeypatch.setattr(database, 'estado_replica', EstadoReplica())
+    monkeypatch.setattr(EstadoReplica, 'retraso', caida)
+    assert 'total_sesiones' not in _evolucion(user_id)
+
+
+def test_escrituras_van_al_primario(replica, user_id):
+    _sesion_en(replica, user_id)
+    respuesta = app.test_client().get(f'/abecedario/evolution/{user_id}?async=1')
+    assert respuesta.status_code == 202
+    job_id = respuesta.get_json()['job']['id']
+    with app.app_context():
+        assert db.session.get(Job, job_id) is not None
+    with Session(replica) as sesion:
+        assert sesion.query(Job).count() == 0
+
+
+def test_overview_en_paralelo_lee_de_la_replica(replica, user_id, monkeypatch):
+    # El camino de Postgres: cada consulta en un hilo con su propio app context
+    monkeypatch.setattr(admin_service, '_en_paralelo', lambda: True)
+    _sesion_en(replica, user_id, cantidad=2)
+    overview = app.test_client().get('/admin/overview').get_json()
+    assert len(overview['paseo_sessions']) == 2
+    assert [u['nombre'] for u in overview['users']] == ['Replica']
@@ -0,0 +1,63 @@
+"""
+Agregador diario de una sola pasada (services/resumen_diario_service.py):
+GET /abecedario/daily-summaries devuelve lo mismo que pedir
+/abecedario/daily-summary día por día, en una consulta.
+
+    python -m pytest tests/tests_resumen_diario.py
+"""
+from datetime import date, datetime, time, timedelta
+
+from app import app, db
+from models.user import User
+from models.abecedario import Abecedario
+
+HOY = date.today()
+
+
+def _usuario(sesiones):
+    """sesiones: [(días atrás, nivel, completado, errores, tiempo)]"""
+    with app.app_context():
+        user = User(nombre='Resumen', password='x', edad=70, genero='F')
+        db.session.add(user)
+        db.session.flush()
+        for i, (atras, nivel, completado, errores, tiempo) in enumerate(sesiones):
+            dia = HOY - timedelta(days=atras)
+            db.session.add(Abecedario(user_id=user.id, palabra_objetivo='SOL', longitud_palabra=3,
+                                      tiempo_resolucion=tiempo, cantidad_errores=errores, pistas_usadas=0,
+                                      completado=completado, nivel_jugado=nivel, fecha_juego=dia,
+                                      created_at=datetime.combine(dia, time(10, i))))
+        db.session.commit()
+        return user.id
+
+
+def test_rango_igual_a_un_dia_por_vez(cliente, presupuesto_consultas):
+    user_id = _usuario([(0, 'facil', True, 0, 9.0), (0, 'intermedio', False, 2, 30.0),
+                        (2, 'dificil', True, 1, 12.0), (5, 'facil', True, 0, 20.0)])
+    desde = HOY - timedelta(days=6)
+    with presupuesto_consultas(1, 'daily-summaries'):
+        rango = cliente.get(f'/abecedario/daily-summaries/{user_id}?fecha_inicio={desde}&fecha_fin={HOY}').get_json()
+
+    assert [dia['fecha'] for dia in rango['dias']] == [(desde + timedelta(days=i)).isoformat() for i in range(7)]
+    for dia in rango['dias']:
+        assert dia == cliente.get(f"/abecedario/daily-summary/{user_id}?fecha={dia['fecha']}").get_json()
+
+    # Sin parámetros: los últimos 7 días
+    assert cliente.get(f'/abecedario/daily-summaries/{user_id}').get_json() == rango
+    sin_detalle = cliente.get(f'/abecedario/daily-summaries/{user_id}?sesiones=0').get_json()
+    assert 'sesiones' not in sin_detalle['dias'][-1] and sin_detalle['dias'][-1]['total_palabras'] == 2
+
+
+def test_final_stats_puntos_por_nivel(cliente):
+    user_id = _usuario([(0, 'facil', True, 0, 9.0), (0, 'dificil', True, 1, 20.0), (0, 'intermedio', False, 2, 30.0)])
+    stats = cliente.get(f'/abecedario/final-stats/{user_id}').get_json()
+    # facil: 10 * (1 + 0.5 + 0.2) = 17; dificil: 50 * (1 + 0.25) - 5 = 57
+    assert stats['puntos_totales'] == 74
+    assert stats['por_nivel']['dificil'] == {'total': 1, 'completadas': 1, 'puntos': 57}
+    assert stats['metricas_globales'] == {'tiempo_promedio': 14.5, 'mejor_tiempo': 9.0, 'precision': 66.67,
+                                          'total_errores': 3, 'total_pistas': 0}
+
+
+def test_rango_invalido(cliente):
+    assert cliente.get('/abecedario/daily-summaries/1?fecha_inicio=2026-02-01&fecha_fin=2026-01-01').status_code == 400
+    assert cliente.get('/abecedario/daily-summaries/1?fecha_inicio=2020-01-01&fecha_fin=2026-01-01').status_code == 400
+    assert cliente.get('/abecedario/daily-summaries/1?fecha_inicio=ayer').status_code == 400
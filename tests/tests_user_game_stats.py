@@ -0,0 +1,125 @@
+"""
+Tabla user_game_stats: el upsert incremental (una sesión a la vez, en la
+transacción del save) tiene que dar lo mismo que reconstruir desde cero, y
+los endpoints de stats tienen que coincidir con el cálculo sobre las sesiones.
+
+    python -m pytest tests/tests_user_game_stats.py
+"""
+import random
+from datetime import datetime, date, timedelta
+
+import pytest
+
+from app import app, db
+from models.user import User
+from models.memory_game import MemoryGameSession
+from models.paseo import PaseoSession
+from models.user_game_stats import UserGameStats
+from services.user_game_stats_service import UserGameStatsService, combinar
+
+
+@pytest.fixture
+def usuario(cliente):
+    with app.app_context():
+        user = User(nombre='Estadisticas', password='x', edad=70, genero='M')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _fila(user_id, juego):
+    fila = db.session.get(UserGameStats, (user_id, juego))
+    db.session.refresh(fila)
+    return {c.name: getattr(fila, c.name) for c in UserGameStats.__table__.columns}
+
+
+def _comparar(a, b):
+    for clave, valor in a.items():
+        if isinstance(valor, float):
+            assert valor == pytest.approx(b[clave]), clave
+        else:
+            assert valor == b[clave], clave
+
+
+def test_incremental_igual_a_reconstruir(usuario):
+    """Sesiones en días salteados, repetidos y una que llega fuera de orden"""
+    rnd = random.Random(7)
+    base = datetime(2026, 3, 1, 10, 0)
+    dias = [0, 0, 1, 2, 2, 5, 6, 7, 8, 3, 9]  # el 3 llega después del 8
+
+    with app.app_context():
+        for i, d in enumerate(dias):
+            momento = base + timedelta(days=d, minutes=i)
+            sesion = MemoryGameSession(user_id=usuario, total_pairs=4, pairs_found=rnd.randint(0, 4),
+                                       total_flips=rnd.randint(8, 20), accuracy_percentage=rnd.uniform(20, 100),
+                                       elapsed_time_seconds=rnd.uniform(20, 90),
+                                       completion_status=rnd.choice(['completed', 'timeout']),
+                                       finished_at=momento)
+            db.session.add(sesion)
+            UserGameStatsService.registrar('memoria', sesion)
+            db.session.commit()
+
+        incremental = _fila(usuario, 'memoria')
+        assert incremental['sesiones'] == len(dias)
+        assert incremental['ultimo_dia'] == date(2026, 3, 10)
+        assert incremental['racha_maxima'] == 5  # días 5..9
+        assert incremental['racha_dias'] == 5
+        assert incremental['sesiones_dia'] == 1
+
+        UserGameStatsService.reconstruir('memoria')
+        reconstruida = _fila(usuario, 'memoria')
+
+    # El orden de llegada difiere (reconstruir ordena por fecha) pero las sumas y la racha final coinciden
+    _comparar(incremental, reconstruida)
+
+
+def test_combinar_racha():
+    delta = lambda d: {'sesiones': 1, 'completadas': 1, 'aciertos': 0, 'errores': 0, 'sesiones_con_tiempo': 0,
+                       'suma_tiempo': 0.0, 'suma_tiempo_cuadrado': 0.0, 'mejor_tiempo': None, 'suma_precision': 0.0,
+                       'suma_precision_cuadrado': 0.0, 'suma_precision_completadas': 0.0,
+                       'primera_partida': datetime(2026, 1, d), 'ultima_partida': datetime(2026, 1, d),
+                       'ultimo_dia': date(2026, 1, d), 'racha_dias': 1, 'racha_maxima': 1,
+                       'sesiones_dia': 1, 'aciertos_dia': 0, 'errores_dia': 0}
+    fila = None
+    for d in (1, 2, 3, 5, 6):
+        fila = combinar(fila, delta(d))
+    assert (fila['racha_dias'], fila['racha_maxima'], fila['sesiones']) == (2, 3, 5)
+
+
+def test_endpoints_leen_la_tabla(cliente, usuario, sin_gemini):
+    for tiempo, estado, precision in [(40.0, 'completed', 80.0), (30.0, 'completed', 60.0), (20.0, 'timeout', 10.0)]:
+        cliente.post('/memory-game/submit-results', json={'user_id': usuario, 'session_data': {
+            'completion_status': estado, 'total_flips': 12, 'pairs_found': 3, 'total_pairs': 3,
+            'elapsed_time': tiempo, 'time_limit': 60, 'accuracy': precision}})
+    for aciertos in (5, 2):
+        cliente.post('/paseo/save-session', json={
+            'user_id': usuario, 'nivel_dificultad': 'facil', 'meta_aciertos': 5, 'total_aciertos': aciertos,
+            'total_errores_incorrecto': 1, 'total_errores_perdidas': 1, 'duracion_total': 60.0, 'completado': True})
+    cliente.post('/train-game/submit-results', json={'user_id': usuario, 'session_data': {
+        'correct_routing': 8, 'wrong_routing': 2, 'completion_status': 'completed'}})
+
+    memoria = cliente.get(f'/memory-game/stats/{usuario}').get_json()['data']
+    assert memoria['total_sessions'] == 3
+    assert memoria['completed_sessions'] == 2
+    assert memoria['average_accuracy'] == pytest.approx(70.0)
+    assert memoria['best_time'] == 30.0
+    assert [s['elapsed_time'] for s in memoria['recent_sessions']] == [40.0, 30.0, 20.0]
+
+    paseo = cliente.get(f'/paseo/final-stats/{usuario}').get_json()
+    assert (paseo['total_sesiones'], paseo['total_aciertos'], paseo['total_errores']) == (2, 7, 4)
+    assert paseo['precision'] == round(7 / 11 * 100, 1)
+
+    trenes = cliente.get(f'/train-game/stats/{usuario}').get_json()['data']
+    assert (trenes['total_sessions'], trenes['total_trains_routed'], trenes['average_accuracy']) == (1, 8, 80.0)
+
+    admin = cliente.get(f'/admin/user-stats/{usuario}').get_json()
+    assert admin['stats']['paseo']['victorias'] == 1
+    assert admin['stats']['memoria']['sesiones_completadas'] == 2
+    assert admin['acumulado']['memoria']['racha_dias'] == 1
+
+    # Reset de memoria: se van las sesiones y también su fila de estadísticas
+    cliente.delete(f'/memory-game/reset/{usuario}')
+    assert cliente.get(f'/memory-game/stats/{usuario}').get_json()['data']['total_sessions'] == 0
+    with app.app_context():
+        assert PaseoSession.query.count() == 2
+        assert db.session.get(UserGameStats, (usuario, 'paseo')).sesiones == 2